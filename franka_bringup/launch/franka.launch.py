@@ -18,7 +18,7 @@ import os
 from ament_index_python.packages import get_package_share_directory
 from launch import LaunchDescription
 from launch.actions import DeclareLaunchArgument, IncludeLaunchDescription, Shutdown
-from launch.conditions import IfCondition
+from launch.conditions import IfCondition, UnlessCondition
 from launch.launch_description_sources import PythonLaunchDescriptionSource
 from launch.substitutions import Command, FindExecutable, LaunchConfiguration, PathJoinSubstitution
 from launch_ros.actions import Node
@@ -29,12 +29,14 @@ def generate_launch_description():
     robot_ip_parameter_name = 'robot_ip'
     load_gripper_parameter_name = 'load_gripper'
     use_fake_hardware_parameter_name = 'use_fake_hardware'
+    use_loopback_hardware_parameter_name = 'use_loopback_hardware'
     fake_sensor_commands_parameter_name = 'fake_sensor_commands'
     use_rviz_parameter_name = 'use_rviz'
 
     robot_ip = LaunchConfiguration(robot_ip_parameter_name)
     load_gripper = LaunchConfiguration(load_gripper_parameter_name)
     use_fake_hardware = LaunchConfiguration(use_fake_hardware_parameter_name)
+    use_loopback_hardware = LaunchConfiguration(use_loopback_hardware_parameter_name)
     fake_sensor_commands = LaunchConfiguration(fake_sensor_commands_parameter_name)
     use_rviz = LaunchConfiguration(use_rviz_parameter_name)
 
@@ -43,7 +45,8 @@ def generate_launch_description():
     robot_description = Command(
         [FindExecutable(name='xacro'), ' ', franka_xacro_file, ' hand:=', load_gripper,
          ' robot_ip:=', robot_ip, ' use_fake_hardware:=', use_fake_hardware,
-         ' fake_sensor_commands:=', fake_sensor_commands])
+         ' fake_sensor_commands:=', fake_sensor_commands,
+         ' use_loopback_hardware:=', use_loopback_hardware])
 
     rviz_file = os.path.join(get_package_share_directory('franka_description'), 'rviz',
                              'visualize_franka.rviz')
@@ -68,6 +71,11 @@ def generate_launch_description():
             use_fake_hardware_parameter_name,
             default_value='false',
             description='Use fake hardware'),
+        DeclareLaunchArgument(
+            use_loopback_hardware_parameter_name,
+            default_value='false',
+            description='Run franka_hardware against a simulated robot instead of connecting to '
+                        "'{}'".format(robot_ip_parameter_name)),
         DeclareLaunchArgument(
             fake_sensor_commands_parameter_name,
             default_value='false',
@@ -109,12 +117,22 @@ def generate_launch_description():
             executable='spawner',
             arguments=['joint_state_broadcaster'],
             output='screen',
+            condition=IfCondition(use_fake_hardware),
+        ),
+        # Stamps the joint states with the time at which the robot measured them
+        Node(
+            package='controller_manager',
+            executable='spawner',
+            arguments=['franka_joint_state_broadcaster'],
+            output='screen',
+            condition=UnlessCondition(use_fake_hardware),
         ),
         IncludeLaunchDescription(
             PythonLaunchDescriptionSource([PathJoinSubstitution(
                 [FindPackageShare('franka_gripper'), 'launch', 'gripper.launch.py'])]),
             launch_arguments={robot_ip_parameter_name: robot_ip,
-                              use_fake_hardware_parameter_name: use_fake_hardware}.items(),
+                              use_fake_hardware_parameter_name: use_fake_hardware,
+                              use_loopback_hardware_parameter_name: use_loopback_hardware}.items(),
             condition=IfCondition(load_gripper)
 
         ),
@@ -19,6 +19,8 @@ import xacro
 
 panda_xacro_file_name = path.join(get_package_share_directory('franka_description'), 'robots',
                                   'panda_arm.urdf.xacro')
+dual_panda_xacro_file_name = path.join(get_package_share_directory('franka_description'),
+                                       'robots', 'dual_panda_arm.urdf.xacro')
 
 
 def test_load():
@@ -32,6 +34,16 @@ def test_load_with_gripper():
     assert urdf.find('panda_finger_joint') != -1
 
 
+def test_load_with_gripper_ros2_control():
+    urdf = xacro.process_file(panda_xacro_file_name).toxml()
+    assert urdf.find('franka_gripper/GripperHardwareInterface') == -1
+    urdf = xacro.process_file(panda_xacro_file_name,
+                              mappings={'hand': 'true', 'gripper_ros2_control': 'true'}).toxml()
+    assert urdf.count('<ros2_control') == 2
+    assert urdf.find('franka_gripper/GripperHardwareInterface') != -1
+    assert urdf.find('<joint name="panda_finger_joint2">') != -1
+
+
 def test_load_with_fake_hardware():
     urdf = xacro.process_file(panda_xacro_file_name,
                               mappings={'use_fake_hardware': 'true'}).toxml()
@@ -44,6 +56,18 @@ def test_load_with_robot_ip():
     assert urdf.find('franka_ip_address') != -1
 
 
+def test_load_with_loopback_hardware():
+    urdf = xacro.process_file(panda_xacro_file_name,
+                              mappings={'use_loopback_hardware': 'true'}).toxml()
+    assert urdf.find('<param name="loopback">True</param>') != -1
+
+
+def test_load_with_state_recording_file():
+    urdf = xacro.process_file(panda_xacro_file_name,
+                              mappings={'state_recording_file': '/tmp/states.bin'}).toxml()
+    assert urdf.find('<param name="state_recording_file">/tmp/states.bin</param>') != -1
+
+
 def test_load_with_arm_id():
     urdf = xacro.process_file(panda_xacro_file_name,
                               mappings={'arm_id': 'totally_different_arm'}).toxml()
@@ -59,5 +83,15 @@ def test_check_interfaces():
     assert urdf.find('effort') != -1
 
 
+def test_load_dual_arm():
+    urdf = xacro.process_file(dual_panda_xacro_file_name,
+                              mappings={'robot_ip_1': 'left_ip', 'robot_ip_2': 'right_ip'}).toxml()
+    assert urdf.count('<ros2_control') == 1
+    assert urdf.find('<param name="arm_id">left,right</param>') != -1
+    assert urdf.find('<param name="robot_ip">left_ip,right_ip</param>') != -1
+    assert urdf.find('<joint name="left_joint7">') != -1
+    assert urdf.find('<joint name="right_joint7">') != -1
+
+
 if __name__ == '__main__':
     pass
@@ -0,0 +1,466 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+/**
+ * Microbenchmark for the per-cycle cost of the example controllers, the MotionGenerator and
+ * replanning with the WaypointTrajectoryGenerator.
+ *
+ * Each controller is configured and activated like the controller manager does and its update()
+ * is run against loaned interfaces on in-memory joint values. The robot model has fixed
+ * quantities, so the time libfranka spends computing them once per cycle is not included. The time
+ * of every cycle is measured and the mean, p99 and worst-case latency are reported, together with
+ * the cache misses per cycle where the kernel grants access to the hardware counters. The
+ * controllers are restarted every two seconds of controller time, so that the move to start
+ * controller never reaches its goal. "waypoint_replan" replans five random waypoints from a random
+ * state of the previous motion, as the move to start controller does when its waypoints change. It
+ * runs kReplanCyclesDivisor times fewer cycles, as each one costs tens of microseconds. "timer" is
+ * an empty cycle, the measurement overhead which is included in all other rows.
+ *
+ * With --baseline the mean and p99 latencies are compared against a file written with
+ * --write-baseline and the benchmark fails if one of them exceeds the baseline by more than the
+ * tolerance. Baselines only compare on the machine they were recorded on.
+ *
+ * Usage: controller_update_benchmark [--cycles N] [--baseline FILE] [--write-baseline FILE]
+ *                                    [--tolerance FRACTION]
+ */
+
+#include <algorithm>
+#include <array>
+#include <chrono>
+#include <cmath>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <functional>
+#include <map>
+#include <random>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+#ifdef __linux__
+#include <linux/perf_event.h>
+#include <sys/ioctl.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+#endif
+
+#include <franka/robot_state.h>
+#include <Eigen/Core>
+#include <controller_interface/controller_interface.hpp>
+#include <franka_hardware/franka_robot_model.hpp>
+#include <hardware_interface/handle.hpp>
+#include <hardware_interface/loaned_command_interface.hpp>
+#include <hardware_interface/loaned_state_interface.hpp>
+#include <lifecycle_msgs/msg/state.hpp>
+#include <rclcpp/rclcpp.hpp>
+
+#include <franka_example_controllers/cartesian_impedance_example_controller.hpp>
+#include <franka_example_controllers/gravity_compensation_example_controller.hpp>
+#include <franka_example_controllers/joint_impedance_example_controller.hpp>
+#include <franka_example_controllers/motion_generator.hpp>
+#include <franka_example_controllers/move_to_start_example_controller.hpp>
+#include <franka_example_controllers/waypoint_trajectory_generator.hpp>
+#include "fixed_model.hpp"
+
+namespace {
+
+using Clock = std::chrono::steady_clock;
+
+constexpr std::size_t kNumberOfJoints = 7;
+constexpr double kPeriod = 1e-3;  // [s]
+constexpr long kDefaultCycles = 1000000;
+constexpr double kDefaultTolerance = 0.2;
+constexpr long kWarmUpCycles = 10000;
+// Controllers are restarted after this many cycles, which is shorter than the move to start motion
+constexpr long kRestartCycles = 2000;
+constexpr long kReplanCyclesDivisor = 100;
+constexpr std::size_t kReplanWaypoints = 5;
+
+struct Result {
+  double mean_ns;
+  double p99_ns;
+  double max_ns;
+  double cache_misses;  // per cycle, NaN if the counter is not available
+};
+
+/// Counts the cache misses of this thread with a perf_event hardware counter.
+class CacheMissCounter {
+ public:
+  CacheMissCounter() {
+#ifdef __linux__
+    perf_event_attr attributes{};
+    attributes.type = PERF_TYPE_HARDWARE;
+    attributes.size = sizeof(attributes);
+    attributes.config = PERF_COUNT_HW_CACHE_MISSES;
+    attributes.disabled = 1;
+    attributes.exclude_kernel = 1;
+    attributes.exclude_hv = 1;
+    file_descriptor_ = static_cast<int>(syscall(SYS_perf_event_open, &attributes, 0, -1, -1, 0));
+#endif
+  }
+
+  CacheMissCounter(const CacheMissCounter&) = delete;
+  CacheMissCounter& operator=(const CacheMissCounter&) = delete;
+
+  ~CacheMissCounter() {
+#ifdef __linux__
+    if (file_descriptor_ >= 0) {
+      close(file_descriptor_);
+    }
+#endif
+  }
+
+  void start() {
+#ifdef __linux__
+    if (file_descriptor_ >= 0) {
+      ioctl(file_descriptor_, PERF_EVENT_IOC_RESET, 0);
+      ioctl(file_descriptor_, PERF_EVENT_IOC_ENABLE, 0);
+    }
+#endif
+  }
+
+  /// @return the cache misses since start() or NaN if the counter is not available.
+  double stop() {
+#ifdef __linux__
+    uint64_t count = 0;
+    if (file_descriptor_ >= 0) {
+      ioctl(file_descriptor_, PERF_EVENT_IOC_DISABLE, 0);
+      if (read(file_descriptor_, &count, sizeof(count)) == sizeof(count)) {
+        return static_cast<double>(count);
+      }
+    }
+#endif
+    return std::nan("");
+  }
+
+ private:
+  int file_descriptor_ = -1;
+};
+
+/// Times each call of the cycle and summarizes the latencies. prepare is called before each cycle,
+/// outside of the timed region.
+Result measure(long cycles,
+               const std::function<void(long)>& cycle,
+               const std::function<void(long)>& prepare = nullptr) {
+  for (long i = 0; i < kWarmUpCycles; ++i) {
+    if (prepare) {
+      prepare(i);
+    }
+    cycle(i);
+  }
+  std::vector<int64_t> latencies_ns(cycles);
+  CacheMissCounter cache_misses;
+  cache_misses.start();
+  for (long i = 0; i < cycles; ++i) {
+    if (prepare) {
+      prepare(i);
+    }
+    const auto kStart = Clock::now();
+    cycle(i);
+    latencies_ns[i] =
+        std::chrono::duration_cast<std::chrono::nanoseconds>(Clock::now() - kStart).count();
+  }
+  const double kCacheMisses = cache_misses.stop();
+
+  double sum = 0.;
+  for (auto latency : latencies_ns) {
+    sum += latency;
+  }
+  const auto kP99 = latencies_ns.begin() + static_cast<long>(0.99 * (cycles - 1));
+  std::nth_element(latencies_ns.begin(), kP99, latencies_ns.end());
+  return {sum / cycles, static_cast<double>(*kP99),
+          static_cast<double>(*std::max_element(latencies_ns.begin(), latencies_ns.end())),
+          kCacheMisses / cycles};
+}
+
+/// Runs a controller against in-memory joint and robot model interfaces, like the controller
+/// manager does.
+template <typename Controller>
+Result benchmarkController(long cycles) {
+  Controller controller;
+  if (controller.init("controller") != controller_interface::return_type::OK) {
+    throw std::runtime_error("init failed");
+  }
+  auto node = controller.get_node();
+  for (const auto& name : {"k_gains", "d_gains"}) {
+    if (node->has_parameter(name)) {
+      node->set_parameter(rclcpp::Parameter(name, std::vector<double>(kNumberOfJoints, 10.)));
+    }
+  }
+  if (controller.configure().id() != lifecycle_msgs::msg::State::PRIMARY_STATE_INACTIVE) {
+    throw std::runtime_error("configure failed");
+  }
+
+  // Away from the start pose, so that the move to start controller has to move
+  std::array<double, kNumberOfJoints> positions{0., 0., 0., -1., 0., 0., 0.};
+  std::array<double, kNumberOfJoints> velocities{};
+  std::array<double, kNumberOfJoints> efforts{};
+  franka_example_controllers::FixedModel model;
+  // An arbitrary Jacobian of full rank
+  for (std::size_t i = 0; i < model.zero_jacobian.size(); ++i) {
+    model.zero_jacobian.at(i) = std::sin(static_cast<double>(i)) + (i % 7 == 0 ? 2. : 0.);
+  }
+  franka::RobotState robot_state;
+  robot_state.O_T_EE = {1., 0., 0., 0., 0., 1., 0., 0., 0., 0., 1., 0., 0.3, 0., 0.5, 1.};
+  robot_state.q = positions;
+  model.update(robot_state);
+  double robot_model_value = franka_hardware::pointerToStateValue<franka_hardware::Model>(&model);
+  double robot_state_value = franka_hardware::pointerToStateValue(&robot_state);
+  std::vector<hardware_interface::CommandInterface> command_handles;
+  std::vector<hardware_interface::StateInterface> state_handles;
+  command_handles.reserve(kNumberOfJoints);
+  state_handles.reserve(2 * kNumberOfJoints);
+  for (const auto& name : controller.command_interface_configuration().names) {
+    const auto kSeparator = name.find('/');
+    command_handles.emplace_back(name.substr(0, kSeparator), name.substr(kSeparator + 1),
+                                 &efforts.at(command_handles.size()));
+  }
+  for (const auto& name : controller.state_interface_configuration().names) {
+    const auto kSeparator = name.find('/');
+    const std::string kInterface = name.substr(kSeparator + 1);
+    const std::size_t kJoint = state_handles.size() / 2;
+    double* value = nullptr;
+    if (kInterface == franka_hardware::FrankaRobotModel::kRobotModelInterface) {
+      value = &robot_model_value;
+    } else if (kInterface == franka_hardware::FrankaRobotModel::kRobotStateInterface) {
+      value = &robot_state_value;
+    } else {
+      value = kInterface == "position" ? &positions.at(kJoint) : &velocities.at(kJoint);
+    }
+    state_handles.emplace_back(name.substr(0, kSeparator), kInterface, value);
+  }
+  std::vector<hardware_interface::LoanedCommandInterface> loaned_commands;
+  for (auto& handle : command_handles) {
+    loaned_commands.emplace_back(handle);
+  }
+  std::vector<hardware_interface::LoanedStateInterface> loaned_states;
+  for (auto& handle : state_handles) {
+    loaned_states.emplace_back(handle);
+  }
+  controller.assign_interfaces(std::move(loaned_commands), std::move(loaned_states));
+  if (node->activate().id() != lifecycle_msgs::msg::State::PRIMARY_STATE_ACTIVE) {
+    throw std::runtime_error("activate failed");
+  }
+
+  const auto kPeriodDuration = rclcpp::Duration::from_seconds(kPeriod);
+  rclcpp::Time time(0, 0, RCL_ROS_TIME);
+  return measure(
+      cycles,
+      [&](long /*cycle*/) {
+        time += kPeriodDuration;
+        controller.update(time, kPeriodDuration);
+      },
+      [&](long cycle) {
+        // The hardware starts a new cycle of the robot model before the controllers run
+        robot_state.tau_J_d = efforts;
+        model.update(robot_state);
+        if (cycle % kRestartCycles == kRestartCycles - 1) {
+          controller.on_activate(rclcpp_lifecycle::State());
+        }
+      });
+}
+
+Result benchmarkMotionGenerator(long cycles) {
+  const MotionGenerator::Vector7d kStart = MotionGenerator::Vector7d::Zero();
+  MotionGenerator::Vector7d goal;
+  goal << 0, -M_PI_4, 0, -3 * M_PI_4, 0, M_PI_2, M_PI_4;
+  MotionGenerator generator(0.2, kStart, goal);
+  // Sweep the whole motion again and again, to hit every segment
+  const auto kCyclesPerMotion = static_cast<long>(generator.getDuration() / kPeriod) + 1;
+  double checksum = 0.;
+  auto result = measure(cycles, [&](long cycle) {
+    const auto kTime = rclcpp::Duration::from_seconds((cycle % kCyclesPerMotion) * kPeriod);
+    checksum += generator.getDesiredJointPositions(kTime).first(3);
+  });
+  if (not std::isfinite(checksum)) {
+    throw std::runtime_error("motion generator diverged");
+  }
+  return result;
+}
+
+Result benchmarkReplan(long cycles) {
+  using Vector7d = franka_example_controllers::WaypointTrajectoryGenerator::Vector7d;
+  // The limits of the move to start controller
+  franka_example_controllers::WaypointTrajectoryGenerator generator(
+      {(Vector7d() << 0.4, 0.4, 0.4, 0.4, 0.5, 0.5, 0.5).finished(), Vector7d::Constant(1.),
+       Vector7d::Constant(5.)},
+      kReplanWaypoints);
+  std::vector<Vector7d> waypoints(kReplanWaypoints, Vector7d::Zero());
+  if (not generator.plan({Vector7d::Zero(), Vector7d::Zero(), Vector7d::Zero()}, waypoints)) {
+    throw std::runtime_error("waypoint planning failed");
+  }
+  std::mt19937 random_engine(42);
+  std::uniform_real_distribution<double> random_position(-1.5, 1.5);
+  std::uniform_real_distribution<double> random_fraction(0., 1.);
+  double replan_time = 0.;
+  long failures = 0;
+  // Each cycle continues from the motion of the previous one, so that most motions start at speed
+  auto result = measure(
+      cycles,
+      [&](long /*cycle*/) {
+        if (not generator.replan(replan_time, waypoints)) {
+          ++failures;
+        }
+      },
+      [&](long /*cycle*/) {
+        for (auto& waypoint : waypoints) {
+          for (Eigen::Index joint = 0; joint < waypoint.size(); ++joint) {
+            waypoint[joint] = random_position(random_engine);
+          }
+        }
+        replan_time = random_fraction(random_engine) * generator.getDuration();
+      });
+  if (failures > 0) {
+    throw std::runtime_error("waypoint replanning failed");
+  }
+  return result;
+}
+
+using Results = std::map<std::string, Result>;
+
+/// Name of the empty cycle, which is reported but not compared against the baseline
+constexpr const char* kTimer = "timer";
+
+void print(const Results& results) {
+  std::printf("%-22s %10s %10s %10s %14s\n", "", "mean [ns]", "p99 [ns]", "max [ns]",
+              "cache misses");
+  for (const auto& entry : results) {
+    const auto& kResult = entry.second;
+    std::printf("%-22s %10.1f %10.0f %10.0f", entry.first.c_str(), kResult.mean_ns, kResult.p99_ns,
+                kResult.max_ns);
+    if (std::isnan(kResult.cache_misses)) {
+      std::printf(" %14s\n", "n/a");
+    } else {
+      std::printf(" %14.2f\n", kResult.cache_misses);
+    }
+  }
+}
+
+void writeBaseline(const std::string& path, const Results& results) {
+  std::ofstream file(path);
+  file << "# controller_update_benchmark baseline: name, mean and p99 latency in ns\n"
+       << "# Only valid on the machine it was recorded on, regenerate with --write-baseline\n";
+  for (const auto& entry : results) {
+    file << entry.first << ' ' << entry.second.mean_ns << ' ' << entry.second.p99_ns << '\n';
+  }
+  if (not file) {
+    throw std::runtime_error("could not write " + path);
+  }
+}
+
+Results readBaseline(const std::string& path) {
+  std::ifstream file(path);
+  if (not file) {
+    throw std::runtime_error("could not read " + path);
+  }
+  Results baseline;
+  std::string line;
+  while (std::getline(file, line)) {
+    if (line.empty() or line[0] == '#') {
+      continue;
+    }
+    std::istringstream fields(line);
+    std::string name;
+    Result result{};
+    if (not(fields >> name >> result.mean_ns >> result.p99_ns)) {
+      throw std::runtime_error("malformed baseline line: " + line);
+    }
+    baseline[name] = result;
+  }
+  return baseline;
+}
+
+/// @return the number of latencies which exceed the baseline by more than the tolerance.
+int compare(const Results& results, const Results& baseline, double tolerance) {
+  int regressions = 0;
+  auto check = [&](const std::string& name, const char* statistic, double value,
+                   double baseline_value) {
+    if (value > baseline_value * (1. + tolerance)) {
+      std::printf("Regression: %s %s %.1f ns, baseline %.1f ns\n", name.c_str(), statistic, value,
+                  baseline_value);
+      ++regressions;
+    }
+  };
+  for (const auto& entry : baseline) {
+    const auto kResult = results.find(entry.first);
+    if (kResult == results.end() or entry.first == kTimer) {
+      continue;
+    }
+    check(entry.first, "mean", kResult->second.mean_ns, entry.second.mean_ns);
+    check(entry.first, "p99", kResult->second.p99_ns, entry.second.p99_ns);
+  }
+  return regressions;
+}
+
+}  // namespace
+
+int main(int argc, char** argv) {
+  long cycles = kDefaultCycles;
+  double tolerance = kDefaultTolerance;
+  std::string baseline_path;
+  std::string output_path;
+  for (int i = 1; i < argc; ++i) {
+    const std::string kArgument = argv[i];
+    if (i + 1 == argc) {
+      std::fprintf(stderr, "Missing value for %s\n", kArgument.c_str());
+      return 2;
+    }
+    const char* value = argv[++i];
+    if (kArgument == "--cycles") {
+      cycles = std::atol(value);
+    } else if (kArgument == "--baseline") {
+      baseline_path = value;
+    } else if (kArgument == "--write-baseline") {
+      output_path = value;
+    } else if (kArgument == "--tolerance") {
+      tolerance = std::atof(value);
+    } else {
+      std::fprintf(stderr, "Unknown argument %s\n", kArgument.c_str());
+      return 2;
+    }
+  }
+  if (cycles < 1) {
+    std::fprintf(stderr, "--cycles must be positive\n");
+    return 2;
+  }
+
+  rclcpp::init(argc, argv);
+  std::printf("%ld cycles per benchmark\n", cycles);
+  Results results;
+  results[kTimer] = measure(cycles, [](long /*cycle*/) {});
+  results["cartesian_impedance"] =
+      benchmarkController<franka_example_controllers::CartesianImpedanceExampleController>(cycles);
+  results["gravity_compensation"] =
+      benchmarkController<franka_example_controllers::GravityCompensationExampleController>(cycles);
+  results["joint_impedance"] =
+      benchmarkController<franka_example_controllers::JointImpedanceExampleController>(cycles);
+  results["move_to_start"] =
+      benchmarkController<franka_example_controllers::MoveToStartExampleController>(cycles);
+  results["motion_generator"] = benchmarkMotionGenerator(cycles);
+  results["waypoint_replan"] = benchmarkReplan(std::max(cycles / kReplanCyclesDivisor, 1L));
+  rclcpp::shutdown();
+  print(results);
+
+  if (not output_path.empty()) {
+    writeBaseline(output_path, results);
+  }
+  if (not baseline_path.empty()) {
+    return compare(results, readBaseline(baseline_path), tolerance) > 0 ? 1 : 0;
+  }
+  return 0;
+}
@@ -0,0 +1,120 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <memory>
+#include <mutex>
+#include <string>
+#include <vector>
+
+#include <Eigen/Dense>
+#include <controller_interface/controller_interface.hpp>
+#include <franka_hardware/franka_robot_model.hpp>
+#include <geometry_msgs/msg/pose_stamped.hpp>
+#include <rcl_interfaces/msg/set_parameters_result.hpp>
+#include <rclcpp/rclcpp.hpp>
+#include <realtime_tools/realtime_buffer.hpp>
+
+namespace franka_example_controllers {
+
+/**
+ * The Cartesian impedance example controller makes the end effector behave like a spring-damper
+ * system around an equilibrium pose. Joint motions that do not move the end effector are pulled
+ * towards the joint positions at activation.
+ *
+ * The equilibrium pose is set by publishing a geometry_msgs/PoseStamped in the base frame on
+ * ~/equilibrium_pose and the stiffness by setting the translational_stiffness,
+ * rotational_stiffness and nullspace_stiffness parameters while the controller runs. Both reach
+ * the control loop through a realtime buffer and are approached with a first-order filter, so
+ * that the commanded torques stay smooth.
+ *
+ * The Jacobian and the Coriolis forces are taken from the FrankaRobotModel, which computes them
+ * at most once per cycle.
+ */
+class CartesianImpedanceExampleController : public controller_interface::ControllerInterface {
+ public:
+  using Vector7d = Eigen::Matrix<double, 7, 1>;
+  using Vector6d = Eigen::Matrix<double, 6, 1>;
+  using Matrix6d = Eigen::Matrix<double, 6, 6>;
+
+  static constexpr double kDefaultTranslationalStiffness = 200.;  // [N/m]
+  static constexpr double kDefaultRotationalStiffness = 10.;      // [Nm/rad]
+  static constexpr double kDefaultNullspaceStiffness = 0.5;       // [Nm/rad]
+
+  /// Equilibrium pose and stiffness the controller converges to.
+  struct Target {
+    Eigen::Matrix<double, 3, 1, Eigen::DontAlign> position = Eigen::Vector3d::Zero();
+    Eigen::Quaternion<double, Eigen::DontAlign> orientation =
+        Eigen::Quaternion<double, Eigen::DontAlign>::Identity();
+    double translational_stiffness = kDefaultTranslationalStiffness;
+    double rotational_stiffness = kDefaultRotationalStiffness;
+    double nullspace_stiffness = kDefaultNullspaceStiffness;
+  };
+
+  controller_interface::InterfaceConfiguration command_interface_configuration() const override;
+  controller_interface::InterfaceConfiguration state_interface_configuration() const override;
+  controller_interface::return_type update(const rclcpp::Time& time,
+                                           const rclcpp::Duration& period) override;
+  controller_interface::return_type init(
+      const std::string& controller_name,
+      const std::string& namespace_ = "",
+      const rclcpp::NodeOptions& node_options = rclcpp::NodeOptions()) override;
+  CallbackReturn on_init() override { return CallbackReturn::SUCCESS; }
+  CallbackReturn on_configure(const rclcpp_lifecycle::State& previous_state) override;
+  CallbackReturn on_activate(const rclcpp_lifecycle::State& previous_state) override;
+  CallbackReturn on_deactivate(const rclcpp_lifecycle::State& previous_state) override;
+
+  EIGEN_MAKE_ALIGNED_OPERATOR_NEW
+
+ private:
+  /// Fraction of the remaining distance to the target covered per cycle
+  static constexpr double kFilterCoefficient = 0.005;
+  /// Largest change of the commanded torques per cycle
+  static constexpr double kMaxTorqueChange = 1.;  // [Nm]
+  /// Damping of the pseudoinverse used for the nullspace projection
+  static constexpr double kPseudoInverseDamping = 0.2;
+
+  /// Publishes a new target to the control loop. Must not be called from the control loop.
+  void setTarget(const Target& target);
+  void equilibriumPoseCallback(const geometry_msgs::msg::PoseStamped& message);
+  rcl_interfaces::msg::SetParametersResult parametersCallback(
+      const std::vector<rclcpp::Parameter>& parameters);
+  /// Moves the stiffness, damping and equilibrium pose one filter step towards the target.
+  void filterTowards(const Target& target);
+
+  std::string arm_id_;
+  const int num_joints = 7;
+  // Built once in on_configure
+  std::vector<std::string> command_interface_names_;
+  std::vector<std::string> state_interface_names_;
+  std::unique_ptr<franka_hardware::FrankaRobotModel> franka_robot_model_;
+
+  // Latest target, written outside of the control loop and handed over by target_buffer_
+  std::mutex target_mutex_;
+  Target target_;  // guarded by target_mutex_
+  realtime_tools::RealtimeBuffer<Target> target_buffer_;
+  rclcpp::Subscription<geometry_msgs::msg::PoseStamped>::SharedPtr equilibrium_pose_subscription_;
+  rclcpp::node_interfaces::OnSetParametersCallbackHandle::SharedPtr parameters_callback_handle_;
+
+  // Filtered values used by the control law, only accessed by the control loop
+  Vector6d cartesian_stiffness_ = Vector6d::Zero();  // diagonal of the stiffness matrix
+  Vector6d cartesian_damping_ = Vector6d::Zero();    // diagonal of the damping matrix
+  double nullspace_stiffness_ = 0.;
+  Eigen::Vector3d position_d_ = Eigen::Vector3d::Zero();
+  Eigen::Quaterniond orientation_d_ = Eigen::Quaterniond::Identity();
+  Vector7d q_d_nullspace_ = Vector7d::Zero();
+};
+
+}  // namespace franka_example_controllers
@@ -15,6 +15,7 @@
 #pragma once
 
 #include <string>
+#include <vector>
 
 #include <controller_interface/controller_interface.hpp>
 #include <rclcpp/duration.hpp>
@@ -41,5 +42,7 @@ class GravityCompensationExampleController : public controller_interface::Contro
  private:
   std::string arm_id_;
   const int num_joints = 7;
+  // Built once in on_configure
+  std::vector<std::string> command_interface_names_;
 };
 }  // namespace franka_example_controllers
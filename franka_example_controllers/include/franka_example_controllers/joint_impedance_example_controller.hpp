@@ -15,6 +15,7 @@
 #pragma once
 
 #include <string>
+#include <vector>
 
 #include <Eigen/Eigen>
 #include <controller_interface/controller_interface.hpp>
@@ -48,7 +49,10 @@ class JointImpedanceExampleController : public controller_interface::ControllerI
   Vector7d dq_filtered_;
   Vector7d k_gains_;
   Vector7d d_gains_;
-  rclcpp::Time start_time_;
+  double elapsed_time_ = 0.0;  // [s] sum of the update periods since activation
+  // Built once in on_configure
+  std::vector<std::string> command_interface_names_;
+  std::vector<std::string> state_interface_names_;
   void updateJointStates();
 };
 
@@ -23,10 +23,24 @@
  * An example showing how to generate a joint pose motion to a goal position. Adapted from:
  * Wisama Khalil and Etienne Dombre. 2002. Modeling, Identification and Control of Robots
  * (Kogan Page Science Paper edition).
+ *
+ * Each joint accelerates, cruises, decelerates and rests. The motion of each of these segments is
+ * a polynomial in the time since the segment started, whose coefficients are computed once in the
+ * constructor, so evaluating the motion only selects the active segment of each joint and
+ * evaluates its polynomial.
  */
 class MotionGenerator {
  public:
   using Vector7d = Eigen::Matrix<double, 7, 1>;
+  using Matrix7Xd = Eigen::Matrix<double, 7, Eigen::Dynamic>;
+
+  /// Joint positions, velocities and accelerations at several times, one column per time.
+  struct Samples {
+    Matrix7Xd positions;
+    Matrix7Xd velocities;
+    Matrix7Xd accelerations;
+  };
+
   /**
    * Creates a new MotionGenerator instance for a target q.
    *
@@ -39,7 +53,6 @@ class MotionGenerator {
   /**
    * Sends joint position calculations
    *
-   * @param[in] robot_state Current state of the robot.
    * @param[in] trajectory_time Amount of time, that has passed since the start of the trajectory.
    *
    * @return Joint positions to use inside a control loop and a boolean indicating whether the
@@ -47,23 +60,59 @@ class MotionGenerator {
    */
   std::pair<Vector7d, bool> getDesiredJointPositions(const rclcpp::Duration& trajectory_time);
 
+  /**
+   * Samples the whole motion, e.g. to check it before it is executed.
+   *
+   * @param[in] times Times since the start of the trajectory in s.
+   *
+   * @return Joint positions, velocities and accelerations at the given times.
+   */
+  Samples sample(const Eigen::Ref<const Eigen::VectorXd>& times) const;
+
+  /// @return the time in s after which all joints reached the goal.
+  double getDuration() const;
+
  private:
   using Vector7i = Eigen::Matrix<int, 7, 1>;
-
-  bool calculateDesiredValues(double t, Vector7d* delta_q_d) const;
-  void calculateSynchronizedValues();
+  using Array7d = Eigen::Array<double, 7, 1>;
 
   static constexpr double kDeltaQMotionFinished = 1e-6;
   static const int kJoints = 7;
+  // Acceleration, constant velocity, deceleration and rest
+  static const int kSegments = 4;
+  // Coefficients of the polynomials in ascending order, the motion is at most quartic
+  static const int kCoefficients = 5;
+
+  using Coefficients = Eigen::Array<double, kJoints, kCoefficients>;
+
+  /**
+   * Evaluates the motion relative to the start positions.
+   *
+   * @param[in] t Time since the start of the trajectory in s.
+   * @param[out] delta_q_d Joint position change since the start.
+   * @param[out] dq_d Joint velocities, not computed if null.
+   * @param[out] ddq_d Joint accelerations, not computed if null.
+   *
+   * @return whether all joints reached the goal.
+   */
+  bool calculateDesiredValues(double t,
+                              Vector7d* delta_q_d,
+                              Vector7d* dq_d = nullptr,
+                              Vector7d* ddq_d = nullptr) const;
+  void calculateSynchronizedValues();
 
   Vector7d q_start_;
   Vector7d delta_q_;
 
-  Vector7d dq_max_sync_;
-  Vector7d t_1_sync_;
-  Vector7d t_2_sync_;
-  Vector7d t_f_sync_;
-  Vector7d q_1_;
+  Vector7d dq_max_sync_ = Vector7d::Zero();
+  Vector7d t_1_sync_ = Vector7d::Zero();
+  Vector7d t_2_sync_ = Vector7d::Zero();
+  Vector7d t_f_sync_ = Vector7d::Zero();
+  Vector7d q_1_ = Vector7d::Zero();
+
+  // Start time and polynomial coefficients of each segment per joint
+  std::array<Array7d, kSegments> segment_start_;
+  std::array<Coefficients, kSegments> segment_coefficients_;
 
   double time_ = 0.0;
 
@@ -14,18 +14,27 @@
 
 #pragma once
 
+#include <cstddef>
+#include <cstdint>
 #include <memory>
+#include <mutex>
 #include <string>
+#include <vector>
 
 #include <Eigen/Eigen>
 #include <controller_interface/controller_interface.hpp>
+#include <rcl_interfaces/msg/set_parameters_result.hpp>
 #include <rclcpp/rclcpp.hpp>
+#include <realtime_tools/realtime_buffer.hpp>
 
-#include "motion_generator.hpp"
+#include "waypoint_trajectory_generator.hpp"
 
 namespace franka_example_controllers {
 
-/// The move to start example controller moves the robot into default pose.
+/// The move to start example controller moves the robot into default pose, passing the joint
+/// positions of the waypoints parameter on the way without stopping. When the waypoints parameter
+/// changes while the controller is active, the motion is replanned from the current desired state
+/// through the new waypoints.
 class MoveToStartExampleController : public controller_interface::ControllerInterface {
  public:
   using Vector7d = Eigen::Matrix<double, 7, 1>;
@@ -39,9 +48,24 @@ class MoveToStartExampleController : public controller_interface::ControllerInte
   CallbackReturn on_configure(const rclcpp_lifecycle::State& previous_state) override;
   CallbackReturn on_activate(const rclcpp_lifecycle::State& previous_state) override;
 
+  /// Largest number of waypoints, including the start pose at the end
+  static constexpr std::size_t kMaxWaypoints = 10;
+
     /// added to make this compile, don't know if it is correct
    CallbackReturn on_init() override { return CallbackReturn::SUCCESS; };
  private:
+  struct Waypoints {
+    uint64_t id = 0;  // increases with each change of the waypoints parameter
+    std::vector<Vector7d> positions;
+  };
+
+  /// Converts the waypoints parameter to the waypoints of the motion, ending at the start pose.
+  /// @return false if the parameter does not hold whole waypoints or too many.
+  bool parseWaypoints(const std::vector<double>& parameter, std::vector<Vector7d>* waypoints) const;
+
+  rcl_interfaces::msg::SetParametersResult parametersCallback(
+      const std::vector<rclcpp::Parameter>& parameters);
+
   std::string arm_id_;
   const int num_joints = 7;
   Vector7d q_;
@@ -50,8 +74,20 @@ class MoveToStartExampleController : public controller_interface::ControllerInte
   Vector7d dq_filtered_;
   Vector7d k_gains_;
   Vector7d d_gains_;
-  rclcpp::Time start_time_;
-  std::unique_ptr<MotionGenerator> motion_generator_;
+  double elapsed_time_ = 0.0;  // [s] sum of the update periods since activation
+  // Built once in on_configure
+  std::vector<std::string> command_interface_names_;
+  std::vector<std::string> state_interface_names_;
+  std::unique_ptr<WaypointTrajectoryGenerator> trajectory_generator_;
+  // Written by the parameter callback, read by update()
+  std::mutex waypoints_mutex_;
+  Waypoints waypoints_;  // guarded by waypoints_mutex_
+  realtime_tools::RealtimeBuffer<Waypoints> waypoints_buffer_;
+  uint64_t planned_waypoints_id_ = 0;  // only accessed by the control loop
+  rclcpp::node_interfaces::OnSetParametersCallbackHandle::SharedPtr parameters_callback_handle_;
+  const Vector7d dq_max_ = (Vector7d() << 0.4, 0.4, 0.4, 0.4, 0.5, 0.5, 0.5).finished();  // rad/s
+  const Vector7d ddq_max_ = Vector7d::Constant(1.0);                                      // rad/s^2
+  const Vector7d dddq_max_ = Vector7d::Constant(5.0);                                     // rad/s^3
 
   void updateJointStates();
 };
@@ -0,0 +1,141 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <cstddef>
+#include <vector>
+
+#include <Eigen/Core>
+
+namespace franka_example_controllers {
+
+/**
+ * Generates a joint motion through a sequence of waypoints that respects velocity, acceleration
+ * and jerk limits for each joint.
+ *
+ * Each section between two waypoints is a quintic polynomial, so position, velocity and
+ * acceleration are continuous. The motion passes the intermediate waypoints without stopping: a
+ * joint keeps moving through a waypoint with the harmonic mean of the average velocities of the
+ * adjacent sections, or stops there if it changes direction. The motion ends at rest at the last
+ * waypoint. All joints share the duration of each section, which is the shortest duration within
+ * the limits of all joints.
+ *
+ * The motion can be replanned from any state, e.g. the current desired state when a new target
+ * arrives. Planning does not allocate memory as long as the number of waypoints does not exceed
+ * the capacity given to the constructor, so it can run within a control cycle. The planning time
+ * of five waypoints is measured by controller_update_benchmark.
+ */
+class WaypointTrajectoryGenerator {
+ public:
+  using Vector7d = Eigen::Matrix<double, 7, 1>;
+
+  /// Limits of each joint, all must be positive.
+  struct Limits {
+    Vector7d velocity;      // [rad/s]
+    Vector7d acceleration;  // [rad/s^2]
+    Vector7d jerk;          // [rad/s^3]
+  };
+
+  struct State {
+    Vector7d position;
+    Vector7d velocity;
+    Vector7d acceleration;
+  };
+
+  /**
+   * Creates a generator without a motion, plan() or replan() must be called before
+   * getDesiredState().
+   *
+   * @param[in] limits Joint limits.
+   * @param[in] max_waypoints Largest number of waypoints accepted by plan().
+   * @throw std::invalid_argument if a limit is not positive or max_waypoints is 0.
+   */
+  WaypointTrajectoryGenerator(const Limits& limits, std::size_t max_waypoints);
+
+  /**
+   * Plans a new motion that starts with the given state at time 0.
+   *
+   * @param[in] start State at the start of the motion.
+   * @param[in] waypoints Joint positions to pass, the motion ends at rest at the last one.
+   *
+   * @return false if there are no waypoints or more than max_waypoints. The previous motion is
+   * kept then.
+   */
+  bool plan(const State& start, const std::vector<Vector7d>& waypoints);
+
+  /**
+   * Plans a new motion that continues the current motion from its state at time t, so the
+   * desired state stays continuous. The new motion starts at time 0.
+   *
+   * @param[in] t Time of the current motion at which the new motion starts.
+   * @param[in] waypoints Joint positions to pass, the motion ends at rest at the last one.
+   *
+   * @return false if there is no current motion or plan() would fail.
+   */
+  bool replan(double t, const std::vector<Vector7d>& waypoints);
+
+  /**
+   * @param[in] t Time since the start of the motion in s.
+   *
+   * @return the desired state. Before the start it is the start state, after the end the last
+   * waypoint at rest.
+   */
+  State getDesiredState(double t) const;
+
+  /// @return the duration of the motion in s, 0 if there is none.
+  double getDuration() const { return duration_; }
+
+  /// @return whether the motion reached the last waypoint at time t.
+  bool isFinished(double t) const { return not sections_.empty() and t >= duration_; }
+
+ private:
+  static const int kJoints = 7;
+  static constexpr double kMinSectionDuration = 1e-3;  // [s]
+  static constexpr int kMaxFitIterations = 30;
+  // The section durations are accepted once the limits are used to at least this fraction
+  static constexpr double kFitTolerance = 0.99;
+
+  // Coefficients in ascending order of the polynomial of each joint, one column per order
+  using Coefficients = Eigen::Matrix<double, kJoints, 6, Eigen::DontAlign>;
+
+  struct Section {
+    double start_time;
+    double duration;
+    Coefficients coefficients;
+  };
+
+  /// @return the coefficients of the quintic polynomials from state 0 to state 1 in time t.
+  static Coefficients quinticCoefficients(const State& state_0, const State& state_1, double t);
+
+  /// @return the largest ratio of a joint velocity, acceleration or jerk to its limit, where the
+  /// acceleration and jerk ratios are scaled like the velocity ratio when the duration changes.
+  double limitRatio(const Coefficients& coefficients, double duration) const;
+
+  /// @return the shortest duration for which the section between the states stays within the
+  /// limits, or the duration closest to the limits if there is none.
+  double fitDuration(const State& state_0, const State& state_1, double initial_duration) const;
+
+  /// @return the duration of a rest to rest section within the limits.
+  double restToRestDuration(const Vector7d& delta) const;
+
+  Limits limits_;
+  std::size_t max_waypoints_;
+  std::vector<Section> sections_;
+  // Boundary states of the sections, reserved once
+  std::vector<State> boundaries_;
+  double duration_ = 0.;
+};
+
+}  // namespace franka_example_controllers
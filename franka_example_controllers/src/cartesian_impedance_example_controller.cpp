@@ -0,0 +1,260 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <franka_example_controllers/cartesian_impedance_example_controller.hpp>
+
+#include <cmath>
+#include <exception>
+#include <string>
+
+namespace franka_example_controllers {
+
+constexpr double CartesianImpedanceExampleController::kDefaultTranslationalStiffness;
+constexpr double CartesianImpedanceExampleController::kDefaultRotationalStiffness;
+constexpr double CartesianImpedanceExampleController::kDefaultNullspaceStiffness;
+constexpr double CartesianImpedanceExampleController::kFilterCoefficient;
+constexpr double CartesianImpedanceExampleController::kMaxTorqueChange;
+constexpr double CartesianImpedanceExampleController::kPseudoInverseDamping;
+
+namespace {
+const char* const kStiffnessParameters[] = {"translational_stiffness", "rotational_stiffness",
+                                            "nullspace_stiffness"};
+
+bool isValidStiffness(double stiffness) {
+  return std::isfinite(stiffness) and stiffness >= 0.;
+}
+}  // namespace
+
+controller_interface::InterfaceConfiguration
+CartesianImpedanceExampleController::command_interface_configuration() const {
+  return {controller_interface::interface_configuration_type::INDIVIDUAL, command_interface_names_};
+}
+
+controller_interface::InterfaceConfiguration
+CartesianImpedanceExampleController::state_interface_configuration() const {
+  return {controller_interface::interface_configuration_type::INDIVIDUAL, state_interface_names_};
+}
+
+controller_interface::return_type CartesianImpedanceExampleController::update(
+    const rclcpp::Time& /*time*/,
+    const rclcpp::Duration& /*period*/) {
+  const auto& kRobotState = franka_robot_model_->getRobotState();
+  const Eigen::Map<const Vector7d> kCoriolis(franka_robot_model_->getCoriolisForceVector().data());
+  const Eigen::Map<const Eigen::Matrix<double, 6, 7>> kJacobian(
+      franka_robot_model_->getZeroJacobian(franka::Frame::kEndEffector).data());
+  const Eigen::Map<const Vector7d> kQ(kRobotState.q.data());
+  const Eigen::Map<const Vector7d> kDq(kRobotState.dq.data());
+  const Eigen::Map<const Vector7d> kTauJD(kRobotState.tau_J_d.data());
+  const Eigen::Map<const Eigen::Matrix4d> kTransform(kRobotState.O_T_EE.data());
+  const Eigen::Matrix3d kRotation = kTransform.topLeftCorner<3, 3>();
+
+  // Pose error, the orientation error as the vector part of the error quaternion in the base frame
+  Vector6d error;
+  error.head<3>() = kTransform.topRightCorner<3, 1>() - position_d_;
+  Eigen::Quaterniond orientation(kRotation);
+  if (orientation_d_.coeffs().dot(orientation.coeffs()) < 0.) {
+    orientation.coeffs() = -orientation.coeffs();
+  }
+  const Eigen::Quaterniond kErrorQuaternion(orientation.inverse() * orientation_d_);
+  error.tail<3>() = -kRotation * kErrorQuaternion.vec();
+
+  const Vector7d kTauTask =
+      kJacobian.transpose() * (-cartesian_stiffness_.cwiseProduct(error) -
+                               cartesian_damping_.cwiseProduct(kJacobian * kDq));
+  // The nullspace torques are projected with the damped pseudoinverse of the transposed Jacobian,
+  // (I - J^T (J J^T + d^2 I)^-1 J) tau, evaluated from right to left on fixed-size matrices. The
+  // damping keeps J J^T + d^2 I positive definite, so that a Cholesky decomposition solves it.
+  const Vector7d kNullspaceTorque =
+      nullspace_stiffness_ * (q_d_nullspace_ - kQ) - 2. * std::sqrt(nullspace_stiffness_) * kDq;
+  const Matrix6d kDampedJacobianProduct =
+      kJacobian * kJacobian.transpose() +
+      kPseudoInverseDamping * kPseudoInverseDamping * Matrix6d::Identity();
+  const Vector7d kTauNullspace =
+      kNullspaceTorque -
+      kJacobian.transpose() * kDampedJacobianProduct.llt().solve(kJacobian * kNullspaceTorque);
+  // Limit the change of the torques to the torques commanded last
+  const Vector7d kTauD = kTauJD + (kTauTask + kTauNullspace + kCoriolis - kTauJD)
+                                      .cwiseMax(-kMaxTorqueChange)
+                                      .cwiseMin(kMaxTorqueChange);
+  for (int i = 0; i < num_joints; ++i) {
+    command_interfaces_[i].set_value(kTauD(i));
+  }
+
+  filterTowards(*target_buffer_.readFromRT());
+  return controller_interface::return_type::OK;
+}
+
+void CartesianImpedanceExampleController::filterTowards(const Target& target) {
+  Vector6d stiffness;
+  stiffness << Eigen::Vector3d::Constant(target.translational_stiffness),
+      Eigen::Vector3d::Constant(target.rotational_stiffness);
+  cartesian_stiffness_ =
+      kFilterCoefficient * stiffness + (1. - kFilterCoefficient) * cartesian_stiffness_;
+  cartesian_damping_ = kFilterCoefficient * 2. * stiffness.cwiseSqrt() +
+                       (1. - kFilterCoefficient) * cartesian_damping_;
+  nullspace_stiffness_ = kFilterCoefficient * target.nullspace_stiffness +
+                         (1. - kFilterCoefficient) * nullspace_stiffness_;
+  position_d_ = kFilterCoefficient * target.position + (1. - kFilterCoefficient) * position_d_;
+  orientation_d_ = orientation_d_.slerp(kFilterCoefficient, Eigen::Quaterniond(target.orientation));
+}
+
+controller_interface::return_type CartesianImpedanceExampleController::init(
+    const std::string& controller_name,
+    const std::string& /*namespace_*/,
+    const rclcpp::NodeOptions& /*node_options*/) {
+  auto ret = ControllerInterface::init(controller_name);
+  if (ret != controller_interface::return_type::OK) {
+    return ret;
+  }
+  try {
+    auto_declare<std::string>("arm_id", "panda");
+    auto_declare<double>("translational_stiffness", kDefaultTranslationalStiffness);
+    auto_declare<double>("rotational_stiffness", kDefaultRotationalStiffness);
+    auto_declare<double>("nullspace_stiffness", kDefaultNullspaceStiffness);
+  } catch (const std::exception& e) {
+    fprintf(stderr, "Exception thrown during init stage with message: %s \n", e.what());
+    return controller_interface::return_type::ERROR;
+  }
+  return controller_interface::return_type::OK;
+}
+
+rclcpp_lifecycle::node_interfaces::LifecycleNodeInterface::CallbackReturn
+CartesianImpedanceExampleController::on_configure(
+    const rclcpp_lifecycle::State& /*previous_state*/) {
+  arm_id_ = get_node()->get_parameter("arm_id").as_string();
+  for (const auto* name : kStiffnessParameters) {
+    if (not isValidStiffness(get_node()->get_parameter(name).as_double())) {
+      RCLCPP_FATAL(get_node()->get_logger(), "%s must be finite and not negative", name);
+      return CallbackReturn::FAILURE;
+    }
+  }
+  Target target;
+  target.translational_stiffness = get_node()->get_parameter("translational_stiffness").as_double();
+  target.rotational_stiffness = get_node()->get_parameter("rotational_stiffness").as_double();
+  target.nullspace_stiffness = get_node()->get_parameter("nullspace_stiffness").as_double();
+  setTarget(target);
+
+  franka_robot_model_ = std::make_unique<franka_hardware::FrankaRobotModel>(arm_id_);
+  command_interface_names_.clear();
+  for (int i = 1; i <= num_joints; ++i) {
+    command_interface_names_.push_back(arm_id_ + "_joint" + std::to_string(i) + "/effort");
+  }
+  state_interface_names_ = franka_robot_model_->getStateInterfaceNames();
+
+  equilibrium_pose_subscription_ = get_node()->create_subscription<geometry_msgs::msg::PoseStamped>(
+      "~/equilibrium_pose", rclcpp::SystemDefaultsQoS(),
+      [this](const geometry_msgs::msg::PoseStamped::ConstSharedPtr message) {
+        equilibriumPoseCallback(*message);
+      });
+  parameters_callback_handle_ = get_node()->add_on_set_parameters_callback(
+      [this](const std::vector<rclcpp::Parameter>& parameters) {
+        return parametersCallback(parameters);
+      });
+  return CallbackReturn::SUCCESS;
+}
+
+rclcpp_lifecycle::node_interfaces::LifecycleNodeInterface::CallbackReturn
+CartesianImpedanceExampleController::on_activate(
+    const rclcpp_lifecycle::State& /*previous_state*/) {
+  if (not franka_robot_model_->assignLoanedStateInterfaces(state_interfaces_)) {
+    RCLCPP_ERROR(get_node()->get_logger(), "The robot model interfaces of %s are missing",
+                 arm_id_.c_str());
+    return CallbackReturn::ERROR;
+  }
+  const auto& kRobotState = franka_robot_model_->getRobotState();
+  const Eigen::Map<const Eigen::Matrix4d> kTransform(kRobotState.O_T_EE.data());
+
+  // Hold the current pose and ramp the stiffness up from zero
+  position_d_ = kTransform.topRightCorner<3, 1>();
+  orientation_d_ = Eigen::Quaterniond(Eigen::Matrix3d(kTransform.topLeftCorner<3, 3>()));
+  q_d_nullspace_ = Eigen::Map<const Vector7d>(kRobotState.q.data());
+  cartesian_stiffness_.setZero();
+  cartesian_damping_.setZero();
+  nullspace_stiffness_ = 0.;
+
+  std::lock_guard<std::mutex> lock(target_mutex_);
+  target_.position = position_d_;
+  target_.orientation = orientation_d_;
+  target_buffer_.writeFromNonRT(target_);
+  return CallbackReturn::SUCCESS;
+}
+
+rclcpp_lifecycle::node_interfaces::LifecycleNodeInterface::CallbackReturn
+CartesianImpedanceExampleController::on_deactivate(
+    const rclcpp_lifecycle::State& /*previous_state*/) {
+  franka_robot_model_->releaseInterfaces();
+  return CallbackReturn::SUCCESS;
+}
+
+void CartesianImpedanceExampleController::setTarget(const Target& target) {
+  std::lock_guard<std::mutex> lock(target_mutex_);
+  target_ = target;
+  target_buffer_.writeFromNonRT(target_);
+}
+
+void CartesianImpedanceExampleController::equilibriumPoseCallback(
+    const geometry_msgs::msg::PoseStamped& message) {
+  const auto& kPosition = message.pose.position;
+  const auto& kOrientation = message.pose.orientation;
+  Eigen::Quaterniond orientation(kOrientation.w, kOrientation.x, kOrientation.y, kOrientation.z);
+  const Eigen::Vector3d kPositionVector(kPosition.x, kPosition.y, kPosition.z);
+  if (not kPositionVector.allFinite() or not orientation.coeffs().allFinite() or
+      orientation.norm() < 1e-6) {
+    RCLCPP_WARN(get_node()->get_logger(), "Ignoring invalid equilibrium pose");
+    return;
+  }
+  orientation.normalize();
+
+  std::lock_guard<std::mutex> lock(target_mutex_);
+  target_.position = kPositionVector;
+  target_.orientation = orientation;
+  target_buffer_.writeFromNonRT(target_);
+}
+
+rcl_interfaces::msg::SetParametersResult CartesianImpedanceExampleController::parametersCallback(
+    const std::vector<rclcpp::Parameter>& parameters) {
+  rcl_interfaces::msg::SetParametersResult result;
+  result.successful = true;
+  std::lock_guard<std::mutex> lock(target_mutex_);
+  Target target = target_;
+  for (const auto& parameter : parameters) {
+    const auto& kName = parameter.get_name();
+    double* stiffness = nullptr;
+    if (kName == "translational_stiffness") {
+      stiffness = &target.translational_stiffness;
+    } else if (kName == "rotational_stiffness") {
+      stiffness = &target.rotational_stiffness;
+    } else if (kName == "nullspace_stiffness") {
+      stiffness = &target.nullspace_stiffness;
+    } else {
+      continue;
+    }
+    if (parameter.get_type() != rclcpp::ParameterType::PARAMETER_DOUBLE or
+        not isValidStiffness(parameter.as_double())) {
+      result.successful = false;
+      result.reason = kName + " must be a finite and not negative double";
+      return result;
+    }
+    *stiffness = parameter.as_double();
+  }
+  target_ = target;
+  target_buffer_.writeFromNonRT(target_);
+  return result;
+}
+
+}  // namespace franka_example_controllers
+#include "pluginlib/class_list_macros.hpp"
+// NOLINTNEXTLINE
+PLUGINLIB_EXPORT_CLASS(franka_example_controllers::CartesianImpedanceExampleController,
+                       controller_interface::ControllerInterface)
@@ -21,13 +21,8 @@ namespace franka_example_controllers {
 
 controller_interface::InterfaceConfiguration
 GravityCompensationExampleController::command_interface_configuration() const {
-  controller_interface::InterfaceConfiguration config;
-  config.type = controller_interface::interface_configuration_type::INDIVIDUAL;
-
-  for (int i = 1; i <= num_joints; ++i) {
-    config.names.push_back(arm_id_ + "_joint" + std::to_string(i) + "/effort");
-  }
-  return config;
+  return {controller_interface::interface_configuration_type::INDIVIDUAL,
+          command_interface_names_};
 }
 
 controller_interface::InterfaceConfiguration
@@ -46,6 +41,10 @@ rclcpp_lifecycle::node_interfaces::LifecycleNodeInterface::CallbackReturn
 GravityCompensationExampleController::on_configure(
     const rclcpp_lifecycle::State& /*previous_state*/) {
     arm_id_ = get_node()->get_parameter("arm_id").as_string();
+  command_interface_names_.clear();
+  for (int i = 1; i <= num_joints; ++i) {
+    command_interface_names_.push_back(arm_id_ + "_joint" + std::to_string(i) + "/effort");
+  }
   return CallbackReturn::SUCCESS;
 }
 
@@ -25,31 +25,23 @@ namespace franka_example_controllers {
 
 controller_interface::InterfaceConfiguration
 JointImpedanceExampleController::command_interface_configuration() const {
-  controller_interface::InterfaceConfiguration config;
-  config.type = controller_interface::interface_configuration_type::INDIVIDUAL;
-
-  for (int i = 1; i <= num_joints; ++i) {
-    config.names.push_back(arm_id_ + "_joint" + std::to_string(i) + "/effort");
-  }
-  return config;
+  return {controller_interface::interface_configuration_type::INDIVIDUAL,
+          command_interface_names_};
 }
 
 controller_interface::InterfaceConfiguration
 JointImpedanceExampleController::state_interface_configuration() const {
-  controller_interface::InterfaceConfiguration config;
-  config.type = controller_interface::interface_configuration_type::INDIVIDUAL;
-  for (int i = 1; i <= num_joints; ++i) {
-    config.names.push_back(arm_id_ + "_joint" + std::to_string(i) + "/position");
-    config.names.push_back(arm_id_ + "_joint" + std::to_string(i) + "/velocity");
-  }
-  return config;
+  return {controller_interface::interface_configuration_type::INDIVIDUAL,
+          state_interface_names_};
 }
 
-controller_interface::return_type JointImpedanceExampleController::update(const rclcpp::Time &, const rclcpp::Duration & ) {
+controller_interface::return_type JointImpedanceExampleController::update(
+    const rclcpp::Time& /*time*/,
+    const rclcpp::Duration& period) {
   updateJointStates();
   Vector7d q_goal = initial_q_;
-  auto time = get_node()->now() - start_time_;
-  double delta_angle = M_PI / 8.0 * (1 - std::cos(M_PI / 2.5 * time.seconds()));
+  elapsed_time_ += period.seconds();
+  double delta_angle = M_PI / 8.0 * (1 - std::cos(M_PI / 2.5 * elapsed_time_));
   q_goal(3) += delta_angle;
   q_goal(4) += delta_angle;
 
@@ -109,6 +101,14 @@ JointImpedanceExampleController::on_configure(const rclcpp_lifecycle::State& /*p
     d_gains_(i) = d_gains.at(i);
     k_gains_(i) = k_gains.at(i);
   }
+  command_interface_names_.clear();
+  state_interface_names_.clear();
+  for (int i = 1; i <= num_joints; ++i) {
+    const auto kJointName = arm_id_ + "_joint" + std::to_string(i);
+    command_interface_names_.push_back(kJointName + "/effort");
+    state_interface_names_.push_back(kJointName + "/position");
+    state_interface_names_.push_back(kJointName + "/velocity");
+  }
   dq_filtered_.setZero();
   return CallbackReturn::SUCCESS;
 }
@@ -117,7 +117,7 @@ rclcpp_lifecycle::node_interfaces::LifecycleNodeInterface::CallbackReturn
 JointImpedanceExampleController::on_activate(const rclcpp_lifecycle::State& /*previous_state*/) {
   updateJointStates();
   initial_q_ = q_;
-  start_time_ = get_node()->now();
+  elapsed_time_ = 0.0;
   return CallbackReturn::SUCCESS;
 }
 
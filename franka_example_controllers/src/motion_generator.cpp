@@ -14,7 +14,6 @@
 
 #include <franka_example_controllers/motion_generator.hpp>
 
-#include <algorithm>
 #include <array>
 #include <cassert>
 #include <cmath>
@@ -22,6 +21,8 @@
 
 #include <Eigen/Core>
 
+constexpr double MotionGenerator::kDeltaQMotionFinished;
+
 MotionGenerator::MotionGenerator(double speed_factor,
                                  const Vector7d& q_start,
                                  const Vector7d& q_goal)
@@ -35,39 +36,34 @@ MotionGenerator::MotionGenerator(double speed_factor,
   calculateSynchronizedValues();
 }
 
-bool MotionGenerator::calculateDesiredValues(double t, Vector7d* delta_q_d) const {
-  Vector7i sign_delta_q;
-  sign_delta_q << delta_q_.cwiseSign().cast<int>();
-  Vector7d t_d = t_2_sync_ - t_1_sync_;
-  Vector7d delta_t_2_sync = t_f_sync_ - t_2_sync_;
-  std::array<bool, kJoints> joint_motion_finished{};
-
+bool MotionGenerator::calculateDesiredValues(double t,
+                                             Vector7d* delta_q_d,
+                                             Vector7d* dq_d,
+                                             Vector7d* ddq_d) const {
+  // The segments start one after another, so the number of started segments after the first one
+  // is the index of the active segment
+  const Array7d kTime = Array7d::Constant(t);
+  Vector7i segment = Vector7i::Zero();
+  for (auto i = 1; i < kSegments; i++) {
+    segment.array() += (kTime >= segment_start_[i]).cast<int>();
+  }
+  Coefficients c;
+  Array7d segment_start;
   for (auto i = 0; i < kJoints; i++) {
-    if (std::abs(delta_q_[i]) < kDeltaQMotionFinished) {
-      (*delta_q_d)[i] = 0;
-      joint_motion_finished.at(i) = true;
-    } else {
-      if (t < t_1_sync_[i]) {
-        (*delta_q_d)[i] = -1.0 / std::pow(t_1_sync_[i], 3.0) * dq_max_sync_[i] * sign_delta_q[i] *
-                          (0.5 * t - t_1_sync_[i]) * std::pow(t, 3.0);
-      } else if (t >= t_1_sync_[i] && t < t_2_sync_[i]) {
-        (*delta_q_d)[i] = q_1_[i] + (t - t_1_sync_[i]) * dq_max_sync_[i] * sign_delta_q[i];
-      } else if (t >= t_2_sync_[i] && t < t_f_sync_[i]) {
-        (*delta_q_d)[i] =
-            delta_q_[i] + 0.5 *
-                              (1.0 / std::pow(delta_t_2_sync[i], 3.0) *
-                                   (t - t_1_sync_[i] - 2.0 * delta_t_2_sync[i] - t_d[i]) *
-                                   std::pow((t - t_1_sync_[i] - t_d[i]), 3.0) +
-                               (2.0 * t - 2.0 * t_1_sync_[i] - delta_t_2_sync[i] - 2.0 * t_d[i])) *
-                              dq_max_sync_[i] * sign_delta_q[i];
-      } else {
-        (*delta_q_d)[i] = delta_q_[i];
-        joint_motion_finished.at(i) = true;
-      }
-    }
+    c.row(i) = segment_coefficients_[segment[i]].row(i);
+    segment_start[i] = segment_start_[segment[i]][i];
+  }
+
+  const Array7d kTau = kTime - segment_start;
+  *delta_q_d =
+      c.col(0) + kTau * (c.col(1) + kTau * (c.col(2) + kTau * (c.col(3) + kTau * c.col(4))));
+  if (dq_d != nullptr) {
+    *dq_d = c.col(1) + kTau * (2.0 * c.col(2) + kTau * (3.0 * c.col(3) + kTau * 4.0 * c.col(4)));
   }
-  return std::all_of(joint_motion_finished.cbegin(), joint_motion_finished.cend(),
-                     [](bool x) { return x; });
+  if (ddq_d != nullptr) {
+    *ddq_d = 2.0 * c.col(2) + kTau * (6.0 * c.col(3) + kTau * 12.0 * c.col(4));
+  }
+  return ((kTime >= t_f_sync_.array()) or (delta_q_.array().abs() < kDeltaQMotionFinished)).all();
 }
 
 void MotionGenerator::calculateSynchronizedValues() {
@@ -111,6 +107,39 @@ void MotionGenerator::calculateSynchronizedValues() {
       q_1_[i] = (dq_max_sync_)[i] * sign_delta_q[i] * (0.5 * (t_1_sync_)[i]);
     }
   }
+
+  // Polynomial of each segment in the time since the segment started. Joints which do not move
+  // stay in the last segment with all coefficients 0.
+  for (auto& coefficients : segment_coefficients_) {
+    coefficients.setZero();
+  }
+  for (auto& start : segment_start_) {
+    start.setZero();
+  }
+  for (auto i = 0; i < kJoints; i++) {
+    if (std::abs(delta_q_[i]) <= kDeltaQMotionFinished) {
+      continue;
+    }
+    const double kDq = dq_max_sync_[i] * sign_delta_q[i];
+    const double kT1 = t_1_sync_[i];
+    const double kDeltaT2 = delta_t_2_sync[i];
+    segment_start_[1][i] = kT1;
+    segment_start_[2][i] = t_2_sync_[i];
+    segment_start_[3][i] = t_f_sync_[i];
+    // Acceleration: dq * (t^3 / t_1^2 - t^4 / (2 t_1^3))
+    segment_coefficients_[0](i, 3) = kDq / (kT1 * kT1);
+    segment_coefficients_[0](i, 4) = -0.5 * kDq / (kT1 * kT1 * kT1);
+    // Constant velocity
+    segment_coefficients_[1](i, 0) = q_1_[i];
+    segment_coefficients_[1](i, 1) = kDq;
+    // Deceleration: delta_q + dq / 2 * (tau^4 / dt_2^3 - 2 tau^3 / dt_2^2 + 2 tau - dt_2)
+    segment_coefficients_[2](i, 0) = delta_q_[i] - 0.5 * kDq * kDeltaT2;
+    segment_coefficients_[2](i, 1) = kDq;
+    segment_coefficients_[2](i, 3) = -kDq / (kDeltaT2 * kDeltaT2);
+    segment_coefficients_[2](i, 4) = 0.5 * kDq / (kDeltaT2 * kDeltaT2 * kDeltaT2);
+    // Rest at the goal
+    segment_coefficients_[3](i, 0) = delta_q_[i];
+  }
 }
 
 std::pair<MotionGenerator::Vector7d, bool> MotionGenerator::getDesiredJointPositions(
@@ -119,8 +148,27 @@ std::pair<MotionGenerator::Vector7d, bool> MotionGenerator::getDesiredJointPosit
 
   Vector7d delta_q_d;
   bool motion_finished = calculateDesiredValues(time_, &delta_q_d);
-
-  std::array<double, kJoints> joint_positions{};
-  Eigen::VectorXd::Map(&joint_positions[0], kJoints) = (q_start_ + delta_q_d);
   return std::make_pair(q_start_ + delta_q_d, motion_finished);
+}
+
+MotionGenerator::Samples MotionGenerator::sample(
+    const Eigen::Ref<const Eigen::VectorXd>& times) const {
+  Samples samples;
+  samples.positions.resize(kJoints, times.size());
+  samples.velocities.resize(kJoints, times.size());
+  samples.accelerations.resize(kJoints, times.size());
+  Vector7d delta_q_d;
+  Vector7d dq_d;
+  Vector7d ddq_d;
+  for (Eigen::Index i = 0; i < times.size(); i++) {
+    calculateDesiredValues(times[i], &delta_q_d, &dq_d, &ddq_d);
+    samples.positions.col(i) = q_start_ + delta_q_d;
+    samples.velocities.col(i) = dq_d;
+    samples.accelerations.col(i) = ddq_d;
+  }
+  return samples;
+}
+
+double MotionGenerator::getDuration() const {
+  return t_f_sync_.maxCoeff();
 }
\ No newline at end of file
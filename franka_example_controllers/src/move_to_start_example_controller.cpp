@@ -17,40 +17,43 @@
 #include <cassert>
 #include <cmath>
 #include <exception>
+#include <string>
+#include <vector>
 
 #include <Eigen/Eigen>
 #include <controller_interface/controller_interface.hpp>
 
 namespace franka_example_controllers {
 
+constexpr std::size_t MoveToStartExampleController::kMaxWaypoints;
+
 controller_interface::InterfaceConfiguration
 MoveToStartExampleController::command_interface_configuration() const {
-  controller_interface::InterfaceConfiguration config;
-  config.type = controller_interface::interface_configuration_type::INDIVIDUAL;
-
-  for (int i = 1; i <= num_joints; ++i) {
-    config.names.push_back(arm_id_ + "_joint" + std::to_string(i) + "/effort");
-  }
-  return config;
+  return {controller_interface::interface_configuration_type::INDIVIDUAL,
+          command_interface_names_};
 }
 
 controller_interface::InterfaceConfiguration
 MoveToStartExampleController::state_interface_configuration() const {
-  controller_interface::InterfaceConfiguration config;
-  config.type = controller_interface::interface_configuration_type::INDIVIDUAL;
-  for (int i = 1; i <= num_joints; ++i) {
-    config.names.push_back(arm_id_ + "_joint" + std::to_string(i) + "/position");
-    config.names.push_back(arm_id_ + "_joint" + std::to_string(i) + "/velocity");
-  }
-  return config;
+  return {controller_interface::interface_configuration_type::INDIVIDUAL,
+          state_interface_names_};
 }
 
-controller_interface::return_type MoveToStartExampleController::update(const rclcpp::Time & , const rclcpp::Duration & ) {
+controller_interface::return_type MoveToStartExampleController::update(
+    const rclcpp::Time& /*time*/,
+    const rclcpp::Duration& period) {
   updateJointStates();
-  auto trajectory_time = get_node()->now() - start_time_;
-  auto motion_generator_output = motion_generator_->getDesiredJointPositions(trajectory_time);
-  Vector7d q_desired = motion_generator_output.first;
-  bool finished = motion_generator_output.second;
+  elapsed_time_ += period.seconds();
+  const auto& kWaypoints = *waypoints_buffer_.readFromRT();
+  if (kWaypoints.id != planned_waypoints_id_) {
+    // Continues from the current desired state, so the new motion starts without a jump
+    if (trajectory_generator_->replan(elapsed_time_, kWaypoints.positions)) {
+      elapsed_time_ = 0.0;
+    }
+    planned_waypoints_id_ = kWaypoints.id;
+  }
+  Vector7d q_desired = trajectory_generator_->getDesiredState(elapsed_time_).position;
+  bool finished = trajectory_generator_->isFinished(elapsed_time_);
   if (not finished) {
     const double kAlpha = 0.99;
     dq_filtered_ = (1 - kAlpha) * dq_filtered_ + kAlpha * dq_;
@@ -81,6 +84,7 @@ controller_interface::return_type MoveToStartExampleController::init(
     auto_declare<std::string>("arm_id", "panda");
     auto_declare<std::vector<double>>("k_gains", {});
     auto_declare<std::vector<double>>("d_gains", {});
+    auto_declare<std::vector<double>>("waypoints", {});
   } catch (const std::exception& e) {
     fprintf(stderr, "Exception thrown during init stage with message: %s \n", e.what());
     return controller_interface::return_type::ERROR;
@@ -115,18 +119,86 @@ MoveToStartExampleController::on_configure(const rclcpp_lifecycle::State& /*prev
     d_gains_(i) = d_gains.at(i);
     k_gains_(i) = k_gains.at(i);
   }
+  std::vector<Vector7d> waypoints;
+  if (not parseWaypoints(get_node()->get_parameter("waypoints").as_double_array(), &waypoints)) {
+    RCLCPP_FATAL(get_node()->get_logger(),
+                 "waypoints should contain %d joint positions for each of at most %zu waypoints",
+                 num_joints, kMaxWaypoints - 1);
+    return CallbackReturn::FAILURE;
+  }
+  {
+    std::lock_guard<std::mutex> lock(waypoints_mutex_);
+    waypoints_.id++;
+    waypoints_.positions = waypoints;
+    waypoints_buffer_.writeFromNonRT(waypoints_);
+  }
+  trajectory_generator_ = std::make_unique<WaypointTrajectoryGenerator>(
+      WaypointTrajectoryGenerator::Limits{dq_max_, ddq_max_, dddq_max_}, kMaxWaypoints);
+  command_interface_names_.clear();
+  state_interface_names_.clear();
+  for (int i = 1; i <= num_joints; ++i) {
+    const auto kJointName = arm_id_ + "_joint" + std::to_string(i);
+    command_interface_names_.push_back(kJointName + "/effort");
+    state_interface_names_.push_back(kJointName + "/position");
+    state_interface_names_.push_back(kJointName + "/velocity");
+  }
   dq_filtered_.setZero();
+  parameters_callback_handle_ = get_node()->add_on_set_parameters_callback(
+      [this](const std::vector<rclcpp::Parameter>& parameters) {
+        return parametersCallback(parameters);
+      });
   return CallbackReturn::SUCCESS;
 }
 
 rclcpp_lifecycle::node_interfaces::LifecycleNodeInterface::CallbackReturn
 MoveToStartExampleController::on_activate(const rclcpp_lifecycle::State& /*previous_state*/) {
   updateJointStates();
-  motion_generator_ = std::make_unique<MotionGenerator>(0.2, q_, q_goal_);
-  start_time_ = get_node()->now();
+  std::lock_guard<std::mutex> lock(waypoints_mutex_);
+  trajectory_generator_->plan({q_, Vector7d::Zero(), Vector7d::Zero()}, waypoints_.positions);
+  planned_waypoints_id_ = waypoints_.id;
+  elapsed_time_ = 0.0;
   return CallbackReturn::SUCCESS;
 }
 
+bool MoveToStartExampleController::parseWaypoints(const std::vector<double>& parameter,
+                                                  std::vector<Vector7d>* waypoints) const {
+  // Joint positions of all waypoints one after another
+  if (parameter.size() % num_joints != 0 or parameter.size() / num_joints > kMaxWaypoints - 1) {
+    return false;
+  }
+  waypoints->clear();
+  for (size_t i = 0; i < parameter.size(); i += num_joints) {
+    waypoints->emplace_back(Eigen::Map<const Vector7d>(&parameter.at(i)));
+  }
+  waypoints->push_back(q_goal_);
+  return true;
+}
+
+rcl_interfaces::msg::SetParametersResult MoveToStartExampleController::parametersCallback(
+    const std::vector<rclcpp::Parameter>& parameters) {
+  rcl_interfaces::msg::SetParametersResult result;
+  result.successful = true;
+  for (const auto& parameter : parameters) {
+    if (parameter.get_name() != "waypoints") {
+      continue;
+    }
+    std::vector<Vector7d> waypoints;
+    if (parameter.get_type() != rclcpp::ParameterType::PARAMETER_DOUBLE_ARRAY or
+        not parseWaypoints(parameter.as_double_array(), &waypoints)) {
+      result.successful = false;
+      result.reason = "waypoints must contain " + std::to_string(num_joints) +
+                      " joint positions for each of at most " + std::to_string(kMaxWaypoints - 1) +
+                      " waypoints";
+      return result;
+    }
+    std::lock_guard<std::mutex> lock(waypoints_mutex_);
+    waypoints_.id++;
+    waypoints_.positions = waypoints;
+    waypoints_buffer_.writeFromNonRT(waypoints_);
+  }
+  return result;
+}
+
 void MoveToStartExampleController::updateJointStates() {
   for (auto i = 0; i < num_joints; ++i) {
     const auto& position_interface = state_interfaces_.at(2 * i);
@@ -0,0 +1,310 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <franka_example_controllers/waypoint_trajectory_generator.hpp>
+
+#include <algorithm>
+#include <array>
+#include <cmath>
+#include <limits>
+#include <stdexcept>
+
+namespace franka_example_controllers {
+
+namespace {
+constexpr int kRootIterations = 40;
+
+/// @return the value of the polynomial with coefficients in ascending order at x.
+template <std::size_t N>
+double evaluatePolynomial(const std::array<double, N>& coefficients, double x) {
+  double value = 0.;
+  for (auto i = N; i > 0; i--) {
+    value = value * x + coefficients[i - 1];
+  }
+  return value;
+}
+
+/// @return the derivative of the polynomial with coefficients in ascending order.
+template <std::size_t N>
+std::array<double, N - 1> derivative(const std::array<double, N>& coefficients) {
+  std::array<double, N - 1> result{};
+  for (std::size_t i = 1; i < N; i++) {
+    result[i - 1] = static_cast<double>(i) * coefficients[i];
+  }
+  return result;
+}
+
+/// Finds the roots of c[0] + c[1] x + c[2] x^2 inside (0, upper), sorted ascending.
+/// @return the number of roots written to roots.
+int quadraticRoots(const std::array<double, 3>& c, double upper, std::array<double, 2>* roots) {
+  std::array<double, 2> candidates{};
+  int count = 0;
+  if (c[2] == 0.) {
+    if (c[1] != 0.) {
+      candidates[count++] = -c[0] / c[1];
+    }
+  } else {
+    const double kDiscriminant = c[1] * c[1] - 4. * c[2] * c[0];
+    if (kDiscriminant >= 0.) {
+      // Numerically stable form, also for a small leading coefficient
+      const double kQ = -0.5 * (c[1] + std::copysign(std::sqrt(kDiscriminant), c[1]));
+      candidates[count++] = kQ / c[2];
+      if (kQ != 0.) {
+        candidates[count++] = c[0] / kQ;
+      }
+    }
+  }
+  int inside = 0;
+  for (int i = 0; i < count; i++) {
+    if (candidates[i] > 0. and candidates[i] < upper) {
+      (*roots)[inside++] = candidates[i];
+    }
+  }
+  if (inside == 2 and (*roots)[0] > (*roots)[1]) {
+    std::swap((*roots)[0], (*roots)[1]);
+  }
+  return inside;
+}
+}  // namespace
+
+constexpr double WaypointTrajectoryGenerator::kMinSectionDuration;
+constexpr double WaypointTrajectoryGenerator::kFitTolerance;
+
+WaypointTrajectoryGenerator::WaypointTrajectoryGenerator(const Limits& limits,
+                                                         std::size_t max_waypoints)
+    : limits_(limits), max_waypoints_(max_waypoints) {
+  for (const auto* limit : {&limits.velocity, &limits.acceleration, &limits.jerk}) {
+    if (not limit->allFinite() or (limit->array() <= 0.).any()) {
+      throw std::invalid_argument("WaypointTrajectoryGenerator: limits must be positive");
+    }
+  }
+  if (max_waypoints == 0) {
+    throw std::invalid_argument("WaypointTrajectoryGenerator: max_waypoints must be positive");
+  }
+  sections_.reserve(max_waypoints);
+  boundaries_.reserve(max_waypoints + 1);
+}
+
+bool WaypointTrajectoryGenerator::plan(const State& start, const std::vector<Vector7d>& waypoints) {
+  if (waypoints.empty() or waypoints.size() > max_waypoints_) {
+    return false;
+  }
+  const std::size_t kSections = waypoints.size();
+  boundaries_.resize(kSections + 1);
+  sections_.resize(kSections);
+  boundaries_[0] = start;
+  for (std::size_t k = 0; k < kSections; k++) {
+    boundaries_[k + 1].position = waypoints[k];
+    boundaries_[k + 1].velocity.setZero();
+    boundaries_[k + 1].acceleration.setZero();
+    sections_[k].duration =
+        restToRestDuration(boundaries_[k + 1].position - boundaries_[k].position);
+  }
+
+  // Pass the intermediate waypoints with the harmonic mean of the average velocities of the
+  // adjacent sections, which keeps each joint monotonic where the waypoints are.
+  for (std::size_t k = 1; k < kSections; k++) {
+    const Vector7d kSlopeBefore =
+        (boundaries_[k].position - boundaries_[k - 1].position) / sections_[k - 1].duration;
+    const Vector7d kSlopeAfter =
+        (boundaries_[k + 1].position - boundaries_[k].position) / sections_[k].duration;
+    for (auto i = 0; i < kJoints; i++) {
+      const double kProduct = kSlopeBefore[i] * kSlopeAfter[i];
+      const double kVelocity =
+          kProduct > 0. ? 2. * kProduct / (kSlopeBefore[i] + kSlopeAfter[i]) : 0.;
+      boundaries_[k].velocity[i] =
+          std::max(-limits_.velocity[i], std::min(kVelocity, limits_.velocity[i]));
+    }
+  }
+
+  double start_time = 0.;
+  for (std::size_t k = 0; k < kSections; k++) {
+    auto& section = sections_[k];
+    section.duration = fitDuration(boundaries_[k], boundaries_[k + 1], section.duration);
+    section.coefficients =
+        quinticCoefficients(boundaries_[k], boundaries_[k + 1], section.duration);
+    section.start_time = start_time;
+    start_time += section.duration;
+  }
+  duration_ = start_time;
+  return true;
+}
+
+bool WaypointTrajectoryGenerator::replan(double t, const std::vector<Vector7d>& waypoints) {
+  if (sections_.empty()) {
+    return false;
+  }
+  return plan(getDesiredState(t), waypoints);
+}
+
+WaypointTrajectoryGenerator::State WaypointTrajectoryGenerator::getDesiredState(double t) const {
+  if (sections_.empty() or t <= 0.) {
+    return boundaries_.empty() ? State{Vector7d::Zero(), Vector7d::Zero(), Vector7d::Zero()}
+                               : boundaries_.front();
+  }
+  if (t >= duration_) {
+    return {boundaries_.back().position, Vector7d::Zero(), Vector7d::Zero()};
+  }
+  const auto kSection = std::upper_bound(sections_.begin(), sections_.end(), t,
+                                         [](double time, const Section& section) {
+                                           return time < section.start_time;
+                                         }) -
+                        1;
+  const double kTau = t - kSection->start_time;
+  const auto& c = kSection->coefficients;
+  State state;
+  state.position =
+      c.col(0) +
+      kTau *
+          (c.col(1) + kTau * (c.col(2) + kTau * (c.col(3) + kTau * (c.col(4) + kTau * c.col(5)))));
+  state.velocity =
+      c.col(1) + kTau * (2. * c.col(2) +
+                         kTau * (3. * c.col(3) + kTau * (4. * c.col(4) + kTau * 5. * c.col(5))));
+  state.acceleration =
+      2. * c.col(2) + kTau * (6. * c.col(3) + kTau * (12. * c.col(4) + kTau * 20. * c.col(5)));
+  return state;
+}
+
+WaypointTrajectoryGenerator::Coefficients WaypointTrajectoryGenerator::quinticCoefficients(
+    const State& state_0,
+    const State& state_1,
+    double t) {
+  const Vector7d kDelta = state_1.position - state_0.position;
+  const auto& v_0 = state_0.velocity;
+  const auto& v_1 = state_1.velocity;
+  const auto& a_0 = state_0.acceleration;
+  const auto& a_1 = state_1.acceleration;
+  const double kT2 = t * t;
+  const double kT3 = kT2 * t;
+  Coefficients coefficients;
+  coefficients.col(0) = state_0.position;
+  coefficients.col(1) = v_0;
+  coefficients.col(2) = 0.5 * a_0;
+  coefficients.col(3) =
+      (20. * kDelta - (8. * v_1 + 12. * v_0) * t - (3. * a_0 - a_1) * kT2) / (2. * kT3);
+  coefficients.col(4) =
+      (-30. * kDelta + (14. * v_1 + 16. * v_0) * t + (3. * a_0 - 2. * a_1) * kT2) / (2. * kT3 * t);
+  coefficients.col(5) =
+      (12. * kDelta - 6. * (v_1 + v_0) * t + (a_1 - a_0) * kT2) / (2. * kT3 * kT2);
+  return coefficients;
+}
+
+double WaypointTrajectoryGenerator::limitRatio(const Coefficients& coefficients,
+                                               double duration) const {
+  double ratio = 0.;
+  for (auto i = 0; i < kJoints; i++) {
+    std::array<double, 6> position{};
+    for (std::size_t k = 0; k < position.size(); k++) {
+      position[k] = coefficients(i, static_cast<Eigen::Index>(k));
+    }
+    const auto kVelocity = derivative(position);
+    const auto kAcceleration = derivative(kVelocity);
+    const auto kJerk = derivative(kAcceleration);
+    const auto kSnap = derivative(kJerk);
+
+    // The extrema of each derivative are at the ends or where the next derivative is 0
+    double max_jerk = std::max(std::abs(evaluatePolynomial(kJerk, 0.)),
+                               std::abs(evaluatePolynomial(kJerk, duration)));
+    if (kSnap[1] != 0.) {
+      const double kRoot = -kSnap[0] / kSnap[1];
+      if (kRoot > 0. and kRoot < duration) {
+        max_jerk = std::max(max_jerk, std::abs(evaluatePolynomial(kJerk, kRoot)));
+      }
+    }
+
+    std::array<double, 2> jerk_roots{};
+    const int kJerkRoots = quadraticRoots(kJerk, duration, &jerk_roots);
+    double max_acceleration = std::max(std::abs(evaluatePolynomial(kAcceleration, 0.)),
+                                       std::abs(evaluatePolynomial(kAcceleration, duration)));
+    for (int k = 0; k < kJerkRoots; k++) {
+      max_acceleration =
+          std::max(max_acceleration, std::abs(evaluatePolynomial(kAcceleration, jerk_roots[k])));
+    }
+
+    // The acceleration is monotonic between the roots of the jerk, so each of these intervals
+    // contains at most one root of the acceleration, which is found by bisection.
+    std::array<double, 4> bounds{0., duration, duration, duration};
+    for (int k = 0; k < kJerkRoots; k++) {
+      bounds[k + 1] = jerk_roots[k];
+    }
+    double max_velocity = std::max(std::abs(evaluatePolynomial(kVelocity, 0.)),
+                                   std::abs(evaluatePolynomial(kVelocity, duration)));
+    for (int k = 0; k <= kJerkRoots; k++) {
+      double lower = bounds[k];
+      double upper = bounds[k + 1];
+      const bool kRising = evaluatePolynomial(kAcceleration, lower) < 0.;
+      if ((evaluatePolynomial(kAcceleration, upper) < 0.) == kRising) {
+        continue;
+      }
+      for (int iteration = 0; iteration < kRootIterations; iteration++) {
+        const double kMiddle = 0.5 * (lower + upper);
+        if ((evaluatePolynomial(kAcceleration, kMiddle) < 0.) == kRising) {
+          lower = kMiddle;
+        } else {
+          upper = kMiddle;
+        }
+      }
+      max_velocity =
+          std::max(max_velocity, std::abs(evaluatePolynomial(kVelocity, 0.5 * (lower + upper))));
+    }
+
+    ratio = std::max({ratio, max_velocity / limits_.velocity[i],
+                      std::sqrt(max_acceleration / limits_.acceleration[i]),
+                      std::cbrt(max_jerk / limits_.jerk[i])});
+  }
+  return ratio;
+}
+
+double WaypointTrajectoryGenerator::fitDuration(const State& state_0,
+                                                const State& state_1,
+                                                double initial_duration) const {
+  // Rest to rest, scaling the duration by the ratio scales the motion exactly to the limits. With
+  // boundary velocities it is a good estimate, so a few iterations suffice.
+  double duration = std::max(initial_duration, kMinSectionDuration);
+  double feasible_duration = std::numeric_limits<double>::infinity();
+  double closest_duration = duration;
+  double closest_ratio = std::numeric_limits<double>::infinity();
+  for (int iteration = 0; iteration < kMaxFitIterations; iteration++) {
+    const double kRatio = limitRatio(quinticCoefficients(state_0, state_1, duration), duration);
+    if (kRatio < closest_ratio) {
+      closest_ratio = kRatio;
+      closest_duration = duration;
+    }
+    if (kRatio <= 1.) {
+      feasible_duration = std::min(feasible_duration, duration);
+      if (kRatio >= kFitTolerance or duration <= kMinSectionDuration) {
+        break;
+      }
+    }
+    // Aim slightly below the limits, so that the iteration ends on a feasible duration
+    duration = std::max(kMinSectionDuration,
+                        duration * std::max(0.5, std::min(kRatio / kFitTolerance * 0.995, 2.)));
+  }
+  return std::isfinite(feasible_duration) ? feasible_duration : closest_duration;
+}
+
+double WaypointTrajectoryGenerator::restToRestDuration(const Vector7d& delta) const {
+  // Peak velocity, acceleration and jerk of a rest to rest quintic over a distance d in time t
+  constexpr double kVelocityFactor = 15. / 8.;
+  const double kAccelerationFactor = 10. / std::sqrt(3.);
+  constexpr double kJerkFactor = 60.;
+  const Eigen::Array<double, kJoints, 1> kDistance = delta.array().abs();
+  const double kDuration =
+      std::max({(kVelocityFactor * kDistance / limits_.velocity.array()).maxCoeff(),
+                (kAccelerationFactor * kDistance / limits_.acceleration.array()).sqrt().maxCoeff(),
+                (kJerkFactor * kDistance / limits_.jerk.array()).pow(1. / 3.).maxCoeff()});
+  return std::max(kDuration, kMinSectionDuration);
+}
+
+}  // namespace franka_example_controllers
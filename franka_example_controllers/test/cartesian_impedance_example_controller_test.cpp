@@ -0,0 +1,157 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <array>
+#include <cmath>
+#include <string>
+#include <vector>
+
+#include <franka/robot_state.h>
+#include <gtest/gtest.h>
+#include <controller_interface/controller_interface.hpp>
+#include <franka_hardware/franka_robot_model.hpp>
+#include <hardware_interface/handle.hpp>
+#include <hardware_interface/loaned_command_interface.hpp>
+#include <hardware_interface/loaned_state_interface.hpp>
+#include <lifecycle_msgs/msg/state.hpp>
+#include <rclcpp/rclcpp.hpp>
+
+#include <franka_example_controllers/cartesian_impedance_example_controller.hpp>
+#include "fixed_model.hpp"
+
+using franka_example_controllers::CartesianImpedanceExampleController;
+using franka_hardware::FrankaRobotModel;
+
+namespace {
+constexpr std::size_t kNumberOfJoints = 7;
+// Enough cycles for the stiffness filter to settle
+constexpr int kSettleCycles = 3000;
+
+class CartesianImpedanceExampleControllerTest : public ::testing::Test {
+ protected:
+  static void SetUpTestSuite() { rclcpp::init(0, nullptr); }
+  static void TearDownTestSuite() { rclcpp::shutdown(); }
+
+  void SetUp() override {
+    // The first six joints move the end effector along and around the base axes
+    for (std::size_t axis = 0; axis < 6; ++axis) {
+      model_.zero_jacobian.at(6 * axis + axis) = 1.;  // column-major
+    }
+    robot_state_.O_T_EE = {1., 0., 0., 0., 0., 1., 0., 0., 0., 0., 1., 0., 0.3, 0., 0.5, 1.};
+    model_.update(robot_state_);
+    robot_model_value_ = franka_hardware::pointerToStateValue<franka_hardware::Model>(&model_);
+    robot_state_value_ = franka_hardware::pointerToStateValue(&robot_state_);
+
+    ASSERT_EQ(controller_.init("cartesian_impedance_example_controller"),
+              controller_interface::return_type::OK);
+    ASSERT_EQ(controller_.configure().id(), lifecycle_msgs::msg::State::PRIMARY_STATE_INACTIVE);
+    for (std::size_t i = 0; i < kNumberOfJoints; ++i) {
+      command_handles_.emplace_back("panda_joint" + std::to_string(i + 1), "effort",
+                                    &commands_.at(i));
+    }
+    state_handles_.emplace_back("panda", std::string(FrankaRobotModel::kRobotModelInterface),
+                                &robot_model_value_);
+    state_handles_.emplace_back("panda", std::string(FrankaRobotModel::kRobotStateInterface),
+                                &robot_state_value_);
+    std::vector<hardware_interface::LoanedCommandInterface> loaned_commands;
+    for (auto& handle : command_handles_) {
+      loaned_commands.emplace_back(handle);
+    }
+    std::vector<hardware_interface::LoanedStateInterface> loaned_states;
+    for (auto& handle : state_handles_) {
+      loaned_states.emplace_back(handle);
+    }
+    controller_.assign_interfaces(std::move(loaned_commands), std::move(loaned_states));
+    ASSERT_EQ(controller_.get_node()->activate().id(),
+              lifecycle_msgs::msg::State::PRIMARY_STATE_ACTIVE);
+  }
+
+  /// Runs the control loop, the robot feeds the commanded torques back as tau_J_d.
+  void cycle(int cycles) {
+    const auto kPeriod = rclcpp::Duration::from_seconds(1e-3);
+    for (int i = 0; i < cycles; ++i) {
+      model_.update(robot_state_);
+      ASSERT_EQ(controller_.update(rclcpp::Time(), kPeriod), controller_interface::return_type::OK);
+      robot_state_.tau_J_d = commands_;
+    }
+  }
+
+  franka_example_controllers::FixedModel model_;
+  franka::RobotState robot_state_;
+  double robot_model_value_ = 0.;
+  double robot_state_value_ = 0.;
+  std::array<double, kNumberOfJoints> commands_{};
+  std::vector<hardware_interface::CommandInterface> command_handles_;
+  std::vector<hardware_interface::StateInterface> state_handles_;
+  CartesianImpedanceExampleController controller_;
+};
+}  // namespace
+
+TEST_F(CartesianImpedanceExampleControllerTest, requestsRobotModelInterfaces) {
+  const auto kNames = controller_.state_interface_configuration().names;
+  ASSERT_EQ(kNames.size(), 2U);
+  EXPECT_EQ(kNames.at(0), "panda/robot_model");
+  EXPECT_EQ(kNames.at(1), "panda/robot_state");
+  EXPECT_EQ(controller_.command_interface_configuration().names.at(6), "panda_joint7/effort");
+}
+
+TEST_F(CartesianImpedanceExampleControllerTest, holdsThePoseAtActivation) {
+  cycle(kSettleCycles);
+  for (double command : commands_) {
+    EXPECT_NEAR(command, 0., 1e-9);
+  }
+}
+
+TEST_F(CartesianImpedanceExampleControllerTest, pullsTowardsTheEquilibriumPose) {
+  // The stiffness ramps up from zero after the activation, the first commands are small
+  robot_state_.O_T_EE.at(12) += 0.01;
+  cycle(2);
+  EXPECT_LT(commands_.at(0), 0.);
+  EXPECT_GT(commands_.at(0), -0.1);
+
+  cycle(kSettleCycles);
+  const double kForce = -CartesianImpedanceExampleController::kDefaultTranslationalStiffness * 0.01;
+  EXPECT_NEAR(commands_.at(0), kForce, 1e-3);
+  EXPECT_NEAR(commands_.at(1), 0., 1e-9);
+}
+
+TEST_F(CartesianImpedanceExampleControllerTest, pullsTowardsTheEquilibriumOrientation) {
+  const double kAngle = 0.02;  // [rad] around the z axis
+  robot_state_.O_T_EE.at(0) = std::cos(kAngle);
+  robot_state_.O_T_EE.at(1) = std::sin(kAngle);
+  robot_state_.O_T_EE.at(4) = -std::sin(kAngle);
+  robot_state_.O_T_EE.at(5) = std::cos(kAngle);
+  cycle(kSettleCycles);
+  // The orientation error is the vector part of the error quaternion
+  EXPECT_NEAR(
+      commands_.at(5),
+      -CartesianImpedanceExampleController::kDefaultRotationalStiffness * std::sin(kAngle / 2),
+      1e-6);
+  EXPECT_NEAR(commands_.at(3), 0., 1e-9);
+}
+
+TEST_F(CartesianImpedanceExampleControllerTest, appliesStiffnessChangesOnline) {
+  robot_state_.O_T_EE.at(13) -= 0.01;
+  ASSERT_TRUE(controller_.get_node()
+                  ->set_parameter(rclcpp::Parameter("translational_stiffness", 400.))
+                  .successful);
+  cycle(kSettleCycles);
+  EXPECT_NEAR(commands_.at(1), 4., 1e-3);
+}
+
+TEST_F(CartesianImpedanceExampleControllerTest, rejectsNegativeStiffness) {
+  EXPECT_FALSE(controller_.get_node()
+                   ->set_parameter(rclcpp::Parameter("rotational_stiffness", -1.))
+                   .successful);
+}
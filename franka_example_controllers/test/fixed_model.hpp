@@ -0,0 +1,45 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <array>
+
+#include <franka/model.h>
+#include <franka/robot_state.h>
+#include <franka_hardware/model.hpp>
+
+namespace franka_example_controllers {
+
+/// Robot model with fixed quantities for all frames, for tests without a robot.
+class FixedModel : public franka_hardware::Model {
+ public:
+  FixedModel() = default;
+
+  std::array<double, 42> zero_jacobian{};
+  std::array<double, 7> coriolis{};
+
+ protected:
+  std::array<double, 7> computeCoriolisForceVector(
+      const franka::RobotState& /*state*/) const override {
+    return coriolis;
+  }
+
+  std::array<double, 42> computeZeroJacobian(franka::Frame /*frame*/,
+                                             const franka::RobotState& /*state*/) const override {
+    return zero_jacobian;
+  }
+};
+
+}  // namespace franka_example_controllers
@@ -0,0 +1,98 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <chrono>
+#include <cmath>
+
+#include <gtest/gtest.h>
+#include <Eigen/Core>
+
+#include <franka_example_controllers/motion_generator.hpp>
+
+using Vector7d = MotionGenerator::Vector7d;
+
+namespace {
+constexpr double kSpeedFactor = 0.2;
+constexpr double kTimeStep = 1e-3;  // [s]
+
+const Vector7d kStart = (Vector7d() << 0.1, -0.5, 0.2, -2.0, 0.3, 1.5, 0.7).finished();
+// The fourth joint does not move, the first one too little to reach its maximum velocity
+const Vector7d kGoal = (Vector7d() << 0.12, -0.785, 0.0, -2.0, 0.0, 1.571, 0.785).finished();
+
+rclcpp::Duration seconds(double t) {
+  return rclcpp::Duration(std::chrono::nanoseconds(static_cast<int64_t>(std::llround(t * 1e9))));
+}
+
+Eigen::VectorXd timeGrid(double duration) {
+  const auto kSteps = static_cast<Eigen::Index>(std::ceil(duration / kTimeStep)) + 1;
+  return Eigen::VectorXd::LinSpaced(kSteps, 0., (kSteps - 1) * kTimeStep);
+}
+}  // namespace
+
+TEST(MotionGeneratorTest, startsAndEndsAtRest) {
+  MotionGenerator generator(kSpeedFactor, kStart, kGoal);
+  const double kDuration = generator.getDuration();
+  ASSERT_GT(kDuration, 0.);
+
+  auto output = generator.getDesiredJointPositions(seconds(0.));
+  EXPECT_TRUE(output.first.isApprox(kStart));
+  EXPECT_FALSE(output.second);
+  output = generator.getDesiredJointPositions(seconds(kDuration / 2));
+  EXPECT_FALSE(output.second);
+  EXPECT_DOUBLE_EQ(output.first[3], kStart[3]);
+  output = generator.getDesiredJointPositions(seconds(kDuration + kTimeStep));
+  EXPECT_TRUE(output.second);
+  EXPECT_TRUE(output.first.isApprox(kGoal, 1e-9));
+
+  const auto kSamples = generator.sample((Eigen::VectorXd(2) << 0., kDuration).finished());
+  EXPECT_LT(kSamples.velocities.cwiseAbs().maxCoeff(), 1e-9);
+  EXPECT_TRUE(kSamples.positions.col(1).isApprox(kGoal, 1e-9));
+}
+
+TEST(MotionGeneratorTest, sampleMatchesControlLoop) {
+  MotionGenerator generator(kSpeedFactor, kStart, kGoal);
+  const auto kTimes = timeGrid(generator.getDuration());
+  const auto kSamples = generator.sample(kTimes);
+  ASSERT_EQ(kSamples.positions.cols(), kTimes.size());
+  for (Eigen::Index i = 0; i < kTimes.size(); i += 10) {
+    const auto kOutput = generator.getDesiredJointPositions(seconds(kTimes[i]));
+    EXPECT_TRUE(kOutput.first.isApprox(kSamples.positions.col(i), 1e-12)) << "t = " << kTimes[i];
+  }
+}
+
+TEST(MotionGeneratorTest, derivativesAreConsistentAndLimited) {
+  MotionGenerator generator(kSpeedFactor, kStart, kGoal);
+  const auto kSamples = generator.sample(timeGrid(generator.getDuration()));
+  const Eigen::Index kSteps = kSamples.positions.cols();
+  // The jerk jumps between the segments, so the finite differences of the acceleration are coarse
+  for (Eigen::Index i = 1; i + 1 < kSteps; i++) {
+    const Vector7d kVelocity =
+        (kSamples.positions.col(i + 1) - kSamples.positions.col(i - 1)) / (2 * kTimeStep);
+    const Vector7d kAcceleration =
+        (kSamples.velocities.col(i + 1) - kSamples.velocities.col(i - 1)) / (2 * kTimeStep);
+    EXPECT_LT((kVelocity - kSamples.velocities.col(i)).cwiseAbs().maxCoeff(), 1e-4);
+    EXPECT_LT((kAcceleration - kSamples.accelerations.col(i)).cwiseAbs().maxCoeff(), 0.1);
+  }
+  // Limits of the generator scaled by the speed factor
+  EXPECT_LE(kSamples.velocities.cwiseAbs().maxCoeff(), 2.5 * kSpeedFactor + 1e-9);
+  EXPECT_LE(kSamples.accelerations.cwiseAbs().maxCoeff(), 5. * kSpeedFactor + 1e-9);
+}
+
+TEST(MotionGeneratorTest, finishesImmediatelyAtGoal) {
+  MotionGenerator generator(kSpeedFactor, kStart, kStart);
+  EXPECT_DOUBLE_EQ(generator.getDuration(), 0.);
+  const auto kOutput = generator.getDesiredJointPositions(seconds(0.));
+  EXPECT_TRUE(kOutput.second);
+  EXPECT_TRUE(kOutput.first.isApprox(kStart));
+}
@@ -0,0 +1,153 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <algorithm>
+#include <array>
+#include <cmath>
+#include <string>
+#include <vector>
+
+#include <gtest/gtest.h>
+#include <controller_interface/controller_interface.hpp>
+#include <hardware_interface/handle.hpp>
+#include <hardware_interface/loaned_command_interface.hpp>
+#include <hardware_interface/loaned_state_interface.hpp>
+#include <lifecycle_msgs/msg/state.hpp>
+#include <rclcpp/rclcpp.hpp>
+
+#include <franka_example_controllers/move_to_start_example_controller.hpp>
+
+using franka_example_controllers::MoveToStartExampleController;
+
+namespace {
+constexpr std::size_t kNumberOfJoints = 7;
+constexpr double kStiffness = 10.;
+// Long enough for the motions of the tests
+constexpr int kMotionCycles = 20000;
+
+class MoveToStartExampleControllerTest : public ::testing::Test {
+ protected:
+  static void SetUpTestSuite() { rclcpp::init(0, nullptr); }
+  static void TearDownTestSuite() { rclcpp::shutdown(); }
+
+  void SetUp() override {
+    ASSERT_EQ(controller_.init("move_to_start_example_controller"),
+              controller_interface::return_type::OK);
+    auto node = controller_.get_node();
+    node->set_parameter(
+        rclcpp::Parameter("k_gains", std::vector<double>(kNumberOfJoints, kStiffness)));
+    node->set_parameter(rclcpp::Parameter("d_gains", std::vector<double>(kNumberOfJoints, 0.)));
+    ASSERT_EQ(controller_.configure().id(), lifecycle_msgs::msg::State::PRIMARY_STATE_INACTIVE);
+
+    // The robot stands still in the start pose, so the commands follow the desired positions
+    positions_ = kStartPose;
+    for (std::size_t i = 0; i < kNumberOfJoints; ++i) {
+      const auto kJointName = "panda_joint" + std::to_string(i + 1);
+      command_handles_.emplace_back(kJointName, "effort", &commands_.at(i));
+      state_handles_.emplace_back(kJointName, "position", &positions_.at(i));
+      state_handles_.emplace_back(kJointName, "velocity", &velocities_.at(i));
+    }
+    std::vector<hardware_interface::LoanedCommandInterface> loaned_commands;
+    for (auto& handle : command_handles_) {
+      loaned_commands.emplace_back(handle);
+    }
+    std::vector<hardware_interface::LoanedStateInterface> loaned_states;
+    for (auto& handle : state_handles_) {
+      loaned_states.emplace_back(handle);
+    }
+    controller_.assign_interfaces(std::move(loaned_commands), std::move(loaned_states));
+    ASSERT_EQ(node->activate().id(), lifecycle_msgs::msg::State::PRIMARY_STATE_ACTIVE);
+  }
+
+  void cycle(int cycles) {
+    const auto kPeriod = rclcpp::Duration::from_seconds(1e-3);
+    for (int i = 0; i < cycles; ++i) {
+      ASSERT_EQ(controller_.update(rclcpp::Time(), kPeriod), controller_interface::return_type::OK);
+    }
+  }
+
+  /// @return the waypoints parameter for a single waypoint.
+  static std::vector<double> waypointParameter(const std::array<double, kNumberOfJoints>& q) {
+    return {q.begin(), q.end()};
+  }
+
+  const std::array<double, kNumberOfJoints> kStartPose{0., -M_PI_4, 0.,    -3 * M_PI_4,
+                                                       0., M_PI_2,  M_PI_4};
+  std::array<double, kNumberOfJoints> positions_{};
+  std::array<double, kNumberOfJoints> velocities_{};
+  std::array<double, kNumberOfJoints> commands_{};
+  std::vector<hardware_interface::CommandInterface> command_handles_;
+  std::vector<hardware_interface::StateInterface> state_handles_;
+  MoveToStartExampleController controller_;
+};
+}  // namespace
+
+TEST_F(MoveToStartExampleControllerTest, replansWhenTheWaypointsChange) {
+  cycle(10);
+  EXPECT_NEAR(commands_.at(0), 0., 1e-9);
+
+  auto waypoint = kStartPose;
+  waypoint.at(0) += 0.5;
+  ASSERT_TRUE(controller_.get_node()
+                  ->set_parameter(rclcpp::Parameter("waypoints", waypointParameter(waypoint)))
+                  .successful);
+  // The new motion starts where the desired state was
+  cycle(1);
+  EXPECT_NEAR(commands_.at(0), 0., 1e-6);
+
+  // It passes the waypoint and returns to the start pose
+  double max_command = 0.;
+  for (int i = 0; i < kMotionCycles; ++i) {
+    cycle(1);
+    max_command = std::max(max_command, commands_.at(0));
+  }
+  EXPECT_NEAR(max_command, kStiffness * 0.5, 0.05);
+  EXPECT_NEAR(commands_.at(0), 0., 1e-9);
+  EXPECT_NEAR(commands_.at(1), 0., 1e-9);
+}
+
+TEST_F(MoveToStartExampleControllerTest, replansWhileMoving) {
+  auto waypoint = kStartPose;
+  waypoint.at(0) += 0.5;
+  auto node = controller_.get_node();
+  ASSERT_TRUE(
+      node->set_parameter(rclcpp::Parameter("waypoints", waypointParameter(waypoint))).successful);
+  cycle(1000);
+  const double kCommand = commands_.at(0);
+  ASSERT_GT(kCommand, 0.1);
+
+  waypoint.at(0) = kStartPose.at(0) - 0.5;
+  ASSERT_TRUE(
+      node->set_parameter(rclcpp::Parameter("waypoints", waypointParameter(waypoint))).successful);
+  cycle(1);
+  EXPECT_NEAR(commands_.at(0), kCommand, 0.01);
+
+  double min_command = 0.;
+  for (int i = 0; i < kMotionCycles; ++i) {
+    cycle(1);
+    min_command = std::min(min_command, commands_.at(0));
+  }
+  EXPECT_NEAR(min_command, -kStiffness * 0.5, 0.05);
+}
+
+TEST_F(MoveToStartExampleControllerTest, rejectsInvalidWaypoints) {
+  auto node = controller_.get_node();
+  EXPECT_FALSE(
+      node->set_parameter(rclcpp::Parameter("waypoints", std::vector<double>(6, 0.))).successful);
+  const std::vector<double> kTooMany(MoveToStartExampleController::kMaxWaypoints * kNumberOfJoints,
+                                     0.);
+  EXPECT_FALSE(node->set_parameter(rclcpp::Parameter("waypoints", kTooMany)).successful);
+  cycle(10);
+  EXPECT_NEAR(commands_.at(0), 0., 1e-9);
+}
@@ -0,0 +1,231 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <array>
+#include <atomic>
+#include <cmath>
+#include <cstdlib>
+#include <new>
+#include <string>
+#include <vector>
+
+#include <franka/robot_state.h>
+#include <gtest/gtest.h>
+#include <controller_interface/controller_interface.hpp>
+#include <franka_hardware/franka_robot_model.hpp>
+#include <hardware_interface/handle.hpp>
+#include <hardware_interface/loaned_command_interface.hpp>
+#include <hardware_interface/loaned_state_interface.hpp>
+#include <lifecycle_msgs/msg/state.hpp>
+#include <rclcpp/rclcpp.hpp>
+
+#include <franka_example_controllers/cartesian_impedance_example_controller.hpp>
+#include <franka_example_controllers/gravity_compensation_example_controller.hpp>
+#include <franka_example_controllers/joint_impedance_example_controller.hpp>
+#include <franka_example_controllers/move_to_start_example_controller.hpp>
+#include "fixed_model.hpp"
+
+namespace {
+// Heap operations are only counted while enabled, so that gtest and the ROS setup can allocate
+std::atomic<bool> count_allocations{false};
+std::atomic<std::size_t> allocations{0};
+
+void* allocate(std::size_t size) {
+  if (count_allocations.load(std::memory_order_relaxed)) {
+    allocations.fetch_add(1, std::memory_order_relaxed);
+  }
+  void* pointer = std::malloc(size == 0 ? 1 : size);
+  if (pointer == nullptr) {
+    throw std::bad_alloc();
+  }
+  return pointer;
+}
+
+void deallocate(void* pointer) noexcept {
+  if (pointer != nullptr && count_allocations.load(std::memory_order_relaxed)) {
+    allocations.fetch_add(1, std::memory_order_relaxed);
+  }
+  std::free(pointer);
+}
+}  // namespace
+
+void* operator new(std::size_t size) {
+  return allocate(size);
+}
+void* operator new[](std::size_t size) {
+  return allocate(size);
+}
+void operator delete(void* pointer) noexcept {
+  deallocate(pointer);
+}
+void operator delete[](void* pointer) noexcept {
+  deallocate(pointer);
+}
+void operator delete(void* pointer, std::size_t /*size*/) noexcept {
+  deallocate(pointer);
+}
+void operator delete[](void* pointer, std::size_t /*size*/) noexcept {
+  deallocate(pointer);
+}
+
+namespace {
+constexpr std::size_t kNumberOfJoints = 7;
+constexpr int kCycles = 10000;
+constexpr double kPeriod = 1e-3;  // [s]
+
+/// Feeds a controller from fake joint and robot model interfaces the way the controller manager
+/// does and runs its update loop.
+template <typename Controller>
+class RealtimeUpdateTest : public ::testing::Test {
+ protected:
+  static void SetUpTestSuite() { rclcpp::init(0, nullptr); }
+  static void TearDownTestSuite() { rclcpp::shutdown(); }
+
+  void SetUp() override {
+    ASSERT_EQ(controller_.init("controller"), controller_interface::return_type::OK);
+    auto node = controller_.get_node();
+    for (const auto& name : {"k_gains", "d_gains"}) {
+      if (node->has_parameter(name)) {
+        node->set_parameter(rclcpp::Parameter(name, std::vector<double>(kNumberOfJoints, 10.)));
+      }
+    }
+    if (node->has_parameter("waypoints")) {
+      node->set_parameter(
+          rclcpp::Parameter("waypoints", std::vector<double>{0.3, -0.5, 0., -2., 0., 1.5, 0.5}));
+    }
+    ASSERT_EQ(controller_.configure().id(), lifecycle_msgs::msg::State::PRIMARY_STATE_INACTIVE);
+
+    // Away from the start pose, so that the move to start controller has to move
+    joint_positions_.fill(0.);
+    joint_positions_[3] = -1.;
+    joint_velocities_.fill(0.);
+    joint_efforts_.fill(0.);
+    for (std::size_t axis = 0; axis < 6; ++axis) {
+      model_.zero_jacobian.at(6 * axis + axis) = 1.;  // column-major
+    }
+    robot_state_.O_T_EE = {1., 0., 0., 0., 0., 1., 0., 0., 0., 0., 1., 0., 0.3, 0., 0.5, 1.};
+    updateRobotState();
+    createInterfaces();
+    assignInterfaces();
+    ASSERT_EQ(node->activate().id(), lifecycle_msgs::msg::State::PRIMARY_STATE_ACTIVE);
+    // Hands a new target to the control loop of the Cartesian impedance controller
+    if (node->has_parameter("translational_stiffness")) {
+      ASSERT_TRUE(
+          node->set_parameter(rclcpp::Parameter("translational_stiffness", 300.)).successful);
+    }
+    // The move to start controller replans in the first update
+    if (node->has_parameter("waypoints")) {
+      const std::vector<double> kWaypoints{0.2, -0.6, 0., -2.2, 0., 1.4, 0.6,
+                                           0.1, -0.7, 0., -2.3, 0., 1.5, 0.7};
+      ASSERT_TRUE(node->set_parameter(rclcpp::Parameter("waypoints", kWaypoints)).successful);
+    }
+  }
+
+  /// Copies the joint values into the robot state and starts a new cycle of the robot model.
+  void updateRobotState() {
+    robot_state_.q = joint_positions_;
+    robot_state_.dq = joint_velocities_;
+    robot_state_.tau_J_d = joint_efforts_;
+    model_.update(robot_state_);
+  }
+
+  void createInterfaces() {
+    for (const auto& name : controller_.command_interface_configuration().names) {
+      command_handles_.emplace_back(prefixOf(name), interfaceOf(name),
+                                    &joint_efforts_.at(command_handles_.size()));
+    }
+    for (const auto& name : controller_.state_interface_configuration().names) {
+      const std::string kInterface = interfaceOf(name);
+      const std::size_t kJoint = state_handles_.size() / 2;
+      double* value = nullptr;
+      if (kInterface == franka_hardware::FrankaRobotModel::kRobotModelInterface) {
+        value = &robot_model_value_;
+      } else if (kInterface == franka_hardware::FrankaRobotModel::kRobotStateInterface) {
+        value = &robot_state_value_;
+      } else {
+        value =
+            kInterface == "position" ? &joint_positions_.at(kJoint) : &joint_velocities_.at(kJoint);
+      }
+      state_handles_.emplace_back(prefixOf(name), kInterface, value);
+    }
+  }
+
+  void assignInterfaces() {
+    std::vector<hardware_interface::LoanedCommandInterface> loaned_commands;
+    for (auto& handle : command_handles_) {
+      loaned_commands.emplace_back(handle);
+    }
+    std::vector<hardware_interface::LoanedStateInterface> loaned_states;
+    for (auto& handle : state_handles_) {
+      loaned_states.emplace_back(handle);
+    }
+    controller_.assign_interfaces(std::move(loaned_commands), std::move(loaned_states));
+  }
+
+  static std::string prefixOf(const std::string& name) { return name.substr(0, name.find('/')); }
+  static std::string interfaceOf(const std::string& name) {
+    return name.substr(name.find('/') + 1);
+  }
+
+  /// @return the number of heap operations during the update cycles.
+  std::size_t countAllocationsInUpdates(bool* all_ok) {
+    const rclcpp::Duration kPeriodDuration = rclcpp::Duration::from_seconds(kPeriod);
+    rclcpp::Time time(0, 0, RCL_ROS_TIME);
+    *all_ok = true;
+    allocations = 0;
+    count_allocations = true;
+    for (int i = 0; i < kCycles; ++i) {
+      time += kPeriodDuration;
+      *all_ok = *all_ok &&
+                controller_.update(time, kPeriodDuration) == controller_interface::return_type::OK;
+      // A crude simulation, to sweep the controllers through their trajectories
+      for (std::size_t joint = 0; joint < kNumberOfJoints; ++joint) {
+        joint_velocities_[joint] += kPeriod * joint_efforts_[joint];
+        joint_positions_[joint] += kPeriod * joint_velocities_[joint];
+      }
+      updateRobotState();
+    }
+    count_allocations = false;
+    return allocations;
+  }
+
+  Controller controller_;
+  std::array<double, kNumberOfJoints> joint_positions_{};
+  std::array<double, kNumberOfJoints> joint_velocities_{};
+  std::array<double, kNumberOfJoints> joint_efforts_{};
+  franka_example_controllers::FixedModel model_;
+  franka::RobotState robot_state_;
+  double robot_model_value_ = franka_hardware::pointerToStateValue<franka_hardware::Model>(&model_);
+  double robot_state_value_ = franka_hardware::pointerToStateValue(&robot_state_);
+  std::vector<hardware_interface::CommandInterface> command_handles_;
+  std::vector<hardware_interface::StateInterface> state_handles_;
+};
+
+using Controllers =
+    ::testing::Types<franka_example_controllers::CartesianImpedanceExampleController,
+                     franka_example_controllers::GravityCompensationExampleController,
+                     franka_example_controllers::JointImpedanceExampleController,
+                     franka_example_controllers::MoveToStartExampleController>;
+}  // namespace
+
+TYPED_TEST_SUITE(RealtimeUpdateTest, Controllers);
+
+TYPED_TEST(RealtimeUpdateTest, updateDoesNotAllocate) {
+  bool all_ok = false;
+  EXPECT_EQ(this->countAllocationsInUpdates(&all_ok), 0U);
+  EXPECT_TRUE(all_ok);
+  for (double effort : this->joint_efforts_) {
+    EXPECT_TRUE(std::isfinite(effort));
+  }
+}
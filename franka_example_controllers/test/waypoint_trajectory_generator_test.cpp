@@ -0,0 +1,171 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <algorithm>
+#include <cmath>
+#include <random>
+#include <stdexcept>
+#include <vector>
+
+#include <gtest/gtest.h>
+#include <Eigen/Core>
+
+#include <franka_example_controllers/waypoint_trajectory_generator.hpp>
+
+using franka_example_controllers::WaypointTrajectoryGenerator;
+using Vector7d = WaypointTrajectoryGenerator::Vector7d;
+
+namespace {
+constexpr double kTimeStep = 1e-3;  // [s]
+constexpr double kTolerance = 1e-6;
+
+WaypointTrajectoryGenerator::Limits limits() {
+  return {Vector7d::Constant(0.5), Vector7d::Constant(2.), Vector7d::Constant(10.)};
+}
+
+WaypointTrajectoryGenerator::State rest(const Vector7d& position) {
+  return {position, Vector7d::Zero(), Vector7d::Zero()};
+}
+
+Vector7d joints(double q1, double q2, double q4) {
+  return (Vector7d() << q1, q2, 0., q4, 0., 1.5, 0.8).finished();
+}
+
+const std::vector<Vector7d> kWaypoints{joints(0.2, -0.6, -2.0), joints(0.4, -0.4, -2.2),
+                                       joints(0.6, -0.6, -2.4)};
+
+/// Samples the motion and checks that it stays within the limits.
+void expectWithinLimits(const WaypointTrajectoryGenerator& generator) {
+  const auto kLimits = limits();
+  auto previous = generator.getDesiredState(0.);
+  for (double t = kTimeStep; t < generator.getDuration() + kTimeStep; t += kTimeStep) {
+    const auto kState = generator.getDesiredState(t);
+    ASSERT_TRUE((kState.velocity.cwiseAbs().array() <= kLimits.velocity.array() + kTolerance).all())
+        << "t = " << t;
+    ASSERT_TRUE(
+        (kState.acceleration.cwiseAbs().array() <= kLimits.acceleration.array() + kTolerance).all())
+        << "t = " << t;
+    const Vector7d kJerk = (kState.acceleration - previous.acceleration) / kTimeStep;
+    ASSERT_TRUE((kJerk.cwiseAbs().array() <= kLimits.jerk.array() * 1.001).all()) << "t = " << t;
+    previous = kState;
+  }
+}
+
+/// @return the smallest distance between the waypoint and the sampled motion.
+double closestApproach(const WaypointTrajectoryGenerator& generator, const Vector7d& waypoint) {
+  double distance = INFINITY;
+  for (double t = 0.; t <= generator.getDuration(); t += kTimeStep) {
+    distance = std::min(distance, (generator.getDesiredState(t).position - waypoint).norm());
+  }
+  return distance;
+}
+}  // namespace
+
+TEST(WaypointTrajectoryGeneratorTest, passesWaypointsWithinLimits) {
+  WaypointTrajectoryGenerator generator(limits(), 4);
+  const Vector7d kStart = joints(0., -0.785, -2.356);
+  ASSERT_TRUE(generator.plan(rest(kStart), kWaypoints));
+  EXPECT_FALSE(generator.isFinished(0.));
+  EXPECT_TRUE(generator.getDesiredState(0.).position.isApprox(kStart));
+  for (const auto& waypoint : kWaypoints) {
+    EXPECT_LT(closestApproach(generator, waypoint), 1e-3);
+  }
+  expectWithinLimits(generator);
+
+  const auto kEnd = generator.getDesiredState(generator.getDuration());
+  EXPECT_TRUE(generator.isFinished(generator.getDuration()));
+  EXPECT_TRUE(kEnd.position.isApprox(kWaypoints.back()));
+  EXPECT_TRUE(kEnd.velocity.isZero());
+}
+
+TEST(WaypointTrajectoryGeneratorTest, blendsThroughWaypointsFasterThanStopping) {
+  WaypointTrajectoryGenerator generator(limits(), 4);
+  const Vector7d kStart = joints(0., -0.785, -2.356);
+  // Each waypoint continues the motion of the first joint in the same direction
+  ASSERT_TRUE(generator.plan(rest(kStart), kWaypoints));
+  double min_speed = INFINITY;
+  for (double t = 0.2 * generator.getDuration(); t < 0.8 * generator.getDuration();
+       t += kTimeStep) {
+    min_speed = std::min(min_speed, std::abs(generator.getDesiredState(t).velocity[0]));
+  }
+  EXPECT_GT(min_speed, 0.01);
+
+  double stopping_duration = 0.;
+  WaypointTrajectoryGenerator single(limits(), 1);
+  Vector7d from = kStart;
+  for (const auto& waypoint : kWaypoints) {
+    ASSERT_TRUE(single.plan(rest(from), {waypoint}));
+    stopping_duration += single.getDuration();
+    from = waypoint;
+  }
+  EXPECT_LT(generator.getDuration(), stopping_duration);
+}
+
+TEST(WaypointTrajectoryGeneratorTest, replansFromCurrentState) {
+  WaypointTrajectoryGenerator generator(limits(), 4);
+  ASSERT_TRUE(generator.plan(rest(joints(0., -0.785, -2.356)), kWaypoints));
+  const double kReplanTime = 0.4 * generator.getDuration();
+  const auto kBefore = generator.getDesiredState(kReplanTime);
+  ASSERT_GT(kBefore.velocity.norm(), 0.01);
+
+  const Vector7d kTarget = joints(-0.3, -0.2, -1.8);
+  ASSERT_TRUE(generator.replan(kReplanTime, {kTarget}));
+  const auto kAfter = generator.getDesiredState(0.);
+  EXPECT_TRUE(kAfter.position.isApprox(kBefore.position));
+  EXPECT_TRUE(kAfter.velocity.isApprox(kBefore.velocity));
+  EXPECT_TRUE(kAfter.acceleration.isApprox(kBefore.acceleration));
+  EXPECT_TRUE(generator.getDesiredState(generator.getDuration()).position.isApprox(kTarget));
+  expectWithinLimits(generator);
+}
+
+TEST(WaypointTrajectoryGeneratorTest, rejectsInvalidWaypoints) {
+  WaypointTrajectoryGenerator generator(limits(), 2);
+  EXPECT_FALSE(generator.replan(0., {kWaypoints.front()}));
+  ASSERT_TRUE(generator.plan(rest(Vector7d::Zero()), {kWaypoints.front()}));
+  const double kDuration = generator.getDuration();
+  EXPECT_FALSE(generator.plan(rest(Vector7d::Zero()), {}));
+  EXPECT_FALSE(generator.plan(rest(Vector7d::Zero()), kWaypoints));
+  EXPECT_DOUBLE_EQ(generator.getDuration(), kDuration);
+
+  auto invalid_limits = limits();
+  invalid_limits.jerk[3] = 0.;
+  EXPECT_THROW(WaypointTrajectoryGenerator(invalid_limits, 1), std::invalid_argument);
+}
+
+TEST(WaypointTrajectoryGeneratorTest, replansFromRandomStates) {
+  constexpr std::size_t kMaxWaypoints = 5;
+  constexpr int kMotions = 200;
+  WaypointTrajectoryGenerator generator(limits(), kMaxWaypoints);
+  ASSERT_TRUE(generator.plan(rest(joints(0., -0.785, -2.356)), kWaypoints));
+  std::mt19937 random_engine(42);
+  std::uniform_real_distribution<double> random_position(-1.5, 1.5);
+  std::vector<Vector7d> waypoints(kMaxWaypoints);
+
+  for (int motion = 0; motion < kMotions; ++motion) {
+    for (auto& waypoint : waypoints) {
+      for (Eigen::Index joint = 0; joint < waypoint.size(); ++joint) {
+        waypoint[joint] = random_position(random_engine);
+      }
+    }
+    const double kReplanTime =
+        std::uniform_real_distribution<double>(0., generator.getDuration())(random_engine);
+    const auto kState = generator.getDesiredState(kReplanTime);
+    // Continue from the replanned motion, so that most motions start at speed
+    ASSERT_TRUE(generator.replan(kReplanTime, waypoints)) << "motion " << motion;
+    EXPECT_LT((generator.getDesiredState(0.).position - kState.position).norm(), kTolerance);
+    EXPECT_LT(
+        (generator.getDesiredState(generator.getDuration()).position - waypoints.back()).norm(),
+        kTolerance);
+  }
+}
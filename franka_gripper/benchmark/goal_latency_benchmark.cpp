@@ -0,0 +1,259 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+/**
+ * Latency benchmark for the gripper goal execution against the loopback gripper.
+ *
+ * Each goal moves the fingers by 1 mm. The time from accepting the goal to its result, minus the
+ * time the gripper spent on the command, is reported as the overhead of the goal execution.
+ * Afterwards long motions are canceled at a random time and the time from the cancel request to
+ * the result is reported.
+ *
+ * "polling" is the execution as done before: a thread per goal which runs the command with
+ * std::async and polls the result and the cancel request with the feedback period, while the
+ * state timer calls the blocking readOnce() under the mutex that the feedback also needs.
+ * "executor" is the GoalExecutor with the GripperStateReader used by the GripperActionServer.
+ *
+ * Usage: goal_latency_benchmark [goals] [feedback rate in Hz] [loopback delay in us]
+ */
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <functional>
+#include <future>
+#include <mutex>
+#include <random>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include <franka_gripper/goal_executor.hpp>
+#include <franka_gripper/gripper_state_reader.hpp>
+#include <franka_gripper/loopback_gripper_connection.hpp>
+
+namespace {
+
+using Clock = std::chrono::steady_clock;
+using franka_gripper::GoalExecutor;
+using franka_gripper::GripperStateReader;
+using franka_gripper::LoopbackGripperConnection;
+
+constexpr double kSpeed = 0.1;        // [m/s]
+constexpr double kSlowSpeed = 0.005;  // [m/s] speed of the motions which are canceled
+constexpr double kStepWidths[] = {0.07, 0.071};
+constexpr double kStatePublishRate = 50;  // [Hz] default state_publish_rate
+constexpr std::chrono::milliseconds kMinimumCancelDelay{20};
+
+/// Time at which the result of a goal was known and time the gripper spent on its command
+struct Outcome {
+  Clock::time_point result_time;
+  Clock::duration command_duration;
+};
+
+/// Executes one goal at a time, like the action server callbacks
+class Execution {
+ public:
+  virtual ~Execution() = default;
+  /// Starts a goal, like the goal accepted callback
+  virtual void start(std::function<bool()> command) = 0;
+  /// Requests the cancellation of the running goal, like the cancel callback
+  virtual void cancel() = 0;
+  /// Waits for the result of the running goal
+  virtual Outcome wait() = 0;
+};
+
+/// Goal execution as done before the GoalExecutor
+class PollingExecution : public Execution {
+ public:
+  PollingExecution(LoopbackGripperConnection* gripper, std::chrono::nanoseconds feedback_period)
+      : gripper_(gripper),
+        feedback_period_(feedback_period),
+        state_timer_([this]() { publishStates(); }) {}
+
+  ~PollingExecution() override {
+    finished_ = true;
+    state_timer_.join();
+  }
+
+  void start(std::function<bool()> command) override {
+    canceling_ = false;
+    std::promise<Outcome> outcome;
+    outcome_ = outcome.get_future();
+    std::thread([this, command, outcome = std::move(outcome)]() mutable {
+      Clock::duration command_duration{};
+      auto result = std::async(std::launch::async, [&command, &command_duration]() {
+        const auto kStart = Clock::now();
+        const bool kSuccess = command();
+        command_duration = Clock::now() - kStart;
+        return kSuccess;
+      });
+      while (result.wait_for(feedback_period_) != std::future_status::ready) {
+        if (canceling_) {
+          gripper_->stop();
+          break;
+        }
+        std::lock_guard<std::mutex> lock(state_mutex_);
+        feedback_width_ = state_.width;
+      }
+      result.get();
+      outcome.set_value({Clock::now(), command_duration});
+    }).detach();
+  }
+
+  void cancel() override { canceling_ = true; }
+
+  Outcome wait() override { return outcome_.get(); }
+
+ private:
+  /// The state timer of the action server, which read the state while holding the state mutex
+  void publishStates() {
+    const auto kPeriod = std::chrono::duration_cast<Clock::duration>(
+        std::chrono::duration<double>(1. / kStatePublishRate));
+    auto next_publish = Clock::now();
+    while (not finished_) {
+      {
+        std::lock_guard<std::mutex> lock(state_mutex_);
+        state_ = gripper_->readOnce();
+      }
+      next_publish += kPeriod;
+      std::this_thread::sleep_until(next_publish);
+    }
+  }
+
+  LoopbackGripperConnection* gripper_;
+  const std::chrono::nanoseconds feedback_period_;
+  std::atomic<bool> canceling_{false};
+  std::future<Outcome> outcome_;
+  std::mutex state_mutex_;
+  franka::GripperState state_;
+  double feedback_width_ = 0.;
+  std::atomic<bool> finished_{false};
+  std::thread state_timer_;
+};
+
+/// Goal execution as done by the GripperActionServer
+class ExecutorExecution : public Execution {
+ public:
+  ExecutorExecution(LoopbackGripperConnection* gripper, std::chrono::nanoseconds feedback_period)
+      : reader_(gripper, gripper->readOnce(), [](const std::string& /*message*/) {}),
+        executor_(GoalExecutor::Policy::kPreempt, 1, feedback_period, [gripper]() {
+          gripper->stop();
+        }) {}
+
+  void start(std::function<bool()> command) override {
+    auto outcome = std::make_shared<std::promise<Outcome>>();
+    outcome_ = outcome->get_future();
+    auto command_duration = std::make_shared<Clock::duration>();
+    GoalExecutor::Goal goal;
+    goal.run = [command, command_duration]() {
+      const auto kStart = Clock::now();
+      command();
+      *command_duration = Clock::now() - kStart;
+    };
+    goal.finish = [outcome, command_duration](const GoalExecutor::Report& /*report*/) {
+      outcome->set_value({Clock::now(), *command_duration});
+    };
+    goal.feedback = [this]() { feedback_width_ = reader_.latest().width; };
+    goal.key = this;
+    executor_.submit(std::move(goal));
+  }
+
+  void cancel() override { executor_.cancel(this); }
+
+  Outcome wait() override { return outcome_.get(); }
+
+ private:
+  GripperStateReader reader_;
+  GoalExecutor executor_;
+  std::future<Outcome> outcome_;
+  double feedback_width_ = 0.;
+};
+
+struct Result {
+  double mean_ms;
+  double p99_ms;
+  double max_ms;
+};
+
+Result evaluate(std::vector<double> latencies_ms) {
+  std::sort(latencies_ms.begin(), latencies_ms.end());
+  double sum = 0.;
+  for (auto latency : latencies_ms) {
+    sum += latency;
+  }
+  const auto kP99Index = static_cast<std::size_t>(0.99 * (latencies_ms.size() - 1));
+  return {sum / latencies_ms.size(), latencies_ms.at(kP99Index), latencies_ms.back()};
+}
+
+double toMilliseconds(Clock::duration duration) {
+  return std::chrono::duration<double, std::milli>(duration).count();
+}
+
+template <typename ExecutionType>
+void run(const std::string& name,
+         int goals,
+         std::chrono::nanoseconds feedback_period,
+         std::chrono::microseconds delay) {
+  LoopbackGripperConnection gripper(delay);
+  ExecutionType execution(&gripper, feedback_period);
+
+  std::vector<double> overhead_ms;
+  for (int i = 0; i < goals; i++) {
+    const double kWidth = kStepWidths[i % 2];
+    const auto kStart = Clock::now();
+    execution.start([&gripper, kWidth]() { return gripper.move(kWidth, kSpeed); });
+    const auto kOutcome = execution.wait();
+    overhead_ms.push_back(
+        toMilliseconds(kOutcome.result_time - kStart - kOutcome.command_duration));
+  }
+
+  // Cancel at a random phase of the feedback period
+  std::mt19937 generator(42);
+  std::uniform_int_distribution<std::chrono::nanoseconds::rep> cancel_delay(
+      kMinimumCancelDelay.count(), (kMinimumCancelDelay + feedback_period).count());
+  std::vector<double> cancel_ms;
+  for (int i = 0; i < goals; i++) {
+    execution.start([&gripper]() { return gripper.move(0., kSlowSpeed); });
+    std::this_thread::sleep_for(std::chrono::nanoseconds(cancel_delay(generator)));
+    const auto kCancelTime = Clock::now();
+    execution.cancel();
+    cancel_ms.push_back(toMilliseconds(execution.wait().result_time - kCancelTime));
+  }
+
+  const auto kOverhead = evaluate(overhead_ms);
+  const auto kCancel = evaluate(cancel_ms);
+  std::printf("%-9s goal to result overhead  mean: %7.3f ms  p99: %7.3f ms  max: %7.3f ms\n",
+              name.c_str(), kOverhead.mean_ms, kOverhead.p99_ms, kOverhead.max_ms);
+  std::printf("%-9s cancel to result          mean: %7.3f ms  p99: %7.3f ms  max: %7.3f ms\n",
+              name.c_str(), kCancel.mean_ms, kCancel.p99_ms, kCancel.max_ms);
+}
+
+}  // namespace
+
+int main(int argc, char** argv) {
+  const int kGoals = argc > 1 ? std::atoi(argv[1]) : 50;
+  const double kFeedbackRate = argc > 2 ? std::atof(argv[2]) : 30.;
+  const std::chrono::microseconds kDelay(argc > 3 ? std::atoi(argv[3]) : 0);
+  const auto kFeedbackPeriod = std::chrono::duration_cast<std::chrono::nanoseconds>(
+      std::chrono::duration<double>(1. / kFeedbackRate));
+
+  std::printf("%d goals, feedback rate %.0f Hz, loopback delay %ld us\n", kGoals, kFeedbackRate,
+              static_cast<long>(kDelay.count()));
+  run<PollingExecution>("polling", kGoals, kFeedbackPeriod, kDelay);
+  run<ExecutorExecution>("executor", kGoals, kFeedbackPeriod, kDelay);
+  return 0;
+}
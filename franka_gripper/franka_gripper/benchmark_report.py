@@ -0,0 +1,141 @@
+#  Copyright (c) 2023 Franka Emika GmbH
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Latency statistics and reports of the gripper action benchmark.
+
+A report is a dictionary that is written as JSON. It holds the benchmark configuration and per
+action the goal outcomes, the throughput and the percentiles of each latency phase in ms. Reports
+can be compared against a baseline report to detect latency regressions.
+"""
+
+import csv
+import json
+import math
+import threading
+
+PERCENTILES = (50, 90, 99)
+PHASES = ('accept', 'first_feedback', 'result', 'cancel')
+OUTCOMES = ('succeeded', 'aborted', 'canceled', 'rejected')
+
+
+def percentile(sorted_samples, percent):
+    """Return the percentile of sorted samples, linearly interpolated between the ranks."""
+    if not sorted_samples:
+        return math.nan
+    rank = (len(sorted_samples) - 1) * percent / 100.
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (rank - lower)
+
+
+def summarize(samples):
+    """Return count, mean, max and the PERCENTILES of latency samples in s as ms."""
+    milliseconds = sorted(sample * 1e3 for sample in samples)
+    summary = {'count': len(milliseconds),
+               'mean': sum(milliseconds) / len(milliseconds) if milliseconds else math.nan,
+               'max': milliseconds[-1] if milliseconds else math.nan}
+    for percent in PERCENTILES:
+        summary['p{}'.format(percent)] = percentile(milliseconds, percent)
+    return summary
+
+
+class LatencyRecorder:
+    """Collects the latencies and outcomes of the goals of one action, thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {phase: [] for phase in PHASES}
+        self._outcomes = {outcome: 0 for outcome in OUTCOMES}
+
+    def add_latency(self, phase, seconds):
+        with self._lock:
+            self._samples[phase].append(seconds)
+
+    def add_outcome(self, outcome):
+        with self._lock:
+            self._outcomes[outcome] += 1
+
+    def summarize(self, duration):
+        """
+        Return the outcomes, throughput and latency summaries of the goals.
+
+        :param duration: wall time in s in which the goals were executed.
+        """
+        with self._lock:
+            goals = sum(self._outcomes.values())
+            return {'goals': goals,
+                    'throughput': goals / duration if duration > 0. else math.nan,
+                    'outcomes': dict(self._outcomes),
+                    'latency_ms': {phase: summarize(samples)
+                                   for phase, samples in self._samples.items()}}
+
+
+def write_json(path, report):
+    # NaN marks phases without samples, it is written as null to keep the file valid JSON
+    with open(path, 'w') as stream:
+        json.dump(_replace_nan(report), stream, indent=2, sort_keys=True)
+        stream.write('\n')
+
+
+def write_csv(path, report):
+    """Write one row per action and latency phase."""
+    fields = ['action', 'phase', 'count', 'mean', 'max'] + \
+        ['p{}'.format(percent) for percent in PERCENTILES]
+    with open(path, 'w', newline='') as stream:
+        writer = csv.DictWriter(stream, fields)
+        writer.writeheader()
+        for action, action_report in sorted(report['actions'].items()):
+            for phase, summary in sorted(action_report['latency_ms'].items()):
+                writer.writerow(dict(summary, action=action, phase=phase))
+
+
+def load_json(path):
+    with open(path) as stream:
+        return json.load(stream)
+
+
+def find_regressions(report, baseline, tolerance, statistic='p90'):
+    """
+    Return the latencies that grew by more than tolerance relative to the baseline.
+
+    Phases without samples in either report are skipped.
+
+    :return: list of (action, phase, baseline value, value) tuples in ms.
+    """
+    regressions = []
+    for action, action_report in sorted(report['actions'].items()):
+        baseline_action = baseline['actions'].get(action)
+        if baseline_action is None:
+            continue
+        for phase, summary in sorted(action_report['latency_ms'].items()):
+            value = summary.get(statistic)
+            baseline_value = baseline_action['latency_ms'].get(phase, {}).get(statistic)
+            if _is_missing(value) or _is_missing(baseline_value):
+                continue
+            if value > baseline_value * (1. + tolerance):
+                regressions.append((action, phase, baseline_value, value))
+    return regressions
+
+
+def _is_missing(value):
+    return value is None or math.isnan(value)
+
+
+def _replace_nan(value):
+    if isinstance(value, dict):
+        return {key: _replace_nan(item) for key, item in value.items()}
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
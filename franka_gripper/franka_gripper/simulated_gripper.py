@@ -0,0 +1,154 @@
+#  Copyright (c) 2023 Franka Emika GmbH
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Motion model of the Franka Hand, used to simulate the gripper without hardware.
+
+The commands have the semantics of the franka::Gripper methods of the same name: they block until
+the motion has finished and return whether it succeeded. The fingers move with the commanded speed
+and stop at an object of ``object_width`` when grasping. A grasp succeeds if the fingers stop
+within the epsilon of the commanded width. With a ``time_scale`` above 1, simulated time passes
+faster than wall time, so motions finish earlier.
+"""
+
+import collections
+import threading
+import time
+
+GripperState = collections.namedtuple('GripperState', ['width', 'max_width', 'is_grasped', 'time'])
+
+MAX_WIDTH = 0.08  # [m]
+HOMING_SPEED = 0.1  # [m/s]
+
+
+class SimulatedGripper:
+
+    def __init__(self, max_width=MAX_WIDTH, object_width=0., time_scale=1.,
+                 clock=time.monotonic):
+        """
+        Create a gripper with open fingers.
+
+        :param max_width: maximum opening width of the fingers in m.
+        :param object_width: width of the object between the fingers in m, 0 if there is none.
+        :param time_scale: simulated seconds per wall time second.
+        :param clock: wall time source in s.
+        """
+        if time_scale <= 0.:
+            raise ValueError('time_scale must be positive')
+        self.max_width = max_width
+        self.object_width = object_width
+        self._time_scale = time_scale
+        self._clock = clock
+        self._start_time = clock()
+        # Guards the motion state, notified when a motion is stopped
+        self._condition = threading.Condition()
+        # Serializes the commands, like the single command channel of the real gripper
+        self._command_lock = threading.Lock()
+        self._motion_start_width = max_width
+        self._motion_target = max_width
+        self._motion_speed = 1.
+        self._motion_start_time = 0.
+        self._stop_requested = False
+        self._is_grasped = False
+
+    def now(self):
+        """Return the simulated time in s since the gripper was created."""
+        return (self._clock() - self._start_time) * self._time_scale
+
+    def read_once(self):
+        """Return the current state of the gripper."""
+        with self._condition:
+            now = self.now()
+            return GripperState(self._width(now), self.max_width, self._is_grasped, now)
+
+    def homing(self):
+        """Close and open the fingers to calibrate the maximum width."""
+        with self._command_lock:
+            return (self._move_to(0., HOMING_SPEED) and
+                    self._move_to(self.max_width, HOMING_SPEED))
+
+    def move(self, width, speed):
+        """
+        Move the fingers to a width.
+
+        :raises ValueError: if the width or speed is out of range.
+        """
+        self._check_command(width, speed)
+        with self._command_lock:
+            return self._move_to(width, speed)
+
+    def grasp(self, width, speed, force, epsilon_inner=0.005, epsilon_outer=0.005):
+        """
+        Close the fingers until they stop at the object or at 0.
+
+        :return: True if the fingers stopped within [width - epsilon_inner, width + epsilon_outer].
+        :raises ValueError: if the width, speed or force is out of range.
+        """
+        self._check_command(width, speed)
+        if force < 0.:
+            raise ValueError('Grasp command rejected: force must not be negative')
+        with self._command_lock:
+            with self._condition:
+                current_width = self._width(self.now())
+            stop_width = self.object_width if 0. < self.object_width < current_width else 0.
+            if not self._move_to(stop_width, speed):
+                return False
+            grasped = width - epsilon_inner <= stop_width <= width + epsilon_outer
+            with self._condition:
+                self._is_grasped = grasped
+            return grasped
+
+    def stop(self):
+        """Stop the running motion, which then returns False."""
+        with self._condition:
+            now = self.now()
+            self._set_motion(self._width(now), self._width(now), 1., now)
+            self._stop_requested = True
+            self._condition.notify_all()
+        return True
+
+    def _check_command(self, width, speed):
+        if not 0. <= width <= self.max_width:
+            raise ValueError('Command rejected: width {} out of [0, {}]'.format(
+                width, self.max_width))
+        if speed <= 0.:
+            raise ValueError('Command rejected: speed must be positive')
+
+    def _move_to(self, width, speed):
+        with self._condition:
+            now = self.now()
+            self._stop_requested = False
+            self._is_grasped = False
+            self._set_motion(self._width(now), width, speed, now)
+            end_time = now + abs(width - self._motion_start_width) / speed
+            while not self._stop_requested:
+                remaining = (end_time - self.now()) / self._time_scale
+                if remaining <= 0.:
+                    return True
+                self._condition.wait(remaining)
+            return False
+
+    def _set_motion(self, start_width, target, speed, start_time):
+        self._motion_start_width = start_width
+        self._motion_target = target
+        self._motion_speed = speed
+        self._motion_start_time = start_time
+
+    def _width(self, now):
+        travelled = self._motion_speed * max(0., now - self._motion_start_time)
+        distance = self._motion_target - self._motion_start_width
+        if travelled >= abs(distance):
+            return self._motion_target
+        return self._motion_start_width + travelled if distance > 0 else \
+            self._motion_start_width - travelled
@@ -0,0 +1,76 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <atomic>
+#include <cstdint>
+
+#include <franka/gripper_state.h>
+
+namespace franka_gripper {
+
+/**
+ * Estimates the velocity and effort of each finger from the gripper states, which only contain
+ * the width.
+ *
+ * The velocity is the finite difference of the finger position over the gripper time, smoothed by
+ * a first order low-pass filter. Each update costs the same, no matter how long the filter ran.
+ * The gripper has no force sensor, so the effort is the commanded grasp force while an object is
+ * grasped and 0 otherwise. It points in the closing direction, so it is negative.
+ *
+ * update(), velocity() and reset() must be called from a single thread, the grasp force can be
+ * set and the effort read from any thread.
+ */
+class FingerStateEstimator {
+ public:
+  static constexpr double kDefaultCutoffFrequency = 10.;  // [Hz]
+
+  /**
+   * @param[in] cutoff_frequency of the velocity low-pass filter in Hz, 0 disables the filter.
+   * @throw std::invalid_argument if the cutoff frequency is negative or not finite.
+   */
+  explicit FingerStateEstimator(double cutoff_frequency = kDefaultCutoffFrequency);
+
+  /// Updates the velocity with a new gripper state. A state which is not newer than the previous
+  /// one leaves the velocity unchanged, an older state restarts the estimation.
+  void update(const franka::GripperState& state);
+
+  /// Forgets the previous states, the velocity is 0 until the second update.
+  void reset();
+
+  /// @return the filtered velocity of each finger in m/s.
+  double velocity() const { return velocity_; }
+
+  /// Sets the force of the running grasp, 0 if the gripper moves without force control.
+  void setGraspForce(double force) { grasp_force_.store(force, std::memory_order_relaxed); }
+
+  /// @return the commanded grasp force in N while an object is grasped, 0 otherwise.
+  double graspForce(bool is_grasped) const {
+    return is_grasped ? grasp_force_.load(std::memory_order_relaxed) : 0.;
+  }
+
+  /// @return the effort of each finger in N.
+  double effort(bool is_grasped) const { return -graspForce(is_grasped); }
+
+ private:
+  double cutoff_frequency_;
+  bool initialized_ = false;
+  uint64_t previous_time_ms_ = 0;
+  double previous_position_ = 0.;
+  double velocity_ = 0.;
+  std::atomic<double> grasp_force_{0.};
+};
+
+}  // namespace franka_gripper
@@ -0,0 +1,170 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <chrono>
+#include <condition_variable>
+#include <cstddef>
+#include <cstdint>
+#include <deque>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <thread>
+
+namespace franka_gripper {
+
+/**
+ * Executes gripper goals one after another on a single worker thread.
+ *
+ * Goals are finished as soon as their command returns. A supervisor thread publishes the feedback
+ * of the active goal, finishes canceled goals which were still waiting and stops the device as
+ * soon as the active goal is interrupted. The stop is repeated every kStopRetryPeriod until the
+ * interrupted goal returned, as it is lost if it reaches the device before the command. The next
+ * goal is only started after the device was stopped, so an interrupted command can never stop the
+ * command that follows it.
+ */
+class GoalExecutor {
+ public:
+  using Clock = std::chrono::steady_clock;
+
+  /// What happens to accepted goals when a new goal is submitted
+  enum class Policy {
+    kPreempt,  // the new goal preempts the active goal and all waiting goals
+    kQueue,    // the new goal waits until the goals before it have finished
+  };
+
+  /// Why a goal did not run to completion
+  enum class Interruption { kNone, kPreempted, kCanceled, kShutdown };
+
+  /// Passed to Goal::finish
+  struct Report {
+    Interruption interruption;
+    std::chrono::nanoseconds queue_latency;      // from submission to start or interruption
+    std::chrono::nanoseconds execution_latency;  // from start to end, zero if never started
+  };
+
+  /// Counters since the start, latencies since the previous collectStatistics()
+  struct Statistics {
+    uint64_t completed;  // goals which ran to completion
+    uint64_t preempted;
+    uint64_t canceled;
+    std::chrono::nanoseconds max_queue_latency;
+    std::chrono::nanoseconds max_execution_latency;
+  };
+
+  /// Callbacks of a goal. They are never called while the executor holds its lock.
+  struct Goal {
+    /// Performs the command on the worker thread. Must not throw. Is skipped if the goal is
+    /// interrupted before it started.
+    std::function<void()> run;
+    /// Called exactly once after run returned or when the goal was dropped from the queue.
+    std::function<void(const Report&)> finish;
+    /// Called when run starts and periodically while it is executing, never after finish.
+    std::function<void()> feedback;
+    /// Identifies the goal in cancel(), e.g. its goal handle.
+    const void* key = nullptr;
+  };
+
+  /**
+   * Starts the worker and the supervisor threads.
+   * @param[in] policy how to handle goals which are submitted while another goal is active.
+   * @param[in] max_queue_depth maximum number of goals waiting for execution with kQueue.
+   * @param[in] feedback_period period of the feedback of the active goal.
+   * @param[in] stop_device stops the running command, so that run returns. Must not throw.
+   */
+  GoalExecutor(Policy policy,
+               std::size_t max_queue_depth,
+               std::chrono::nanoseconds feedback_period,
+               std::function<void()> stop_device);
+  GoalExecutor(const GoalExecutor&) = delete;
+  GoalExecutor& operator=(const GoalExecutor&) = delete;
+  GoalExecutor(GoalExecutor&&) = delete;
+  GoalExecutor& operator=(GoalExecutor&&) = delete;
+
+  /// Interrupts the active goal, drops the waiting goals and stops the threads.
+  ~GoalExecutor();
+
+  /// @return whether a goal submitted now would be accepted.
+  bool canAccept() const;
+
+  /**
+   * Queues a goal for execution. With kPreempt, the active goal and all waiting goals are
+   * interrupted first.
+   * @param[in] goal the goal.
+   * @return false if the queue is full. The goal callbacks are not called in this case.
+   */
+  bool submit(Goal goal);
+
+  /**
+   * Interrupts a goal and stops the device right away if the goal is active. The goal is
+   * finished on the worker or supervisor thread, never by this call.
+   * @param[in] key key of the goal.
+   * @return false if there is no active or waiting goal with this key.
+   */
+  bool cancel(const void* key);
+
+  /// @return goal counters and latencies. Must only be called from a single thread.
+  Statistics collectStatistics();
+
+ private:
+  struct Entry {
+    Goal goal;
+    Clock::time_point submit_time;
+    Interruption interruption = Interruption::kNone;  // guarded by mutex_
+    // Serializes feedback with finish, so that no feedback is published for a finished goal
+    std::mutex completion_mutex;
+    bool finished = false;
+  };
+
+  static constexpr std::chrono::milliseconds kStopRetryPeriod{100};
+
+  void work();
+  void supervise();
+
+  /// Must be called with mutex_ held.
+  bool canAcceptLocked() const;
+
+  /// Drops the waiting goals and interrupts the active goal. Must be called with mutex_ held.
+  /// @return the dropped goals, to be finished after releasing mutex_.
+  std::deque<std::shared_ptr<Entry>> interruptAll(Interruption interruption);
+
+  /// Finishes a goal and updates the statistics.
+  void finish(const std::shared_ptr<Entry>& entry, const Report& report);
+
+  const Policy policy_;
+  const std::size_t max_queue_depth_;
+  const std::chrono::nanoseconds feedback_period_;
+  const std::function<void()> stop_device_;
+
+  mutable std::mutex mutex_;
+  std::condition_variable worker_wakeup_;
+  std::condition_variable supervisor_wakeup_;
+  std::deque<std::shared_ptr<Entry>> queue_;
+  // Waiting goals which were canceled, finished by the supervisor
+  std::deque<std::shared_ptr<Entry>> canceled_;
+  std::shared_ptr<Entry> active_;
+  bool goal_started_ = false;
+  bool stop_requested_ = false;
+  bool shutdown_ = false;
+
+  std::mutex statistics_mutex_;
+  Statistics statistics_{};
+
+  std::thread worker_;
+  std::thread supervisor_;
+};
+
+}  // namespace franka_gripper
@@ -14,17 +14,21 @@
 
 #pragma once
 
+#include <atomic>
 #include <chrono>
 #include <functional>
-#include <future>
 #include <memory>
 #include <string>
 #include <thread>
 
 #include <franka/exception.h>
-#include <franka/gripper.h>
 #include <franka/gripper_state.h>
 #include <control_msgs/action/gripper_command.hpp>
+#include <diagnostic_msgs/msg/diagnostic_array.hpp>
+#include <franka_gripper/finger_state_estimator.hpp>
+#include <franka_gripper/goal_executor.hpp>
+#include <franka_gripper/gripper_connection.hpp>
+#include <franka_gripper/gripper_state_reader.hpp>
 #include <franka_msgs/action/grasp.hpp>
 #include <franka_msgs/action/homing.hpp>
 #include <franka_msgs/action/move.hpp>
@@ -35,17 +39,8 @@
 
 namespace franka_gripper {
 
-/// checks whether an asynchronous command has finished
-/// @tparam T the expected return type of the future
-/// @param t the future which should be checked
-/// @param future_wait_timeout how long to wait for the result before returning false
-/// @return whether the asynchronous function has already finished
-template <typename T>
-bool resultIsReady(std::future<T>& t, std::chrono::nanoseconds future_wait_timeout) {
-  return t.wait_for(future_wait_timeout) == std::future_status::ready;
-}
-
-/// ROS node that offers multiple actions to use the gripper.
+/// ROS node that offers multiple actions to use the gripper. Goals are executed one after another
+/// by a GoalExecutor, a new goal either preempts the active goal or waits in a bounded queue.
 class GripperActionServer : public rclcpp::Node {
  public:
   using Homing = franka_msgs::action::Homing;
@@ -62,10 +57,15 @@ class GripperActionServer : public rclcpp::Node {
 
   using Trigger = std_srvs::srv::Trigger;
 
-  /// creates an instance of a GripperActionServer
+  /// creates an instance of a GripperActionServer. Connects to the gripper in the background,
+  /// goals are rejected until the connection is established.
   /// @param options options for node initialization
   explicit GripperActionServer(const rclcpp::NodeOptions& options = rclcpp::NodeOptions());
 
+  /// waits for a running connection attempt to finish, aborts the remaining goals and stops
+  /// streaming the gripper state
+  ~GripperActionServer() override;
+
  private:
   /// describes the different tasks. Each task corresponds to one action server
   enum class Task { kHoming, kMove, kGrasp, kGripperCommand };
@@ -90,34 +90,62 @@ class GripperActionServer : public rclcpp::Node {
   const double k_default_speed = 0.1;              // default gripper speed in m/s
   const int k_default_state_publish_rate = 30;     // default gripper state publish rate
   const int k_default_feedback_publish_rate = 10;  // default action feedback publish rate
-
-  std::unique_ptr<franka::Gripper> gripper_;
+  const double k_default_diagnostics_publish_rate = 1.0;      // default diagnostics publish rate
+  const std::chrono::seconds k_stale_state_threshold{1};      // state age reported as a warning
+  const std::chrono::seconds k_cancel_transition_timeout{1};  // wait for the canceling state
+  const int k_default_goal_queue_depth = 1;  // default number of goals waiting with "queue" policy
+
+  std::unique_ptr<GripperConnection> gripper_;
+  std::unique_ptr<GripperStateReader> state_reader_;
+  std::unique_ptr<GoalExecutor> goal_executor_;
+  std::unique_ptr<FingerStateEstimator> finger_state_estimator_;
   rclcpp_action::Server<Homing>::SharedPtr homing_server_;
   rclcpp_action::Server<Move>::SharedPtr move_server_;
   rclcpp_action::Server<Grasp>::SharedPtr grasp_server_;
   rclcpp_action::Server<GripperCommand>::SharedPtr gripper_command_server_;
   rclcpp::Service<Trigger>::SharedPtr stop_service_;
-  std::mutex gripper_state_mutex_;
-  franka::GripperState current_gripper_state_;
   rclcpp::Publisher<sensor_msgs::msg::JointState>::SharedPtr joint_states_publisher_;
   rclcpp::TimerBase::SharedPtr timer_;
+  rclcpp::Publisher<diagnostic_msgs::msg::DiagnosticArray>::SharedPtr diagnostics_publisher_;
+  rclcpp::TimerBase::SharedPtr diagnostics_timer_;
+  uint64_t last_read_errors_ = 0;
+  std::atomic<uint64_t> rejected_goals_{0};
 
   double default_speed_;          // default gripper speed parameter value in m/s
   double default_epsilon_inner_;  // default gripper inner epsilon parameter value in m
   double default_epsilon_outer_;  //  default gripper outer epsilon parameter value in m
   std::vector<std::string> joint_names_;
-  std::chrono::nanoseconds future_wait_timeout_{0};
+  std::atomic<bool> connected_{false};
+  std::thread connection_thread_;
+
+  /// creates the connection to the gripper and reads its first state
+  /// @param create_connection creates the connection, is allowed to throw a franka::Exception
+  void connect(const std::function<std::unique_ptr<GripperConnection>()>& create_connection);
 
+  /// publishes the latest gripper state without waiting for the gripper
   void publishGripperState();
 
+  /// publishes the rate and latency of the gripper state stream and the goal statistics on
+  /// /diagnostics
+  void publishDiagnostics();
+
+  /// stops the gripper, used by the goal executor to interrupt the active goal
+  void stopGripper();
+
+  /// passes a goal to the goal executor, aborts it if the goal queue is full
+  /// @param[in] goal the goal callbacks
+  /// @param[in] abort aborts the goal handle
+  void submitGoal(GoalExecutor::Goal goal, const std::function<void()>& abort);
+
   /// stops the gripper and writes the result into the response
   /// @param[out] response  will be updated with the success status and error message
   void stopServiceCallback(const std::shared_ptr<Trigger::Response>& response);
 
-  /// accepts any cancel request
-  rclcpp_action::CancelResponse handleCancel(Task task);
+  /// accepts any cancel request and interrupts the goal right away
+  /// @param[in] goal the goal handle of the goal
+  rclcpp_action::CancelResponse handleCancel(Task task, const void* goal);
 
-  /// accepts any goal request
+  /// accepts goal requests while the gripper is connected and the goal executor accepts goals
   rclcpp_action::GoalResponse handleGoal(Task task);
 
   /// performs homing
@@ -129,18 +157,18 @@ class GripperActionServer : public rclcpp::Node {
   /// performs grasp
   void executeGrasp(const std::shared_ptr<GoalHandleGrasp>& goal_handle);
 
-  /// Performs the moveit grasp command
+  /// Queues the moveit grasp command for execution
   /// @param goal_handle
   /// @param command_handler eiter a grasp or move command defined by the onExecuteGripperCommand
   /// method
   void executeGripperCommand(const std::shared_ptr<GoalHandleGripperCommand>& goal_handle,
                              const std::function<bool()>& command_handler);
 
-  /// Defines a function for either grasping or moving the gripper, depending on the current gripper
-  /// state and the commanded goal. Then it calls executeGripperCommand to execute that function
+  /// Defines a function for either grasping or moving the gripper, depending on the gripper state
+  /// when the goal starts and the commanded goal. Then it calls executeGripperCommand to queue it
   void onExecuteGripperCommand(const std::shared_ptr<GoalHandleGripperCommand>& goal_handle);
 
-  /// Executes a gripper command
+  /// Queues a gripper command for execution
   /// @tparam T A gripper action message type (Move, Grasp, Homing)
   /// @param[in] goal_handle The goal handle from the action server
   /// @param[in] task The type of the Task
@@ -151,33 +179,91 @@ class GripperActionServer : public rclcpp::Node {
                       Task task,
                       const std::function<bool()>& command_handler) {
     const auto kTaskName = getTaskName(task);
-    RCLCPP_INFO(this->get_logger(), "Gripper %s...", kTaskName.c_str());
-
-    auto command_execution_thread = withResultGenerator<T>(command_handler);
+    auto result = std::make_shared<typename T::Result>();
 
-    std::future<std::shared_ptr<typename T::Result>> result_future =
-        std::async(std::launch::async, command_execution_thread);
+    GoalExecutor::Goal goal;
+    goal.run = [this, kTaskName, result, command_handler]() {
+      RCLCPP_INFO(this->get_logger(), "Gripper %s...", kTaskName.c_str());
+      *result = *withResultGenerator<T>(command_handler)();
+    };
+    goal.finish = [this, kTaskName, result, goal_handle](const GoalExecutor::Report& report) {
+      if (report.interruption == GoalExecutor::Interruption::kPreempted) {
+        result->error = "preempted by a newer goal";
+      }
+      finishGoal(goal_handle, result, result->success, kTaskName, report);
+    };
+    goal.feedback = [this, goal_handle]() { publishGripperWidthFeedback(goal_handle); };
+    goal.key = goal_handle.get();
+    submitGoal(std::move(goal), [goal_handle, result]() { goal_handle->abort(result); });
+  }
 
-    while (not resultIsReady(result_future, future_wait_timeout_) and rclcpp::ok()) {
-      if (goal_handle->is_canceling()) {
-        gripper_->stop();
-        auto result = result_future.get();
-        RCLCPP_INFO(get_logger(), "Gripper %s canceled", kTaskName.c_str());
-        goal_handle->canceled(result);
+  /// Ends a goal according to the way it was executed
+  /// @param[in] goal_handle The goal handle from the action server
+  /// @param[in] result The result of the goal
+  /// @param[in] success whether the command succeeded
+  /// @param[in] task_name The name of the Task
+  /// @param[in] report how the goal was executed
+  template <typename GoalHandle, typename Result>
+  void finishGoal(const GoalHandle& goal_handle,
+                  const Result& result,
+                  bool success,
+                  const std::string& task_name,
+                  const GoalExecutor::Report& report) {
+    if (not rclcpp::ok()) {
+      return;
+    }
+    const double kQueueLatency =
+        std::chrono::duration<double, std::milli>(report.queue_latency).count();
+    const double kExecutionLatency =
+        std::chrono::duration<double, std::milli>(report.execution_latency).count();
+    switch (report.interruption) {
+      case GoalExecutor::Interruption::kCanceled:
+        RCLCPP_INFO(get_logger(), "Gripper %s canceled (queued %.1f ms, executed %.1f ms)",
+                    task_name.c_str(), kQueueLatency, kExecutionLatency);
+        if (waitUntilCanceling(goal_handle)) {
+          goal_handle->canceled(result);
+        } else {
+          goal_handle->abort(result);
+        }
         return;
-      }
-      publishGripperWidthFeedback(goal_handle);
+      case GoalExecutor::Interruption::kPreempted:
+        RCLCPP_INFO(get_logger(), "Gripper %s preempted (queued %.1f ms, executed %.1f ms)",
+                    task_name.c_str(), kQueueLatency, kExecutionLatency);
+        goal_handle->abort(result);
+        return;
+      case GoalExecutor::Interruption::kShutdown:
+        goal_handle->abort(result);
+        return;
+      case GoalExecutor::Interruption::kNone:
+        break;
+    }
+    if (success) {
+      RCLCPP_INFO(get_logger(), "Gripper %s succeeded (queued %.1f ms, executed %.1f ms)",
+                  task_name.c_str(), kQueueLatency, kExecutionLatency);
+      goal_handle->succeed(result);
+    } else {
+      RCLCPP_INFO(get_logger(), "Gripper %s failed (queued %.1f ms, executed %.1f ms)",
+                  task_name.c_str(), kQueueLatency, kExecutionLatency);
+      goal_handle->abort(result);
     }
-    if (rclcpp::ok()) {
-      const auto kResult = result_future.get();
-      if (kResult->success) {
-        RCLCPP_INFO(get_logger(), "Gripper %s succeeded", kTaskName.c_str());
-        goal_handle->succeed(kResult);
-      } else {
-        RCLCPP_INFO(get_logger(), "Gripper %s failed", kTaskName.c_str());
-        goal_handle->abort(kResult);
+  }
+
+  /// The goal is interrupted from handleCancel, but only enters the canceling state after
+  /// handleCancel returned. Waits for this transition, which must happen before the goal can be
+  /// finished as canceled.
+  /// @param[in] goal_handle The goal handle from the action server
+  /// @return false if the goal did not enter the canceling state within
+  /// k_cancel_transition_timeout
+  template <typename GoalHandle>
+  bool waitUntilCanceling(const GoalHandle& goal_handle) {
+    const auto kDeadline = std::chrono::steady_clock::now() + k_cancel_transition_timeout;
+    while (not goal_handle->is_canceling()) {
+      if (std::chrono::steady_clock::now() > kDeadline) {
+        return false;
       }
+      std::this_thread::yield();
     }
+    return true;
   }
 
   /// Creates a function that catches exceptions for the gripper command function and returns a
@@ -209,8 +295,7 @@ class GripperActionServer : public rclcpp::Node {
   void publishGripperWidthFeedback(
       const std::shared_ptr<rclcpp_action::ServerGoalHandle<T>>& goal_handle) {
     auto gripper_feedback = std::make_shared<typename T::Feedback>();
-    std::lock_guard<std::mutex> guard(gripper_state_mutex_);
-    gripper_feedback->current_width = current_gripper_state_.width;
+    gripper_feedback->current_width = state_reader_->latest().width;
     goal_handle->publish_feedback(gripper_feedback);
   }
 
@@ -0,0 +1,63 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <memory>
+#include <string>
+
+#include <franka/gripper.h>
+#include <franka/gripper_state.h>
+
+namespace franka_gripper {
+
+/// Connection to a gripper as used by GripperActionServer. The methods have the semantics of the
+/// franka::Gripper methods of the same name, including the exceptions they throw.
+class GripperConnection {
+ public:
+  virtual ~GripperConnection() = default;
+
+  virtual bool homing() = 0;
+  virtual bool move(double width, double speed) = 0;
+  virtual bool grasp(double width,
+                     double speed,
+                     double force,
+                     double epsilon_inner,
+                     double epsilon_outer) = 0;
+  virtual bool stop() = 0;
+  virtual franka::GripperState readOnce() = 0;
+};
+
+/// Connection to a real gripper through libfranka.
+class LibfrankaGripperConnection : public GripperConnection {
+ public:
+  /// connects to the gripper, throws a franka::Exception if the connection cannot be established
+  /// @param robot_ip IP address or hostname of the robot
+  explicit LibfrankaGripperConnection(const std::string& robot_ip);
+
+  bool homing() override;
+  bool move(double width, double speed) override;
+  bool grasp(double width,
+             double speed,
+             double force,
+             double epsilon_inner,
+             double epsilon_outer) override;
+  bool stop() override;
+  franka::GripperState readOnce() override;
+
+ private:
+  std::unique_ptr<franka::Gripper> gripper_;
+};
+
+}  // namespace franka_gripper
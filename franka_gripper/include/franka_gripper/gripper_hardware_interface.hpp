@@ -0,0 +1,154 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <array>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <future>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include <hardware_interface/hardware_info.hpp>
+#include <hardware_interface/system_interface.hpp>
+#include <hardware_interface/types/hardware_interface_return_values.hpp>
+#include <rclcpp/rclcpp.hpp>
+
+#include "franka_gripper/finger_state_estimator.hpp"
+#include "franka_gripper/goal_executor.hpp"
+#include "franka_gripper/gripper_connection.hpp"
+#include "franka_gripper/gripper_state_reader.hpp"
+
+namespace franka_gripper {
+
+/**
+ * ros2_control system for the Franka Hand, an alternative to the GripperActionServer.
+ *
+ * Exports the position, velocity and effort of the two finger joints, estimated by a
+ * FingerStateEstimator from the gripper width, and
+ * under the {arm_id}_gripper prefix the width, max_width, is_grasped and state_age state
+ * interfaces and the width and force command interfaces. A command is sent to the gripper when
+ * the width or force command changes and the width command is not NaN. A force above zero grasps
+ * with that force, otherwise the fingers move to the width. A new command preempts the running
+ * one. The command_active state interface is 1 until the latest command has finished and
+ * command_success tells whether it succeeded.
+ *
+ * read() and write() never wait for the gripper: the state is streamed by a GripperStateReader and
+ * the commands are handed to a dispatcher thread which runs them on a GoalExecutor.
+ */
+class GripperHardwareInterface : public hardware_interface::SystemInterface {
+ public:
+  using CallbackReturn = rclcpp_lifecycle::node_interfaces::LifecycleNodeInterface::CallbackReturn;
+
+  GripperHardwareInterface() = default;
+  GripperHardwareInterface(const GripperHardwareInterface&) = delete;
+  GripperHardwareInterface& operator=(const GripperHardwareInterface&) = delete;
+  GripperHardwareInterface(GripperHardwareInterface&&) = delete;
+  GripperHardwareInterface& operator=(GripperHardwareInterface&&) = delete;
+  ~GripperHardwareInterface() override;
+
+  CallbackReturn on_init(const hardware_interface::HardwareInfo& info) override;
+  std::vector<hardware_interface::StateInterface> export_state_interfaces() override;
+  std::vector<hardware_interface::CommandInterface> export_command_interfaces() override;
+  CallbackReturn on_activate(const rclcpp_lifecycle::State& previous_state) override;
+  CallbackReturn on_deactivate(const rclcpp_lifecycle::State& previous_state) override;
+  hardware_interface::return_type read(const rclcpp::Time& time,
+                                       const rclcpp::Duration& period) override;
+  hardware_interface::return_type write(const rclcpp::Time& time,
+                                        const rclcpp::Duration& period) override;
+
+  static constexpr std::size_t kNumberOfFingers = 2;
+  static constexpr const char* kDefaultArmId = "panda";
+  static constexpr const char* kWidthInterface = "width";
+  static constexpr const char* kForceInterface = "force";
+  static constexpr double kDefaultSpeed = 0.1;           // [m/s]
+  static constexpr double kDefaultGraspEpsilon = 0.005;  // [m]
+
+ private:
+  /// Longest time a changed command can wait for the dispatcher if its notification was missed
+  static constexpr std::chrono::milliseconds kDispatchTimeout{10};
+
+  struct Command {
+    uint64_t id;
+    double width;
+    double force;
+  };
+
+  /// Starts the command dispatcher and the goal executor.
+  void startCommandExecution();
+
+  /// Interrupts the running command and stops the dispatcher and the goal executor.
+  void stopCommandExecution();
+
+  /// Runs on the dispatcher thread, submits each new command to the goal executor.
+  /// @param[in] dispatched_sequence command sequence when the dispatcher was started.
+  void dispatchCommands(uint64_t dispatched_sequence);
+
+  /// @return the latest command written by write(). Never blocks write().
+  Command latestCommand() const;
+
+  /// Runs a command on the worker thread of the goal executor.
+  void runCommand(const Command& command);
+
+  static rclcpp::Logger getLogger();
+
+  std::string prefix_;
+  double speed_ = kDefaultSpeed;
+  double epsilon_inner_ = kDefaultGraspEpsilon;
+  double epsilon_outer_ = kDefaultGraspEpsilon;
+
+  std::future<std::unique_ptr<GripperConnection>> connection_;
+  std::unique_ptr<GripperConnection> gripper_;
+  std::unique_ptr<GripperStateReader> state_reader_;
+  std::unique_ptr<GoalExecutor> goal_executor_;
+  std::unique_ptr<FingerStateEstimator> finger_state_estimator_;
+
+  // Interface values, only accessed by the control loop
+  std::array<double, kNumberOfFingers> hw_positions_{};
+  std::array<double, kNumberOfFingers> hw_velocities_{};
+  std::array<double, kNumberOfFingers> hw_efforts_{};
+  double hw_width_ = 0;
+  double hw_max_width_ = 0;
+  double hw_is_grasped_ = 0;
+  double hw_state_age_ = 0;
+  double hw_command_active_ = 0;
+  double hw_command_success_ = 0;
+  double hw_width_command_ = 0;
+  double hw_force_command_ = 0;
+  // Command sent last and the number of commands sent by write()
+  double sent_width_command_ = 0;
+  double sent_force_command_ = 0;
+  uint64_t sent_commands_ = 0;
+
+  // Sequence lock around the latest command. Odd while write() updates the command.
+  std::atomic<uint64_t> command_sequence_{0};
+  std::atomic<double> command_width_{0};
+  std::atomic<double> command_force_{0};
+  // ID of the newest command that has finished and its outcome
+  std::atomic<uint64_t> finished_command_{0};
+  std::atomic<bool> command_success_{false};
+
+  std::mutex dispatch_mutex_;
+  std::condition_variable dispatch_wakeup_;
+  bool dispatch_shutdown_ = false;  // guarded by dispatch_mutex_
+  std::thread dispatcher_;
+};
+
+}  // namespace franka_gripper
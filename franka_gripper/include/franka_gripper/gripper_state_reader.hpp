@@ -0,0 +1,119 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <functional>
+#include <mutex>
+#include <string>
+#include <thread>
+
+#include <franka/gripper_state.h>
+#include <franka_gripper/gripper_connection.hpp>
+
+namespace franka_gripper {
+
+/**
+ * Streams the gripper state on a dedicated thread, so that the blocking network read never runs
+ * on the threads which publish the state or the action feedback.
+ *
+ * The latest state is kept in a sequence lock. The reader thread never waits for consumers and
+ * any number of threads can fetch the latest state without waiting for the network.
+ */
+class GripperStateReader {
+ public:
+  using Clock = std::chrono::steady_clock;
+
+  /// Read statistics. Rate and latency cover the time since the previous collectStatistics().
+  struct Statistics {
+    uint64_t reads;                         // successful reads since the start
+    uint64_t errors;                        // failed reads since the start
+    double rate;                            // [Hz] successful reads per second
+    std::chrono::nanoseconds mean_latency;  // mean duration of a successful readOnce() call
+    std::chrono::nanoseconds max_latency;   // longest successful readOnce() call
+    std::chrono::nanoseconds age;           // time since the latest state was received
+  };
+
+  /**
+   * Starts the reader thread.
+   * @param[in] gripper connection to read from. Must outlive the reader.
+   * @param[in] initial_state state returned by latest() until the first read succeeded.
+   * @param[in] on_error called on the reader thread with the message of each failed read.
+   */
+  GripperStateReader(GripperConnection* gripper,
+                     const franka::GripperState& initial_state,
+                     std::function<void(const std::string&)> on_error);
+  GripperStateReader(const GripperStateReader&) = delete;
+  GripperStateReader& operator=(const GripperStateReader&) = delete;
+  GripperStateReader(GripperStateReader&&) = delete;
+  GripperStateReader& operator=(GripperStateReader&&) = delete;
+
+  /// Stops the reader thread after the running read returned.
+  ~GripperStateReader();
+
+  /**
+   * Fetches the most recently read state without blocking. Can be called from any thread.
+   * @param[out] receive_time if not null, set to the time at which the state was received.
+   * @return the latest state.
+   */
+  franka::GripperState latest(Clock::time_point* receive_time = nullptr) const;
+
+  /**
+   * Computes the read statistics since the previous call. Must only be called from a single
+   * thread.
+   * @return read rate and latency.
+   */
+  Statistics collectStatistics();
+
+ private:
+  /// Time to wait before reading again after a failed read
+  static constexpr std::chrono::milliseconds kRetryDelay{100};
+
+  void run();
+  void store(const franka::GripperState& state, Clock::time_point receive_time);
+
+  GripperConnection* gripper_;
+  std::function<void(const std::string&)> on_error_;
+
+  // Sequence lock around the fields of the latest state. Odd while the reader thread writes.
+  std::atomic<uint32_t> sequence_{0};
+  std::atomic<double> width_{0.};
+  std::atomic<double> max_width_{0.};
+  std::atomic<bool> is_grasped_{false};
+  std::atomic<uint16_t> temperature_{0};
+  std::atomic<uint64_t> time_ms_{0};
+  std::atomic<Clock::rep> receive_time_{0};
+
+  // Written by the reader thread only.
+  std::atomic<uint64_t> reads_{0};
+  std::atomic<uint64_t> errors_{0};
+  std::atomic<Clock::rep> latency_sum_{0};
+  std::atomic<Clock::rep> max_latency_{0};
+
+  // Only accessed by collectStatistics().
+  uint64_t last_reads_ = 0;
+  Clock::rep last_latency_sum_ = 0;
+  Clock::time_point last_collect_time_;
+
+  std::atomic<bool> stop_{false};
+  std::mutex stop_mutex_;
+  std::condition_variable stop_requested_;
+  std::thread thread_;
+};
+
+}  // namespace franka_gripper
@@ -0,0 +1,64 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <atomic>
+#include <chrono>
+#include <mutex>
+
+#include <franka_gripper/gripper_connection.hpp>
+
+namespace franka_gripper {
+
+/// Gripper connection without a gripper, used to test the GripperActionServer on machines without
+/// a robot. The fingers move with the commanded speed in steps of 1 ms and, like on the real
+/// gripper, readOnce() waits for the next step before returning the state. Nothing is ever held
+/// between the fingers, so a grasp succeeds if the commanded width is within the epsilon of the
+/// width the fingers close to.
+class LoopbackGripperConnection : public GripperConnection {
+ public:
+  /// @param delay time added to each call, like the round trip to a real gripper
+  explicit LoopbackGripperConnection(
+      std::chrono::microseconds delay = std::chrono::microseconds(0));
+
+  bool homing() override;
+  bool move(double width, double speed) override;
+  bool grasp(double width,
+             double speed,
+             double force,
+             double epsilon_inner,
+             double epsilon_outer) override;
+  bool stop() override;
+  franka::GripperState readOnce() override;
+
+  static constexpr double kMaxWidth = 0.08;  // [m]
+
+ private:
+  static constexpr std::chrono::milliseconds kStep{1};
+
+  /// moves the fingers towards the width
+  /// @return false if the motion was stopped
+  bool moveTo(double width, double speed);
+
+  const std::chrono::microseconds delay_;
+  const std::chrono::steady_clock::time_point start_time_;
+  std::mutex state_mutex_;
+  franka::GripperState state_;
+  // Serializes the motions, like the single command channel of the real gripper
+  std::mutex motion_mutex_;
+  std::atomic<bool> stop_requested_{false};
+};
+
+}  // namespace franka_gripper
@@ -25,10 +25,12 @@ from launch_ros.actions import Node
 def generate_launch_description():
     robot_ip_parameter_name = 'robot_ip'
     use_fake_hardware_parameter_name = 'use_fake_hardware'
+    use_loopback_hardware_parameter_name = 'use_loopback_hardware'
     arm_parameter_name = 'arm_id'
     joint_names_parameter_name = 'joint_names'
     robot_ip = LaunchConfiguration(robot_ip_parameter_name)
     use_fake_hardware = LaunchConfiguration(use_fake_hardware_parameter_name)
+    use_loopback_hardware = LaunchConfiguration(use_loopback_hardware_parameter_name)
     arm_id = LaunchConfiguration(arm_parameter_name)
     joint_names = LaunchConfiguration(joint_names_parameter_name)
 
@@ -46,7 +48,12 @@ def generate_launch_description():
         DeclareLaunchArgument(
             use_fake_hardware_parameter_name,
             default_value='false',
-            description='Publish fake gripper joint states without connecting to a real gripper'),
+            description='Run a simulated gripper node instead of connecting to a real gripper'),
+        DeclareLaunchArgument(
+            use_loopback_hardware_parameter_name,
+            default_value='false',
+            description='Run the gripper node against a simulated gripper instead of connecting '
+                        'to a real gripper'),
         DeclareLaunchArgument(
             arm_parameter_name,
             default_value='panda',
@@ -60,7 +67,8 @@ def generate_launch_description():
             package='franka_gripper',
             executable='franka_gripper_node',
             name=[arm_id, '_gripper'],
-            parameters=[{'robot_ip': robot_ip, 'joint_names': joint_names}, gripper_config],
+            parameters=[{'robot_ip': robot_ip, 'joint_names': joint_names,
+                         'loopback': use_loopback_hardware}, gripper_config],
             condition=UnlessCondition(use_fake_hardware)
         ),
         Node(
@@ -13,40 +13,242 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import threading
+import time
+
+from control_msgs.action import GripperCommand
+from franka_gripper.simulated_gripper import SimulatedGripper
+from franka_msgs.action import Grasp, Homing, Move
 import rclpy
+from rclpy.action import ActionServer, CancelResponse
+from rclpy.callback_groups import ReentrantCallbackGroup
+from rclpy.executors import MultiThreadedExecutor
 from rclpy.node import Node
-
 from sensor_msgs.msg import JointState
+from std_srvs.srv import Trigger
+
+# Time for a goal to become canceling after its cancel request was accepted
+CANCEL_TRANSITION_TIMEOUT = 1.  # [s]
+# Period in which a preempting goal repeats the stop until the preempted goal has finished
+PREEMPT_STOP_PERIOD = 0.01  # [s]
+SAME_POSITION_THRESHOLD = 1e-4  # [m]
 
 
 class FakeGripperStatePublisher(Node):
+    """
+    Simulated gripper with the action and service interfaces of the franka_gripper_node.
+
+    A new goal stops and aborts the active goal, as with the ``preempt`` goal policy of the
+    franka_gripper_node.
+    """
 
     def __init__(self):
         super().__init__('fake_gripper_state_publisher')
-        self.publisher_ = self.create_publisher(JointState, '~/joint_states', 1)
-        timer_period = 0.1  # seconds
         self.declare_parameter('joint_names')
+        self.declare_parameter('state_publish_rate', 30)
+        self.declare_parameter('feedback_publish_rate', 10)
+        self.declare_parameter('default_speed', 0.1)
+        self.declare_parameter('default_grasp_epsilon.inner', 0.005)
+        self.declare_parameter('default_grasp_epsilon.outer', 0.005)
+        self.declare_parameter('time_scale', 1.)
+        self.declare_parameter('simulated_object_width', 0.)
         self.joint_names = self.get_parameter(
             'joint_names').get_parameter_value().string_array_value
         assert len(self.joint_names) == 2
-        self.timer = self.create_timer(timer_period, self.publish_state)
+        self.default_speed = self.get_parameter('default_speed').value
+        self.default_epsilon_inner = self.get_parameter('default_grasp_epsilon.inner').value
+        self.default_epsilon_outer = self.get_parameter('default_grasp_epsilon.outer').value
+
+        self.gripper = SimulatedGripper(
+            object_width=self.get_parameter('simulated_object_width').value,
+            time_scale=self.get_parameter('time_scale').value)
+        # Guards the active goal and the feedback of the running goal
+        self._lock = threading.Lock()
+        # Held by the goal whose command runs on the gripper
+        self._execution_lock = threading.Lock()
+        self._active_goal = None
+        self._publish_feedback = None
+        # Active goals that the cancel callback stopped
+        self._canceled_goals = set()
+
+        callback_group = ReentrantCallbackGroup()
+        self._action_servers = [
+            self._create_action_server(Homing, '~/homing', self._execute_homing, callback_group),
+            self._create_action_server(Move, '~/move', self._execute_move, callback_group),
+            self._create_action_server(Grasp, '~/grasp', self._execute_grasp, callback_group),
+            self._create_action_server(GripperCommand, '~/gripper_action',
+                                       self._execute_gripper_command, callback_group),
+        ]
+        self.stop_service = self.create_service(Trigger, '~/stop', self._stop_service_callback,
+                                                callback_group=callback_group)
+        self.publisher_ = self.create_publisher(JointState, '~/joint_states', 1)
+        self.timer = self.create_timer(
+            1. / self.get_parameter('state_publish_rate').value, self.publish_state)
+        self.feedback_timer = self.create_timer(
+            1. / self.get_parameter('feedback_publish_rate').value, self._publish_goal_feedback)
 
     def publish_state(self):
+        state = self.gripper.read_once()
         joint_states = JointState()
         joint_states.header.stamp = self.get_clock().now().to_msg()
         joint_states.name = self.joint_names
-        joint_states.position = [0.035, 0.035]
+        joint_states.position = [state.width / 2, state.width / 2]
         joint_states.velocity = [0., 0.]
         joint_states.effort = [0., 0.]
         self.publisher_.publish(joint_states)
 
+    def _create_action_server(self, action_type, name, execute_callback, callback_group):
+        return ActionServer(self, action_type, name, execute_callback,
+                            cancel_callback=self._cancel_callback,
+                            callback_group=callback_group)
+
+    def _cancel_callback(self, goal_handle):
+        with self._lock:
+            if self._active_goal is goal_handle:
+                self._canceled_goals.add(goal_handle)
+                self.gripper.stop()
+        return CancelResponse.ACCEPT
+
+    def _execute_homing(self, goal_handle):
+        return self._execute_franka_command(goal_handle, Homing, 'homing', self.gripper.homing)
+
+    def _execute_move(self, goal_handle):
+        goal = goal_handle.request
+        return self._execute_franka_command(goal_handle, Move, 'move',
+                                            lambda: self.gripper.move(goal.width, goal.speed))
+
+    def _execute_grasp(self, goal_handle):
+        goal = goal_handle.request
+        return self._execute_franka_command(
+            goal_handle, Grasp, 'grasp',
+            lambda: self.gripper.grasp(goal.width, goal.speed, goal.force,
+                                       goal.epsilon.inner, goal.epsilon.outer))
+
+    def _execute_franka_command(self, goal_handle, action_type, task_name, command):
+        result = action_type.Result()
+
+        def run():
+            try:
+                result.success = command()
+            except ValueError as error:
+                result.success = False
+                result.error = str(error)
+                self.get_logger().error(result.error)
+            return result.success
+
+        def publish_feedback():
+            feedback = action_type.Feedback()
+            feedback.current_width = self.gripper.read_once().width
+            goal_handle.publish_feedback(feedback)
+
+        return self._execute(goal_handle, task_name, run, publish_feedback, result)
+
+    def _execute_gripper_command(self, goal_handle):
+        command = goal_handle.request.command
+        target_width = 2 * command.position
+        result = GripperCommand.Result()
+
+        def run():
+            state = self.gripper.read_once()
+            if target_width > state.max_width or target_width < 0:
+                self.get_logger().error(
+                    'GripperServer: Commanding out of range width! max_width = {} command = {}'
+                    .format(state.max_width, target_width))
+                result.reached_goal = False
+            elif abs(target_width - state.width) < SAME_POSITION_THRESHOLD:
+                result.reached_goal = True
+            elif target_width >= state.width:
+                result.reached_goal = self.gripper.move(target_width, self.default_speed)
+            else:
+                result.reached_goal = self.gripper.grasp(
+                    target_width, self.default_speed, command.max_effort,
+                    self.default_epsilon_inner, self.default_epsilon_outer)
+            result.position = self.gripper.read_once().width
+            return result.reached_goal
+
+        def publish_feedback():
+            feedback = GripperCommand.Feedback()
+            feedback.position = self.gripper.read_once().width
+            goal_handle.publish_feedback(feedback)
+
+        return self._execute(goal_handle, 'gripper_action', run, publish_feedback, result)
+
+    def _execute(self, goal_handle, task_name, run, publish_feedback, result):
+        with self._lock:
+            preempted_goal = self._active_goal
+            self._active_goal = goal_handle
+        if preempted_goal is not None:
+            self.gripper.stop()
+        # The preempted goal can stop just before its motion starts, so the stop is repeated
+        while not self._execution_lock.acquire(timeout=PREEMPT_STOP_PERIOD):
+            self.gripper.stop()
+        try:
+            with self._lock:
+                if self._active_goal is not goal_handle:
+                    self.get_logger().error('Gripper {} preempted'.format(task_name))
+                    goal_handle.abort()
+                    return result
+                self._publish_feedback = publish_feedback
+            if goal_handle.is_cancel_requested:
+                goal_handle.canceled()
+                return result
+            self.get_logger().info('Gripper {}...'.format(task_name))
+            publish_feedback()
+            success = run()
+            with self._lock:
+                self._publish_feedback = None
+                preempted = self._active_goal is not goal_handle
+                if not preempted:
+                    self._active_goal = None
+                else:
+                    self._canceled_goals.discard(goal_handle)
+            if not success and not preempted and self._wait_until_canceling(goal_handle):
+                self.get_logger().info('Gripper {} canceled'.format(task_name))
+                goal_handle.canceled()
+            elif success:
+                self.get_logger().info('Gripper {} succeeded'.format(task_name))
+                goal_handle.succeed()
+            else:
+                self.get_logger().error('Gripper {} failed'.format(task_name))
+                goal_handle.abort()
+            return result
+        finally:
+            self._execution_lock.release()
+
+    def _wait_until_canceling(self, goal_handle):
+        # The cancel callback stops the gripper before the goal becomes canceling
+        with self._lock:
+            if goal_handle not in self._canceled_goals:
+                return False
+            self._canceled_goals.discard(goal_handle)
+        deadline = time.monotonic() + CANCEL_TRANSITION_TIMEOUT
+        while not goal_handle.is_cancel_requested:
+            if time.monotonic() > deadline:
+                self.get_logger().error('Goal did not become canceling, aborting it')
+                return False
+            time.sleep(PREEMPT_STOP_PERIOD)
+        return True
+
+    def _publish_goal_feedback(self):
+        with self._lock:
+            publish_feedback = self._publish_feedback
+        if publish_feedback is not None:
+            publish_feedback()
+
+    def _stop_service_callback(self, request, response):
+        self.get_logger().info('Stopping gripper_...')
+        response.success = self.gripper.stop()
+        if response.success:
+            self.get_logger().info('Gripper stopped')
+        return response
+
 
 def main(args=None):
     rclpy.init(args=args)
 
     state_publisher = FakeGripperStatePublisher()
 
-    rclpy.spin(state_publisher)
+    rclpy.spin(state_publisher, executor=MultiThreadedExecutor())
     state_publisher.destroy_node()
     rclpy.shutdown()
 
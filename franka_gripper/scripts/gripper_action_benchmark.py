@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+#  Copyright (c) 2023 Franka Emika GmbH
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Measures the goal latencies and the throughput of the gripper action servers.
+
+Each worker sends goals to the move, grasp or gripper_action server one after another and records
+the time until the goal is accepted, until the first feedback and until the result arrives. A
+fraction of the goals is canceled after a random delay to measure the cancel latency. With
+``--stand-in`` the benchmark starts the simulated gripper instead of using a running gripper node.
+
+Example::
+
+    ros2 run franka_gripper gripper_action_benchmark.py --stand-in --goals 200 --concurrency 2 \\
+        --cancel-rate 0.1 --output report.json --baseline baseline.json
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from action_msgs.msg import GoalStatus
+from ament_index_python.packages import get_package_prefix
+from control_msgs.action import GripperCommand
+from franka_gripper.benchmark_report import find_regressions, LatencyRecorder, load_json, \
+    write_csv, write_json
+from franka_msgs.action import Grasp, Move
+import rclpy
+from rclpy.action import ActionClient
+from rclpy.executors import MultiThreadedExecutor
+from rclpy.utilities import remove_ros_args
+
+ACTIONS = {'move': Move, 'grasp': Grasp, 'gripper_action': GripperCommand}
+SERVER_TIMEOUT = 10.  # [s]
+OUTCOME_NAMES = {GoalStatus.STATUS_SUCCEEDED: 'succeeded',
+                 GoalStatus.STATUS_ABORTED: 'aborted',
+                 GoalStatus.STATUS_CANCELED: 'canceled'}
+
+
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--gripper', default='/panda_gripper',
+                        help='namespace of the gripper action servers')
+    parser.add_argument('--actions', default='move,grasp,gripper_action',
+                        help='comma separated actions to benchmark one after another')
+    parser.add_argument('--goals', type=int, default=100, help='goals per action')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='workers sending goals at the same time')
+    parser.add_argument('--pattern', choices=['open-close', 'random'], default='open-close',
+                        help='alternate between the widths or draw them uniformly')
+    parser.add_argument('--open-width', type=float, default=0.08, help='[m]')
+    parser.add_argument('--close-width', type=float, default=0.02, help='[m]')
+    parser.add_argument('--speed', type=float, default=0.1, help='[m/s]')
+    parser.add_argument('--force', type=float, default=20., help='[N]')
+    parser.add_argument('--epsilon', type=float, default=0.08,
+                        help='inner and outer grasp epsilon in m')
+    parser.add_argument('--cancel-rate', type=float, default=0.,
+                        help='fraction of the goals to cancel')
+    parser.add_argument('--cancel-delay', type=float, default=0.05,
+                        help='maximum delay in s between accepting and canceling a goal')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='report file, written as CSV if it ends with .csv')
+    parser.add_argument('--baseline', help='JSON report to compare the p90 latencies against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed relative latency increase over the baseline')
+    parser.add_argument('--stand-in', action='store_true',
+                        help='start the simulated gripper and benchmark it')
+    parser.add_argument('--time-scale', type=float, default=1.,
+                        help='simulated seconds per second of the stand-in')
+    parser.add_argument('--object-width', type=float, default=0.,
+                        help='width of the object grasped by the stand-in in m')
+    arguments = parser.parse_args(argv)
+    arguments.actions = arguments.actions.split(',')
+    unknown_actions = set(arguments.actions) - set(ACTIONS)
+    if unknown_actions:
+        parser.error('unknown actions: {}'.format(', '.join(sorted(unknown_actions))))
+    if arguments.goals < 1 or arguments.concurrency < 1:
+        parser.error('--goals and --concurrency must be positive')
+    if not 0. <= arguments.cancel_rate <= 1.:
+        parser.error('--cancel-rate must be within [0, 1]')
+    return arguments
+
+
+def start_stand_in(arguments):
+    executable = os.path.join(get_package_prefix('franka_gripper'), 'lib', 'franka_gripper',
+                              'fake_gripper_state_publisher.py')
+    namespace, _, name = arguments.gripper.rstrip('/').rpartition('/')
+    return subprocess.Popen([
+        executable, '--ros-args',
+        '-r', '__node:={}'.format(name),
+        '-r', '__ns:={}'.format(namespace or '/'),
+        '-p', 'joint_names:=[{0}_finger_joint1,{0}_finger_joint2]'.format(name),
+        '-p', 'time_scale:={}'.format(arguments.time_scale),
+        '-p', 'simulated_object_width:={}'.format(arguments.object_width)])
+
+
+class GoalFactory:
+    """Creates the goals of an action following the goal pattern."""
+
+    def __init__(self, action_type, arguments, random_generator):
+        self._action_type = action_type
+        self._arguments = arguments
+        self._random = random_generator
+        self._lock = threading.Lock()
+        self._count = 0
+
+    def create(self):
+        arguments = self._arguments
+        with self._lock:
+            if arguments.pattern == 'random':
+                width = self._random.uniform(arguments.close_width, arguments.open_width)
+            else:
+                width = arguments.open_width if self._count % 2 else arguments.close_width
+            self._count += 1
+        goal = self._action_type.Goal()
+        if self._action_type is GripperCommand:
+            goal.command.position = width / 2
+            goal.command.max_effort = arguments.force
+            return goal
+        goal.width = width
+        goal.speed = arguments.speed
+        if self._action_type is Grasp:
+            goal.force = arguments.force
+            goal.epsilon.inner = arguments.epsilon
+            goal.epsilon.outer = arguments.epsilon
+        return goal
+
+
+def wait_for(future, timeout):
+    done = threading.Event()
+    future.add_done_callback(lambda _: done.set())
+    return done.wait(timeout)
+
+
+def run_goal(client, goal, recorder, cancel_delay):
+    """Send a goal, cancel it after cancel_delay if it is not None, and record the latencies."""
+    first_feedback = []
+    start = time.perf_counter()
+
+    def on_feedback(_):
+        if not first_feedback:
+            first_feedback.append(time.perf_counter())
+
+    goal_future = client.send_goal_async(goal, feedback_callback=on_feedback)
+    if not wait_for(goal_future, SERVER_TIMEOUT):
+        recorder.add_outcome('rejected')
+        return
+    goal_handle = goal_future.result()
+    recorder.add_latency('accept', time.perf_counter() - start)
+    if not goal_handle.accepted:
+        recorder.add_outcome('rejected')
+        return
+    result_future = goal_handle.get_result_async()
+    cancel_time = None
+    if cancel_delay is not None and not wait_for(result_future, cancel_delay):
+        cancel_time = time.perf_counter()
+        goal_handle.cancel_goal_async()
+    wait_for(result_future, None)
+    end = time.perf_counter()
+    recorder.add_latency('result', end - start)
+    if first_feedback:
+        recorder.add_latency('first_feedback', first_feedback[0] - start)
+    status = result_future.result().status
+    if cancel_time is not None and status == GoalStatus.STATUS_CANCELED:
+        recorder.add_latency('cancel', end - cancel_time)
+    recorder.add_outcome(OUTCOME_NAMES.get(status, 'aborted'))
+
+
+def benchmark_action(node, action_name, arguments, random_generator):
+    action_type = ACTIONS[action_name]
+    server_name = '{}/{}'.format(arguments.gripper, action_name)
+    client = ActionClient(node, action_type, server_name)
+    if not client.wait_for_server(timeout_sec=SERVER_TIMEOUT):
+        raise RuntimeError('{} action server is not available'.format(server_name))
+    goal_factory = GoalFactory(action_type, arguments, random_generator)
+    recorder = LatencyRecorder()
+    # Goals are drawn from a shared counter so that the workers send exactly --goals goals
+    remaining_goals = [arguments.goals]
+    lock = threading.Lock()
+
+    def work():
+        while True:
+            with lock:
+                if remaining_goals[0] == 0:
+                    return
+                remaining_goals[0] -= 1
+                cancel_delay = None
+                if random_generator.random() < arguments.cancel_rate:
+                    cancel_delay = random_generator.uniform(0., arguments.cancel_delay)
+            run_goal(client, goal_factory.create(), recorder, cancel_delay)
+
+    workers = [threading.Thread(target=work) for _ in range(arguments.concurrency)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    summary = recorder.summarize(time.perf_counter() - start)
+    client.destroy()
+    return summary
+
+
+def print_summary(action_name, summary):
+    print('{}: {} goals, {:.1f} goals/s, {}'.format(
+        action_name, summary['goals'], summary['throughput'],
+        ', '.join('{} {}'.format(count, outcome)
+                  for outcome, count in summary['outcomes'].items())))
+    for phase, latency in summary['latency_ms'].items():
+        if latency['count']:
+            print('  {:<15} p50 {:8.3f} ms  p90 {:8.3f} ms  p99 {:8.3f} ms  max {:8.3f} ms'.format(
+                phase, latency['p50'], latency['p90'], latency['p99'], latency['max']))
+
+
+def main(argv=None):
+    arguments = parse_arguments(remove_ros_args(argv or sys.argv)[1:])
+    stand_in = start_stand_in(arguments) if arguments.stand_in else None
+    rclpy.init(args=argv)
+    node = rclpy.create_node('gripper_action_benchmark')
+    executor = MultiThreadedExecutor()
+    executor.add_node(node)
+    spinner = threading.Thread(target=executor.spin, daemon=True)
+    spinner.start()
+    random_generator = random.Random(arguments.seed)
+    report = {'config': {key: value for key, value in vars(arguments).items()
+                         if key not in ('output', 'baseline')},
+              'actions': {}}
+    try:
+        for action_name in arguments.actions:
+            summary = benchmark_action(node, action_name, arguments, random_generator)
+            report['actions'][action_name] = summary
+            print_summary(action_name, summary)
+    finally:
+        executor.shutdown()
+        node.destroy_node()
+        rclpy.shutdown()
+        if stand_in is not None:
+            stand_in.terminate()
+            stand_in.wait()
+
+    if arguments.output:
+        if arguments.output.endswith('.csv'):
+            write_csv(arguments.output, report)
+        else:
+            write_json(arguments.output, report)
+    if arguments.baseline:
+        regressions = find_regressions(report, load_json(arguments.baseline), arguments.tolerance)
+        for action_name, phase, baseline_value, value in regressions:
+            print('Regression: {} {} p90 {:.3f} ms, baseline {:.3f} ms'.format(
+                action_name, phase, value, baseline_value))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
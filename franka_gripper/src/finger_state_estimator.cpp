@@ -0,0 +1,57 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <franka_gripper/finger_state_estimator.hpp>
+
+#include <cmath>
+#include <stdexcept>
+
+namespace franka_gripper {
+
+constexpr double FingerStateEstimator::kDefaultCutoffFrequency;
+
+FingerStateEstimator::FingerStateEstimator(double cutoff_frequency)
+    : cutoff_frequency_(cutoff_frequency) {
+  if (not std::isfinite(cutoff_frequency) or cutoff_frequency < 0) {
+    throw std::invalid_argument("FingerStateEstimator: cutoff frequency must not be negative");
+  }
+}
+
+void FingerStateEstimator::update(const franka::GripperState& state) {
+  const uint64_t kTimeMs = state.time.toMSec();
+  const double kPosition = state.width / 2;
+  if (initialized_ and kTimeMs == previous_time_ms_) {
+    return;
+  }
+  if (not initialized_ or kTimeMs < previous_time_ms_) {
+    initialized_ = true;
+    velocity_ = 0.;
+  } else {
+    const double kPeriod = static_cast<double>(kTimeMs - previous_time_ms_) * 1e-3;
+    const double kRawVelocity = (kPosition - previous_position_) / kPeriod;
+    // Exact discretization of the first order low-pass for the actual sample period
+    const double kAlpha =
+        cutoff_frequency_ > 0 ? 1. - std::exp(-2. * M_PI * cutoff_frequency_ * kPeriod) : 1.;
+    velocity_ += kAlpha * (kRawVelocity - velocity_);
+  }
+  previous_time_ms_ = kTimeMs;
+  previous_position_ = kPosition;
+}
+
+void FingerStateEstimator::reset() {
+  initialized_ = false;
+  velocity_ = 0.;
+}
+
+}  // namespace franka_gripper
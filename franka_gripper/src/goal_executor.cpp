@@ -0,0 +1,253 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <franka_gripper/goal_executor.hpp>
+
+#include <algorithm>
+#include <utility>
+
+namespace franka_gripper {
+
+constexpr std::chrono::milliseconds GoalExecutor::kStopRetryPeriod;
+
+GoalExecutor::GoalExecutor(Policy policy,
+                           std::size_t max_queue_depth,
+                           std::chrono::nanoseconds feedback_period,
+                           std::function<void()> stop_device)
+    : policy_(policy),
+      max_queue_depth_(max_queue_depth),
+      feedback_period_(feedback_period),
+      stop_device_(std::move(stop_device)),
+      worker_([this]() { work(); }),
+      supervisor_([this]() { supervise(); }) {}
+
+GoalExecutor::~GoalExecutor() {
+  std::deque<std::shared_ptr<Entry>> dropped;
+  {
+    std::lock_guard<std::mutex> lock(mutex_);
+    shutdown_ = true;
+    dropped.swap(canceled_);
+    for (const auto& entry : interruptAll(Interruption::kShutdown)) {
+      dropped.push_back(entry);
+    }
+  }
+  worker_wakeup_.notify_one();
+  supervisor_wakeup_.notify_one();
+  // The supervisor keeps stopping the device until the active goal returned.
+  supervisor_.join();
+  worker_.join();
+  const auto kNow = Clock::now();
+  for (const auto& entry : dropped) {
+    finish(entry, {entry->interruption, kNow - entry->submit_time, {}});
+  }
+}
+
+bool GoalExecutor::canAccept() const {
+  std::lock_guard<std::mutex> lock(mutex_);
+  return canAcceptLocked();
+}
+
+bool GoalExecutor::canAcceptLocked() const {
+  return not shutdown_ and (policy_ == Policy::kPreempt or queue_.size() < max_queue_depth_);
+}
+
+bool GoalExecutor::submit(Goal goal) {
+  auto entry = std::make_shared<Entry>();
+  entry->goal = std::move(goal);
+  entry->submit_time = Clock::now();
+  std::deque<std::shared_ptr<Entry>> dropped;
+  {
+    std::lock_guard<std::mutex> lock(mutex_);
+    if (not canAcceptLocked()) {
+      return false;
+    }
+    if (policy_ == Policy::kPreempt) {
+      dropped = interruptAll(Interruption::kPreempted);
+    }
+    queue_.push_back(entry);
+  }
+  worker_wakeup_.notify_one();
+  supervisor_wakeup_.notify_one();
+  const auto kNow = Clock::now();
+  for (const auto& dropped_entry : dropped) {
+    finish(dropped_entry, {Interruption::kPreempted, kNow - dropped_entry->submit_time, {}});
+  }
+  return true;
+}
+
+bool GoalExecutor::cancel(const void* key) {
+  {
+    std::lock_guard<std::mutex> lock(mutex_);
+    if (active_ and active_->goal.key == key) {
+      if (active_->interruption == Interruption::kNone) {
+        active_->interruption = Interruption::kCanceled;
+        stop_requested_ = true;
+      }
+    } else {
+      const auto kPosition = std::find_if(
+          queue_.begin(), queue_.end(),
+          [key](const std::shared_ptr<Entry>& entry) { return entry->goal.key == key; });
+      if (kPosition == queue_.end()) {
+        return false;
+      }
+      (*kPosition)->interruption = Interruption::kCanceled;
+      canceled_.push_back(*kPosition);
+      queue_.erase(kPosition);
+    }
+  }
+  supervisor_wakeup_.notify_one();
+  return true;
+}
+
+GoalExecutor::Statistics GoalExecutor::collectStatistics() {
+  std::lock_guard<std::mutex> lock(statistics_mutex_);
+  const auto kStatistics = statistics_;
+  statistics_.max_queue_latency = {};
+  statistics_.max_execution_latency = {};
+  return kStatistics;
+}
+
+void GoalExecutor::work() {
+  std::unique_lock<std::mutex> lock(mutex_);
+  while (true) {
+    // A pending stop belongs to the previous goal and must be issued before the next one starts
+    worker_wakeup_.wait(
+        lock, [this]() { return shutdown_ or (not stop_requested_ and not queue_.empty()); });
+    if (shutdown_) {
+      return;
+    }
+    auto entry = queue_.front();
+    queue_.pop_front();
+    active_ = entry;
+    goal_started_ = true;
+    lock.unlock();
+    supervisor_wakeup_.notify_one();
+
+    // A goal interrupted up to here is skipped. If it is interrupted while run sends its command,
+    // the stop can reach the device first, so the supervisor repeats it until run returns.
+    lock.lock();
+    const bool kInterrupted = entry->interruption != Interruption::kNone;
+    lock.unlock();
+    const auto kStart = Clock::now();
+    if (not kInterrupted) {
+      entry->goal.run();
+    }
+    const auto kEnd = Clock::now();
+
+    lock.lock();
+    active_.reset();
+    if (shutdown_) {
+      supervisor_wakeup_.notify_one();
+    }
+    const Report kReport{entry->interruption, kStart - entry->submit_time, kEnd - kStart};
+    lock.unlock();
+    finish(entry, kReport);
+    lock.lock();
+  }
+}
+
+void GoalExecutor::supervise() {
+  const auto kWakeup = [this]() {
+    return (shutdown_ and not active_) or stop_requested_ or goal_started_ or not canceled_.empty();
+  };
+  auto next_feedback = Clock::now();
+  auto next_stop = Clock::time_point::max();
+  std::unique_lock<std::mutex> lock(mutex_);
+  while (true) {
+    if (active_) {
+      supervisor_wakeup_.wait_until(lock, std::min(next_feedback, next_stop), kWakeup);
+    } else {
+      supervisor_wakeup_.wait(lock, kWakeup);
+    }
+    if (not active_ or active_->interruption == Interruption::kNone) {
+      next_stop = Clock::time_point::max();
+    } else if (Clock::now() >= next_stop) {
+      stop_requested_ = true;
+    }
+    if (stop_requested_) {
+      lock.unlock();
+      stop_device_();
+      lock.lock();
+      stop_requested_ = false;
+      next_stop = Clock::now() + kStopRetryPeriod;
+      worker_wakeup_.notify_one();
+    }
+    if (shutdown_ and not active_) {
+      return;
+    }
+
+    std::deque<std::shared_ptr<Entry>> canceled;
+    canceled.swap(canceled_);
+    const auto kActive = active_;
+    const auto kNow = Clock::now();
+    const bool kFeedbackDue = kActive and (goal_started_ or kNow >= next_feedback);
+    if (kFeedbackDue) {
+      next_feedback = kNow + feedback_period_;
+    }
+    goal_started_ = false;
+    lock.unlock();
+
+    for (const auto& entry : canceled) {
+      finish(entry, {Interruption::kCanceled, kNow - entry->submit_time, {}});
+    }
+    if (kFeedbackDue) {
+      std::lock_guard<std::mutex> completion_lock(kActive->completion_mutex);
+      if (not kActive->finished) {
+        kActive->goal.feedback();
+      }
+    }
+    lock.lock();
+  }
+}
+
+std::deque<std::shared_ptr<GoalExecutor::Entry>> GoalExecutor::interruptAll(
+    Interruption interruption) {
+  std::deque<std::shared_ptr<Entry>> dropped;
+  dropped.swap(queue_);
+  for (const auto& entry : dropped) {
+    entry->interruption = interruption;
+  }
+  if (active_ and active_->interruption == Interruption::kNone) {
+    active_->interruption = interruption;
+    stop_requested_ = true;
+  }
+  return dropped;
+}
+
+void GoalExecutor::finish(const std::shared_ptr<Entry>& entry, const Report& report) {
+  {
+    std::lock_guard<std::mutex> lock(statistics_mutex_);
+    switch (report.interruption) {
+      case Interruption::kNone:
+        statistics_.completed++;
+        break;
+      case Interruption::kPreempted:
+        statistics_.preempted++;
+        break;
+      case Interruption::kCanceled:
+        statistics_.canceled++;
+        break;
+      case Interruption::kShutdown:
+        break;
+    }
+    statistics_.max_queue_latency = std::max(statistics_.max_queue_latency, report.queue_latency);
+    statistics_.max_execution_latency =
+        std::max(statistics_.max_execution_latency, report.execution_latency);
+  }
+  std::lock_guard<std::mutex> lock(entry->completion_mutex);
+  entry->finished = true;
+  entry->goal.finish(report);
+}
+
+}  // namespace franka_gripper
@@ -12,16 +12,17 @@
 // See the License for the specific language governing permissions and
 // limitations under the License.
 
+#include <cmath>
 #include <functional>
-#include <future>
 #include <memory>
 #include <string>
 #include <thread>
 
 #include <franka/exception.h>
-#include <franka/gripper.h>
 #include <franka/gripper_state.h>
 #include <control_msgs/action/gripper_command.hpp>
+#include <diagnostic_msgs/msg/diagnostic_status.hpp>
+#include <diagnostic_msgs/msg/key_value.hpp>
 #include <rclcpp/rclcpp.hpp>
 #include <rclcpp_action/rclcpp_action.hpp>
 #include <rclcpp_components/register_node_macro.hpp>
@@ -29,19 +30,41 @@
 #include <std_srvs/srv/trigger.hpp>
 
 #include <franka_gripper/gripper_action_server.hpp>
+#include <franka_gripper/loopback_gripper_connection.hpp>
 
 namespace franka_gripper {
+
+namespace {
+diagnostic_msgs::msg::KeyValue keyValue(const std::string& key, const std::string& value) {
+  diagnostic_msgs::msg::KeyValue key_value;
+  key_value.key = key;
+  key_value.value = value;
+  return key_value;
+}
+
+std::string toMicroseconds(std::chrono::nanoseconds duration) {
+  return std::to_string(std::chrono::duration<double, std::micro>(duration).count());
+}
+}  // namespace
+
 GripperActionServer::GripperActionServer(const rclcpp::NodeOptions& options)
     : Node("franka_gripper_node", options) {
     this->declare_parameter<std::string>("robot_ip");
+  this->declare_parameter("loopback", false);
+  this->declare_parameter("loopback_delay_us", 0);
   this->declare_parameter("default_grasp_epsilon.inner", k_default_grasp_epsilon);
   this->declare_parameter("default_grasp_epsilon.outer", k_default_grasp_epsilon);
   this->declare_parameter("default_speed", k_default_speed);
   this->declare_parameter<std::vector<std::string>>("joint_names");
   this->declare_parameter("state_publish_rate", k_default_state_publish_rate);
   this->declare_parameter("feedback_publish_rate", k_default_feedback_publish_rate);
+  this->declare_parameter("diagnostics_publish_rate", k_default_diagnostics_publish_rate);
+  this->declare_parameter<std::string>("goal_policy", "preempt");
+  this->declare_parameter("goal_queue_depth", k_default_goal_queue_depth);
+  this->declare_parameter("velocity_filter_cutoff", FingerStateEstimator::kDefaultCutoffFrequency);
+  const bool kLoopback = this->get_parameter("loopback").as_bool();
   std::string robot_ip;
-  if (not this->get_parameter<std::string>("robot_ip", robot_ip)) {
+  if (not kLoopback and not this->get_parameter<std::string>("robot_ip", robot_ip)) {
     RCLCPP_FATAL(this->get_logger(), "Parameter 'robot_ip' not set");
     throw std::invalid_argument("Parameter 'robot_ip' not set");
   }
@@ -65,17 +88,48 @@ GripperActionServer::GripperActionServer(const rclcpp::NodeOptions& options)
       static_cast<double>(this->get_parameter("state_publish_rate").as_int());
   const double kFeedbackPublishRate =
       static_cast<double>(this->get_parameter("feedback_publish_rate").as_int());
-  this->future_wait_timeout_ = rclcpp::WallRate(kFeedbackPublishRate).period();
+  const double kDiagnosticsPublishRate =
+      this->get_parameter("diagnostics_publish_rate").as_double();
 
-  RCLCPP_INFO(this->get_logger(), "Trying to establish a connection with the gripper");
-  try {
-    this->gripper_ = std::make_unique<franka::Gripper>(robot_ip);
-  } catch (const franka::Exception& exception) {
-    RCLCPP_FATAL(this->get_logger(), exception.what());
-    throw exception;
+  const auto kGoalPolicy = this->get_parameter("goal_policy").as_string();
+  GoalExecutor::Policy goal_policy = GoalExecutor::Policy::kPreempt;
+  if (kGoalPolicy == "queue") {
+    goal_policy = GoalExecutor::Policy::kQueue;
+  } else if (kGoalPolicy != "preempt") {
+    RCLCPP_FATAL(this->get_logger(),
+                 "Parameter 'goal_policy' must be 'preempt' or 'queue', got '%s' instead",
+                 kGoalPolicy.c_str());
+    throw std::invalid_argument("Parameter 'goal_policy' has an invalid value");
+  }
+  const auto kGoalQueueDepth = this->get_parameter("goal_queue_depth").as_int();
+  if (kGoalQueueDepth < 1) {
+    RCLCPP_FATAL(this->get_logger(), "Parameter 'goal_queue_depth' must be at least 1, got %ld",
+                 kGoalQueueDepth);
+    throw std::invalid_argument("Parameter 'goal_queue_depth' has an invalid value");
+  }
+  const double kVelocityFilterCutoff = this->get_parameter("velocity_filter_cutoff").as_double();
+  if (not std::isfinite(kVelocityFilterCutoff) or kVelocityFilterCutoff < 0) {
+    RCLCPP_FATAL(this->get_logger(),
+                 "Parameter 'velocity_filter_cutoff' must not be negative, got %f",
+                 kVelocityFilterCutoff);
+    throw std::invalid_argument("Parameter 'velocity_filter_cutoff' has an invalid value");
+  }
+  this->finger_state_estimator_ = std::make_unique<FingerStateEstimator>(kVelocityFilterCutoff);
+  this->goal_executor_ = std::make_unique<GoalExecutor>(
+      goal_policy, static_cast<std::size_t>(kGoalQueueDepth),
+      rclcpp::WallRate(kFeedbackPublishRate).period(), [this]() { stopGripper(); });
+
+  std::function<std::unique_ptr<GripperConnection>()> create_connection;
+  if (kLoopback) {
+    const auto kDelay =
+        std::chrono::microseconds(this->get_parameter("loopback_delay_us").as_int());
+    RCLCPP_INFO(this->get_logger(), "Using loopback gripper, delay %ld us", kDelay.count());
+    create_connection = [kDelay]() { return std::make_unique<LoopbackGripperConnection>(kDelay); };
+  } else {
+    create_connection = [robot_ip]() {
+      return std::make_unique<LibfrankaGripperConnection>(robot_ip);
+    };
   }
-  RCLCPP_INFO(this->get_logger(), "Connected to gripper");
-  current_gripper_state_ = gripper_->readOnce();
   const auto kHomingTask = Task::kHoming;
   this->stop_service_ =  // NOLINTNEXTLINE
       create_service<Trigger>("~/stop",
@@ -86,60 +140,110 @@ GripperActionServer::GripperActionServer(const rclcpp::NodeOptions& options)
 
   this->homing_server_ = rclcpp_action::create_server<Homing>(
       this, "~/homing", [this](auto /*uuid*/, auto /*goal*/) { return handleGoal(kHomingTask); },
-      [this](const auto& /*goal_handle*/) { return handleCancel(kHomingTask); },
-      [this](const auto& goal_handle) {
-        return std::thread{[goal_handle, this]() { executeHoming(goal_handle); }}.detach();
-      });
+      [this](const auto& goal_handle) { return handleCancel(kHomingTask, goal_handle.get()); },
+      [this](const auto& goal_handle) { executeHoming(goal_handle); });
   const auto kMoveTask = Task::kMove;
   this->move_server_ = rclcpp_action::create_server<Move>(
       this, "~/move", [this](auto /*uuid*/, auto /*goal*/) { return handleGoal(kMoveTask); },
-      [this](const auto& /*goal_handle*/) { return handleCancel(kMoveTask); },
-      [this](const auto& goal_handle) {
-        return std::thread{[goal_handle, this]() { executeMove(goal_handle); }}.detach();
-      });
+      [this](const auto& goal_handle) { return handleCancel(kMoveTask, goal_handle.get()); },
+      [this](const auto& goal_handle) { executeMove(goal_handle); });
 
   const auto kGraspTask = Task::kGrasp;
   this->grasp_server_ = rclcpp_action::create_server<Grasp>(
       this, "~/grasp", [this](auto /*uuid*/, auto /*goal*/) { return handleGoal(kGraspTask); },
-      [this](const auto& /*goal_handle*/) { return handleCancel(kGraspTask); },
-      [this](const auto& goal_handle) {
-        return std::thread{[goal_handle, this]() { executeGrasp(goal_handle); }}.detach();
-      });
+      [this](const auto& goal_handle) { return handleCancel(kGraspTask, goal_handle.get()); },
+      [this](const auto& goal_handle) { executeGrasp(goal_handle); });
 
   const auto kGripperCommandTask = Task::kGripperCommand;
   this->gripper_command_server_ = rclcpp_action::create_server<GripperCommand>(
       this, "~/gripper_action",
       [this](auto /*uuid*/, auto /*goal*/) { return handleGoal(kGripperCommandTask); },
-      [this](const auto& /*goal_handle*/) { return handleCancel(kGripperCommandTask); },
       [this](const auto& goal_handle) {
-        return std::thread{[goal_handle, this]() { onExecuteGripperCommand(goal_handle); }}
-            .detach();
-      });
+        return handleCancel(kGripperCommandTask, goal_handle.get());
+      },
+      [this](const auto& goal_handle) { onExecuteGripperCommand(goal_handle); });
 
   this->joint_states_publisher_ =
       this->create_publisher<sensor_msgs::msg::JointState>("~/joint_states", 1);
   this->timer_ = this->create_wall_timer(rclcpp::WallRate(kStatePublishRate).period(),
                                          [this]() { return publishGripperState(); });
+  this->diagnostics_publisher_ =
+      this->create_publisher<diagnostic_msgs::msg::DiagnosticArray>("/diagnostics", 1);
+  this->diagnostics_timer_ =
+      this->create_wall_timer(rclcpp::WallRate(kDiagnosticsPublishRate).period(),
+                              [this]() { return publishDiagnostics(); });
+
+  // The connection can take a while. The node is already usable for everything else meanwhile,
+  // goals are rejected until the gripper is connected.
+  RCLCPP_INFO(this->get_logger(), "Trying to establish a connection with the gripper");
+  this->connection_thread_ =
+      std::thread([this, create_connection]() { connect(create_connection); });
+}
+
+GripperActionServer::~GripperActionServer() {
+  connection_thread_.join();
+  goal_executor_.reset();
+}
+
+void GripperActionServer::connect(
+    const std::function<std::unique_ptr<GripperConnection>()>& create_connection) {
+  const auto kStart = std::chrono::steady_clock::now();
+  std::unique_ptr<GripperConnection> gripper;
+  franka::GripperState state;
+  try {
+    gripper = create_connection();
+    state = gripper->readOnce();
+  } catch (const franka::Exception& exception) {
+    RCLCPP_FATAL(this->get_logger(), "Could not connect to gripper: %s", exception.what());
+    return;
+  }
+  gripper_ = std::move(gripper);
+  state_reader_ = std::make_unique<GripperStateReader>(
+      gripper_.get(), state, [this](const std::string& message) {
+        RCLCPP_ERROR_THROTTLE(this->get_logger(), *this->get_clock(), 1000,
+                              "Could not read gripper state: %s", message.c_str());
+      });
+  connected_ = true;
+  RCLCPP_INFO(
+      this->get_logger(), "Connected to gripper in %.1f ms",
+      std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - kStart).count());
 }
 
-rclcpp_action::CancelResponse GripperActionServer::handleCancel(Task task) {
+rclcpp_action::CancelResponse GripperActionServer::handleCancel(Task task, const void* goal) {
   RCLCPP_INFO(this->get_logger(), "Received request to handleCancel %s", getTaskName(task).c_str());
+  goal_executor_->cancel(goal);
   return rclcpp_action::CancelResponse::ACCEPT;
 }
 
 rclcpp_action::GoalResponse GripperActionServer::handleGoal(Task task) {
+  if (not connected_) {
+    RCLCPP_ERROR(this->get_logger(), "Rejected %s request, the gripper is not connected",
+                 getTaskName(task).c_str());
+    rejected_goals_++;
+    return rclcpp_action::GoalResponse::REJECT;
+  }
+  if (not goal_executor_->canAccept()) {
+    RCLCPP_ERROR(this->get_logger(), "Rejected %s request, the goal queue is full",
+                 getTaskName(task).c_str());
+    rejected_goals_++;
+    return rclcpp_action::GoalResponse::REJECT;
+  }
   RCLCPP_INFO(this->get_logger(), "Received %s request", getTaskName(task).c_str());
   return rclcpp_action::GoalResponse::ACCEPT_AND_EXECUTE;
 }
 
 void GripperActionServer::executeHoming(const std::shared_ptr<GoalHandleHoming>& goal_handle) {
-  const auto kCommand = [this]() { return gripper_->homing(); };
+  const auto kCommand = [this]() {
+    finger_state_estimator_->setGraspForce(0.);
+    return gripper_->homing();
+  };
   executeCommand(goal_handle, Task::kHoming, kCommand);
 }
 
 void GripperActionServer::executeMove(const std::shared_ptr<GoalHandleMove>& goal_handle) {
   auto command = [goal_handle, this]() {
     const auto kGoal = goal_handle->get_goal();
+    finger_state_estimator_->setGraspForce(0.);
     return gripper_->move(kGoal->width, kGoal->speed);
   };
   executeCommand(goal_handle, Task::kMove, command);
@@ -148,6 +252,7 @@ void GripperActionServer::executeMove(const std::shared_ptr<GoalHandleMove>& goa
 void GripperActionServer::executeGrasp(const std::shared_ptr<GoalHandleGrasp>& goal_handle) {
   auto command = [goal_handle, this]() {
     const auto kGoal = goal_handle->get_goal();
+    finger_state_estimator_->setGraspForce(kGoal->force);
     return gripper_->grasp(kGoal->width, kGoal->speed, kGoal->force, kGoal->epsilon.inner,
                            kGoal->epsilon.outer);
   };
@@ -159,30 +264,24 @@ void GripperActionServer::onExecuteGripperCommand(
   const auto kGoal = goal_handle->get_goal();
   const double kTargetWidth = 2 * kGoal->command.position;
 
-  std::unique_lock<std::mutex> guard(gripper_state_mutex_);
-  constexpr double kSamePositionThreshold = 1e-4;
-  auto result = std::make_shared<control_msgs::action::GripperCommand::Result>();
-  const double kCurrentWidth = current_gripper_state_.width;
-  if (kTargetWidth > current_gripper_state_.max_width or kTargetWidth < 0) {
-    RCLCPP_ERROR(this->get_logger(),
-                 "GripperServer: Commanding out of range width! max_width = %f command = %f",
-                 current_gripper_state_.max_width, kTargetWidth);
-    goal_handle->abort(result);
-    return;
-  }
-  if (std::abs(kTargetWidth - kCurrentWidth) < kSamePositionThreshold) {
-    result->effort = 0;
-    result->position = kCurrentWidth;
-    result->reached_goal = true;
-    result->stalled = false;
-    goal_handle->succeed(result);
-    return;
-  }
-  guard.unlock();
-  auto command = [kTargetWidth, kCurrentWidth, kGoal, this]() {
-    if (kTargetWidth >= kCurrentWidth) {
+  // The fingers can still move while the goal waits, so the command is chosen once it starts
+  auto command = [kTargetWidth, kGoal, this]() {
+    constexpr double kSamePositionThreshold = 1e-4;
+    const auto kCurrentState = state_reader_->latest();
+    if (kTargetWidth > kCurrentState.max_width or kTargetWidth < 0) {
+      RCLCPP_ERROR(this->get_logger(),
+                   "GripperServer: Commanding out of range width! max_width = %f command = %f",
+                   kCurrentState.max_width, kTargetWidth);
+      return false;
+    }
+    if (std::abs(kTargetWidth - kCurrentState.width) < kSamePositionThreshold) {
+      return true;
+    }
+    if (kTargetWidth >= kCurrentState.width) {
+      finger_state_estimator_->setGraspForce(0.);
       return gripper_->move(kTargetWidth, default_speed_);
     }
+    finger_state_estimator_->setGraspForce(kGoal->command.max_effort);
     return gripper_->grasp(kTargetWidth, default_speed_, kGoal->command.max_effort,
                            default_epsilon_inner_, default_epsilon_outer_);
   };
@@ -194,50 +293,58 @@ void GripperActionServer::executeGripperCommand(
     const std::shared_ptr<GoalHandleGripperCommand>& goal_handle,
     const std::function<bool()>& command_handler) {
   const auto kTaskName = getTaskName(Task::kGripperCommand);
-  RCLCPP_INFO(this->get_logger(), "Gripper %s...", kTaskName.c_str());
+  auto result = std::make_shared<GripperCommand::Result>();
 
-  auto command_execution_thread = [command_handler, this]() {
-    auto result = std::make_shared<GripperCommand::Result>();
+  GoalExecutor::Goal goal;
+  goal.run = [this, kTaskName, result, command_handler]() {
+    RCLCPP_INFO(this->get_logger(), "Gripper %s...", kTaskName.c_str());
     try {
       result->reached_goal = command_handler();
     } catch (const franka::Exception& e) {
       result->reached_goal = false;
       RCLCPP_ERROR(this->get_logger(), e.what());
     }
-    return result;
   };
+  goal.finish = [this, kTaskName, result, goal_handle](const GoalExecutor::Report& report) {
+    const auto kState = state_reader_->latest();
+    result->position = kState.width;
+    result->effort = finger_state_estimator_->graspForce(kState.is_grasped);
+    finishGoal(goal_handle, result, result->reached_goal, kTaskName, report);
+  };
+  goal.feedback = [this, goal_handle]() { publishGripperCommandFeedback(goal_handle); };
+  goal.key = goal_handle.get();
+  submitGoal(std::move(goal), [goal_handle, result]() { goal_handle->abort(result); });
+}
 
-  std::future<std::shared_ptr<typename GripperCommand ::Result>> result_future =
-      std::async(std::launch::async, command_execution_thread);
-
-  while (not resultIsReady(result_future, future_wait_timeout_) and rclcpp::ok()) {
-    if (goal_handle->is_canceling()) {
-      gripper_->stop();
-      auto result = result_future.get();
-      RCLCPP_INFO(get_logger(), "Gripper %s canceled", kTaskName.c_str());
-      goal_handle->canceled(result);
-      return;
-    }
-    publishGripperCommandFeedback(goal_handle);
+void GripperActionServer::submitGoal(GoalExecutor::Goal goal, const std::function<void()>& abort) {
+  if (not goal_executor_->submit(std::move(goal))) {
+    // Another goal was accepted since this one passed handleGoal
+    RCLCPP_ERROR(this->get_logger(), "Aborted goal, the goal queue is full");
+    rejected_goals_++;
+    abort();
   }
-  if (rclcpp::ok()) {
-    const auto kResult = result_future.get();
-    std::lock_guard<std::mutex> guard(gripper_state_mutex_);
-    kResult->position = current_gripper_state_.width;
-    kResult->effort = 0.;
-    if (kResult->reached_goal) {
-      RCLCPP_INFO(get_logger(), "Gripper %s succeeded", kTaskName.c_str());
-      goal_handle->succeed(kResult);
-    } else {
-      RCLCPP_INFO(get_logger(), "Gripper %s failed", kTaskName.c_str());
-      goal_handle->abort(kResult);
-    }
+}
+
+void GripperActionServer::stopGripper() {
+  try {
+    gripper_->stop();
+  } catch (const franka::Exception& e) {
+    RCLCPP_ERROR(this->get_logger(), "Could not stop the gripper: %s", e.what());
   }
 }
 
 void GripperActionServer::stopServiceCallback(const std::shared_ptr<Trigger::Response>& response) {
+  if (not connected_) {
+    response->success = false;
+    response->message = "Gripper is not connected";
+    RCLCPP_ERROR(this->get_logger(), response->message.c_str());
+    return;
+  }
   RCLCPP_INFO(this->get_logger(), "Stopping gripper_...");
-  auto action_result = withResultGenerator<Homing>([this]() { return gripper_->stop(); })();
+  auto action_result = withResultGenerator<Homing>([this]() {
+    finger_state_estimator_->setGraspForce(0.);
+    return gripper_->stop();
+  })();
   response->success = action_result->success;
   response->message = action_result->error;
   if (response->success) {
@@ -251,31 +358,91 @@ void GripperActionServer::stopServiceCallback(const std::shared_ptr<Trigger::Res
 }
 
 void GripperActionServer::publishGripperState() {
-  std::lock_guard<std::mutex> lock(gripper_state_mutex_);
-  try {
-    current_gripper_state_ = gripper_->readOnce();
-  } catch (const franka::Exception& e) {
-    RCLCPP_ERROR(this->get_logger(), e.what());
+  if (not connected_) {
+    return;
   }
+  const auto kState = state_reader_->latest();
+  // Estimated once here, so that subscribers need not differentiate the positions themselves
+  finger_state_estimator_->update(kState);
+  const double kVelocity = finger_state_estimator_->velocity();
+  const double kEffort = finger_state_estimator_->effort(kState.is_grasped);
   sensor_msgs::msg::JointState joint_states;
   joint_states.header.stamp = this->now();
   joint_states.name.push_back(this->joint_names_[0]);
   joint_states.name.push_back(this->joint_names_[1]);
-  joint_states.position.push_back(current_gripper_state_.width / 2);
-  joint_states.position.push_back(current_gripper_state_.width / 2);
-  joint_states.velocity.push_back(0.0);
-  joint_states.velocity.push_back(0.0);
-  joint_states.effort.push_back(0.0);
-  joint_states.effort.push_back(0.0);
+  joint_states.position.push_back(kState.width / 2);
+  joint_states.position.push_back(kState.width / 2);
+  joint_states.velocity.push_back(kVelocity);
+  joint_states.velocity.push_back(kVelocity);
+  joint_states.effort.push_back(kEffort);
+  joint_states.effort.push_back(kEffort);
   joint_states_publisher_->publish(joint_states);
 }
 
+void GripperActionServer::publishDiagnostics() {
+  diagnostic_msgs::msg::DiagnosticStatus status;
+  status.name = "franka_gripper: state stream";
+  status.hardware_id = "franka_gripper";
+  if (not connected_) {
+    status.level = diagnostic_msgs::msg::DiagnosticStatus::STALE;
+    status.message = "Gripper not connected";
+  } else {
+    const auto kStatistics = state_reader_->collectStatistics();
+    status.level = diagnostic_msgs::msg::DiagnosticStatus::OK;
+    status.message = "OK";
+    if (kStatistics.errors > last_read_errors_) {
+      status.level = diagnostic_msgs::msg::DiagnosticStatus::WARN;
+      status.message = std::to_string(kStatistics.errors - last_read_errors_) +
+                       " failed reads since last report";
+    } else if (kStatistics.age > k_stale_state_threshold) {
+      status.level = diagnostic_msgs::msg::DiagnosticStatus::WARN;
+      status.message = "No gripper state received for " +
+                       std::to_string(std::chrono::duration<double>(kStatistics.age).count()) +
+                       " s";
+    }
+    last_read_errors_ = kStatistics.errors;
+
+    status.values.push_back(keyValue("reads", std::to_string(kStatistics.reads)));
+    status.values.push_back(keyValue("failed reads", std::to_string(kStatistics.errors)));
+    status.values.push_back(keyValue("state rate [Hz]", std::to_string(kStatistics.rate)));
+    status.values.push_back(
+        keyValue("read latency mean [us]", toMicroseconds(kStatistics.mean_latency)));
+    status.values.push_back(
+        keyValue("read latency max [us]", toMicroseconds(kStatistics.max_latency)));
+    status.values.push_back(keyValue("state age [us]", toMicroseconds(kStatistics.age)));
+  }
+
+  const auto kGoalStatistics = goal_executor_->collectStatistics();
+  diagnostic_msgs::msg::DiagnosticStatus goal_status;
+  goal_status.name = "franka_gripper: goals";
+  goal_status.hardware_id = "franka_gripper";
+  goal_status.level = diagnostic_msgs::msg::DiagnosticStatus::OK;
+  goal_status.message = "OK";
+  goal_status.values.push_back(
+      keyValue("completed goals", std::to_string(kGoalStatistics.completed)));
+  goal_status.values.push_back(
+      keyValue("preempted goals", std::to_string(kGoalStatistics.preempted)));
+  goal_status.values.push_back(
+      keyValue("canceled goals", std::to_string(kGoalStatistics.canceled)));
+  goal_status.values.push_back(keyValue("rejected goals", std::to_string(rejected_goals_.load())));
+  goal_status.values.push_back(
+      keyValue("queue latency max [us]", toMicroseconds(kGoalStatistics.max_queue_latency)));
+  goal_status.values.push_back(keyValue("execution latency max [us]",
+                                        toMicroseconds(kGoalStatistics.max_execution_latency)));
+
+  diagnostic_msgs::msg::DiagnosticArray diagnostics;
+  diagnostics.header.stamp = this->now();
+  diagnostics.status.push_back(status);
+  diagnostics.status.push_back(goal_status);
+  diagnostics_publisher_->publish(diagnostics);
+}
+
 void GripperActionServer::publishGripperCommandFeedback(
     const std::shared_ptr<rclcpp_action::ServerGoalHandle<GripperCommand>>& goal_handle) {
   auto gripper_feedback = std::make_shared<GripperCommand::Feedback>();
-  std::lock_guard<std::mutex> guard(gripper_state_mutex_);
-  gripper_feedback->position = current_gripper_state_.width;
-  gripper_feedback->effort = 0.;
+  const auto kState = state_reader_->latest();
+  gripper_feedback->position = kState.width;
+  gripper_feedback->effort = finger_state_estimator_->graspForce(kState.is_grasped);
   goal_handle->publish_feedback(gripper_feedback);
 }
 }  // namespace franka_gripper
@@ -0,0 +1,46 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <franka_gripper/gripper_connection.hpp>
+
+namespace franka_gripper {
+
+LibfrankaGripperConnection::LibfrankaGripperConnection(const std::string& robot_ip)
+    : gripper_(std::make_unique<franka::Gripper>(robot_ip)) {}
+
+bool LibfrankaGripperConnection::homing() {
+  return gripper_->homing();
+}
+
+bool LibfrankaGripperConnection::move(double width, double speed) {
+  return gripper_->move(width, speed);
+}
+
+bool LibfrankaGripperConnection::grasp(double width,
+                                       double speed,
+                                       double force,
+                                       double epsilon_inner,
+                                       double epsilon_outer) {
+  return gripper_->grasp(width, speed, force, epsilon_inner, epsilon_outer);
+}
+
+bool LibfrankaGripperConnection::stop() {
+  return gripper_->stop();
+}
+
+franka::GripperState LibfrankaGripperConnection::readOnce() {
+  return gripper_->readOnce();
+}
+
+}  // namespace franka_gripper
@@ -0,0 +1,346 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "franka_gripper/gripper_hardware_interface.hpp"
+
+#include <cmath>
+#include <limits>
+#include <stdexcept>
+#include <unordered_map>
+#include <utility>
+
+#include <franka/exception.h>
+#include <hardware_interface/handle.hpp>
+#include <hardware_interface/types/hardware_interface_type_values.hpp>
+
+#include "franka_gripper/loopback_gripper_connection.hpp"
+
+namespace franka_gripper {
+
+using StateInterface = hardware_interface::StateInterface;
+using CommandInterface = hardware_interface::CommandInterface;
+
+constexpr std::size_t GripperHardwareInterface::kNumberOfFingers;
+constexpr double GripperHardwareInterface::kDefaultSpeed;
+constexpr double GripperHardwareInterface::kDefaultGraspEpsilon;
+constexpr std::chrono::milliseconds GripperHardwareInterface::kDispatchTimeout;
+
+namespace {
+/// xacro renders booleans as "True" and "False"
+bool isEnabled(const std::unordered_map<std::string, std::string>& parameters,
+               const std::string& name) {
+  const auto kParameter = parameters.find(name);
+  return kParameter != parameters.end() and
+         (kParameter->second == "true" or kParameter->second == "True");
+}
+
+double getDouble(const std::unordered_map<std::string, std::string>& parameters,
+                 const std::string& name,
+                 double default_value) {
+  const auto kParameter = parameters.find(name);
+  if (kParameter == parameters.end() or kParameter->second.empty()) {
+    return default_value;
+  }
+  return std::stod(kParameter->second);
+}
+}  // namespace
+
+GripperHardwareInterface::~GripperHardwareInterface() {
+  stopCommandExecution();
+  state_reader_.reset();
+}
+
+GripperHardwareInterface::CallbackReturn GripperHardwareInterface::on_init(
+    const hardware_interface::HardwareInfo& info) {
+  if (hardware_interface::SystemInterface::on_init(info) != CallbackReturn::SUCCESS) {
+    return CallbackReturn::ERROR;
+  }
+  if (info_.joints.size() != kNumberOfFingers) {
+    RCLCPP_FATAL(getLogger(), "Got %zu joints. Expected %zu.", info_.joints.size(),
+                 kNumberOfFingers);
+    return CallbackReturn::ERROR;
+  }
+  for (const auto& joint : info_.joints) {
+    if (not joint.command_interfaces.empty()) {
+      RCLCPP_FATAL(getLogger(),
+                   "Joint '%s' has command interfaces. The gripper is commanded through '%s' and "
+                   "'%s' instead.",
+                   joint.name.c_str(), kWidthInterface, kForceInterface);
+      return CallbackReturn::ERROR;
+    }
+  }
+
+  const auto& kParameters = info_.hardware_parameters;
+  const auto kArmId = kParameters.find("arm_id");
+  prefix_ = (kArmId != kParameters.end() ? kArmId->second : kDefaultArmId) + "_gripper";
+  std::chrono::microseconds loopback_delay{0};
+  try {
+    finger_state_estimator_ = std::make_unique<FingerStateEstimator>(getDouble(
+        kParameters, "velocity_filter_cutoff", FingerStateEstimator::kDefaultCutoffFrequency));
+    speed_ = getDouble(kParameters, "default_speed", kDefaultSpeed);
+    epsilon_inner_ = getDouble(kParameters, "default_grasp_epsilon_inner", kDefaultGraspEpsilon);
+    epsilon_outer_ = getDouble(kParameters, "default_grasp_epsilon_outer", kDefaultGraspEpsilon);
+    loopback_delay = std::chrono::microseconds(
+        static_cast<int64_t>(getDouble(kParameters, "loopback_delay_us", 0)));
+  } catch (const std::logic_error& e) {
+    RCLCPP_FATAL(getLogger(), "Invalid parameter value: %s", e.what());
+    return CallbackReturn::ERROR;
+  }
+  if (speed_ <= 0) {
+    RCLCPP_FATAL(getLogger(), "Parameter 'default_speed' must be positive, got %f", speed_);
+    return CallbackReturn::ERROR;
+  }
+
+  // Like the arms, the gripper connects in the background while the rest of the bringup continues.
+  if (isEnabled(kParameters, "loopback")) {
+    RCLCPP_INFO(getLogger(), "Using loopback gripper, delay %ld us", loopback_delay.count());
+    connection_ =
+        std::async(std::launch::async, [loopback_delay]() -> std::unique_ptr<GripperConnection> {
+          return std::make_unique<LoopbackGripperConnection>(loopback_delay);
+        });
+  } else {
+    const auto kRobotIp = kParameters.find("robot_ip");
+    if (kRobotIp == kParameters.end()) {
+      RCLCPP_FATAL(getLogger(), "Parameter 'robot_ip' not set");
+      return CallbackReturn::ERROR;
+    }
+    const auto kIp = kRobotIp->second;
+    RCLCPP_INFO(getLogger(), "Connecting to gripper at \"%s\" ...", kIp.c_str());
+    connection_ = std::async(std::launch::async, [kIp]() -> std::unique_ptr<GripperConnection> {
+      return std::make_unique<LibfrankaGripperConnection>(kIp);
+    });
+  }
+  hw_width_command_ = std::numeric_limits<double>::quiet_NaN();
+  hw_force_command_ = 0;
+  return CallbackReturn::SUCCESS;
+}
+
+std::vector<StateInterface> GripperHardwareInterface::export_state_interfaces() {
+  std::vector<StateInterface> state_interfaces;
+  for (auto i = 0U; i < kNumberOfFingers; i++) {
+    const auto& kJointName = info_.joints[i].name;
+    state_interfaces.emplace_back(
+        StateInterface(kJointName, hardware_interface::HW_IF_POSITION, &hw_positions_.at(i)));
+    state_interfaces.emplace_back(
+        StateInterface(kJointName, hardware_interface::HW_IF_VELOCITY, &hw_velocities_.at(i)));
+    state_interfaces.emplace_back(
+        StateInterface(kJointName, hardware_interface::HW_IF_EFFORT, &hw_efforts_.at(i)));
+  }
+  state_interfaces.emplace_back(StateInterface(prefix_, kWidthInterface, &hw_width_));
+  state_interfaces.emplace_back(StateInterface(prefix_, "max_width", &hw_max_width_));
+  state_interfaces.emplace_back(StateInterface(prefix_, "is_grasped", &hw_is_grasped_));
+  state_interfaces.emplace_back(StateInterface(prefix_, "state_age", &hw_state_age_));
+  state_interfaces.emplace_back(StateInterface(prefix_, "command_active", &hw_command_active_));
+  state_interfaces.emplace_back(StateInterface(prefix_, "command_success", &hw_command_success_));
+  return state_interfaces;
+}
+
+std::vector<CommandInterface> GripperHardwareInterface::export_command_interfaces() {
+  std::vector<CommandInterface> command_interfaces;
+  command_interfaces.emplace_back(CommandInterface(prefix_, kWidthInterface, &hw_width_command_));
+  command_interfaces.emplace_back(CommandInterface(prefix_, kForceInterface, &hw_force_command_));
+  return command_interfaces;
+}
+
+GripperHardwareInterface::CallbackReturn GripperHardwareInterface::on_activate(
+    const rclcpp_lifecycle::State& /*previous_state*/) {
+  if (not gripper_) {
+    if (not connection_.valid()) {
+      RCLCPP_FATAL(getLogger(), "Not initialized");
+      return CallbackReturn::ERROR;
+    }
+    franka::GripperState state;
+    try {
+      gripper_ = connection_.get();
+      state = gripper_->readOnce();
+    } catch (const franka::Exception& e) {
+      RCLCPP_FATAL(getLogger(), "Could not connect to gripper: %s", e.what());
+      gripper_.reset();
+      return CallbackReturn::ERROR;
+    }
+    state_reader_ =
+        std::make_unique<GripperStateReader>(gripper_.get(), state, [](const std::string& message) {
+          RCLCPP_ERROR(getLogger(), "Could not read gripper state: %s", message.c_str());
+        });
+    RCLCPP_INFO(getLogger(), "Connected to gripper");
+  }
+  // Nothing is commanded until a controller writes a width
+  hw_width_command_ = std::numeric_limits<double>::quiet_NaN();
+  hw_force_command_ = 0;
+  sent_width_command_ = hw_width_command_;
+  sent_force_command_ = hw_force_command_;
+  finished_command_ = sent_commands_;
+  finger_state_estimator_->reset();
+  finger_state_estimator_->setGraspForce(0);
+  startCommandExecution();
+  read(rclcpp::Clock().now(), rclcpp::Duration(0, 0));
+  return CallbackReturn::SUCCESS;
+}
+
+GripperHardwareInterface::CallbackReturn GripperHardwareInterface::on_deactivate(
+    const rclcpp_lifecycle::State& /*previous_state*/) {
+  stopCommandExecution();
+  RCLCPP_INFO(getLogger(), "Stopped");
+  return CallbackReturn::SUCCESS;
+}
+
+hardware_interface::return_type GripperHardwareInterface::read(const rclcpp::Time& /*time*/,
+                                                               const rclcpp::Duration& /*period*/) {
+  if (not state_reader_) {
+    return hardware_interface::return_type::OK;
+  }
+  GripperStateReader::Clock::time_point receive_time;
+  const auto kState = state_reader_->latest(&receive_time);
+  finger_state_estimator_->update(kState);
+  hw_positions_.fill(kState.width / 2);
+  hw_velocities_.fill(finger_state_estimator_->velocity());
+  hw_efforts_.fill(finger_state_estimator_->effort(kState.is_grasped));
+  hw_width_ = kState.width;
+  hw_max_width_ = kState.max_width;
+  hw_is_grasped_ = kState.is_grasped ? 1 : 0;
+  hw_state_age_ =
+      std::chrono::duration<double>(GripperStateReader::Clock::now() - receive_time).count();
+  hw_command_active_ = finished_command_.load(std::memory_order_acquire) != sent_commands_ ? 1 : 0;
+  hw_command_success_ = command_success_.load(std::memory_order_relaxed) ? 1 : 0;
+  return hardware_interface::return_type::OK;
+}
+
+hardware_interface::return_type GripperHardwareInterface::write(
+    const rclcpp::Time& /*time*/,
+    const rclcpp::Duration& /*period*/) {
+  if (std::isnan(hw_width_command_) or
+      (hw_width_command_ == sent_width_command_ and hw_force_command_ == sent_force_command_)) {
+    return hardware_interface::return_type::OK;
+  }
+  if (not std::isfinite(hw_width_command_) or not std::isfinite(hw_force_command_)) {
+    return hardware_interface::return_type::ERROR;
+  }
+  sent_width_command_ = hw_width_command_;
+  sent_force_command_ = hw_force_command_;
+  sent_commands_++;
+  // Only this thread writes the command, so the sequence can be updated without a CAS
+  command_sequence_.store(2 * sent_commands_ - 1, std::memory_order_relaxed);
+  std::atomic_thread_fence(std::memory_order_release);
+  command_width_.store(sent_width_command_, std::memory_order_relaxed);
+  command_force_.store(sent_force_command_, std::memory_order_relaxed);
+  command_sequence_.store(2 * sent_commands_, std::memory_order_release);
+  dispatch_wakeup_.notify_one();
+  return hardware_interface::return_type::OK;
+}
+
+void GripperHardwareInterface::startCommandExecution() {
+  goal_executor_ = std::make_unique<GoalExecutor>(
+      GoalExecutor::Policy::kPreempt, 1, std::chrono::seconds(1), [this]() {
+        try {
+          gripper_->stop();
+        } catch (const franka::Exception& e) {
+          RCLCPP_ERROR(getLogger(), "Could not stop the gripper: %s", e.what());
+        }
+      });
+  {
+    std::lock_guard<std::mutex> lock(dispatch_mutex_);
+    dispatch_shutdown_ = false;
+  }
+  // Commands written before the dispatcher runs must not count as dispatched
+  const auto kSequence = command_sequence_.load(std::memory_order_acquire);
+  dispatcher_ = std::thread([this, kSequence]() { dispatchCommands(kSequence); });
+}
+
+void GripperHardwareInterface::stopCommandExecution() {
+  {
+    std::lock_guard<std::mutex> lock(dispatch_mutex_);
+    dispatch_shutdown_ = true;
+  }
+  dispatch_wakeup_.notify_one();
+  if (dispatcher_.joinable()) {
+    dispatcher_.join();
+  }
+  goal_executor_.reset();
+}
+
+void GripperHardwareInterface::dispatchCommands(uint64_t dispatched_sequence) {
+  std::unique_lock<std::mutex> lock(dispatch_mutex_);
+  while (true) {
+    // write() notifies without taking the mutex, so that it never waits for this thread. A
+    // notification that arrives while the predicate is checked is caught up by the timeout.
+    dispatch_wakeup_.wait_for(lock, kDispatchTimeout, [this, dispatched_sequence]() {
+      return dispatch_shutdown_ or
+             command_sequence_.load(std::memory_order_acquire) != dispatched_sequence;
+    });
+    if (dispatch_shutdown_) {
+      return;
+    }
+    const auto kCommand = latestCommand();
+    if (2 * kCommand.id == dispatched_sequence) {
+      continue;
+    }
+    dispatched_sequence = 2 * kCommand.id;
+    lock.unlock();
+    GoalExecutor::Goal goal;
+    goal.run = [this, kCommand]() { runCommand(kCommand); };
+    goal.finish = [this, kCommand](const GoalExecutor::Report& /*report*/) {
+      // Commands that were preempted before they started finish after their successors started
+      auto finished = finished_command_.load(std::memory_order_relaxed);
+      while (finished < kCommand.id and not finished_command_.compare_exchange_weak(
+                                            finished, kCommand.id, std::memory_order_release)) {
+      }
+    };
+    goal.feedback = []() {};
+    goal_executor_->submit(std::move(goal));
+    lock.lock();
+  }
+}
+
+GripperHardwareInterface::Command GripperHardwareInterface::latestCommand() const {
+  while (true) {
+    const auto kSequence = command_sequence_.load(std::memory_order_acquire);
+    if (kSequence % 2 == 1) {
+      std::this_thread::yield();
+      continue;
+    }
+    const Command kCommand{kSequence / 2, command_width_.load(std::memory_order_relaxed),
+                           command_force_.load(std::memory_order_relaxed)};
+    std::atomic_thread_fence(std::memory_order_acquire);
+    if (command_sequence_.load(std::memory_order_relaxed) == kSequence) {
+      return kCommand;
+    }
+  }
+}
+
+void GripperHardwareInterface::runCommand(const Command& command) {
+  bool success = false;
+  try {
+    finger_state_estimator_->setGraspForce(command.force > 0 ? command.force : 0);
+    if (command.force > 0) {
+      success =
+          gripper_->grasp(command.width, speed_, command.force, epsilon_inner_, epsilon_outer_);
+    } else {
+      success = gripper_->move(command.width, speed_);
+    }
+  } catch (const franka::Exception& e) {
+    RCLCPP_ERROR(getLogger(), "Gripper command failed: %s", e.what());
+  }
+  command_success_.store(success, std::memory_order_relaxed);
+}
+
+rclcpp::Logger GripperHardwareInterface::getLogger() {
+  return rclcpp::get_logger("GripperHardwareInterface");
+}
+
+}  // namespace franka_gripper
+
+#include "pluginlib/class_list_macros.hpp"
+// NOLINTNEXTLINE
+PLUGINLIB_EXPORT_CLASS(franka_gripper::GripperHardwareInterface,
+                       hardware_interface::SystemInterface)
@@ -0,0 +1,124 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <franka_gripper/gripper_state_reader.hpp>
+
+#include <utility>
+
+#include <franka/exception.h>
+
+namespace franka_gripper {
+
+constexpr std::chrono::milliseconds GripperStateReader::kRetryDelay;
+
+GripperStateReader::GripperStateReader(GripperConnection* gripper,
+                                       const franka::GripperState& initial_state,
+                                       std::function<void(const std::string&)> on_error)
+    : gripper_(gripper), on_error_(std::move(on_error)), last_collect_time_(Clock::now()) {
+  store(initial_state, last_collect_time_);
+  thread_ = std::thread([this]() { run(); });
+}
+
+GripperStateReader::~GripperStateReader() {
+  {
+    std::lock_guard<std::mutex> lock(stop_mutex_);
+    stop_ = true;
+  }
+  stop_requested_.notify_one();
+  thread_.join();
+}
+
+franka::GripperState GripperStateReader::latest(Clock::time_point* receive_time) const {
+  franka::GripperState state;
+  Clock::rep stamp = 0;
+  uint32_t sequence = 0;
+  do {
+    sequence = sequence_.load(std::memory_order_acquire);
+    state.width = width_.load(std::memory_order_relaxed);
+    state.max_width = max_width_.load(std::memory_order_relaxed);
+    state.is_grasped = is_grasped_.load(std::memory_order_relaxed);
+    state.temperature = temperature_.load(std::memory_order_relaxed);
+    state.time = franka::Duration(time_ms_.load(std::memory_order_relaxed));
+    stamp = receive_time_.load(std::memory_order_relaxed);
+    std::atomic_thread_fence(std::memory_order_acquire);
+  } while ((sequence & 1U) != 0 or sequence != sequence_.load(std::memory_order_relaxed));
+  if (receive_time != nullptr) {
+    *receive_time = Clock::time_point(Clock::duration(stamp));
+  }
+  return state;
+}
+
+GripperStateReader::Statistics GripperStateReader::collectStatistics() {
+  const auto kNow = Clock::now();
+  const uint64_t kReads = reads_.load(std::memory_order_relaxed);
+  const Clock::rep kLatencySum = latency_sum_.load(std::memory_order_relaxed);
+  const uint64_t kNewReads = kReads - last_reads_;
+  const double kElapsed = std::chrono::duration<double>(kNow - last_collect_time_).count();
+
+  Statistics statistics{};
+  statistics.reads = kReads;
+  statistics.errors = errors_.load(std::memory_order_relaxed);
+  statistics.rate = kElapsed > 0. ? static_cast<double>(kNewReads) / kElapsed : 0.;
+  if (kNewReads > 0) {
+    statistics.mean_latency =
+        Clock::duration((kLatencySum - last_latency_sum_) / static_cast<Clock::rep>(kNewReads));
+  }
+  statistics.max_latency = Clock::duration(max_latency_.exchange(0, std::memory_order_relaxed));
+  Clock::time_point receive_time;
+  latest(&receive_time);
+  statistics.age = kNow - receive_time;
+
+  last_reads_ = kReads;
+  last_latency_sum_ = kLatencySum;
+  last_collect_time_ = kNow;
+  return statistics;
+}
+
+void GripperStateReader::run() {
+  while (not stop_) {
+    const auto kStart = Clock::now();
+    try {
+      const auto kState = gripper_->readOnce();
+      const auto kEnd = Clock::now();
+      store(kState, kEnd);
+      const Clock::rep kLatency = (kEnd - kStart).count();
+      latency_sum_.fetch_add(kLatency, std::memory_order_relaxed);
+      if (kLatency > max_latency_.load(std::memory_order_relaxed)) {
+        // Only lowered by collectStatistics(), so a lost update is overwritten by the next read.
+        max_latency_.store(kLatency, std::memory_order_relaxed);
+      }
+      reads_.fetch_add(1, std::memory_order_relaxed);
+    } catch (const franka::Exception& exception) {
+      errors_.fetch_add(1, std::memory_order_relaxed);
+      on_error_(exception.what());
+      std::unique_lock<std::mutex> lock(stop_mutex_);
+      stop_requested_.wait_for(lock, kRetryDelay, [this]() { return stop_.load(); });
+    }
+  }
+}
+
+void GripperStateReader::store(const franka::GripperState& state, Clock::time_point receive_time) {
+  const uint32_t kSequence = sequence_.load(std::memory_order_relaxed);
+  sequence_.store(kSequence + 1, std::memory_order_relaxed);
+  std::atomic_thread_fence(std::memory_order_release);
+  width_.store(state.width, std::memory_order_relaxed);
+  max_width_.store(state.max_width, std::memory_order_relaxed);
+  is_grasped_.store(state.is_grasped, std::memory_order_relaxed);
+  temperature_.store(state.temperature, std::memory_order_relaxed);
+  time_ms_.store(state.time.toMSec(), std::memory_order_relaxed);
+  receive_time_.store(receive_time.time_since_epoch().count(), std::memory_order_relaxed);
+  sequence_.store(kSequence + 2, std::memory_order_release);
+}
+
+}  // namespace franka_gripper
@@ -0,0 +1,113 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <franka_gripper/loopback_gripper_connection.hpp>
+
+#include <algorithm>
+#include <cmath>
+#include <thread>
+
+#include <franka/exception.h>
+
+namespace franka_gripper {
+
+constexpr double LoopbackGripperConnection::kMaxWidth;
+constexpr std::chrono::milliseconds LoopbackGripperConnection::kStep;
+
+LoopbackGripperConnection::LoopbackGripperConnection(std::chrono::microseconds delay)
+    : delay_(delay), start_time_(std::chrono::steady_clock::now()) {
+  state_.width = kMaxWidth;
+  state_.max_width = kMaxWidth;
+  state_.is_grasped = false;
+  state_.temperature = 25;
+}
+
+bool LoopbackGripperConnection::homing() {
+  std::this_thread::sleep_for(delay_);
+  std::lock_guard<std::mutex> lock(motion_mutex_);
+  stop_requested_ = false;
+  return moveTo(0., 0.1) and moveTo(kMaxWidth, 0.1);
+}
+
+bool LoopbackGripperConnection::move(double width, double speed) {
+  std::this_thread::sleep_for(delay_);
+  if (width < 0. or width > kMaxWidth or speed <= 0.) {
+    throw franka::CommandException("libfranka gripper: Move command rejected");
+  }
+  std::lock_guard<std::mutex> lock(motion_mutex_);
+  stop_requested_ = false;
+  return moveTo(width, speed);
+}
+
+bool LoopbackGripperConnection::grasp(double width,
+                                      double speed,
+                                      double /*force*/,
+                                      double epsilon_inner,
+                                      double /*epsilon_outer*/) {
+  std::this_thread::sleep_for(delay_);
+  if (width < 0. or width > kMaxWidth or speed <= 0.) {
+    throw franka::CommandException("libfranka gripper: Grasp command rejected");
+  }
+  std::lock_guard<std::mutex> lock(motion_mutex_);
+  stop_requested_ = false;
+  if (not moveTo(0., speed)) {
+    return false;
+  }
+  const bool kGrasped = width <= epsilon_inner;
+  std::lock_guard<std::mutex> state_lock(state_mutex_);
+  state_.is_grasped = kGrasped;
+  return kGrasped;
+}
+
+bool LoopbackGripperConnection::stop() {
+  std::this_thread::sleep_for(delay_);
+  stop_requested_ = true;
+  std::lock_guard<std::mutex> lock(motion_mutex_);
+  return true;
+}
+
+franka::GripperState LoopbackGripperConnection::readOnce() {
+  std::this_thread::sleep_for(delay_);
+  const auto kNextStep = std::chrono::duration_cast<std::chrono::milliseconds>(
+                             std::chrono::steady_clock::now() - start_time_) +
+                         kStep;
+  std::this_thread::sleep_until(start_time_ + kNextStep);
+  std::lock_guard<std::mutex> lock(state_mutex_);
+  state_.time = franka::Duration(kNextStep.count());
+  return state_;
+}
+
+bool LoopbackGripperConnection::moveTo(double width, double speed) {
+  const double kStepWidth = speed * std::chrono::duration<double>(kStep).count();
+  auto next_step = std::chrono::steady_clock::now();
+  while (true) {
+    if (stop_requested_) {
+      return false;
+    }
+    {
+      std::lock_guard<std::mutex> lock(state_mutex_);
+      state_.is_grasped = false;
+      const double kRemaining = width - state_.width;
+      if (std::abs(kRemaining) <= kStepWidth) {
+        state_.width = width;
+        return true;
+      }
+      state_.width += std::copysign(kStepWidth, kRemaining);
+    }
+    next_step += kStep;
+    std::this_thread::sleep_until(next_step);
+  }
+}
+
+}  // namespace franka_gripper
@@ -0,0 +1,87 @@
+#  Copyright (c) 2023 Franka Emika GmbH
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import csv
+import math
+
+from franka_gripper.benchmark_report import find_regressions, LatencyRecorder, load_json, \
+    percentile, summarize, write_csv, write_json
+import pytest
+
+
+def make_report(result_latencies):
+    recorder = LatencyRecorder()
+    for latency in result_latencies:
+        recorder.add_latency('result', latency)
+        recorder.add_outcome('succeeded')
+    return {'config': {}, 'actions': {'move': recorder.summarize(1.)}}
+
+
+def test_percentile_interpolates():
+    samples = [1., 2., 3., 4., 5.]
+    assert percentile(samples, 0) == 1.
+    assert percentile(samples, 50) == 3.
+    assert percentile(samples, 90) == pytest.approx(4.6)
+    assert percentile(samples, 100) == 5.
+    assert math.isnan(percentile([], 50))
+
+
+def test_summarize_in_milliseconds():
+    summary = summarize([0.003, 0.001, 0.002])
+    assert summary['count'] == 3
+    assert summary['mean'] == pytest.approx(2.)
+    assert summary['max'] == pytest.approx(3.)
+    assert summary['p50'] == pytest.approx(2.)
+
+
+def test_recorder_counts_outcomes():
+    recorder = LatencyRecorder()
+    recorder.add_outcome('succeeded')
+    recorder.add_outcome('canceled')
+    recorder.add_outcome('canceled')
+    summary = recorder.summarize(2.)
+    assert summary['goals'] == 3
+    assert summary['throughput'] == pytest.approx(1.5)
+    assert summary['outcomes']['canceled'] == 2
+    assert summary['latency_ms']['cancel']['count'] == 0
+
+
+def test_json_round_trip(tmp_path):
+    path = str(tmp_path / 'report.json')
+    report = make_report([0.01, 0.02])
+    write_json(path, report)
+    loaded = load_json(path)
+    assert loaded['actions']['move']['latency_ms']['result']['p50'] == pytest.approx(15.)
+    # Phases without samples have no statistics
+    assert loaded['actions']['move']['latency_ms']['cancel']['p50'] is None
+
+
+def test_csv_has_row_per_phase(tmp_path):
+    path = str(tmp_path / 'report.csv')
+    write_csv(path, make_report([0.01]))
+    with open(path) as stream:
+        rows = list(csv.DictReader(stream))
+    assert len(rows) == 4
+    result_row = next(row for row in rows if row['phase'] == 'result')
+    assert result_row['action'] == 'move'
+    assert float(result_row['p90']) == pytest.approx(10.)
+
+
+def test_find_regressions(tmp_path):
+    path = str(tmp_path / 'baseline.json')
+    write_json(path, make_report([0.01] * 10))
+    baseline = load_json(path)
+    assert find_regressions(make_report([0.011] * 10), baseline, tolerance=0.2) == []
+    regressions = find_regressions(make_report([0.02] * 10), baseline, tolerance=0.2)
+    assert [(action, phase) for action, phase, _, _ in regressions] == [('move', 'result')]
@@ -0,0 +1,90 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <cmath>
+#include <stdexcept>
+
+#include <franka/gripper_state.h>
+#include <gtest/gtest.h>
+
+#include <franka_gripper/finger_state_estimator.hpp>
+
+using franka_gripper::FingerStateEstimator;
+
+namespace {
+franka::GripperState gripperState(double width, uint64_t time_ms, bool is_grasped = false) {
+  franka::GripperState state;
+  state.width = width;
+  state.is_grasped = is_grasped;
+  state.time = franka::Duration(time_ms);
+  return state;
+}
+}  // namespace
+
+TEST(FingerStateEstimatorTest, differentiatesFingerPositionWithoutFilter) {
+  FingerStateEstimator estimator(0.);
+  estimator.update(gripperState(0.08, 1000));
+  EXPECT_DOUBLE_EQ(estimator.velocity(), 0.);
+  // The width closes by 2 mm in 10 ms, each finger moves by 1 mm
+  estimator.update(gripperState(0.078, 1010));
+  EXPECT_NEAR(estimator.velocity(), -0.1, 1e-9);
+}
+
+TEST(FingerStateEstimatorTest, converges) {
+  FingerStateEstimator estimator(10.);
+  double width = 0.08;
+  estimator.update(gripperState(width, 0));
+  estimator.update(gripperState(width -= 0.001, 10));
+  const double kFirstVelocity = estimator.velocity();
+  EXPECT_LT(kFirstVelocity, 0.);
+  EXPECT_GT(kFirstVelocity, -0.05);
+  for (uint64_t time_ms = 20; time_ms <= 500; time_ms += 10) {
+    estimator.update(gripperState(width -= 0.001, time_ms));
+  }
+  EXPECT_NEAR(estimator.velocity(), -0.05, 1e-6);
+}
+
+TEST(FingerStateEstimatorTest, ignoresRepeatedState) {
+  FingerStateEstimator estimator(0.);
+  estimator.update(gripperState(0.08, 0));
+  estimator.update(gripperState(0.07, 100));
+  const double kVelocity = estimator.velocity();
+  estimator.update(gripperState(0.07, 100));
+  EXPECT_DOUBLE_EQ(estimator.velocity(), kVelocity);
+}
+
+TEST(FingerStateEstimatorTest, restartsOnOlderState) {
+  FingerStateEstimator estimator(0.);
+  estimator.update(gripperState(0.08, 500));
+  estimator.update(gripperState(0.07, 600));
+  estimator.update(gripperState(0.02, 10));
+  EXPECT_DOUBLE_EQ(estimator.velocity(), 0.);
+  estimator.update(gripperState(0.02, 20));
+  EXPECT_DOUBLE_EQ(estimator.velocity(), 0.);
+}
+
+TEST(FingerStateEstimatorTest, estimatesEffortFromGraspForce) {
+  FingerStateEstimator estimator;
+  estimator.setGraspForce(20.);
+  EXPECT_DOUBLE_EQ(estimator.effort(false), 0.);
+  EXPECT_DOUBLE_EQ(estimator.effort(true), -20.);
+  EXPECT_DOUBLE_EQ(estimator.graspForce(true), 20.);
+  estimator.setGraspForce(0.);
+  EXPECT_DOUBLE_EQ(estimator.effort(true), 0.);
+}
+
+TEST(FingerStateEstimatorTest, rejectsNegativeCutoffFrequency) {
+  EXPECT_THROW(FingerStateEstimator(-1.), std::invalid_argument);
+  EXPECT_THROW(FingerStateEstimator(NAN), std::invalid_argument);
+}
@@ -0,0 +1,341 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstddef>
+#include <future>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <utility>
+#include <vector>
+
+#include <gtest/gtest.h>
+
+#include <franka_gripper/goal_executor.hpp>
+
+using franka_gripper::GoalExecutor;
+using Interruption = GoalExecutor::Interruption;
+
+namespace {
+constexpr std::chrono::milliseconds kFeedbackPeriod{5};
+constexpr std::chrono::seconds kTimeout{5};
+
+/// Device whose commands run until they are stopped or released, records all calls in order. Like
+/// the gripper, it ignores a stop while no command is running.
+class FakeDevice {
+ public:
+  void run(const std::string& name) {
+    std::unique_lock<std::mutex> lock(mutex_);
+    events_.push_back("run " + name);
+    running_ = true;
+    changed_.notify_all();
+    changed_.wait(lock, [this]() { return stopped_ or released_; });
+    stopped_ = false;
+    released_ = false;
+    running_ = false;
+  }
+
+  void stop() {
+    std::lock_guard<std::mutex> lock(mutex_);
+    events_.push_back("stop");
+    stopped_ = running_;
+    changed_.notify_all();
+  }
+
+  /// lets the running command finish on its own
+  void release() {
+    std::lock_guard<std::mutex> lock(mutex_);
+    released_ = true;
+    changed_.notify_all();
+  }
+
+  bool waitUntilRunning() {
+    std::unique_lock<std::mutex> lock(mutex_);
+    return changed_.wait_for(lock, kTimeout, [this]() { return running_; });
+  }
+
+  void record(const std::string& event) {
+    std::lock_guard<std::mutex> lock(mutex_);
+    events_.push_back(event);
+    changed_.notify_all();
+  }
+
+  bool waitForEvents(std::size_t count) {
+    std::unique_lock<std::mutex> lock(mutex_);
+    return changed_.wait_for(lock, kTimeout, [this, count]() { return events_.size() >= count; });
+  }
+
+  std::vector<std::string> events() {
+    std::lock_guard<std::mutex> lock(mutex_);
+    return events_;
+  }
+
+ private:
+  std::mutex mutex_;
+  std::condition_variable changed_;
+  std::vector<std::string> events_;
+  bool running_ = false;
+  bool stopped_ = false;
+  bool released_ = false;
+};
+
+struct TestGoal {
+  std::promise<GoalExecutor::Report> report;
+  std::atomic<int> feedback_count{0};
+  std::atomic<bool> feedback_after_finish{false};
+  std::atomic<bool> finished{false};
+
+  GoalExecutor::Goal make(FakeDevice* device, const std::string& name) {
+    GoalExecutor::Goal goal;
+    goal.run = [device, name]() { device->run(name); };
+    goal.finish = [this, device, name](const GoalExecutor::Report& finished_report) {
+      device->record("finish " + name);
+      finished = true;
+      report.set_value(finished_report);
+    };
+    goal.feedback = [this]() {
+      feedback_count++;
+      if (finished) {
+        feedback_after_finish = true;
+      }
+    };
+    goal.key = this;
+    return goal;
+  }
+
+  GoalExecutor::Report waitForReport() {
+    auto future = report.get_future();
+    EXPECT_EQ(future.wait_for(kTimeout), std::future_status::ready);
+    return future.get();
+  }
+};
+
+std::unique_ptr<GoalExecutor> makeExecutor(
+    GoalExecutor::Policy policy,
+    std::size_t max_queue_depth,
+    FakeDevice* device,
+    std::chrono::nanoseconds feedback_period = kFeedbackPeriod) {
+  return std::make_unique<GoalExecutor>(policy, max_queue_depth, feedback_period,
+                                        [device]() { device->stop(); });
+}
+}  // namespace
+
+TEST(GoalExecutorTest, executesQueuedGoalsInOrder) {
+  FakeDevice device;
+  auto executor = makeExecutor(GoalExecutor::Policy::kQueue, 2, &device);
+  TestGoal first;
+  TestGoal second;
+  ASSERT_TRUE(executor->submit(first.make(&device, "first")));
+  ASSERT_TRUE(device.waitUntilRunning());
+  ASSERT_TRUE(executor->submit(second.make(&device, "second")));
+
+  device.release();
+  EXPECT_EQ(first.waitForReport().interruption, Interruption::kNone);
+  ASSERT_TRUE(device.waitUntilRunning());
+  device.release();
+  const auto kReport = second.waitForReport();
+  EXPECT_EQ(kReport.interruption, Interruption::kNone);
+  EXPECT_GT(kReport.queue_latency.count(), 0);
+  EXPECT_GT(kReport.execution_latency.count(), 0);
+  EXPECT_EQ(device.events(),
+            (std::vector<std::string>{"run first", "finish first", "run second", "finish second"}));
+  EXPECT_EQ(executor->collectStatistics().completed, 2U);
+}
+
+TEST(GoalExecutorTest, rejectsGoalsIfTheQueueIsFull) {
+  FakeDevice device;
+  auto executor = makeExecutor(GoalExecutor::Policy::kQueue, 1, &device);
+  TestGoal active;
+  TestGoal waiting;
+  TestGoal rejected;
+  ASSERT_TRUE(executor->submit(active.make(&device, "active")));
+  ASSERT_TRUE(device.waitUntilRunning());
+  ASSERT_TRUE(executor->submit(waiting.make(&device, "waiting")));
+
+  EXPECT_FALSE(executor->canAccept());
+  EXPECT_FALSE(executor->submit(rejected.make(&device, "rejected")));
+  device.release();
+  active.waitForReport();
+  ASSERT_TRUE(device.waitUntilRunning());
+  device.release();
+  waiting.waitForReport();
+}
+
+TEST(GoalExecutorTest, stopsThePreemptedGoalBeforeStartingTheNext) {
+  FakeDevice device;
+  auto executor = makeExecutor(GoalExecutor::Policy::kPreempt, 1, &device);
+  TestGoal first;
+  TestGoal second;
+  ASSERT_TRUE(executor->submit(first.make(&device, "first")));
+  ASSERT_TRUE(device.waitUntilRunning());
+  ASSERT_TRUE(executor->submit(second.make(&device, "second")));
+
+  EXPECT_EQ(first.waitForReport().interruption, Interruption::kPreempted);
+  ASSERT_TRUE(device.waitUntilRunning());
+  device.release();
+  EXPECT_EQ(second.waitForReport().interruption, Interruption::kNone);
+  EXPECT_EQ(device.events(), (std::vector<std::string>{"run first", "stop", "finish first",
+                                                       "run second", "finish second"}));
+  const auto kStatistics = executor->collectStatistics();
+  EXPECT_EQ(kStatistics.preempted, 1U);
+  EXPECT_EQ(kStatistics.completed, 1U);
+}
+
+TEST(GoalExecutorTest, stopsAPreemptedGoalWhoseCommandStartsAfterTheStop) {
+  FakeDevice device;
+  auto executor = makeExecutor(GoalExecutor::Policy::kPreempt, 1, &device);
+  TestGoal first;
+  TestGoal second;
+  std::promise<void> entered;
+  std::promise<void> proceed;
+  auto goal = first.make(&device, "first");
+  goal.run = [&device, &entered, kProceed = proceed.get_future().share()]() {
+    entered.set_value();
+    kProceed.wait();
+    device.run("first");
+  };
+  ASSERT_TRUE(executor->submit(std::move(goal)));
+  ASSERT_EQ(entered.get_future().wait_for(kTimeout), std::future_status::ready);
+  ASSERT_TRUE(executor->submit(second.make(&device, "second")));
+  // The stop is ignored, as the command of the first goal was not sent yet
+  ASSERT_TRUE(device.waitForEvents(1));
+  proceed.set_value();
+
+  EXPECT_EQ(first.waitForReport().interruption, Interruption::kPreempted);
+  ASSERT_TRUE(device.waitUntilRunning());
+  device.release();
+  EXPECT_EQ(second.waitForReport().interruption, Interruption::kNone);
+  EXPECT_EQ(device.events(), (std::vector<std::string>{"stop", "run first", "stop", "finish first",
+                                                       "run second", "finish second"}));
+}
+
+TEST(GoalExecutorTest, cancelsGoalsRightAfterTheirSubmission) {
+  FakeDevice device;
+  auto executor = makeExecutor(GoalExecutor::Policy::kPreempt, 1, &device);
+  for (int i = 0; i < 20; i++) {
+    TestGoal goal;
+    ASSERT_TRUE(executor->submit(goal.make(&device, "goal")));
+    EXPECT_TRUE(executor->cancel(&goal));
+    EXPECT_EQ(goal.waitForReport().interruption, Interruption::kCanceled);
+  }
+  TestGoal last;
+  ASSERT_TRUE(executor->submit(last.make(&device, "last")));
+  ASSERT_TRUE(device.waitUntilRunning());
+  device.release();
+  EXPECT_EQ(last.waitForReport().interruption, Interruption::kNone);
+  EXPECT_EQ(executor->collectStatistics().canceled, 20U);
+}
+
+TEST(GoalExecutorTest, cancelsTheActiveGoal) {
+  FakeDevice device;
+  auto executor = makeExecutor(GoalExecutor::Policy::kPreempt, 1, &device);
+  TestGoal goal;
+  ASSERT_TRUE(executor->submit(goal.make(&device, "goal")));
+  ASSERT_TRUE(device.waitUntilRunning());
+  EXPECT_TRUE(executor->cancel(&goal));
+
+  EXPECT_EQ(goal.waitForReport().interruption, Interruption::kCanceled);
+  EXPECT_EQ(device.events(), (std::vector<std::string>{"run goal", "stop", "finish goal"}));
+  EXPECT_EQ(executor->collectStatistics().canceled, 1U);
+}
+
+TEST(GoalExecutorTest, cancelsWaitingGoalsWithoutRunningThem) {
+  FakeDevice device;
+  auto executor = makeExecutor(GoalExecutor::Policy::kQueue, 1, &device);
+  TestGoal active;
+  TestGoal waiting;
+  ASSERT_TRUE(executor->submit(active.make(&device, "active")));
+  ASSERT_TRUE(device.waitUntilRunning());
+  ASSERT_TRUE(executor->submit(waiting.make(&device, "waiting")));
+  EXPECT_TRUE(executor->cancel(&waiting));
+
+  const auto kReport = waiting.waitForReport();
+  EXPECT_EQ(kReport.interruption, Interruption::kCanceled);
+  EXPECT_EQ(kReport.execution_latency.count(), 0);
+  EXPECT_TRUE(executor->canAccept());
+  device.release();
+  EXPECT_EQ(active.waitForReport().interruption, Interruption::kNone);
+  EXPECT_EQ(device.events(),
+            (std::vector<std::string>{"run active", "finish waiting", "finish active"}));
+}
+
+TEST(GoalExecutorTest, ignoresCancelRequestsForUnknownGoals) {
+  FakeDevice device;
+  auto executor = makeExecutor(GoalExecutor::Policy::kPreempt, 1, &device);
+  TestGoal goal;
+  EXPECT_FALSE(executor->cancel(&goal));
+  EXPECT_TRUE(device.events().empty());
+}
+
+TEST(GoalExecutorTest, finishesGoalsWithoutWaitingForTheFeedbackPeriod) {
+  FakeDevice device;
+  auto executor =
+      makeExecutor(GoalExecutor::Policy::kPreempt, 1, &device, std::chrono::seconds(10));
+  TestGoal goal;
+  ASSERT_TRUE(executor->submit(goal.make(&device, "goal")));
+  ASSERT_TRUE(device.waitUntilRunning());
+  const auto kStart = std::chrono::steady_clock::now();
+  device.release();
+  goal.waitForReport();
+  EXPECT_LT(std::chrono::steady_clock::now() - kStart, std::chrono::seconds(1));
+
+  TestGoal canceled;
+  ASSERT_TRUE(executor->submit(canceled.make(&device, "canceled")));
+  ASSERT_TRUE(device.waitUntilRunning());
+  // Feedback is published once when the goal starts
+  const auto kDeadline = std::chrono::steady_clock::now() + std::chrono::seconds(1);
+  while (canceled.feedback_count == 0 and std::chrono::steady_clock::now() < kDeadline) {
+    std::this_thread::sleep_for(std::chrono::milliseconds(1));
+  }
+  EXPECT_EQ(canceled.feedback_count, 1);
+  const auto kCancelTime = std::chrono::steady_clock::now();
+  EXPECT_TRUE(executor->cancel(&canceled));
+  EXPECT_EQ(canceled.waitForReport().interruption, Interruption::kCanceled);
+  EXPECT_LT(std::chrono::steady_clock::now() - kCancelTime, std::chrono::seconds(1));
+}
+
+TEST(GoalExecutorTest, publishesFeedbackWhileRunning) {
+  FakeDevice device;
+  auto executor = makeExecutor(GoalExecutor::Policy::kPreempt, 1, &device);
+  TestGoal goal;
+  ASSERT_TRUE(executor->submit(goal.make(&device, "goal")));
+  ASSERT_TRUE(device.waitUntilRunning());
+  std::this_thread::sleep_for(10 * kFeedbackPeriod);
+  device.release();
+  goal.waitForReport();
+  std::this_thread::sleep_for(4 * kFeedbackPeriod);
+
+  EXPECT_GT(goal.feedback_count, 2);
+  EXPECT_FALSE(goal.feedback_after_finish);
+}
+
+TEST(GoalExecutorTest, interruptsAllGoalsOnDestruction) {
+  FakeDevice device;
+  auto executor = makeExecutor(GoalExecutor::Policy::kQueue, 1, &device);
+  TestGoal active;
+  TestGoal waiting;
+  ASSERT_TRUE(executor->submit(active.make(&device, "active")));
+  ASSERT_TRUE(device.waitUntilRunning());
+  ASSERT_TRUE(executor->submit(waiting.make(&device, "waiting")));
+  executor.reset();
+
+  EXPECT_EQ(active.waitForReport().interruption, Interruption::kShutdown);
+  EXPECT_EQ(waiting.waitForReport().interruption, Interruption::kShutdown);
+  EXPECT_EQ(device.events(),
+            (std::vector<std::string>{"run active", "stop", "finish active", "finish waiting"}));
+}
@@ -0,0 +1,167 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <chrono>
+#include <cmath>
+#include <functional>
+#include <limits>
+#include <map>
+#include <string>
+#include <thread>
+
+#include <gtest/gtest.h>
+#include <hardware_interface/hardware_info.hpp>
+
+#include <franka_gripper/gripper_hardware_interface.hpp>
+#include <franka_gripper/loopback_gripper_connection.hpp>
+
+using franka_gripper::GripperHardwareInterface;
+using franka_gripper::LoopbackGripperConnection;
+using CallbackReturn = GripperHardwareInterface::CallbackReturn;
+
+namespace {
+// Generous bounds, the conditions usually hold long before. The loopback gripper publishes its
+// state every millisecond and moves the fingers at 0.1 m/s.
+constexpr std::chrono::seconds kCommandTimeout{10};
+constexpr std::chrono::seconds kStateTimeout{1};
+
+hardware_interface::HardwareInfo gripperInfo() {
+  hardware_interface::HardwareInfo info;
+  info.hardware_parameters["arm_id"] = "panda";
+  info.hardware_parameters["loopback"] = "true";
+  for (const auto& name : {"panda_finger_joint1", "panda_finger_joint2"}) {
+    hardware_interface::ComponentInfo joint;
+    joint.name = name;
+    joint.state_interfaces = {{"position"}, {"velocity"}};
+    info.joints.push_back(joint);
+  }
+  return info;
+}
+
+class GripperHardwareInterfaceTest : public ::testing::Test {
+ protected:
+  void SetUp() override {
+    ASSERT_EQ(gripper_.on_init(gripperInfo()), CallbackReturn::SUCCESS);
+    for (auto& state_interface : gripper_.export_state_interfaces()) {
+      states_.emplace(state_interface.get_name(), state_interface);
+    }
+    for (auto& command_interface : gripper_.export_command_interfaces()) {
+      commands_.emplace(command_interface.get_name(), command_interface);
+    }
+    ASSERT_EQ(gripper_.on_activate(rclcpp_lifecycle::State()), CallbackReturn::SUCCESS);
+  }
+
+  void TearDown() override { gripper_.on_deactivate(rclcpp_lifecycle::State()); }
+
+  /// Runs the control loop at 1 kHz until the condition holds.
+  /// @return false if the condition did not hold within the timeout.
+  bool cycleUntil(const std::function<bool()>& condition,
+                  std::chrono::milliseconds timeout = kCommandTimeout) {
+    const auto kDeadline = std::chrono::steady_clock::now() + timeout;
+    while (std::chrono::steady_clock::now() < kDeadline) {
+      if (gripper_.write(rclcpp::Time(), rclcpp::Duration(0, 0)) !=
+          hardware_interface::return_type::OK) {
+        return false;
+      }
+      std::this_thread::sleep_for(std::chrono::milliseconds(1));
+      gripper_.read(rclcpp::Time(), rclcpp::Duration(0, 0));
+      if (condition()) {
+        return true;
+      }
+    }
+    return false;
+  }
+
+  double state(const std::string& name) { return states_.at(name).get_value(); }
+  void command(const std::string& name, double value) { commands_.at(name).set_value(value); }
+
+  GripperHardwareInterface gripper_;
+  std::map<std::string, hardware_interface::StateInterface> states_;
+  std::map<std::string, hardware_interface::CommandInterface> commands_;
+};
+}  // namespace
+
+TEST_F(GripperHardwareInterfaceTest, exportsFingerAndGripperInterfaces) {
+  EXPECT_EQ(states_.count("panda_finger_joint1/position"), 1U);
+  EXPECT_EQ(states_.count("panda_finger_joint2/velocity"), 1U);
+  EXPECT_EQ(states_.count("panda_gripper/width"), 1U);
+  EXPECT_EQ(states_.count("panda_gripper/command_active"), 1U);
+  EXPECT_EQ(commands_.count("panda_gripper/width"), 1U);
+  EXPECT_EQ(commands_.count("panda_gripper/force"), 1U);
+  EXPECT_DOUBLE_EQ(state("panda_gripper/width"), LoopbackGripperConnection::kMaxWidth);
+  EXPECT_DOUBLE_EQ(state("panda_finger_joint1/position"), LoopbackGripperConnection::kMaxWidth / 2);
+}
+
+TEST_F(GripperHardwareInterfaceTest, sendsNothingWithoutWidthCommand) {
+  EXPECT_FALSE(cycleUntil([]() { return false; }, std::chrono::milliseconds(20)));
+  EXPECT_DOUBLE_EQ(state("panda_gripper/command_active"), 0.);
+  EXPECT_DOUBLE_EQ(state("panda_gripper/width"), LoopbackGripperConnection::kMaxWidth);
+}
+
+TEST_F(GripperHardwareInterfaceTest, movesWithoutBlockingTheLoop) {
+  command("panda_gripper/width", 0.04);
+  ASSERT_EQ(gripper_.write(rclcpp::Time(), rclcpp::Duration(0, 0)),
+            hardware_interface::return_type::OK);
+  gripper_.read(rclcpp::Time(), rclcpp::Duration(0, 0));
+  // The motion takes 400 ms, write() returned long before the fingers arrived
+  EXPECT_DOUBLE_EQ(state("panda_gripper/command_active"), 1.);
+  EXPECT_GT(state("panda_gripper/width"), 0.04);
+
+  // The loop keeps cycling and sees the fingers move while the command runs
+  bool moving = false;
+  ASSERT_TRUE(cycleUntil([this, &moving]() {
+    moving = moving or state("panda_finger_joint1/velocity") < 0;
+    return state("panda_gripper/command_active") == 0.;
+  }));
+  EXPECT_TRUE(moving);
+  EXPECT_DOUBLE_EQ(state("panda_gripper/command_success"), 1.);
+  // The state can lag behind the end of the command by a state period
+  EXPECT_TRUE(cycleUntil([this]() { return std::abs(state("panda_gripper/width") - 0.04) < 1e-9; },
+                         kStateTimeout));
+  EXPECT_NEAR(state("panda_finger_joint2/position"), 0.02, 1e-9);
+}
+
+TEST_F(GripperHardwareInterfaceTest, graspsWithForce) {
+  command("panda_gripper/width", 0.);
+  command("panda_gripper/force", 20.);
+  ASSERT_TRUE(cycleUntil([this]() { return state("panda_gripper/command_active") == 0.; }));
+  EXPECT_DOUBLE_EQ(state("panda_gripper/command_success"), 1.);
+  EXPECT_TRUE(
+      cycleUntil([this]() { return state("panda_gripper/is_grasped") == 1.; }, kStateTimeout));
+  EXPECT_DOUBLE_EQ(state("panda_finger_joint1/effort"), -20.);
+}
+
+TEST_F(GripperHardwareInterfaceTest, newCommandPreemptsRunningCommand) {
+  command("panda_gripper/width", 0.);
+  ASSERT_TRUE(cycleUntil([this]() { return state("panda_gripper/width") < 0.07; }));
+  command("panda_gripper/width", 0.06);
+  ASSERT_TRUE(cycleUntil([this]() { return state("panda_gripper/command_active") == 0.; }));
+  EXPECT_DOUBLE_EQ(state("panda_gripper/command_success"), 1.);
+  EXPECT_TRUE(cycleUntil([this]() { return std::abs(state("panda_gripper/width") - 0.06) < 1e-9; },
+                         kStateTimeout));
+}
+
+TEST_F(GripperHardwareInterfaceTest, rejectsInfiniteCommand) {
+  command("panda_gripper/width", 0.04);
+  command("panda_gripper/force", std::numeric_limits<double>::infinity());
+  EXPECT_EQ(gripper_.write(rclcpp::Time(), rclcpp::Duration(0, 0)),
+            hardware_interface::return_type::ERROR);
+}
+
+TEST(GripperHardwareInterfaceInitTest, rejectsJointCommandInterfaces) {
+  auto info = gripperInfo();
+  info.joints[0].command_interfaces = {{"position"}};
+  GripperHardwareInterface gripper;
+  EXPECT_EQ(gripper.on_init(info), CallbackReturn::ERROR);
+}
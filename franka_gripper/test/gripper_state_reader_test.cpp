@@ -0,0 +1,99 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <atomic>
+#include <chrono>
+#include <string>
+#include <thread>
+
+#include <franka/exception.h>
+#include <gtest/gtest.h>
+
+#include <franka_gripper/gripper_state_reader.hpp>
+#include <franka_gripper/loopback_gripper_connection.hpp>
+
+using franka_gripper::GripperStateReader;
+using franka_gripper::LoopbackGripperConnection;
+
+namespace {
+class FailingGripperConnection : public LoopbackGripperConnection {
+ public:
+  franka::GripperState readOnce() override {
+    throw franka::NetworkException("libfranka gripper: UDP receive: Timeout");
+  }
+};
+
+franka::GripperState initialState(double width) {
+  franka::GripperState state;
+  state.width = width;
+  state.max_width = LoopbackGripperConnection::kMaxWidth;
+  return state;
+}
+}  // namespace
+
+TEST(GripperStateReaderTest, streamsStateContinuously) {
+  LoopbackGripperConnection gripper;
+  GripperStateReader reader(&gripper, initialState(0.), [](const std::string& /*message*/) {});
+  std::this_thread::sleep_for(std::chrono::milliseconds(50));
+
+  const auto kStatistics = reader.collectStatistics();
+  EXPECT_GT(kStatistics.reads, 10U);
+  EXPECT_EQ(kStatistics.errors, 0U);
+  EXPECT_GT(kStatistics.rate, 100.);
+  EXPECT_GT(kStatistics.mean_latency.count(), 0);
+  EXPECT_GE(kStatistics.max_latency, kStatistics.mean_latency);
+  EXPECT_LT(kStatistics.age, std::chrono::milliseconds(20));
+  EXPECT_DOUBLE_EQ(reader.latest().width, LoopbackGripperConnection::kMaxWidth);
+}
+
+TEST(GripperStateReaderTest, followsTheFingers) {
+  LoopbackGripperConnection gripper;
+  GripperStateReader reader(&gripper, initialState(0.), [](const std::string& /*message*/) {});
+  ASSERT_TRUE(gripper.move(0.04, 1.));
+  std::this_thread::sleep_for(std::chrono::milliseconds(10));
+  EXPECT_NEAR(reader.latest().width, 0.04, 1e-9);
+}
+
+TEST(GripperStateReaderTest, doesNotBlockOnSlowReads) {
+  LoopbackGripperConnection gripper(std::chrono::milliseconds(200));
+  GripperStateReader reader(&gripper, initialState(0.01), [](const std::string& /*message*/) {});
+
+  const auto kStart = std::chrono::steady_clock::now();
+  GripperStateReader::Clock::time_point receive_time;
+  EXPECT_DOUBLE_EQ(reader.latest(&receive_time).width, 0.01);
+  EXPECT_LT(std::chrono::steady_clock::now() - kStart, std::chrono::milliseconds(50));
+  EXPECT_LE(receive_time, kStart);
+}
+
+TEST(GripperStateReaderTest, reportsFailedReads) {
+  FailingGripperConnection gripper;
+  std::atomic<int> reported_errors{0};
+  const auto kStart = std::chrono::steady_clock::now();
+  {
+    GripperStateReader reader(&gripper, initialState(0.02),
+                              [&reported_errors](const std::string& message) {
+                                EXPECT_EQ(message, "libfranka gripper: UDP receive: Timeout");
+                                reported_errors++;
+                              });
+    std::this_thread::sleep_for(std::chrono::milliseconds(20));
+    const auto kStatistics = reader.collectStatistics();
+    EXPECT_EQ(kStatistics.reads, 0U);
+    EXPECT_GE(kStatistics.errors, 1U);
+    EXPECT_EQ(kStatistics.rate, 0.);
+    EXPECT_DOUBLE_EQ(reader.latest().width, 0.02);
+  }
+  // Waiting for the next retry is interrupted when the reader is destroyed
+  EXPECT_LT(std::chrono::steady_clock::now() - kStart, std::chrono::milliseconds(100));
+  EXPECT_GE(reported_errors, 1);
+}
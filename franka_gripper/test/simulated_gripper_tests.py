@@ -0,0 +1,118 @@
+#  Copyright (c) 2023 Franka Emika GmbH
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import threading
+import time
+
+from franka_gripper.simulated_gripper import MAX_WIDTH, SimulatedGripper
+import pytest
+
+# Motions of a few cm take a few ms
+FAST_TIME_SCALE = 100.
+
+
+def test_starts_open():
+    state = SimulatedGripper().read_once()
+    assert state.width == MAX_WIDTH
+    assert state.max_width == MAX_WIDTH
+    assert not state.is_grasped
+
+
+def test_move_reaches_width():
+    gripper = SimulatedGripper(time_scale=FAST_TIME_SCALE)
+    assert gripper.move(0.02, 0.1)
+    assert gripper.read_once().width == pytest.approx(0.02)
+
+
+def test_move_takes_distance_over_speed():
+    # Scheduling delays of the test are scaled as well
+    gripper = SimulatedGripper(time_scale=10.)
+    start = gripper.now()
+    gripper.move(0.04, 0.1)
+    assert 0.4 <= gripper.now() - start < 0.6
+
+
+def test_width_changes_during_motion():
+    now = [0.]
+    gripper = SimulatedGripper(clock=lambda: now[0])
+    mover = threading.Thread(target=gripper.move, args=(0.04, 0.1))
+    mover.start()
+    while gripper.read_once().width == MAX_WIDTH and mover.is_alive():
+        time.sleep(0.001)
+        now[0] = 0.2
+    assert gripper.read_once().width == pytest.approx(0.06)
+    now[0] = 1.
+    mover.join()
+    assert gripper.read_once().width == pytest.approx(0.04)
+
+
+def test_grasp_succeeds_within_epsilon():
+    gripper = SimulatedGripper(object_width=0.03, time_scale=FAST_TIME_SCALE)
+    assert gripper.grasp(0.032, 0.1, 20., epsilon_inner=0.005, epsilon_outer=0.005)
+    state = gripper.read_once()
+    assert state.width == pytest.approx(0.03)
+    assert state.is_grasped
+
+
+def test_grasp_fails_outside_epsilon():
+    gripper = SimulatedGripper(object_width=0.03, time_scale=FAST_TIME_SCALE)
+    assert not gripper.grasp(0.05, 0.1, 20., epsilon_inner=0.005, epsilon_outer=0.005)
+    assert not gripper.read_once().is_grasped
+
+
+def test_grasp_without_object_closes_fingers():
+    gripper = SimulatedGripper(time_scale=FAST_TIME_SCALE)
+    assert gripper.grasp(0., 0.1, 20.)
+    assert gripper.read_once().width == 0.
+
+
+def test_move_releases_grasp():
+    gripper = SimulatedGripper(object_width=0.03, time_scale=FAST_TIME_SCALE)
+    gripper.grasp(0.03, 0.1, 20.)
+    gripper.move(MAX_WIDTH, 0.1)
+    assert not gripper.read_once().is_grasped
+
+
+def test_homing_opens_fingers():
+    gripper = SimulatedGripper(time_scale=FAST_TIME_SCALE)
+    gripper.move(0.01, 0.1)
+    assert gripper.homing()
+    assert gripper.read_once().width == MAX_WIDTH
+
+
+def test_stop_interrupts_motion():
+    gripper = SimulatedGripper()
+    results = []
+    mover = threading.Thread(target=lambda: results.append(gripper.move(0., 0.01)))
+    mover.start()
+    time.sleep(0.05)
+    gripper.stop()
+    mover.join(1.)
+    assert results == [False]
+    stopped_width = gripper.read_once().width
+    assert 0. < stopped_width < MAX_WIDTH
+    time.sleep(0.01)
+    assert gripper.read_once().width == stopped_width
+
+
+def test_rejects_invalid_commands():
+    gripper = SimulatedGripper()
+    with pytest.raises(ValueError):
+        gripper.move(MAX_WIDTH + 0.01, 0.1)
+    with pytest.raises(ValueError):
+        gripper.move(0.04, 0.)
+    with pytest.raises(ValueError):
+        gripper.grasp(0.04, 0.1, -1.)
+    with pytest.raises(ValueError):
+        SimulatedGripper(time_scale=0.)
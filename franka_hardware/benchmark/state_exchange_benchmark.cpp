@@ -0,0 +1,170 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+/**
+ * Stress benchmark for the state/command exchange between the libfranka control callback and the
+ * ros2_control read()/write() cycle.
+ *
+ * A simulated 1 kHz callback publishes a franka::RobotState and fetches a torque command while
+ * several reader threads hammer the other side of the exchange as fast as they can. The time spent
+ * inside the callback is reported for the previous mutex based exchange and for the wait-free
+ * triple buffer used by franka_hardware::Robot.
+ *
+ * Usage: state_exchange_benchmark [duration in seconds] [number of contending threads]
+ */
+
+#include <algorithm>
+#include <array>
+#include <atomic>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include <franka/robot_state.h>
+
+#include "franka_hardware/triple_buffer.hpp"
+
+namespace {
+
+using Clock = std::chrono::steady_clock;
+using Torques = std::array<double, 7>;
+
+/// Exchange as done before: one mutex for the state and one for the command.
+class MutexExchange {
+ public:
+  Torques callback(const franka::RobotState& state) {
+    {
+      std::lock_guard<std::mutex> lock(read_mutex_);
+      current_state_ = state;
+    }
+    std::lock_guard<std::mutex> lock(write_mutex_);
+    return tau_command_;
+  }
+
+  void readWrite(std::array<double, 7>* q, const Torques& command) {
+    {
+      std::lock_guard<std::mutex> lock(read_mutex_);
+      *q = current_state_.q;
+    }
+    std::lock_guard<std::mutex> lock(write_mutex_);
+    tau_command_ = command;
+  }
+
+ private:
+  std::mutex read_mutex_;
+  std::mutex write_mutex_;
+  franka::RobotState current_state_;
+  Torques tau_command_{};
+};
+
+/// Exchange as done by franka_hardware::Robot. Only one reader thread may use it at a time.
+class TripleBufferExchange {
+ public:
+  Torques callback(const franka::RobotState& state) {
+    current_state_.write(state);
+    return tau_command_.read();
+  }
+
+  void readWrite(std::array<double, 7>* q, const Torques& command) {
+    std::lock_guard<std::mutex> lock(reader_mutex_);
+    *q = current_state_.read().q;
+    tau_command_.write(command);
+  }
+
+ private:
+  franka_hardware::TripleBuffer<franka::RobotState> current_state_;
+  franka_hardware::TripleBuffer<Torques> tau_command_;
+  // Serializes the contending benchmark threads among themselves. The callback never takes it.
+  std::mutex reader_mutex_;
+};
+
+struct Result {
+  double mean_us;
+  double p99_us;
+  double max_us;
+  std::size_t cycles;
+};
+
+template <typename Exchange>
+Result run(std::chrono::seconds duration, int contending_threads) {
+  Exchange exchange;
+  std::atomic_bool finished{false};
+  std::vector<std::thread> readers;
+  for (int i = 0; i < contending_threads; i++) {
+    readers.emplace_back([&exchange, &finished]() {
+      std::array<double, 7> q{};
+      Torques command{};
+      while (not finished) {
+        exchange.readWrite(&q, command);
+        command.at(0) = q.at(0);
+      }
+    });
+  }
+
+  franka::RobotState state;
+  std::vector<double> latencies_us;
+  latencies_us.reserve(static_cast<std::size_t>(duration.count()) * 1000);
+  const auto kEnd = Clock::now() + duration;
+  auto next_cycle = Clock::now();
+  double sink = 0.;
+  while (Clock::now() < kEnd) {
+    next_cycle += std::chrono::milliseconds(1);
+    std::this_thread::sleep_until(next_cycle);
+    state.q.at(0) += 1e-3;
+    const auto kStart = Clock::now();
+    sink += exchange.callback(state).at(0);
+    const auto kStop = Clock::now();
+    latencies_us.push_back(std::chrono::duration<double, std::micro>(kStop - kStart).count());
+  }
+  finished = true;
+  for (auto& reader : readers) {
+    reader.join();
+  }
+  if (sink < 0) {
+    std::printf(" ");
+  }
+
+  std::sort(latencies_us.begin(), latencies_us.end());
+  double sum = 0.;
+  for (auto latency : latencies_us) {
+    sum += latency;
+  }
+  const auto kP99Index = static_cast<std::size_t>(0.99 * (latencies_us.size() - 1));
+  return {sum / latencies_us.size(), latencies_us.at(kP99Index), latencies_us.back(),
+          latencies_us.size()};
+}
+
+void print(const std::string& name, const Result& result) {
+  std::printf("%-14s cycles: %6zu  mean: %8.3f us  p99: %8.3f us  max: %9.3f us\n", name.c_str(),
+              result.cycles, result.mean_us, result.p99_us, result.max_us);
+}
+
+}  // namespace
+
+int main(int argc, char** argv) {
+  const std::chrono::seconds kDuration(argc > 1 ? std::atoi(argv[1]) : 10);
+  const int kContendingThreads =
+      argc > 2 ? std::atoi(argv[2])
+               : std::max(1, static_cast<int>(std::thread::hardware_concurrency()) - 1);
+
+  std::printf("Callback latency over %lds with %d contending threads\n",
+              static_cast<long>(kDuration.count()), kContendingThreads);
+  print("mutex", run<MutexExchange>(kDuration, kContendingThreads));
+  print("triple buffer", run<TripleBufferExchange>(kDuration, kContendingThreads));
+  return 0;
+}
@@ -0,0 +1,96 @@
+#  Copyright (c) 2023 Franka Emika GmbH
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Access to robot state recordings written by franka_hardware::StateRecorder.
+
+The recordings are mapped into memory instead of being parsed, so opening them takes constant
+time regardless of their length. Fields of the records are named like in franka::RobotState,
+e.g. ``recording['q'][:, 0]`` is the position of the first joint over time. Transformations are
+stored column-major as in libfranka.
+"""
+
+import os
+import struct
+
+import numpy
+
+MAGIC = b'FRKSTATE'
+VERSION = 1
+HEADER = struct.Struct('<8sII')
+
+RECORD_DTYPE = numpy.dtype([
+    ('time', '<u8'),
+    ('host_time', '<i8'),
+    ('robot_mode', '<i8'),
+    ('control_command_success_rate', '<f8'),
+    ('q', '<f8', (7,)),
+    ('q_d', '<f8', (7,)),
+    ('dq', '<f8', (7,)),
+    ('dq_d', '<f8', (7,)),
+    ('ddq_d', '<f8', (7,)),
+    ('theta', '<f8', (7,)),
+    ('dtheta', '<f8', (7,)),
+    ('tau_J', '<f8', (7,)),
+    ('tau_J_d', '<f8', (7,)),
+    ('dtau_J', '<f8', (7,)),
+    ('tau_ext_hat_filtered', '<f8', (7,)),
+    ('O_T_EE', '<f8', (16,)),
+    ('O_T_EE_d', '<f8', (16,)),
+    ('O_T_EE_c', '<f8', (16,)),
+    ('O_F_ext_hat_K', '<f8', (6,)),
+    ('K_F_ext_hat_K', '<f8', (6,)),
+    ('O_dP_EE_d', '<f8', (6,)),
+    ('O_dP_EE_c', '<f8', (6,)),
+    ('O_ddP_EE_c', '<f8', (6,)),
+])
+
+
+def load_recording(path):
+    """
+    Map a state recording into memory.
+
+    A record that was only partially written, e.g. because the recording is still running, is
+    left out.
+
+    :param path: path of the recording
+    :return: read-only numpy structured array with one element of RECORD_DTYPE per sample
+    :raises ValueError: if the file is not a state recording of a supported version
+    """
+    with open(path, 'rb') as recording:
+        header = recording.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError('{} is too short to be a state recording'.format(path))
+    magic, version, record_size = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError('{} is not a state recording'.format(path))
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError('{} has unsupported version {} with record size {}'.format(
+            path, version, record_size))
+    count = (os.path.getsize(path) - HEADER.size) // record_size
+    if count == 0:
+        return numpy.empty(0, dtype=RECORD_DTYPE)
+    return numpy.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+
+
+def write_header(stream):
+    """
+    Write the header of a state recording.
+
+    Used to create recordings from Python, e.g. for tests. The records can be appended with
+    ``numpy.ndarray.tofile`` using RECORD_DTYPE.
+
+    :param stream: binary file object
+    """
+    stream.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
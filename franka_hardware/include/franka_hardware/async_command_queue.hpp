@@ -0,0 +1,66 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <condition_variable>
+#include <cstddef>
+#include <deque>
+#include <functional>
+#include <future>
+#include <mutex>
+#include <thread>
+
+namespace franka_hardware {
+
+/**
+ * Bounded queue of blocking commands that are executed one after another by a dedicated worker
+ * thread. Used to keep blocking network calls to the robot away from the realtime path.
+ */
+class AsyncCommandQueue {
+ public:
+  /**
+   * Creates the queue and starts the worker thread.
+   * @param[in] capacity maximum number of commands waiting for execution.
+   */
+  explicit AsyncCommandQueue(std::size_t capacity);
+  AsyncCommandQueue(const AsyncCommandQueue&) = delete;
+  AsyncCommandQueue& operator=(const AsyncCommandQueue&) = delete;
+  AsyncCommandQueue(AsyncCommandQueue&&) = delete;
+  AsyncCommandQueue& operator=(AsyncCommandQueue&&) = delete;
+
+  /// Stops the worker thread. Commands which have not been executed yet are dropped, their
+  /// futures report a broken promise.
+  ~AsyncCommandQueue();
+
+  /**
+   * Appends a command to the queue.
+   * @param[in] command function to execute on the worker thread. It is allowed to throw.
+   * @return a future that becomes ready once the command has been executed and rethrows any
+   * exception thrown by it, or an invalid future if the queue is full.
+   */
+  std::future<void> push(std::function<void()> command);
+
+ private:
+  void run();
+
+  const std::size_t capacity_;
+  std::mutex mutex_;
+  std::condition_variable command_available_;
+  std::deque<std::packaged_task<void()>> commands_;
+  bool finish_ = false;
+  std::thread worker_;
+};
+
+}  // namespace franka_hardware
@@ -0,0 +1,87 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <cstddef>
+#include <vector>
+
+namespace franka_hardware {
+
+/**
+ * Maps the robot time of the robot states onto the host clock.
+ *
+ * A state is received some time after the robot measured it. This delay varies with the network
+ * and the scheduling of the host, but it is never negative. The smallest difference between
+ * receive time and robot time within a window is therefore the best estimate of the clock offset.
+ * A line through the minima of the last windows corrects for the drift between the clocks.
+ *
+ * Not thread-safe. Does not allocate after construction.
+ */
+class ClockOffsetEstimator {
+ public:
+  /**
+   * @param[in] window_length robot time over which the minimum offset is taken [s].
+   * @param[in] number_of_windows number of window minima the drift is estimated from.
+   */
+  explicit ClockOffsetEstimator(double window_length = kDefaultWindowLength,
+                                std::size_t number_of_windows = kDefaultNumberOfWindows);
+
+  /**
+   * Adds a received state. Restarts the estimation if the robot time jumps back, e.g. after a
+   * reconnection.
+   * @param[in] robot_time robot time of the state [s].
+   * @param[in] receive_time host time at which the state was received [s].
+   */
+  void update(double robot_time, double receive_time);
+
+  /**
+   * @param[in] robot_time robot time of a state [s].
+   * @return host time at which the robot measured the state [s], or NaN before the first update.
+   */
+  double toHostTime(double robot_time) const;
+
+  /// @return estimated rate of the host clock relative to the robot clock minus one [s/s].
+  double drift() const;
+
+  /// @return false before the first update.
+  bool isValid() const;
+
+  static constexpr double kDefaultWindowLength = 1.0;  // [s]
+  static constexpr std::size_t kDefaultNumberOfWindows = 10;
+
+ private:
+  struct Minimum {
+    double robot_time;
+    double offset;
+  };
+
+  /// Fits the offset line through the minima of the finished windows.
+  void fit();
+
+  const double window_length_;
+  const std::size_t number_of_windows_;
+  // Minima of the finished windows, oldest first
+  std::vector<Minimum> minima_;
+  Minimum current_{0, 0};
+  double window_start_ = 0;
+  double last_robot_time_ = 0;
+  bool valid_ = false;
+  // offset(t) = offset_ + drift_ * (t - reference_time_)
+  double reference_time_ = 0;
+  double offset_ = 0;
+  double drift_ = 0;
+};
+
+}  // namespace franka_hardware
@@ -0,0 +1,134 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <array>
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+
+#include <franka/robot_state.h>
+
+namespace franka_hardware {
+
+/**
+ * Fixed-size histogram of durations. Values are recorded without allocating or locking, so it can
+ * be filled from the libfranka realtime callback. Exactly one thread may record values, any
+ * thread may read them.
+ */
+class LatencyHistogram {
+ public:
+  static constexpr std::size_t kNumberOfBuckets = 100;
+
+  /**
+   * @param[in] bucket_width width of each bucket. Values above kNumberOfBuckets * bucket_width
+   * are counted in an additional overflow bucket.
+   */
+  explicit LatencyHistogram(std::chrono::nanoseconds bucket_width);
+
+  /// Adds a value to the histogram. Must only be called from a single thread.
+  void record(std::chrono::nanoseconds value);
+
+  /// @return number of recorded values.
+  uint64_t count() const;
+
+  /// @return the largest recorded value.
+  std::chrono::nanoseconds max() const;
+
+  /**
+   * Estimates a percentile from the bucket counts.
+   * @param[in] percentile in range [0, 1].
+   * @return upper edge of the bucket containing the percentile, or the maximum if the percentile
+   * falls into the overflow bucket.
+   */
+  std::chrono::nanoseconds percentile(double percentile) const;
+
+ private:
+  std::chrono::nanoseconds bucket_width_;
+  std::array<std::atomic<uint64_t>, kNumberOfBuckets + 1> buckets_{};
+  std::atomic<uint64_t> count_{0};
+  std::atomic<int64_t> max_ns_{0};
+};
+
+/**
+ * Timing statistics of the libfranka control loop. Recording happens in the realtime callback and
+ * is allocation-free, the values can be read concurrently from any other thread.
+ */
+class ControlLoopStatistics {
+ public:
+  using Clock = std::chrono::steady_clock;
+
+  ControlLoopStatistics();
+
+  /**
+   * Records one callback of the control or reading loop. Must only be called from the loop thread.
+   * @param[in] state robot state received in this cycle.
+   * @param[in] now time at which the callback was entered.
+   * @param[in] controlling whether the loop is sending commands to the robot.
+   */
+  void recordCycle(const franka::RobotState& state, Clock::time_point now, bool controlling);
+
+  /**
+   * Records how old the command consumed in the current cycle is.
+   * Must only be called from the loop thread.
+   * @param[in] age time since the command was written by the hardware interface.
+   */
+  void recordCommandAge(Clock::duration age);
+
+  /**
+   * Records the time between the last callback of a loop and the first callback of the loop that
+   * replaced it. Must only be called from the loop thread.
+   * @param[in] gap time without a new robot state during the mode switch.
+   */
+  void recordModeSwitch(Clock::duration gap);
+
+  /// Resets the period measurement, e.g. after the loop has been restarted.
+  void restart();
+
+  /// @return number of recorded cycles.
+  uint64_t cycles() const;
+
+  /// @return number of cycles the robot reported as lost based on the robot time.
+  uint64_t missedCycles() const;
+
+  /// @return control_command_success_rate of the last cycle of a control loop.
+  double lastSuccessRate() const;
+
+  /// @return lowest control_command_success_rate seen in a control loop.
+  double minimumSuccessRate() const;
+
+  /// @return histogram of the time between two consecutive callbacks.
+  const LatencyHistogram& period() const;
+
+  /// @return histogram of the time between write() and the consumption of the command.
+  const LatencyHistogram& commandAge() const;
+
+  /// @return histogram of the state gaps caused by mode switches.
+  const LatencyHistogram& modeSwitchGap() const;
+
+ private:
+  LatencyHistogram period_;
+  LatencyHistogram command_age_;
+  LatencyHistogram mode_switch_gap_;
+  std::atomic<uint64_t> cycles_{0};
+  std::atomic<uint64_t> missed_cycles_{0};
+  std::atomic<double> last_success_rate_{1.0};
+  std::atomic<double> minimum_success_rate_{1.0};
+  bool has_last_cycle_ = false;
+  Clock::time_point last_cycle_time_;
+  uint64_t last_robot_time_ms_ = 0;
+};
+
+}  // namespace franka_hardware
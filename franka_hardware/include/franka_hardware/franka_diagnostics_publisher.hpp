@@ -0,0 +1,57 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <cstdint>
+#include <memory>
+#include <string>
+
+#include <diagnostic_msgs/msg/diagnostic_array.hpp>
+#include <rclcpp/rclcpp.hpp>
+
+#include "franka_hardware/robot.hpp"
+
+namespace franka_hardware {
+
+/**
+ * Node that periodically publishes the control loop timing statistics of a Robot on /diagnostics.
+ */
+class FrankaDiagnosticsPublisher : public rclcpp::Node {
+ public:
+  /**
+   * @param[in] options node options.
+   * @param[in] robot robot whose statistics are published.
+   * @param[in] publish_rate rate at which diagnostics are published in Hz.
+   * @param[in] node_namespace namespace of the node, e.g. the arm ID if there are several arms.
+   * It is also added to the name of the reported status.
+   */
+  FrankaDiagnosticsPublisher(const rclcpp::NodeOptions& options,
+                             std::shared_ptr<Robot> robot,
+                             double publish_rate,
+                             const std::string& node_namespace = "");
+
+ private:
+  /// Minimum control_command_success_rate before a warning is reported.
+  static constexpr double kSuccessRateWarningThreshold = 0.95;
+
+  void publishDiagnostics();
+
+  std::shared_ptr<Robot> robot_;
+  std::string status_name_;
+  rclcpp::Publisher<diagnostic_msgs::msg::DiagnosticArray>::SharedPtr publisher_;
+  rclcpp::TimerBase::SharedPtr timer_;
+  uint64_t last_missed_cycles_ = 0;
+};
+}  // namespace franka_hardware
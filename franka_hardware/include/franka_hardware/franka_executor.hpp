@@ -14,14 +14,24 @@
 
 #pragma once
 
+#include <chrono>
+#include <condition_variable>
+#include <mutex>
+#include <thread>
+
 #include <rclcpp/rclcpp.hpp>
 
+#include "franka_hardware/thread_configuration.hpp"
+
 namespace franka_hardware {
 
 class FrankaExecutor : public rclcpp::executors::MultiThreadedExecutor {
  public:
-  // Create an instance and start the internal thread
-  FrankaExecutor();
+  // Create an instance and start the internal thread without waiting for it. The configuration is
+  // applied to the internal thread before it starts spinning, so that the worker threads of the
+  // executor inherit it.
+  explicit FrankaExecutor(const ThreadConfiguration& configuration = ThreadConfiguration(),
+                          const rclcpp::Logger& logger = rclcpp::get_logger("FrankaExecutor"));
   FrankaExecutor(const FrankaExecutor&) = delete;
   FrankaExecutor(FrankaExecutor&&) = delete;
 
@@ -32,10 +42,16 @@ class FrankaExecutor : public rclcpp::executors::MultiThreadedExecutor {
   ~FrankaExecutor() override;
 
  private:
+  // Time after which the destructor cancels again if the thread did not leave spin()
+  static constexpr std::chrono::milliseconds kCancelRetryPeriod{10};
+
+  std::mutex stopped_mutex_;
+  std::condition_variable stopped_changed_;
+  bool stopped_ = false;
   std::thread executor_spin_;
 
   // Executor thread starts spining the multithreadedExecutor
-  void run();
+  void run(const ThreadConfiguration& configuration, const rclcpp::Logger& logger);
 
   // Cancel any spinning ROS executor
   void shutdown();
@@ -14,6 +14,9 @@
 
 #pragma once
 
+#include <array>
+#include <chrono>
+#include <future>
 #include <memory>
 #include <string>
 #include <vector>
@@ -27,6 +30,8 @@
 #include <rclcpp/macros.hpp>
 #include <rclcpp/rclcpp.hpp>
 
+#include "franka_hardware/clock_offset_estimator.hpp"
+#include "franka_hardware/franka_diagnostics_publisher.hpp"
 #include "franka_hardware/franka_param_service_server.hpp"
 #include "franka_hardware/franka_executor.hpp"
 namespace franka_hardware {
@@ -43,23 +48,77 @@ class FrankaHardwareInterface
       const std::vector<std::string>& stop_interfaces) override;
   std::vector<hardware_interface::StateInterface> export_state_interfaces() override;
   std::vector<hardware_interface::CommandInterface> export_command_interfaces() override;
+    CallbackReturn on_configure(const rclcpp_lifecycle::State& previous_state) override;
     CallbackReturn on_activate(const rclcpp_lifecycle::State & previous_state) override;
     CallbackReturn  on_deactivate(const rclcpp_lifecycle::State & previous_state) override;
     hardware_interface::return_type read(const rclcpp::Time & time, const rclcpp::Duration & period) override;
   hardware_interface::return_type write(const rclcpp::Time & time, const rclcpp::Duration & period) override;
     CallbackReturn on_init(const hardware_interface::HardwareInfo& info) override;
   static const size_t kNumberOfJoints = 7;
+  static constexpr double kDefaultDiagnosticsPublishRate = 1.0;  // [Hz]
+  static constexpr const char* kDefaultArmId = "panda";
+  static constexpr const char* kCartesianPoseInterface = "cartesian_pose";
+  static constexpr const char* kCartesianVelocityInterface = "cartesian_velocity";
 
  private:
-  std::shared_ptr<Robot> robot_;
-  std::array<double, kNumberOfJoints> hw_commands_{0, 0, 0, 0, 0, 0, 0};
-  std::array<double, kNumberOfJoints> hw_positions_{0, 0, 0, 0, 0, 0, 0};
-  std::array<double, kNumberOfJoints> hw_velocities_{0, 0, 0, 0, 0, 0, 0};
-  std::array<double, kNumberOfJoints> hw_efforts_{0, 0, 0, 0, 0, 0, 0};
-  bool effort_interface_claimed_ = false;
-  bool effort_interface_running_ = false;
-  std::shared_ptr<FrankaParamServiceServer> node_;
+  /// Connection, commands and state snapshot of one arm. The interfaces of the arm point into it.
+  struct Arm {
+    std::string arm_id;
+    /// Indices of the joints of the arm in info_.joints
+    std::vector<size_t> joints;
+    std::shared_ptr<Robot> robot;
+    std::future<std::shared_ptr<Robot>> connection;
+    std::array<double, kNumberOfJoints> hw_commands{0, 0, 0, 0, 0, 0, 0};
+    std::array<double, kNumberOfJoints> hw_position_commands{0, 0, 0, 0, 0, 0, 0};
+    std::array<double, kNumberOfJoints> hw_velocity_commands{0, 0, 0, 0, 0, 0, 0};
+    std::array<double, 16> hw_cartesian_pose_commands{};
+    std::array<double, 6> hw_cartesian_velocity_commands{};
+    // Snapshot of the robot state for the current cycle
+    franka::RobotState hw_franka_robot_state;
+    // Robot time of the snapshot [s]
+    double hw_robot_time = 0;
+    // Time at which the loop thread received the snapshot
+    ControlLoopStatistics::Clock::time_point receive_time;
+    // Time from the reception of the snapshot by the loop thread until read() [s]
+    double hw_state_age = 0;
+    // ROS time at which the robot measured the snapshot [s]
+    double hw_measurement_time = 0;
+    // Maps the robot time onto the steady clock of the host
+    ClockOffsetEstimator clock;
+    double hw_robot_model_pointer = 0;
+    double hw_robot_state_pointer = 0;
+    Robot::ControlMode claimed_mode = Robot::ControlMode::kReading;
+    Robot::ControlMode running_mode = Robot::ControlMode::kReading;
+    std::shared_ptr<FrankaParamServiceServer> node;
+    std::shared_ptr<FrankaDiagnosticsPublisher> diagnostics_publisher;
+  };
+
+  /**
+   * Determines the control mode claimed for an arm by a set of command interfaces. Interfaces of
+   * other arms and other hardware are ignored.
+   * @param[in] arm arm to check.
+   * @param[in] interfaces full names of the command interfaces to start or stop.
+   * @return claimed mode, or Robot::ControlMode::kReading if none of the interfaces is the arm's.
+   * @throw std::invalid_argument if the interfaces do not form exactly one complete mode.
+   */
+  Robot::ControlMode getControlMode(const Arm& arm,
+                                    const std::vector<std::string>& interfaces) const;
+
+  /**
+   * Waits for the connections started by on_init() and sets up everything that needs the robots.
+   * Does nothing if the connections are already established.
+   */
+  CallbackReturn finishConnection();
+
+  /// Resets the commands of an arm to its current desired state after a mode switch.
+  static void holdCurrentState(Arm* arm);
+
+  // Sized once in on_init(), so that the interface pointers stay valid.
+  std::vector<Arm> arms_;
+  std::chrono::steady_clock::time_point init_start_time_;
   std::shared_ptr<FrankaExecutor> executor_;
+  /// @return logger of an arm, the logger of the interface if there is only one arm.
+  rclcpp::Logger getLogger(const Arm& arm) const;
   static rclcpp::Logger getLogger();
 };
 }  // namespace franka_hardware
@@ -14,20 +14,22 @@
 
 #pragma once
 
+#include <future>
 #include <memory>
+#include <string>
 
 #include "franka/exception.h"
+#include "franka_hardware/async_command_queue.hpp"
 #include "franka_hardware/robot.hpp"
-/*
+
 #include <franka_msgs/srv/set_cartesian_stiffness.hpp>
 #include <franka_msgs/srv/set_force_torque_collision_behavior.hpp>
 #include <franka_msgs/srv/set_full_collision_behavior.hpp>
-#include <franka_msgs/srv/set_joint_stiffness.hpp>*/
+#include <franka_msgs/srv/set_joint_stiffness.hpp>
 #include <franka_msgs/srv/set_load.hpp>
-/*
+#include <franka_msgs/srv/set_robot_parameters.hpp>
 #include <franka_msgs/srv/set_stiffness_frame.hpp>
 #include <franka_msgs/srv/set_tcp_frame.hpp>
-*/
 #include <rclcpp/rclcpp.hpp>
 
 /**
@@ -37,12 +39,25 @@ namespace franka_hardware {
 
 class FrankaParamServiceServer : public rclcpp::Node {
  public:
-  FrankaParamServiceServer(const rclcpp::NodeOptions& options, std::shared_ptr<Robot> robot);
+  /**
+   * @param[in] options node options.
+   * @param[in] robot robot whose parameters are set.
+   * @param[in] node_namespace namespace of the node, e.g. the arm ID if there are several arms.
+   */
+  FrankaParamServiceServer(const rclcpp::NodeOptions& options,
+                           std::shared_ptr<Robot> robot,
+                           const std::string& node_namespace = "");
 
  private:
+  /// Maximum number of parameter requests waiting for execution
+  static constexpr std::size_t kCommandQueueCapacity = 16;
+
   /**
    * @brief generic templated param setter function
    *
+   * The setter is queued and executed by the command queue worker, away from the realtime path.
+   * The service callback waits for the result so that it can be reported in the response.
+   *
    * @param param_setter_function: std::function<void(request_type)> makes the call to the robot
    * class which take the request type
    * @param request franka_msgs::srv set parameter request type
@@ -52,8 +67,16 @@ class FrankaParamServiceServer : public rclcpp::Node {
   void setGenericRobotParam(const std::function<void(request_type)>& param_setter_function,
                             const request_type& request,
                             const response_type& response) {
+    std::future<void> result = command_queue_.push(
+        [&param_setter_function, &request]() { param_setter_function(request); });
+    if (not result.valid()) {
+      RCLCPP_ERROR(this->get_logger(), "Parameter command queue is full, rejecting request");
+      response->success = false;
+      response->error = "command queue full";
+      return;
+    }
     try {
-      param_setter_function(request);
+      result.get();
       response->success = true;
     } catch (const franka::CommandException& command_exception) {
       RCLCPP_ERROR(this->get_logger(), "Command exception thrown during parameter setting %s",
@@ -65,6 +88,16 @@ class FrankaParamServiceServer : public rclcpp::Node {
                    network_exception.what());
       response->success = false;
       response->error = "network exception error";
+    } catch (const franka::InvalidOperationException& invalid_operation_exception) {
+      RCLCPP_ERROR(this->get_logger(), "Parameter setting not possible: %s",
+                   invalid_operation_exception.what());
+      response->success = false;
+      response->error = "invalid operation error";
+    } catch (const std::future_error& future_error) {
+      RCLCPP_ERROR(this->get_logger(), "Parameter command was not executed: %s",
+                   future_error.what());
+      response->success = false;
+      response->error = "command not executed";
     }
   }
 
@@ -74,29 +107,28 @@ class FrankaParamServiceServer : public rclcpp::Node {
    * @param request shared_ptr to setJointStiffness service msgs request
    * @param response shared_ptr to setJointStiffness service msgs response
    */
-    /*  void setJointStiffnessCallback(
+  void setJointStiffnessCallback(
       const franka_msgs::srv::SetJointStiffness::Request::SharedPtr& request,
       const franka_msgs::srv::SetJointStiffness::Response::SharedPtr& response);
-    */
+
   /**
    * @brief Callback function for set_cartesian_stiffness service
    *
    * @param request shared_ptr to SetCartesianStiffness service msgs request
    * @param response shared_ptr to SetCartesianStiffness service msgs response
    */
-    /*  void setCartesianStiffnessCallback(
+  void setCartesianStiffnessCallback(
       const franka_msgs::srv::SetCartesianStiffness::Request::SharedPtr& request,
       const franka_msgs::srv::SetCartesianStiffness::Response::SharedPtr& response);
-    */
+
   /**
-   * @brief Callback function for set_cartesian_stiffness service
+   * @brief Callback function for set_tcp_frame service
    *
-   * @param request shared_ptr to SetCartesianStiffness service msgs request
-   * @param response shared_ptr to SetCartesianStiffness service msgs response
+   * @param request shared_ptr to SetTCPFrame service msgs request
+   * @param response shared_ptr to SetTCPFrame service msgs response
    */
-    /*  void setTCPFrameCallback(const franka_msgs::srv::SetTCPFrame::Request::SharedPtr& request,
+  void setTCPFrameCallback(const franka_msgs::srv::SetTCPFrame::Request::SharedPtr& request,
                            const franka_msgs::srv::SetTCPFrame::Response::SharedPtr& response);
-    */
 
   /**
    * @brief Callback function for set_stiffness_frame service
@@ -104,19 +136,19 @@ class FrankaParamServiceServer : public rclcpp::Node {
    * @param request shared_ptr to SetStiffnessFrame service msgs request
    * @param response shared_ptr to SetStiffnessFrame service msgs response
    */
-    /*  void setStiffnessFrameCallback(
+  void setStiffnessFrameCallback(
       const franka_msgs::srv::SetStiffnessFrame::Request::SharedPtr& request,
       const franka_msgs::srv::SetStiffnessFrame::Response::SharedPtr& response);
-    */
+
   /**
    * @brief Callback function for set_force_torque_collision_behavior service
    *
    * @param request shared_ptr to SetForceTorqueCollisionBehavior service msgs request
    * @param response shared_ptr to SetForceTorqueCollisionBehavior service msgs response
    */
-    /*  void setForceTorqueCollisionBehaviorCallback(
+  void setForceTorqueCollisionBehaviorCallback(
       const franka_msgs::srv::SetForceTorqueCollisionBehavior::Request::SharedPtr& request,
-      const franka_msgs::srv::SetForceTorqueCollisionBehavior::Response::SharedPtr& response);*/
+      const franka_msgs::srv::SetForceTorqueCollisionBehavior::Response::SharedPtr& response);
 
   /**
    * @brief Callback function for set_full_collision_behavior service
@@ -124,10 +156,10 @@ class FrankaParamServiceServer : public rclcpp::Node {
    * @param request shared_ptr to SetFullCollisionBehavior service msgs request
    * @param response shared_ptr to SetFullCollisionBehavior service msgs response
    */
-    /*  void setFullCollisionBehaviorCallback(
+  void setFullCollisionBehaviorCallback(
       const franka_msgs::srv::SetFullCollisionBehavior::Request::SharedPtr& request,
       const franka_msgs::srv::SetFullCollisionBehavior::Response::SharedPtr& response);
-    */
+
   /**
    * @brief Callback function for set_load_callback service
    *
@@ -137,17 +169,31 @@ class FrankaParamServiceServer : public rclcpp::Node {
   void setLoadCallback(const franka_msgs::srv::SetLoad::Request::SharedPtr& request,
                        const franka_msgs::srv::SetLoad::Response::SharedPtr& response);
 
+  /**
+   * @brief Callback function for set_robot_parameters service
+   *
+   * @param request shared_ptr to SetRobotParameters service msgs request
+   * @param response shared_ptr to SetRobotParameters service msgs response
+   */
+  void setRobotParametersCallback(
+      const franka_msgs::srv::SetRobotParameters::Request::SharedPtr& request,
+      const franka_msgs::srv::SetRobotParameters::Response::SharedPtr& response);
+
   std::shared_ptr<Robot> robot_;
+  AsyncCommandQueue command_queue_{kCommandQueueCapacity};
+  // Lets service requests wait for their result concurrently, so that they can queue up
+  rclcpp::CallbackGroup::SharedPtr callback_group_;
 
-    /*  rclcpp::Service<franka_msgs::srv::SetJointStiffness>::SharedPtr set_joint_stiffness_service_;
+  rclcpp::Service<franka_msgs::srv::SetJointStiffness>::SharedPtr set_joint_stiffness_service_;
   rclcpp::Service<franka_msgs::srv::SetCartesianStiffness>::SharedPtr
-  set_cartesian_stiffness_service_;*/
+      set_cartesian_stiffness_service_;
   rclcpp::Service<franka_msgs::srv::SetLoad>::SharedPtr set_load_service_;
-    /*  rclcpp::Service<franka_msgs::srv::SetTCPFrame>::SharedPtr set_tcp_frame_service_;
+  rclcpp::Service<franka_msgs::srv::SetTCPFrame>::SharedPtr set_tcp_frame_service_;
   rclcpp::Service<franka_msgs::srv::SetStiffnessFrame>::SharedPtr set_stiffness_frame_service_;
   rclcpp::Service<franka_msgs::srv::SetForceTorqueCollisionBehavior>::SharedPtr
       set_force_torque_collision_behavior_service_;
   rclcpp::Service<franka_msgs::srv::SetFullCollisionBehavior>::SharedPtr
-  set_full_collision_behavior_service_;*/
+      set_full_collision_behavior_service_;
+  rclcpp::Service<franka_msgs::srv::SetRobotParameters>::SharedPtr set_robot_parameters_service_;
 };
 }  // namespace franka_hardware
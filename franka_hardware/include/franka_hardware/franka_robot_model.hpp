@@ -0,0 +1,155 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <array>
+#include <cstring>
+#include <string>
+#include <vector>
+
+#include <franka/model.h>
+#include <franka/robot_state.h>
+#include <hardware_interface/loaned_state_interface.hpp>
+
+#include "franka_hardware/model.hpp"
+
+namespace franka_hardware {
+
+static_assert(sizeof(double) == sizeof(void*),
+              "Pointers are passed through state interfaces as the bits of a double");
+
+/**
+ * Encodes a pointer as the value of a state interface.
+ * @param[in] pointer pointer to pass to the controllers.
+ * @return double with the same bits as the pointer.
+ */
+template <typename T>
+double pointerToStateValue(T* pointer) {
+  double value = 0;
+  std::memcpy(&value, &pointer, sizeof(pointer));
+  return value;
+}
+
+/**
+ * Decodes a pointer from the value of a state interface.
+ * @param[in] value value created with pointerToStateValue().
+ * @return the pointer.
+ */
+template <typename T>
+T* stateValueToPointer(double value) {
+  T* pointer = nullptr;
+  std::memcpy(&pointer, &value, sizeof(pointer));
+  return pointer;
+}
+
+/**
+ * Gives controllers access to the robot model and the full robot state of the current cycle via
+ * the {arm_id}/robot_model and {arm_id}/robot_state state interfaces. The model quantities are
+ * computed at most once per cycle and shared by all controllers using this component.
+ */
+class FrankaRobotModel {
+ public:
+  static constexpr const char* kRobotModelInterface = "robot_model";
+  static constexpr const char* kRobotStateInterface = "robot_state";
+
+  /**
+   * @param[in] arm_id prefix of the state interfaces, e.g. "panda".
+   */
+  explicit FrankaRobotModel(const std::string& arm_id)
+      : robot_model_interface_name_(arm_id + "/" + kRobotModelInterface),
+        robot_state_interface_name_(arm_id + "/" + kRobotStateInterface) {}
+
+  /// @return names of the state interfaces to add to the controller's state interface
+  /// configuration.
+  std::vector<std::string> getStateInterfaceNames() const {
+    return {robot_model_interface_name_, robot_state_interface_name_};
+  }
+
+  /**
+   * Looks up the model and the robot state in the loaned state interfaces of a controller.
+   * Call in on_activate.
+   * @param[in] state_interfaces state interfaces loaned to the controller.
+   * @return false if one of the interfaces is missing.
+   */
+  bool assignLoanedStateInterfaces(
+      const std::vector<hardware_interface::LoanedStateInterface>& state_interfaces) {
+    model_ = nullptr;
+    robot_state_ = nullptr;
+    for (const auto& state_interface : state_interfaces) {
+      // The name of a loaned interface already contains its prefix
+      const auto kName = state_interface.get_name();
+      if (kName == robot_model_interface_name_) {
+        model_ = stateValueToPointer<Model>(state_interface.get_value());
+      } else if (kName == robot_state_interface_name_) {
+        robot_state_ = stateValueToPointer<const franka::RobotState>(state_interface.get_value());
+      }
+    }
+    return model_ != nullptr and robot_state_ != nullptr;
+  }
+
+  /// Forgets the interfaces. Call in on_deactivate.
+  void releaseInterfaces() {
+    model_ = nullptr;
+    robot_state_ = nullptr;
+  }
+
+  /// @return robot state of the current cycle.
+  const franka::RobotState& getRobotState() const { return *robot_state_; }
+
+  /// @return 7x7 mass matrix, column-major.
+  const std::array<double, 49>& getMassMatrix() const { return model_->getMassMatrix(); }
+
+  /// @return Coriolis force vector.
+  const std::array<double, 7>& getCoriolisForceVector() const {
+    return model_->getCoriolisForceVector();
+  }
+
+  /// @return gravity vector.
+  const std::array<double, 7>& getGravityForceVector() const {
+    return model_->getGravityForceVector();
+  }
+
+  /**
+   * @param[in] frame frame of the Jacobian.
+   * @return 6x7 Jacobian relative to the base frame, column-major.
+   */
+  const std::array<double, 42>& getZeroJacobian(franka::Frame frame) const {
+    return model_->getZeroJacobian(frame);
+  }
+
+  /**
+   * @param[in] frame frame of the Jacobian.
+   * @return 6x7 Jacobian relative to the given frame, column-major.
+   */
+  const std::array<double, 42>& getBodyJacobian(franka::Frame frame) const {
+    return model_->getBodyJacobian(frame);
+  }
+
+  /**
+   * @param[in] frame frame of the pose.
+   * @return homogeneous transformation from the base frame to the given frame, column-major.
+   */
+  const std::array<double, 16>& getPose(franka::Frame frame) const {
+    return model_->getPose(frame);
+  }
+
+ private:
+  std::string robot_model_interface_name_;
+  std::string robot_state_interface_name_;
+  Model* model_ = nullptr;
+  const franka::RobotState* robot_state_ = nullptr;
+};
+
+}  // namespace franka_hardware
@@ -0,0 +1,118 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <functional>
+#include <memory>
+#include <random>
+
+#include "franka_hardware/robot_connection.hpp"
+
+namespace franka_hardware {
+
+/**
+ * Robot connection without a robot. Runs the libfranka loops against a simulated robot at 1 kHz,
+ * so that the hardware interface can be tested and benchmarked on machines without a robot.
+ *
+ * Commands are applied ideally: torques accelerate a damped unit inertia per joint, positions and
+ * poses are reached immediately and velocities are integrated. Rotational Cartesian velocities are
+ * ignored. Lost packets advance the robot time without calling the callback, like missed cycles
+ * on a real robot.
+ */
+class LoopbackRobotConnection : public RobotConnection {
+ public:
+  /**
+   * @param[in] packet_loss probability in [0, 1] that a cycle is lost.
+   * @param[in] delay additional time before each callback is called.
+   * @param[in] seed seed of the packet loss generator.
+   */
+  explicit LoopbackRobotConnection(double packet_loss = 0.,
+                                   std::chrono::microseconds delay = std::chrono::microseconds(0),
+                                   uint32_t seed = 0);
+
+  void read(std::function<bool(const franka::RobotState&)> read_callback) override;
+  void control(
+      std::function<franka::Torques(const franka::RobotState&, franka::Duration)> control_callback,
+      bool limit_rate,
+      double cutoff_frequency) override;
+  void control(std::function<franka::JointPositions(const franka::RobotState&, franka::Duration)>
+                   motion_callback,
+               franka::ControllerMode controller_mode,
+               bool limit_rate,
+               double cutoff_frequency) override;
+  void control(std::function<franka::JointVelocities(const franka::RobotState&, franka::Duration)>
+                   motion_callback,
+               franka::ControllerMode controller_mode,
+               bool limit_rate,
+               double cutoff_frequency) override;
+  void control(std::function<franka::CartesianPose(const franka::RobotState&, franka::Duration)>
+                   motion_callback,
+               franka::ControllerMode controller_mode,
+               bool limit_rate,
+               double cutoff_frequency) override;
+  void control(std::function<franka::CartesianVelocities(const franka::RobotState&,
+                                                         franka::Duration)> motion_callback,
+               franka::ControllerMode controller_mode,
+               bool limit_rate,
+               double cutoff_frequency) override;
+
+  void setCollisionBehavior(const std::array<double, 7>& lower_torque_thresholds,
+                            const std::array<double, 7>& upper_torque_thresholds,
+                            const std::array<double, 6>& lower_force_thresholds,
+                            const std::array<double, 6>& upper_force_thresholds) override;
+  void setCollisionBehavior(const std::array<double, 7>& lower_torque_thresholds_acceleration,
+                            const std::array<double, 7>& upper_torque_thresholds_acceleration,
+                            const std::array<double, 7>& lower_torque_thresholds_nominal,
+                            const std::array<double, 7>& upper_torque_thresholds_nominal,
+                            const std::array<double, 6>& lower_force_thresholds_acceleration,
+                            const std::array<double, 6>& upper_force_thresholds_acceleration,
+                            const std::array<double, 6>& lower_force_thresholds_nominal,
+                            const std::array<double, 6>& upper_force_thresholds_nominal) override;
+  void setJointImpedance(const std::array<double, 7>& K_theta) override;  // NOLINT
+  void setCartesianImpedance(const std::array<double, 6>& K_x) override;  // NOLINT
+  void setEE(const std::array<double, 16>& NE_T_EE) override;             // NOLINT
+  void setK(const std::array<double, 16>& EE_T_K) override;               // NOLINT
+  void setLoad(double load_mass,
+               const std::array<double, 3>& F_x_Cload,  // NOLINT
+               const std::array<double, 9>& load_inertia) override;
+
+  /// @return a model with unit mass matrix, no Coriolis and gravity forces and zero Jacobians.
+  std::unique_ptr<Model> loadModel() override;
+
+ private:
+  /**
+   * Runs a loop until the callback finishes it.
+   * @param[in] callback called with the current state, returns true to finish the loop.
+   * @param[in] mode robot mode reported while the loop is running.
+   */
+  void run(const std::function<bool(const franka::RobotState&, franka::Duration)>& callback,
+           franka::RobotMode mode);
+
+  /// Throws like libfranka if a loop is running.
+  void assertNoLoopRunning() const;
+
+  void integrateJointVelocities();
+
+  std::bernoulli_distribution packet_loss_;
+  std::chrono::microseconds delay_;
+  std::mt19937 random_generator_;
+  std::atomic_bool loop_running_{false};
+  franka::RobotState state_;
+};
+
+}  // namespace franka_hardware
@@ -0,0 +1,115 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <array>
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+
+#include <franka/model.h>
+#include <franka/robot_state.h>
+
+namespace franka_hardware {
+
+/**
+ * Dynamics and kinematics model of the robot, evaluated for the state of the current control
+ * cycle. Every quantity is computed at most once per cycle, on the first request, and then shared
+ * by all controllers. Must only be used from the controller manager's update thread.
+ */
+class Model {
+ public:
+  static constexpr std::size_t kNumberOfFrames = 10;
+
+  /**
+   * @param[in] model model loaded from the robot.
+   */
+  explicit Model(std::unique_ptr<franka::Model> model);
+  Model(const Model&) = delete;
+  Model& operator=(const Model&) = delete;
+  Model(Model&&) = delete;
+  Model& operator=(Model&&) = delete;
+  virtual ~Model() = default;
+
+  /**
+   * Starts a new cycle and discards all cached quantities.
+   * @param[in] state robot state of the new cycle. Must stay valid until the next call.
+   */
+  void update(const franka::RobotState& state);
+
+  /// @return the robot state the quantities are computed for, or nullptr before the first cycle.
+  const franka::RobotState* getRobotState() const;
+
+  /// @return 7x7 mass matrix, column-major.
+  const std::array<double, 49>& getMassMatrix();
+
+  /// @return Coriolis force vector.
+  const std::array<double, 7>& getCoriolisForceVector();
+
+  /// @return gravity vector, including the configured load.
+  const std::array<double, 7>& getGravityForceVector();
+
+  /**
+   * @param[in] frame frame of the Jacobian.
+   * @return 6x7 Jacobian relative to the base frame, column-major.
+   */
+  const std::array<double, 42>& getZeroJacobian(franka::Frame frame);
+
+  /**
+   * @param[in] frame frame of the Jacobian.
+   * @return 6x7 Jacobian relative to the given frame, column-major.
+   */
+  const std::array<double, 42>& getBodyJacobian(franka::Frame frame);
+
+  /**
+   * @param[in] frame frame of the pose.
+   * @return homogeneous transformation from the base frame to the given frame, column-major.
+   */
+  const std::array<double, 16>& getPose(franka::Frame frame);
+
+ protected:
+  /// Allows tests to replace the computations without a model loaded from a robot.
+  Model() = default;
+
+  virtual std::array<double, 49> computeMassMatrix(const franka::RobotState& state) const;
+  virtual std::array<double, 7> computeCoriolisForceVector(const franka::RobotState& state) const;
+  virtual std::array<double, 7> computeGravityForceVector(const franka::RobotState& state) const;
+  virtual std::array<double, 42> computeZeroJacobian(franka::Frame frame,
+                                                     const franka::RobotState& state) const;
+  virtual std::array<double, 42> computeBodyJacobian(franka::Frame frame,
+                                                     const franka::RobotState& state) const;
+  virtual std::array<double, 16> computePose(franka::Frame frame,
+                                             const franka::RobotState& state) const;
+
+ private:
+  template <typename T>
+  struct Cached {
+    T value{};
+    uint64_t cycle = 0;
+  };
+
+  std::unique_ptr<franka::Model> model_;
+  const franka::RobotState* state_ = nullptr;
+  // Nothing is computed before the first update, the getters return zeros until then.
+  uint64_t cycle_ = 0;
+  Cached<std::array<double, 49>> mass_matrix_;
+  Cached<std::array<double, 7>> coriolis_;
+  Cached<std::array<double, 7>> gravity_;
+  std::array<Cached<std::array<double, 42>>, kNumberOfFrames> zero_jacobians_;
+  std::array<Cached<std::array<double, 42>>, kNumberOfFrames> body_jacobians_;
+  std::array<Cached<std::array<double, 16>>, kNumberOfFrames> poses_;
+};
+
+}  // namespace franka_hardware
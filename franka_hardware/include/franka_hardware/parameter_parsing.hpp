@@ -0,0 +1,42 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <cstdint>
+#include <string>
+
+namespace franka_hardware {
+
+/**
+ * Parses the value of a hardware parameter as a number.
+ *
+ * @param[in] name name of the parameter, used in the error message.
+ * @param[in] value value of the parameter.
+ * @return the number.
+ * @throw std::invalid_argument if the value is empty or not a finite number.
+ */
+double parseNumber(const std::string& name, const std::string& value);
+
+/**
+ * Parses the value of a hardware parameter as an integer.
+ *
+ * @param[in] name name of the parameter, used in the error message.
+ * @param[in] value value of the parameter.
+ * @return the integer.
+ * @throw std::invalid_argument if the value is empty or not an integer.
+ */
+int64_t parseInteger(const std::string& name, const std::string& value);
+
+}  // namespace franka_hardware
@@ -0,0 +1,100 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <algorithm>
+#include <array>
+#include <atomic>
+#include <cstddef>
+#include <vector>
+
+namespace franka_hardware {
+
+/**
+ * Wait-free bounded single-producer single-consumer queue of values of type T.
+ *
+ * Unlike TripleBuffer, every value is kept until the consumer fetches it. The producer never
+ * blocks: if the queue is full, the new value is rejected. All memory is allocated on
+ * construction, so the producer side can be used from the libfranka realtime callback.
+ *
+ * Exactly one thread may act as producer and exactly one thread may act as consumer.
+ */
+template <typename T>
+class RingBuffer {
+ public:
+  /**
+   * Creates a ring buffer.
+   * @param[in] capacity maximum number of values waiting for the consumer.
+   */
+  explicit RingBuffer(std::size_t capacity) : buffer_(capacity + 1) {}
+
+  RingBuffer(const RingBuffer&) = delete;
+  RingBuffer& operator=(const RingBuffer&) = delete;
+  RingBuffer(RingBuffer&&) = delete;
+  RingBuffer& operator=(RingBuffer&&) = delete;
+
+  /**
+   * Producer side: appends a value.
+   * @param[in] value the new value.
+   * @return false if the queue is full and the value was dropped.
+   */
+  bool push(const T& value) {
+    const std::size_t kHead = head_.load(std::memory_order_relaxed);
+    const std::size_t kNext = increment(kHead);
+    if (kNext == tail_.load(std::memory_order_acquire)) {
+      return false;
+    }
+    buffer_[kHead] = value;
+    head_.store(kNext, std::memory_order_release);
+    return true;
+  }
+
+  /**
+   * Consumer side: removes the oldest values.
+   * @param[out] values receives up to max_count values, oldest first.
+   * @param[in] max_count maximum number of values to remove.
+   * @return number of values written to values.
+   */
+  std::size_t pop(T* values, std::size_t max_count) {
+    const std::size_t kTail = tail_.load(std::memory_order_relaxed);
+    const std::size_t kHead = head_.load(std::memory_order_acquire);
+    const std::size_t kAvailable = kHead >= kTail ? kHead - kTail : buffer_.size() - kTail + kHead;
+    const std::size_t kCount = std::min(kAvailable, max_count);
+    const std::size_t kFirstPart = std::min(kCount, buffer_.size() - kTail);
+    std::copy_n(buffer_.begin() + kTail, kFirstPart, values);
+    std::copy_n(buffer_.begin(), kCount - kFirstPart, values + kFirstPart);
+    tail_.store((kTail + kCount) % buffer_.size(), std::memory_order_release);
+    return kCount;
+  }
+
+  /// @return maximum number of values waiting for the consumer.
+  std::size_t capacity() const { return buffer_.size() - 1; }
+
+ private:
+  static constexpr std::size_t kCacheLineSize = 64;
+
+  std::size_t increment(std::size_t index) const {
+    return index + 1 == buffer_.size() ? 0 : index + 1;
+  }
+
+  // One slot is always left empty to tell a full from an empty queue.
+  std::vector<T> buffer_;
+  // The indices are padded apart so that producer and consumer do not share a cache line.
+  std::atomic<std::size_t> head_{0};
+  std::array<char, kCacheLineSize> padding_head_{};
+  std::atomic<std::size_t> tail_{0};
+};
+
+}  // namespace franka_hardware
@@ -16,6 +16,9 @@
 
 #include <array>
 #include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <functional>
 #include <iostream>
 #include <memory>
 #include <mutex>
@@ -25,19 +28,60 @@
 #include <franka/robot.h>
 #include <rclcpp/logger.hpp>
 
+#include <franka_msgs/srv/set_cartesian_stiffness.hpp>
+#include <franka_msgs/srv/set_force_torque_collision_behavior.hpp>
+#include <franka_msgs/srv/set_full_collision_behavior.hpp>
+#include <franka_msgs/srv/set_joint_stiffness.hpp>
 #include <franka_msgs/srv/set_load.hpp>
+#include <franka_msgs/srv/set_robot_parameters.hpp>
+#include <franka_msgs/srv/set_stiffness_frame.hpp>
+#include <franka_msgs/srv/set_tcp_frame.hpp>
+#include "franka_hardware/control_loop_statistics.hpp"
+#include "franka_hardware/model.hpp"
+#include "franka_hardware/robot_connection.hpp"
+#include "franka_hardware/state_recorder.hpp"
+#include "franka_hardware/thread_configuration.hpp"
+#include "franka_hardware/triple_buffer.hpp"
 namespace franka_hardware {
 
 class Robot {
  public:
+  /// Loops the robot can run. All modes except kIdle stream the robot state.
+  enum class ControlMode : uint8_t {
+    kIdle,
+    kReading,
+    kTorque,
+    kJointPosition,
+    kJointVelocity,
+    kCartesianPose,
+    kCartesianVelocity
+  };
+
   /**
    * Connects to the robot. This method can block for up to one minute if the robot is not
    * responding. An exception will be thrown if the connection cannot be established.
    *
+   * If the loop thread configuration sets a scheduling policy, libfranka does not raise the
+   * priority of the loop thread itself.
+   *
    * @param[in] robot_ip IP address or hostname of the robot.
    * @param[im] logger ROS Logger to print eventual warnings.
+   * @param[in] loop_thread_configuration scheduling and CPU affinity of the loop thread.
    */
-  explicit Robot(const std::string& robot_ip, const rclcpp::Logger& logger);
+  explicit Robot(const std::string& robot_ip,
+                 const rclcpp::Logger& logger,
+                 const ThreadConfiguration& loop_thread_configuration = ThreadConfiguration());
+
+  /**
+   * Uses an established connection, e.g. a LoopbackRobotConnection.
+   *
+   * @param[in] connection connection to the robot.
+   * @param[in] logger ROS Logger to print eventual warnings.
+   * @param[in] loop_thread_configuration scheduling and CPU affinity of the loop thread.
+   */
+  Robot(std::unique_ptr<RobotConnection> connection,
+        const rclcpp::Logger& logger,
+        const ThreadConfiguration& loop_thread_configuration = ThreadConfiguration());
   Robot(const Robot&) = delete;
   Robot& operator=(const Robot& other) = delete;
   Robot& operator=(Robot&& other) = delete;
@@ -47,45 +91,238 @@ class Robot {
   virtual ~Robot();
 
   /**
-   * Starts a torque control loop. Before using this method make sure that no other
-   * control or reading loop is currently active.
+   * Switches the loop thread to the given mode. A running loop is finished and the new loop is
+   * entered right after it on the same thread, so the robot state keeps streaming.
+   * Blocks until the first state of the new loop has been received.
+   *
+   * The motion generator modes hold the current desired state of the robot until the first
+   * command is written after the switch. They should only be left while the robot is at rest.
+   * @param[in] mode loop to run.
+   * @return false if the switch did not complete within kModeSwitchTimeout.
+   */
+  bool initializeControl(ControlMode mode);
+
+  /**
+   * Switches the loop thread to torque control, see initializeControl().
+   * @return false if the switch did not complete within kModeSwitchTimeout.
    */
-  void initializeTorqueControl();
+  bool initializeTorqueControl();
 
   /**
-   * Starts a reading loop of the robot state. Before using this method make sure that no other
-   * control or reading loop is currently active.
+   * Switches the loop thread to reading the robot state. A running control loop is finished and
+   * the reading loop is entered right after it on the same thread.
+   * Blocks until the first state of the reading loop has been received.
+   * @return false if the switch did not complete within kModeSwitchTimeout.
    */
-  void initializeContinuousReading();
+  bool initializeContinuousReading();
 
-  /// stops the control or reading loop of the robot.
+  /// stops the control or reading loop of the robot. The loop thread is kept for the next start.
   void stopRobot();
 
   /**
-   * Get the current robot state in a thread-safe way.
+   * Get the current robot state without blocking the control loop. Must only be called from a
+   * single thread. The returned reference stays valid and unchanged until the next call, so
+   * callers can copy only the fields they need.
+   * @return current robot state.
+   */
+  const franka::RobotState& read();
+
+  /**
+   * Same as read(), additionally reports when the loop thread received the returned state.
+   * @param[out] receive_time time at which the state was received.
    * @return current robot state.
    */
-  franka::RobotState read();
+  const franka::RobotState& read(ControlLoopStatistics::Clock::time_point* receive_time);
+
+  /**
+   * Sends a new joint command to the control loop without blocking it. Depending on the active
+   * mode these are torques, positions or velocities. Must only be called from a single thread,
+   * the same as for the other write methods. The robot will use this command until a new one is
+   * written.
+   * @param[in] command torque [Nm], position [rad] or velocity [rad/s] command for each joint.
+   */
+  void write(const std::array<double, 7>& command);
+
+  /**
+   * Sends a new end effector pose to the Cartesian pose loop without blocking it.
+   * @param[in] pose homogeneous transformation O_T_EE, column-major.
+   */
+  void writeCartesianPose(const std::array<double, 16>& pose);
 
   /**
-   * Sends new desired torque commands to the control loop in a thread-safe way.
-   * The robot will use these torques until a different set of torques are commanded.
-   * @param[in] efforts torque command for each joint.
+   * Sends a new end effector twist to the Cartesian velocity loop without blocking it.
+   * @param[in] velocity [vx, vy, vz] in [m/s] and [wx, wy, wz] in [rad/s], in base frame.
    */
-  void write(const std::array<double, 7>& efforts);
+  void writeCartesianVelocity(const std::array<double, 6>& velocity);
+
+  /// @return the mode of the running loop.
+  ControlMode getControlMode() const;
 
   /// @return true if there is no control or reading loop running.
   bool isStopped() const;
 
-    void setLoad(const franka_msgs::srv::SetLoad::Request::SharedPtr& req);
+  /// @return timing statistics of the control and reading loops.
+  const ControlLoopStatistics& getStatistics() const;
+
+  /// @return model of the robot, loaded when connecting.
+  Model* getModel();
+
+  /**
+   * Records every state received by the control and reading loops to a file, replacing a running
+   * recording. Like the parameter setters, this pauses a running reading loop and is rejected while
+   * a control loop is running.
+   * @param[in] path file to write, see StateRecorder for the format.
+   * @throw std::runtime_error if the file cannot be created.
+   */
+  void startRecording(const std::string& path);
+
+  /// Stops a running recording and writes the remaining samples. Same restrictions as
+  /// startRecording().
+  void stopRecording();
+
+  /*
+   * The following setters perform a blocking network call and must not be called from the
+   * realtime path. libfranka does not accept parameter changes while a control or reading loop
+   * is running, so a running reading loop is paused for the duration of the call. While a control
+   * loop is running the call is rejected with a franka::InvalidOperationException.
+   */
+
+  /**
+   * Sets the joint stiffness of the internal controller.
+   * @param[in] req joint stiffness request.
+   */
+  void setJointStiffness(const franka_msgs::srv::SetJointStiffness::Request::SharedPtr& req);
+
+  /**
+   * Sets the Cartesian stiffness of the internal controller.
+   * @param[in] req Cartesian stiffness request.
+   */
+  void setCartesianStiffness(
+      const franka_msgs::srv::SetCartesianStiffness::Request::SharedPtr& req);
+
+  /**
+   * Sets the transformation from nominal end effector to end effector frame.
+   * @param[in] req TCP frame request.
+   */
+  void setTCPFrame(const franka_msgs::srv::SetTCPFrame::Request::SharedPtr& req);
+
+  /**
+   * Sets the transformation from end effector frame to stiffness frame.
+   * @param[in] req stiffness frame request.
+   */
+  void setStiffnessFrame(const franka_msgs::srv::SetStiffnessFrame::Request::SharedPtr& req);
+
+  /**
+   * Sets the collision thresholds, using the same values for acceleration and nominal phase.
+   * @param[in] req collision behavior request.
+   */
+  void setForceTorqueCollisionBehavior(
+      const franka_msgs::srv::SetForceTorqueCollisionBehavior::Request::SharedPtr& req);
+
+  /**
+   * Sets the collision thresholds for acceleration and nominal phase.
+   * @param[in] req collision behavior request.
+   */
+  void setFullCollisionBehavior(
+      const franka_msgs::srv::SetFullCollisionBehavior::Request::SharedPtr& req);
+
+  /**
+   * Sets the dynamic parameters of a payload.
+   * @param[in] req load request.
+   */
+  void setLoad(const franka_msgs::srv::SetLoad::Request::SharedPtr& req);
+
+  /**
+   * Applies all selected parameters of the request in order, pausing the reading loop only once.
+   * Stops at the first parameter that cannot be set.
+   * @param[in] req batched parameter request.
+   */
+  void setRobotParameters(const franka_msgs::srv::SetRobotParameters::Request::SharedPtr& req);
+
  private:
-  std::unique_ptr<std::thread> control_thread_;
-  std::unique_ptr<franka::Robot> robot_;
-  std::mutex read_mutex_;
-  std::mutex write_mutex_;
-  std::atomic_bool finish_{false};
-  bool stopped_ = true;
-  franka::RobotState current_state_;
-  std::array<double, 7> tau_command_{};
+  /// Maximum time to wait for the loop thread to acknowledge a mode switch
+  static constexpr std::chrono::milliseconds kModeSwitchTimeout{3000};
+
+  struct Command {
+    std::array<double, 7> joint{};
+    std::array<double, 16> cartesian_pose{};
+    std::array<double, 6> cartesian_velocity{};
+    ControlLoopStatistics::Clock::time_point stamp;
+  };
+
+  struct ReceivedState {
+    franka::RobotState state;
+    ControlLoopStatistics::Clock::time_point stamp;
+  };
+
+  /// Body of the loop thread. Runs the requested libfranka loop until the request changes.
+  void runLoop(const ThreadConfiguration& configuration);
+  void runTorqueControl();
+  void runContinuousReading();
+
+  /**
+   * Runs one of the libfranka motion generator loops.
+   * @param[in] mode mode of the loop.
+   * @param[in] controller_mode internal controller tracking the generated motion.
+   * @param[in] hold returns the motion to command before a command was written after the switch.
+   * @param[in] convert converts the written command into the motion.
+   */
+  template <typename MotionGeneratorType>
+  void runMotionGenerator(ControlMode mode,
+                          franka::ControllerMode controller_mode,
+                          MotionGeneratorType (*hold)(const franka::RobotState&),
+                          MotionGeneratorType (*convert)(const Command&));
+
+  /**
+   * Fetches the newest command. Must only be called from the loop thread.
+   * @param[in] now time at which the callback was entered.
+   * @param[in] entry_time time of the first callback of the running loop.
+   * @return the command, or nullptr if no command was written since the loop was entered.
+   */
+  const Command* readCommand(ControlLoopStatistics::Clock::time_point now,
+                             ControlLoopStatistics::Clock::time_point entry_time);
+
+  /// Makes a state received by the loop thread available to read() and the recorder.
+  void publishState(const franka::RobotState& state, ControlLoopStatistics::Clock::time_point now);
+
+  /// Records the state gap and acknowledges the switch on the first callback of a loop.
+  void enterMode(ControlMode mode, ControlLoopStatistics::Clock::time_point now);
+
+  /**
+   * Requests a new mode from the loop thread and waits until it is active.
+   * Must be called with loop_mutex_ held.
+   */
+  bool switchMode(ControlMode mode);
+
+  static const char* toString(ControlMode mode);
+
+  void logRecordingStopped(const StateRecorder& recorder);
+
+  /// Runs a blocking parameter command while no control or reading loop holds the robot.
+  void executeParameterCommand(const std::function<void()>& command);
+
+  std::unique_ptr<RobotConnection> robot_;
+  std::unique_ptr<Model> model_;
+  rclcpp::Logger logger_;
+  // Serializes mode switches with the parameter commands.
+  std::mutex loop_mutex_;
+  // Protects the handshake between switchMode() and the loop thread.
+  mutable std::mutex mode_mutex_;
+  std::condition_variable mode_requested_;
+  std::condition_variable mode_switched_;
+  // Read by the realtime callbacks to decide whether to finish the running loop.
+  std::atomic<ControlMode> requested_mode_{ControlMode::kIdle};
+  ControlMode active_mode_ = ControlMode::kIdle;
+  bool switch_failed_ = false;
+  bool shutdown_ = false;
+  ControlLoopStatistics::Clock::duration last_switch_gap_{};
+  // Only accessed by the loop thread.
+  ControlLoopStatistics::Clock::time_point last_callback_time_;
+  TripleBuffer<ReceivedState> current_state_;
+  TripleBuffer<Command> command_;
+  // Only replaced while the loop thread is idle.
+  std::unique_ptr<StateRecorder> recorder_;
+  ControlLoopStatistics statistics_;
+  std::thread loop_thread_;
 };
 }  // namespace franka_hardware
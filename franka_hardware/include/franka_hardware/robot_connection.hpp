@@ -0,0 +1,160 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <array>
+#include <functional>
+#include <memory>
+#include <string>
+
+#include <franka/control_types.h>
+#include <franka/duration.h>
+#include <franka/robot.h>
+#include <franka/robot_state.h>
+#include <rclcpp/logger.hpp>
+
+#include "franka_hardware/model.hpp"
+
+namespace franka_hardware {
+
+/**
+ * Connection to a robot as used by Robot. The methods have the semantics of the franka::Robot
+ * methods of the same name, including the exceptions they throw.
+ */
+class RobotConnection {
+ public:
+  virtual ~RobotConnection() = default;
+
+  virtual void read(std::function<bool(const franka::RobotState&)> read_callback) = 0;
+
+  virtual void control(
+      std::function<franka::Torques(const franka::RobotState&, franka::Duration)> control_callback,
+      bool limit_rate,
+      double cutoff_frequency) = 0;
+  virtual void control(std::function<franka::JointPositions(const franka::RobotState&,
+                                                            franka::Duration)> motion_callback,
+                       franka::ControllerMode controller_mode,
+                       bool limit_rate,
+                       double cutoff_frequency) = 0;
+  virtual void control(std::function<franka::JointVelocities(const franka::RobotState&,
+                                                             franka::Duration)> motion_callback,
+                       franka::ControllerMode controller_mode,
+                       bool limit_rate,
+                       double cutoff_frequency) = 0;
+  virtual void control(std::function<franka::CartesianPose(const franka::RobotState&,
+                                                           franka::Duration)> motion_callback,
+                       franka::ControllerMode controller_mode,
+                       bool limit_rate,
+                       double cutoff_frequency) = 0;
+  virtual void control(std::function<franka::CartesianVelocities(const franka::RobotState&,
+                                                                 franka::Duration)> motion_callback,
+                       franka::ControllerMode controller_mode,
+                       bool limit_rate,
+                       double cutoff_frequency) = 0;
+
+  virtual void setCollisionBehavior(const std::array<double, 7>& lower_torque_thresholds,
+                                    const std::array<double, 7>& upper_torque_thresholds,
+                                    const std::array<double, 6>& lower_force_thresholds,
+                                    const std::array<double, 6>& upper_force_thresholds) = 0;
+  virtual void setCollisionBehavior(
+      const std::array<double, 7>& lower_torque_thresholds_acceleration,
+      const std::array<double, 7>& upper_torque_thresholds_acceleration,
+      const std::array<double, 7>& lower_torque_thresholds_nominal,
+      const std::array<double, 7>& upper_torque_thresholds_nominal,
+      const std::array<double, 6>& lower_force_thresholds_acceleration,
+      const std::array<double, 6>& upper_force_thresholds_acceleration,
+      const std::array<double, 6>& lower_force_thresholds_nominal,
+      const std::array<double, 6>& upper_force_thresholds_nominal) = 0;
+  virtual void setJointImpedance(const std::array<double, 7>& K_theta) = 0;  // NOLINT
+  virtual void setCartesianImpedance(const std::array<double, 6>& K_x) = 0;  // NOLINT
+  virtual void setEE(const std::array<double, 16>& NE_T_EE) = 0;             // NOLINT
+  virtual void setK(const std::array<double, 16>& EE_T_K) = 0;               // NOLINT
+  virtual void setLoad(double load_mass,
+                       const std::array<double, 3>& F_x_Cload,  // NOLINT
+                       const std::array<double, 9>& load_inertia) = 0;
+
+  /// @return model of the connected robot.
+  virtual std::unique_ptr<Model> loadModel() = 0;
+};
+
+/// Connection to a real robot through libfranka.
+class LibfrankaRobotConnection : public RobotConnection {
+ public:
+  /**
+   * Connects to the robot. This method can block for up to one minute if the robot is not
+   * responding. An exception will be thrown if the connection cannot be established.
+   *
+   * @param[in] robot_ip IP address or hostname of the robot.
+   * @param[in] logger ROS Logger to print eventual warnings.
+   * @param[in] set_realtime_priority if true, libfranka raises the priority of the threads running
+   * the loops and fails if that is not possible on a realtime kernel.
+   */
+  LibfrankaRobotConnection(const std::string& robot_ip,
+                           const rclcpp::Logger& logger,
+                           bool set_realtime_priority = true);
+
+  void read(std::function<bool(const franka::RobotState&)> read_callback) override;
+  void control(
+      std::function<franka::Torques(const franka::RobotState&, franka::Duration)> control_callback,
+      bool limit_rate,
+      double cutoff_frequency) override;
+  void control(std::function<franka::JointPositions(const franka::RobotState&, franka::Duration)>
+                   motion_callback,
+               franka::ControllerMode controller_mode,
+               bool limit_rate,
+               double cutoff_frequency) override;
+  void control(std::function<franka::JointVelocities(const franka::RobotState&, franka::Duration)>
+                   motion_callback,
+               franka::ControllerMode controller_mode,
+               bool limit_rate,
+               double cutoff_frequency) override;
+  void control(std::function<franka::CartesianPose(const franka::RobotState&, franka::Duration)>
+                   motion_callback,
+               franka::ControllerMode controller_mode,
+               bool limit_rate,
+               double cutoff_frequency) override;
+  void control(std::function<franka::CartesianVelocities(const franka::RobotState&,
+                                                         franka::Duration)> motion_callback,
+               franka::ControllerMode controller_mode,
+               bool limit_rate,
+               double cutoff_frequency) override;
+
+  void setCollisionBehavior(const std::array<double, 7>& lower_torque_thresholds,
+                            const std::array<double, 7>& upper_torque_thresholds,
+                            const std::array<double, 6>& lower_force_thresholds,
+                            const std::array<double, 6>& upper_force_thresholds) override;
+  void setCollisionBehavior(const std::array<double, 7>& lower_torque_thresholds_acceleration,
+                            const std::array<double, 7>& upper_torque_thresholds_acceleration,
+                            const std::array<double, 7>& lower_torque_thresholds_nominal,
+                            const std::array<double, 7>& upper_torque_thresholds_nominal,
+                            const std::array<double, 6>& lower_force_thresholds_acceleration,
+                            const std::array<double, 6>& upper_force_thresholds_acceleration,
+                            const std::array<double, 6>& lower_force_thresholds_nominal,
+                            const std::array<double, 6>& upper_force_thresholds_nominal) override;
+  void setJointImpedance(const std::array<double, 7>& K_theta) override;  // NOLINT
+  void setCartesianImpedance(const std::array<double, 6>& K_x) override;  // NOLINT
+  void setEE(const std::array<double, 16>& NE_T_EE) override;             // NOLINT
+  void setK(const std::array<double, 16>& EE_T_K) override;               // NOLINT
+  void setLoad(double load_mass,
+               const std::array<double, 3>& F_x_Cload,  // NOLINT
+               const std::array<double, 9>& load_inertia) override;
+
+  std::unique_ptr<Model> loadModel() override;
+
+ private:
+  std::unique_ptr<franka::Robot> robot_;
+};
+
+}  // namespace franka_hardware
@@ -0,0 +1,137 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <array>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <cstdio>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include <franka/robot_state.h>
+
+#include "franka_hardware/ring_buffer.hpp"
+
+namespace franka_hardware {
+
+/**
+ * One sample of a state recording. All fields are 8 bytes wide so that the record has no padding
+ * and can be mapped directly, e.g. by franka_hardware.state_recording in Python. Transformations
+ * are column-major like in franka::RobotState.
+ */
+struct StateRecord {
+  uint64_t time;      ///< robot time [ms]
+  int64_t host_time;  ///< steady clock of the host when the state was received [ns]
+  int64_t robot_mode;
+  double control_command_success_rate;
+  std::array<double, 7> q;
+  std::array<double, 7> q_d;
+  std::array<double, 7> dq;
+  std::array<double, 7> dq_d;
+  std::array<double, 7> ddq_d;
+  std::array<double, 7> theta;
+  std::array<double, 7> dtheta;
+  std::array<double, 7> tau_J;
+  std::array<double, 7> tau_J_d;
+  std::array<double, 7> dtau_J;
+  std::array<double, 7> tau_ext_hat_filtered;
+  std::array<double, 16> O_T_EE;        // NOLINT(readability-identifier-naming)
+  std::array<double, 16> O_T_EE_d;      // NOLINT(readability-identifier-naming)
+  std::array<double, 16> O_T_EE_c;      // NOLINT(readability-identifier-naming)
+  std::array<double, 6> O_F_ext_hat_K;  // NOLINT(readability-identifier-naming)
+  std::array<double, 6> K_F_ext_hat_K;  // NOLINT(readability-identifier-naming)
+  std::array<double, 6> O_dP_EE_d;      // NOLINT(readability-identifier-naming)
+  std::array<double, 6> O_dP_EE_c;      // NOLINT(readability-identifier-naming)
+  std::array<double, 6> O_ddP_EE_c;     // NOLINT(readability-identifier-naming)
+};
+
+/**
+ * Records robot states to a binary file without blocking the control loop.
+ *
+ * The realtime side copies each state into a ring buffer. A background thread periodically writes
+ * the buffered samples to the file. If the buffer is full, e.g. because the disk stalls, samples
+ * are dropped and counted instead of delaying the control loop.
+ *
+ * The file starts with a header of kMagic, the format version and the record size as
+ * little-endian uint32, followed by one StateRecord per sample.
+ */
+class StateRecorder {
+ public:
+  using Clock = std::chrono::steady_clock;
+
+  static constexpr std::array<char, 8> kMagic{{'F', 'R', 'K', 'S', 'T', 'A', 'T', 'E'}};
+  static constexpr uint32_t kVersion = 1;
+  /// Size of the header preceding the records [bytes]
+  static constexpr std::size_t kHeaderSize = 16;
+  /// Default number of buffered samples, about 8 s at 1 kHz
+  static constexpr std::size_t kDefaultCapacity = 8192;
+
+  /**
+   * Creates the file and starts the writer thread.
+   * @param[in] path file to write. An existing file is overwritten.
+   * @param[in] capacity maximum number of samples waiting to be written.
+   * @throw std::runtime_error if the file cannot be created.
+   */
+  explicit StateRecorder(const std::string& path, std::size_t capacity = kDefaultCapacity);
+  StateRecorder(const StateRecorder&) = delete;
+  StateRecorder& operator=(const StateRecorder&) = delete;
+  StateRecorder(StateRecorder&&) = delete;
+  StateRecorder& operator=(StateRecorder&&) = delete;
+
+  /// Writes the remaining samples and closes the file.
+  ~StateRecorder();
+
+  /**
+   * Queues a state for writing. Never blocks, must only be called from a single thread.
+   * @param[in] state state to record.
+   * @param[in] now time at which the state was received.
+   */
+  void record(const franka::RobotState& state, Clock::time_point now);
+
+  /// @return number of samples written to the file so far.
+  uint64_t writtenSamples() const;
+
+  /// @return number of samples dropped because the buffer was full.
+  uint64_t droppedSamples() const;
+
+  /// @return path of the recording.
+  const std::string& path() const;
+
+ private:
+  /// Time between two writes of the buffered samples
+  static constexpr std::chrono::milliseconds kWritePeriod{10};
+
+  void run();
+  /// @return false if the samples could not be written.
+  bool writeBufferedSamples();
+
+  const std::string path_;
+  std::FILE* file_;
+  RingBuffer<StateRecord> buffer_;
+  std::vector<StateRecord> batch_;
+  std::atomic<uint64_t> written_samples_{0};
+  std::atomic<uint64_t> dropped_samples_{0};
+  std::mutex mutex_;
+  std::condition_variable finish_requested_;
+  bool finish_ = false;
+  std::thread writer_;
+};
+
+}  // namespace franka_hardware
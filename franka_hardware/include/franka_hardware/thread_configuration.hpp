@@ -0,0 +1,78 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+#include <rclcpp/logger.hpp>
+
+namespace franka_hardware {
+
+/// Scheduling and CPU placement requested for one of the threads of the hardware interface.
+struct ThreadConfiguration {
+  /// Name of the thread used in the log
+  std::string name;
+  /// If false, the scheduling policy and priority are left as inherited
+  bool set_scheduling = false;
+  /// SCHED_OTHER, SCHED_FIFO or SCHED_RR
+  int policy = 0;
+  int priority = 0;
+  /// CPUs the thread may run on, empty to leave the affinity as inherited
+  std::vector<int> cpus;
+
+  /// @return true if the configuration leaves the thread as inherited.
+  bool empty() const { return not set_scheduling and cpus.empty(); }
+};
+
+/**
+ * Reads the configuration of a thread from the hardware parameters <prefix>_policy ("other",
+ * "fifo" or "rr"), <prefix>_priority and <prefix>_cpus (comma separated list of CPU numbers).
+ * Missing or empty parameters keep the inherited settings. A priority without a policy selects
+ * "fifo".
+ *
+ * @param[in] parameters hardware parameters.
+ * @param[in] prefix prefix of the parameter names, also used as name of the thread.
+ * @return the configuration.
+ * @throw std::invalid_argument if a parameter has an invalid value.
+ */
+ThreadConfiguration parseThreadConfiguration(
+    const std::unordered_map<std::string, std::string>& parameters,
+    const std::string& prefix);
+
+/**
+ * Applies a configuration to the calling thread and logs the scheduling and affinity that was
+ * actually granted. Threads started afterwards by the calling thread inherit it.
+ *
+ * @param[in] configuration configuration to apply.
+ * @param[in] logger logger for the report.
+ * @return false if a part of the configuration could not be applied.
+ */
+bool applyToCurrentThread(const ThreadConfiguration& configuration, const rclcpp::Logger& logger);
+
+/// @return scheduling policy, priority and allowed CPUs of the calling thread.
+std::string describeCurrentThread();
+
+/**
+ * Locks all current and future pages of the process into memory, so that the control loop is not
+ * delayed by page faults.
+ *
+ * @param[in] logger logger for the report.
+ * @return false if the memory could not be locked, e.g. because of RLIMIT_MEMLOCK.
+ */
+bool lockMemory(const rclcpp::Logger& logger);
+
+}  // namespace franka_hardware
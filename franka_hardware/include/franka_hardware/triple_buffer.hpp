@@ -0,0 +1,112 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <array>
+#include <atomic>
+#include <cstdint>
+
+namespace franka_hardware {
+
+/**
+ * Wait-free single-producer single-consumer exchange of the latest value of type T.
+ *
+ * The producer fills the back buffer and publishes it, the consumer fetches the most recently
+ * published buffer. Neither side ever blocks or waits for the other, which makes this suitable
+ * for passing data in and out of the libfranka realtime callback. Intermediate values are dropped
+ * if the producer is faster than the consumer.
+ *
+ * Exactly one thread may act as producer and exactly one thread may act as consumer.
+ */
+template <typename T>
+class TripleBuffer {
+ public:
+  TripleBuffer() = default;
+
+  /**
+   * Creates a triple buffer where every slot holds the given value.
+   * @param[in] initial_value value returned by the consumer until the first publish.
+   */
+  explicit TripleBuffer(const T& initial_value) { buffers_.fill(initial_value); }
+
+  TripleBuffer(const TripleBuffer&) = delete;
+  TripleBuffer& operator=(const TripleBuffer&) = delete;
+  TripleBuffer(TripleBuffer&&) = delete;
+  TripleBuffer& operator=(TripleBuffer&&) = delete;
+
+  /**
+   * Producer side: access the buffer that will be published next.
+   * The content is whatever was written into this slot the last time it was used.
+   * @return reference to the back buffer.
+   */
+  T& back() { return buffers_.at(back_); }
+
+  /// Producer side: make the back buffer available to the consumer.
+  void publish() {
+    back_ = middle_.exchange(back_ | kNewDataFlag, std::memory_order_acq_rel) & kIndexMask;
+  }
+
+  /**
+   * Producer side: copy a value into the back buffer and publish it.
+   * @param[in] value the new value.
+   */
+  void write(const T& value) {
+    back() = value;
+    publish();
+  }
+
+  /**
+   * Consumer side: swap in the most recently published buffer, if there is one.
+   * @return true if a new value was published since the last call.
+   */
+  bool update() {
+    if ((middle_.load(std::memory_order_relaxed) & kNewDataFlag) == 0) {
+      return false;
+    }
+    front_ = middle_.exchange(front_, std::memory_order_acq_rel) & kIndexMask;
+    return true;
+  }
+
+  /**
+   * Consumer side: access the buffer fetched by the last update(). The reference stays valid and
+   * unchanged until the next call to update(), so readers can copy only the fields they need.
+   * @return reference to the front buffer.
+   */
+  const T& front() const { return buffers_.at(front_); }
+
+  /**
+   * Consumer side: fetch and return the latest value.
+   * @return reference to the front buffer after calling update().
+   */
+  const T& read() {
+    update();
+    return front();
+  }
+
+ private:
+  static constexpr std::uint8_t kIndexMask = 0x3;
+  static constexpr std::uint8_t kNewDataFlag = 0x4;
+  static constexpr std::size_t kCacheLineSize = 64;
+
+  // The indices are padded apart so that producer and consumer do not share a cache line.
+  std::array<T, 3> buffers_{};
+  std::atomic<std::uint8_t> middle_{1};
+  std::array<char, kCacheLineSize> padding_middle_{};
+  std::uint8_t front_{0};
+  std::array<char, kCacheLineSize> padding_front_{};
+  std::uint8_t back_{2};
+};
+
+}  // namespace franka_hardware
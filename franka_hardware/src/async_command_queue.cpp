@@ -0,0 +1,62 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "franka_hardware/async_command_queue.hpp"
+
+#include <utility>
+
+namespace franka_hardware {
+
+AsyncCommandQueue::AsyncCommandQueue(std::size_t capacity)
+    : capacity_(capacity), worker_([this] { run(); }) {}
+
+AsyncCommandQueue::~AsyncCommandQueue() {
+  {
+    std::lock_guard<std::mutex> lock(mutex_);
+    finish_ = true;
+  }
+  command_available_.notify_one();
+  worker_.join();
+}
+
+std::future<void> AsyncCommandQueue::push(std::function<void()> command) {
+  std::packaged_task<void()> task(std::move(command));
+  auto result = task.get_future();
+  {
+    std::lock_guard<std::mutex> lock(mutex_);
+    if (commands_.size() >= capacity_) {
+      return {};
+    }
+    commands_.push_back(std::move(task));
+  }
+  command_available_.notify_one();
+  return result;
+}
+
+void AsyncCommandQueue::run() {
+  std::unique_lock<std::mutex> lock(mutex_);
+  while (true) {
+    command_available_.wait(lock, [this] { return finish_ or not commands_.empty(); });
+    if (finish_) {
+      return;
+    }
+    auto task = std::move(commands_.front());
+    commands_.pop_front();
+    lock.unlock();
+    task();
+    lock.lock();
+  }
+}
+
+}  // namespace franka_hardware
@@ -0,0 +1,99 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "franka_hardware/clock_offset_estimator.hpp"
+
+#include <limits>
+
+namespace franka_hardware {
+
+constexpr double ClockOffsetEstimator::kDefaultWindowLength;
+constexpr std::size_t ClockOffsetEstimator::kDefaultNumberOfWindows;
+
+ClockOffsetEstimator::ClockOffsetEstimator(double window_length, std::size_t number_of_windows)
+    : window_length_(window_length), number_of_windows_(number_of_windows) {
+  minima_.reserve(number_of_windows_);
+}
+
+void ClockOffsetEstimator::update(double robot_time, double receive_time) {
+  const Minimum kSample{robot_time, receive_time - robot_time};
+  const bool kRestart = not valid_ or robot_time < last_robot_time_;
+  last_robot_time_ = robot_time;
+  if (kRestart) {
+    minima_.clear();
+    window_start_ = robot_time;
+    current_ = kSample;
+    valid_ = true;
+  } else if (robot_time - window_start_ >= window_length_) {
+    if (minima_.size() == number_of_windows_) {
+      minima_.erase(minima_.begin());
+    }
+    minima_.push_back(current_);
+    window_start_ = robot_time;
+    current_ = kSample;
+  } else if (kSample.offset < current_.offset) {
+    current_ = kSample;
+    if (not minima_.empty()) {
+      // The fit only changes when a window is finished.
+      return;
+    }
+  } else {
+    return;
+  }
+  fit();
+}
+
+void ClockOffsetEstimator::fit() {
+  // Until the first window is finished, the minimum so far is the best estimate.
+  if (minima_.empty()) {
+    reference_time_ = current_.robot_time;
+    offset_ = current_.offset;
+    drift_ = 0;
+    return;
+  }
+  double mean_time = 0;
+  double mean_offset = 0;
+  for (const auto& minimum : minima_) {
+    mean_time += minimum.robot_time;
+    mean_offset += minimum.offset;
+  }
+  mean_time /= minima_.size();
+  mean_offset /= minima_.size();
+  double covariance = 0;
+  double variance = 0;
+  for (const auto& minimum : minima_) {
+    covariance += (minimum.robot_time - mean_time) * (minimum.offset - mean_offset);
+    variance += (minimum.robot_time - mean_time) * (minimum.robot_time - mean_time);
+  }
+  reference_time_ = mean_time;
+  offset_ = mean_offset;
+  drift_ = variance > 0 ? covariance / variance : 0;
+}
+
+double ClockOffsetEstimator::toHostTime(double robot_time) const {
+  if (not valid_) {
+    return std::numeric_limits<double>::quiet_NaN();
+  }
+  return robot_time + offset_ + drift_ * (robot_time - reference_time_);
+}
+
+double ClockOffsetEstimator::drift() const {
+  return drift_;
+}
+
+bool ClockOffsetEstimator::isValid() const {
+  return valid_;
+}
+
+}  // namespace franka_hardware
@@ -0,0 +1,142 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "franka_hardware/control_loop_statistics.hpp"
+
+#include <algorithm>
+#include <cmath>
+
+namespace franka_hardware {
+
+namespace {
+// Only one thread writes each value, so a plain load and store is enough and avoids locked
+// read-modify-write instructions on the realtime path.
+template <typename T>
+void increment(std::atomic<T>& value, T delta) {
+  value.store(value.load(std::memory_order_relaxed) + delta, std::memory_order_relaxed);
+}
+}  // namespace
+
+constexpr std::size_t LatencyHistogram::kNumberOfBuckets;
+
+LatencyHistogram::LatencyHistogram(std::chrono::nanoseconds bucket_width)
+    : bucket_width_(bucket_width) {}
+
+void LatencyHistogram::record(std::chrono::nanoseconds value) {
+  const auto kNanoseconds = std::max<int64_t>(value.count(), 0);
+  const auto kBucket =
+      std::min<std::size_t>(kNanoseconds / bucket_width_.count(), kNumberOfBuckets);
+  increment<uint64_t>(buckets_.at(kBucket), 1);
+  if (kNanoseconds > max_ns_.load(std::memory_order_relaxed)) {
+    max_ns_.store(kNanoseconds, std::memory_order_relaxed);
+  }
+  // count_ is published last, so a reader never sees more values than bucket entries.
+  count_.store(count_.load(std::memory_order_relaxed) + 1, std::memory_order_release);
+}
+
+uint64_t LatencyHistogram::count() const {
+  return count_.load(std::memory_order_acquire);
+}
+
+std::chrono::nanoseconds LatencyHistogram::max() const {
+  return std::chrono::nanoseconds(max_ns_.load(std::memory_order_relaxed));
+}
+
+std::chrono::nanoseconds LatencyHistogram::percentile(double percentile) const {
+  const auto kCount = count();
+  if (kCount == 0) {
+    return std::chrono::nanoseconds(0);
+  }
+  const auto kRank =
+      static_cast<uint64_t>(std::ceil(std::min(std::max(percentile, 0.), 1.) * kCount));
+  uint64_t seen = 0;
+  for (std::size_t i = 0; i < kNumberOfBuckets; i++) {
+    seen += buckets_.at(i).load(std::memory_order_relaxed);
+    if (seen >= std::max<uint64_t>(kRank, 1)) {
+      return std::min(bucket_width_ * static_cast<int64_t>(i + 1), max());
+    }
+  }
+  return max();
+}
+
+ControlLoopStatistics::ControlLoopStatistics()
+    : period_(std::chrono::microseconds(50)),
+      command_age_(std::chrono::microseconds(50)),
+      mode_switch_gap_(std::chrono::milliseconds(1)) {}
+
+void ControlLoopStatistics::recordCycle(const franka::RobotState& state,
+                                        Clock::time_point now,
+                                        bool controlling) {
+  const uint64_t kRobotTimeMs = state.time.toMSec();
+  if (has_last_cycle_) {
+    period_.record(now - last_cycle_time_);
+    if (kRobotTimeMs > last_robot_time_ms_ + 1) {
+      increment<uint64_t>(missed_cycles_, kRobotTimeMs - last_robot_time_ms_ - 1);
+    }
+  }
+  has_last_cycle_ = true;
+  last_cycle_time_ = now;
+  last_robot_time_ms_ = kRobotTimeMs;
+
+  if (controlling) {
+    last_success_rate_.store(state.control_command_success_rate, std::memory_order_relaxed);
+    if (state.control_command_success_rate <
+        minimum_success_rate_.load(std::memory_order_relaxed)) {
+      minimum_success_rate_.store(state.control_command_success_rate, std::memory_order_relaxed);
+    }
+  }
+  increment<uint64_t>(cycles_, 1);
+}
+
+void ControlLoopStatistics::recordCommandAge(Clock::duration age) {
+  command_age_.record(age);
+}
+
+void ControlLoopStatistics::recordModeSwitch(Clock::duration gap) {
+  mode_switch_gap_.record(gap);
+}
+
+void ControlLoopStatistics::restart() {
+  has_last_cycle_ = false;
+}
+
+uint64_t ControlLoopStatistics::cycles() const {
+  return cycles_.load(std::memory_order_relaxed);
+}
+
+uint64_t ControlLoopStatistics::missedCycles() const {
+  return missed_cycles_.load(std::memory_order_relaxed);
+}
+
+double ControlLoopStatistics::lastSuccessRate() const {
+  return last_success_rate_.load(std::memory_order_relaxed);
+}
+
+double ControlLoopStatistics::minimumSuccessRate() const {
+  return minimum_success_rate_.load(std::memory_order_relaxed);
+}
+
+const LatencyHistogram& ControlLoopStatistics::period() const {
+  return period_;
+}
+
+const LatencyHistogram& ControlLoopStatistics::commandAge() const {
+  return command_age_;
+}
+
+const LatencyHistogram& ControlLoopStatistics::modeSwitchGap() const {
+  return mode_switch_gap_;
+}
+
+}  // namespace franka_hardware
@@ -0,0 +1,99 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "franka_hardware/franka_diagnostics_publisher.hpp"
+
+#include <chrono>
+#include <utility>
+
+#include <diagnostic_msgs/msg/diagnostic_status.hpp>
+#include <diagnostic_msgs/msg/key_value.hpp>
+
+namespace franka_hardware {
+
+namespace {
+diagnostic_msgs::msg::KeyValue keyValue(const std::string& key, const std::string& value) {
+  diagnostic_msgs::msg::KeyValue key_value;
+  key_value.key = key;
+  key_value.value = value;
+  return key_value;
+}
+
+std::string toMicroseconds(std::chrono::nanoseconds duration) {
+  return std::to_string(std::chrono::duration<double, std::micro>(duration).count());
+}
+
+void addHistogram(const std::string& name,
+                  const LatencyHistogram& histogram,
+                  diagnostic_msgs::msg::DiagnosticStatus* status) {
+  status->values.push_back(keyValue(name + " p50 [us]", toMicroseconds(histogram.percentile(0.5))));
+  status->values.push_back(
+      keyValue(name + " p99 [us]", toMicroseconds(histogram.percentile(0.99))));
+  status->values.push_back(keyValue(name + " max [us]", toMicroseconds(histogram.max())));
+}
+}  // namespace
+
+FrankaDiagnosticsPublisher::FrankaDiagnosticsPublisher(const rclcpp::NodeOptions& options,
+                                                       std::shared_ptr<Robot> robot,
+                                                       double publish_rate,
+                                                       const std::string& node_namespace)
+    : rclcpp::Node("diagnostics_publisher", node_namespace, options),
+      robot_(std::move(robot)),
+      status_name_(node_namespace.empty()
+                       ? "franka_hardware: control loop"
+                       : "franka_hardware: " + node_namespace + " control loop") {
+  publisher_ = create_publisher<diagnostic_msgs::msg::DiagnosticArray>("/diagnostics", 1);
+  timer_ = create_wall_timer(rclcpp::WallRate(publish_rate).period(),
+                             [this]() { return publishDiagnostics(); });
+}
+
+void FrankaDiagnosticsPublisher::publishDiagnostics() {
+  const auto& kStatistics = robot_->getStatistics();
+
+  diagnostic_msgs::msg::DiagnosticStatus status;
+  status.name = status_name_;
+  status.hardware_id = "franka";
+  status.level = diagnostic_msgs::msg::DiagnosticStatus::OK;
+  status.message = "OK";
+
+  const auto kMissedCycles = kStatistics.missedCycles();
+  if (kMissedCycles > last_missed_cycles_) {
+    status.level = diagnostic_msgs::msg::DiagnosticStatus::WARN;
+    status.message =
+        std::to_string(kMissedCycles - last_missed_cycles_) + " cycles missed since last report";
+  } else if (kStatistics.lastSuccessRate() < kSuccessRateWarningThreshold) {
+    status.level = diagnostic_msgs::msg::DiagnosticStatus::WARN;
+    status.message = "Low control command success rate";
+  }
+  last_missed_cycles_ = kMissedCycles;
+
+  status.values.push_back(keyValue("cycles", std::to_string(kStatistics.cycles())));
+  status.values.push_back(keyValue("missed cycles", std::to_string(kMissedCycles)));
+  status.values.push_back(
+      keyValue("control command success rate", std::to_string(kStatistics.lastSuccessRate())));
+  status.values.push_back(keyValue("minimum control command success rate",
+                                   std::to_string(kStatistics.minimumSuccessRate())));
+  addHistogram("callback period", kStatistics.period(), &status);
+  addHistogram("command age", kStatistics.commandAge(), &status);
+  status.values.push_back(
+      keyValue("mode switches", std::to_string(kStatistics.modeSwitchGap().count())));
+  addHistogram("mode switch state gap", kStatistics.modeSwitchGap(), &status);
+
+  diagnostic_msgs::msg::DiagnosticArray diagnostics;
+  diagnostics.header.stamp = now();
+  diagnostics.status.push_back(status);
+  publisher_->publish(diagnostics);
+}
+
+}  // namespace franka_hardware
@@ -15,30 +15,38 @@
 #include "franka_hardware/franka_executor.hpp"
 
 namespace franka_hardware {
-using namespace std::chrono_literals;
 
-FrankaExecutor::FrankaExecutor() : executor_spin_([this] { run(); }) {
-  while (!this->spinning) {
-    // Need to wait until the executor starts spinning
-    std::this_thread::sleep_for(100ms);
-  }
-}
+constexpr std::chrono::milliseconds FrankaExecutor::kCancelRetryPeriod;
+
+FrankaExecutor::FrankaExecutor(const ThreadConfiguration& configuration,
+                               const rclcpp::Logger& logger)
+    : executor_spin_([this, configuration, logger] { run(configuration, logger); }) {}
 
 FrankaExecutor::~FrankaExecutor() {
-  // if the executor still spinning cancel it
-  this->shutdown();
+  std::unique_lock<std::mutex> lock(stopped_mutex_);
+  // A cancel before the thread entered spin() has no effect, so it is repeated until the thread
+  // reports that it left spin().
+  while (not stopped_) {
+    this->shutdown();
+    stopped_changed_.wait_for(lock, kCancelRetryPeriod);
+  }
+  lock.unlock();
   executor_spin_.join();
 }
 
-void FrankaExecutor::run() {
+void FrankaExecutor::run(const ThreadConfiguration& configuration, const rclcpp::Logger& logger) {
+  if (not configuration.empty()) {
+    applyToCurrentThread(configuration, logger);
+  }
   // spin the executor
   spin();
+  std::lock_guard<std::mutex> lock(stopped_mutex_);
+  stopped_ = true;
+  stopped_changed_.notify_all();
 }
 
 void FrankaExecutor::shutdown() {
-  if (this->spinning) {
-    this->cancel();
-  }
+  this->cancel();
 }
 
 }  // namespace franka_hardware
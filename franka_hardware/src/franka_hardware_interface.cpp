@@ -15,10 +15,23 @@
 #include <franka_hardware/franka_hardware_interface.hpp>
 
 #include <algorithm>
+#include <chrono>
 #include <cmath>
+#include <cstdint>
 #include <exception>
+#include <future>
+#include <map>
+#include <stdexcept>
+#include <string>
+#include <unordered_map>
+#include <utility>
+#include <vector>
 
 #include <franka/exception.h>
+#include <franka_hardware/franka_robot_model.hpp>
+#include <franka_hardware/loopback_robot_connection.hpp>
+#include <franka_hardware/parameter_parsing.hpp>
+#include <franka_hardware/thread_configuration.hpp>
 #include <hardware_interface/handle.hpp>
 #include <hardware_interface/hardware_info.hpp>
 #include <hardware_interface/system_interface.hpp>
@@ -32,84 +45,273 @@ namespace franka_hardware {
 using StateInterface = hardware_interface::StateInterface;
 using CommandInterface = hardware_interface::CommandInterface;
 
+namespace {
+double toSeconds(ControlLoopStatistics::Clock::duration duration) {
+  return std::chrono::duration<double>(duration).count();
+}
+
+template <std::size_t N>
+bool isFinite(const std::array<double, N>& command) {
+  return std::all_of(command.begin(), command.end(), [](double c) { return std::isfinite(c); });
+}
+
+/// xacro renders booleans as "True" and "False"
+bool isEnabled(const std::unordered_map<std::string, std::string>& parameters,
+               const std::string& name) {
+  const auto kParameter = parameters.find(name);
+  return kParameter != parameters.end() and
+         (kParameter->second == "true" or kParameter->second == "True");
+}
+
+/// Splits a comma separated parameter value, e.g. the IDs of several arms
+std::vector<std::string> splitList(const std::string& value) {
+  std::vector<std::string> items;
+  std::string::size_type start = 0;
+  while (start <= value.size()) {
+    auto end = value.find(',', start);
+    if (end == std::string::npos) {
+      end = value.size();
+    }
+    const auto kFirst = value.find_first_not_of(" \t", start);
+    const auto kLast = value.find_last_not_of(" \t", end - 1);
+    if (kFirst < end and kLast != std::string::npos and kLast >= kFirst) {
+      items.push_back(value.substr(kFirst, kLast - kFirst + 1));
+    }
+    start = end + 1;
+  }
+  return items;
+}
+}  // namespace
+
 std::vector<StateInterface> FrankaHardwareInterface::export_state_interfaces() {
+  // All interfaces point into the robot state snapshots, which read() updates once per cycle.
   std::vector<StateInterface> state_interfaces;
-  for (auto i = 0U; i < info_.joints.size(); i++) {
-    state_interfaces.emplace_back(StateInterface(
-        info_.joints[i].name, hardware_interface::HW_IF_POSITION, &hw_positions_.at(i)));
-    state_interfaces.emplace_back(StateInterface(
-        info_.joints[i].name, hardware_interface::HW_IF_VELOCITY, &hw_velocities_.at(i)));
+  for (auto& arm : arms_) {
+    auto& state = arm.hw_franka_robot_state;
+    for (auto i = 0U; i < arm.joints.size(); i++) {
+      const auto& kJointName = info_.joints[arm.joints[i]].name;
+      state_interfaces.emplace_back(
+          StateInterface(kJointName, hardware_interface::HW_IF_POSITION, &state.q.at(i)));
+      state_interfaces.emplace_back(
+          StateInterface(kJointName, hardware_interface::HW_IF_VELOCITY, &state.dq.at(i)));
+      state_interfaces.emplace_back(
+          StateInterface(kJointName, hardware_interface::HW_IF_EFFORT, &state.tau_J.at(i)));
+      state_interfaces.emplace_back(
+          StateInterface(kJointName, "tau_ext_hat_filtered", &state.tau_ext_hat_filtered.at(i)));
+      state_interfaces.emplace_back(StateInterface(kJointName, "dtau_J", &state.dtau_J.at(i)));
+    }
+    const auto& kArmId = arm.arm_id;
+    for (auto i = 0U; i < state.O_F_ext_hat_K.size(); i++) {
+      state_interfaces.emplace_back(
+          StateInterface(kArmId, "O_F_ext_hat_K_" + std::to_string(i), &state.O_F_ext_hat_K.at(i)));
+    }
+    // O_T_EE in column-major order
+    for (auto i = 0U; i < state.O_T_EE.size(); i++) {
+      state_interfaces.emplace_back(
+          StateInterface(kArmId, "O_T_EE_" + std::to_string(i), &state.O_T_EE.at(i)));
+    }
+    state_interfaces.emplace_back(StateInterface(kArmId, "time", &arm.hw_robot_time));
+    state_interfaces.emplace_back(StateInterface(kArmId, "state_age", &arm.hw_state_age));
     state_interfaces.emplace_back(
-        StateInterface(info_.joints[i].name, hardware_interface::HW_IF_EFFORT, &hw_efforts_.at(i)));
+        StateInterface(kArmId, "measurement_time", &arm.hw_measurement_time));
+    state_interfaces.emplace_back(StateInterface(kArmId, FrankaRobotModel::kRobotModelInterface,
+                                                 &arm.hw_robot_model_pointer));
+    state_interfaces.emplace_back(StateInterface(kArmId, FrankaRobotModel::kRobotStateInterface,
+                                                 &arm.hw_robot_state_pointer));
   }
   return state_interfaces;
 }
 
 std::vector<CommandInterface> FrankaHardwareInterface::export_command_interfaces() {
   std::vector<CommandInterface> command_interfaces;
-  command_interfaces.reserve(info_.joints.size());
-  for (auto i = 0U; i < info_.joints.size(); i++) {
-    command_interfaces.emplace_back(CommandInterface(
-        info_.joints[i].name, hardware_interface::HW_IF_EFFORT, &hw_commands_.at(i)));
+  const std::array<std::string, 6> kCartesianVelocityNames{"vx", "vy", "vz", "wx", "wy", "wz"};
+  for (auto& arm : arms_) {
+    for (auto i = 0U; i < arm.joints.size(); i++) {
+      const auto& kJoint = info_.joints[arm.joints[i]];
+      for (const auto& command_interface : kJoint.command_interfaces) {
+        double* command = &arm.hw_commands.at(i);
+        if (command_interface.name == hardware_interface::HW_IF_POSITION) {
+          command = &arm.hw_position_commands.at(i);
+        } else if (command_interface.name == hardware_interface::HW_IF_VELOCITY) {
+          command = &arm.hw_velocity_commands.at(i);
+        }
+        command_interfaces.emplace_back(
+            CommandInterface(kJoint.name, command_interface.name, command));
+      }
+    }
+    // O_T_EE in column-major order
+    for (auto i = 0U; i < arm.hw_cartesian_pose_commands.size(); i++) {
+      command_interfaces.emplace_back(CommandInterface(
+          arm.arm_id, std::string(kCartesianPoseInterface) + "_" + std::to_string(i),
+          &arm.hw_cartesian_pose_commands.at(i)));
+    }
+    for (auto i = 0U; i < arm.hw_cartesian_velocity_commands.size(); i++) {
+      command_interfaces.emplace_back(CommandInterface(
+          arm.arm_id,
+          std::string(kCartesianVelocityInterface) + "_" + kCartesianVelocityNames.at(i),
+          &arm.hw_cartesian_velocity_commands.at(i)));
+    }
   }
   return command_interfaces;
 }
 
 FrankaHardwareInterface::CallbackReturn FrankaHardwareInterface::on_activate(const rclcpp_lifecycle::State &) {
-  robot_->initializeContinuousReading();
-  hw_commands_.fill(0);
+  if (finishConnection() != CallbackReturn::SUCCESS) {
+    return CallbackReturn::ERROR;
+  }
+  for (auto& arm : arms_) {
+    if (not arm.robot->initializeContinuousReading()) {
+      return CallbackReturn::ERROR;
+    }
+    arm.claimed_mode = Robot::ControlMode::kReading;
+    arm.running_mode = Robot::ControlMode::kReading;
+    arm.hw_commands.fill(0);
+  }
   // Note: read does not use Time in the version of the api
-  read(rclcpp::Time(), rclcpp::Time()-rclcpp::Time());  // makes sure that the robot state is properly initialized.
+  // makes sure that the robot state is properly initialized.
+  read(rclcpp::Clock().now(), rclcpp::Time() - rclcpp::Time());
   RCLCPP_INFO(getLogger(), "Started");
   return rclcpp_lifecycle::node_interfaces::LifecycleNodeInterface::CallbackReturn::SUCCESS;
 }
 
 FrankaHardwareInterface::CallbackReturn   FrankaHardwareInterface::on_deactivate(const rclcpp_lifecycle::State &) {
   RCLCPP_INFO(getLogger(), "trying to Stop...");
-  robot_->stopRobot();
+  for (auto& arm : arms_) {
+    arm.robot->stopRobot();
+  }
   RCLCPP_INFO(getLogger(), "Stopped");
   return rclcpp_lifecycle::node_interfaces::LifecycleNodeInterface::CallbackReturn::SUCCESS;
 }
 
-hardware_interface::return_type FrankaHardwareInterface::read(const rclcpp::Time &, const rclcpp::Duration & ) {
-  const auto kState = robot_->read();
-  hw_positions_ = kState.q;
-  hw_velocities_ = kState.dq;
-  hw_efforts_ = kState.tau_J;
+hardware_interface::return_type FrankaHardwareInterface::read(const rclcpp::Time& time,
+                                                              const rclcpp::Duration&) {
+  // Take the snapshots of all arms back to back before the slower model updates, so that they are
+  // as close in time as possible.
+  const auto kNow = ControlLoopStatistics::Clock::now();
+  for (auto& arm : arms_) {
+    arm.hw_franka_robot_state = arm.robot->read(&arm.receive_time);
+  }
+  for (auto& arm : arms_) {
+    arm.robot->getModel()->update(arm.hw_franka_robot_state);
+    arm.hw_robot_time = arm.hw_franka_robot_state.time.toSec();
+    arm.hw_state_age = toSeconds(kNow - arm.receive_time);
+    // Map the robot time onto the steady clock and from there onto the ROS time of this cycle.
+    arm.clock.update(arm.hw_robot_time, toSeconds(arm.receive_time.time_since_epoch()));
+    arm.hw_measurement_time = time.seconds() - toSeconds(kNow.time_since_epoch()) +
+                              arm.clock.toHostTime(arm.hw_robot_time);
+  }
   return hardware_interface::return_type::OK;
 }
 
 hardware_interface::return_type FrankaHardwareInterface::write(const rclcpp::Time &, const rclcpp::Duration & ) {
-  if (std::any_of(hw_commands_.begin(), hw_commands_.end(),
-                  [](double c) { return not std::isfinite(c); })) {
-    return hardware_interface::return_type::ERROR;
+  // Check the commands of all arms first, so that either all arms get their command in this cycle
+  // or none.
+  for (const auto& arm : arms_) {
+    bool finite = true;
+    switch (arm.running_mode) {
+      case Robot::ControlMode::kTorque:
+        finite = isFinite(arm.hw_commands);
+        break;
+      case Robot::ControlMode::kJointPosition:
+        finite = isFinite(arm.hw_position_commands);
+        break;
+      case Robot::ControlMode::kJointVelocity:
+        finite = isFinite(arm.hw_velocity_commands);
+        break;
+      case Robot::ControlMode::kCartesianPose:
+        finite = isFinite(arm.hw_cartesian_pose_commands);
+        break;
+      case Robot::ControlMode::kCartesianVelocity:
+        finite = isFinite(arm.hw_cartesian_velocity_commands);
+        break;
+      default:
+        break;
+    }
+    if (not finite) {
+      return hardware_interface::return_type::ERROR;
+    }
+  }
+  for (auto& arm : arms_) {
+    switch (arm.running_mode) {
+      case Robot::ControlMode::kTorque:
+        arm.robot->write(arm.hw_commands);
+        break;
+      case Robot::ControlMode::kJointPosition:
+        arm.robot->write(arm.hw_position_commands);
+        break;
+      case Robot::ControlMode::kJointVelocity:
+        arm.robot->write(arm.hw_velocity_commands);
+        break;
+      case Robot::ControlMode::kCartesianPose:
+        arm.robot->writeCartesianPose(arm.hw_cartesian_pose_commands);
+        break;
+      case Robot::ControlMode::kCartesianVelocity:
+        arm.robot->writeCartesianVelocity(arm.hw_cartesian_velocity_commands);
+        break;
+      default:
+        break;
+    }
   }
-
-  robot_->write(hw_commands_);
   return hardware_interface::return_type::OK;
 }
 
 FrankaHardwareInterface::CallbackReturn FrankaHardwareInterface::on_init(const hardware_interface::HardwareInfo& info) {
+  init_start_time_ = std::chrono::steady_clock::now();
     if(hardware_interface::SystemInterface::on_init(info) != CallbackReturn::SUCCESS)
     {
         return CallbackReturn::ERROR;
     }
-  if (info_.joints.size() != kNumberOfJoints) {
-    RCLCPP_FATAL(getLogger(), "Got %zu joints. Expected %zu.", info_.joints.size(), kNumberOfJoints);
+  std::vector<std::string> arm_ids{kDefaultArmId};
+  const auto kArmId = info_.hardware_parameters.find("arm_id");
+  if (kArmId != info_.hardware_parameters.end()) {
+    arm_ids = splitList(kArmId->second);
+  }
+  if (arm_ids.empty()) {
+    RCLCPP_FATAL(getLogger(), "Parameter 'arm_id' is empty");
     return CallbackReturn::ERROR;
   }
+  arms_ = std::vector<Arm>(arm_ids.size());
+  for (auto i = 0U; i < arms_.size(); i++) {
+    arms_[i].arm_id = arm_ids[i];
+  }
+  // With several arms, each joint belongs to the arm whose ID prefixes the joint name.
+  for (auto i = 0U; i < info_.joints.size(); i++) {
+    const auto& kJointName = info_.joints[i].name;
+    auto arm = std::find_if(arms_.begin(), arms_.end(), [&kJointName](const Arm& arm) {
+      return kJointName.rfind(arm.arm_id + "_", 0) == 0;
+    });
+    if (arms_.size() == 1) {
+      arm = arms_.begin();
+    } else if (arm == arms_.end()) {
+      RCLCPP_FATAL(getLogger(), "Joint '%s' does not belong to any arm.", kJointName.c_str());
+      return CallbackReturn::ERROR;
+    }
+    arm->joints.push_back(i);
+  }
+  for (const auto& arm : arms_) {
+    if (arm.joints.size() != kNumberOfJoints) {
+      RCLCPP_FATAL(getLogger(arm), "Got %zu joints. Expected %zu.", arm.joints.size(),
+                   kNumberOfJoints);
+      return CallbackReturn::ERROR;
+    }
+  }
 
   for (const auto& joint : info_.joints) {
-    if (joint.command_interfaces.size() != 1) {
-      RCLCPP_FATAL(getLogger(), "Joint '%s' has %zu command interfaces found. 1 expected.",
-                   joint.name.c_str(), joint.command_interfaces.size());
+    if (joint.command_interfaces.empty()) {
+      RCLCPP_FATAL(getLogger(), "Joint '%s' has no command interfaces.", joint.name.c_str());
       return CallbackReturn::ERROR;
     }
-    if (joint.command_interfaces[0].name != hardware_interface::HW_IF_EFFORT) {
-      RCLCPP_FATAL(getLogger(), "Joint '%s' has unexpected command interface '%s'. Expected '%s'",
-                   joint.name.c_str(), joint.command_interfaces[0].name.c_str(),
-                   hardware_interface::HW_IF_EFFORT);
-      return CallbackReturn::ERROR;
+    for (const auto& command_interface : joint.command_interfaces) {
+      if (command_interface.name != hardware_interface::HW_IF_EFFORT and
+          command_interface.name != hardware_interface::HW_IF_POSITION and
+          command_interface.name != hardware_interface::HW_IF_VELOCITY) {
+        RCLCPP_FATAL(
+            getLogger(),
+            "Joint '%s' has unexpected command interface '%s'. Expected '%s', '%s' or '%s'",
+            joint.name.c_str(), command_interface.name.c_str(), hardware_interface::HW_IF_EFFORT,
+            hardware_interface::HW_IF_POSITION, hardware_interface::HW_IF_VELOCITY);
+        return CallbackReturn::ERROR;
+      }
     }
     if (joint.state_interfaces.size() != 3) {
       RCLCPP_FATAL(getLogger(), "Joint '%s' has %zu state interfaces found. 3 expected.",
@@ -132,26 +334,178 @@ FrankaHardwareInterface::CallbackReturn FrankaHardwareInterface::on_init(const h
                    hardware_interface::HW_IF_EFFORT);
     }
   }
-  std::string robot_ip;
+  const auto kParameters = info_.hardware_parameters;
+  ThreadConfiguration executor_thread_configuration;
+  std::vector<ThreadConfiguration> loop_thread_configurations;
   try {
-    robot_ip = info_.hardware_parameters.at("robot_ip");
-  } catch (const std::out_of_range& ex) {
-    RCLCPP_FATAL(getLogger(), "Parameter 'robot_ip' not set");
+    const auto kLoopThreadConfiguration = parseThreadConfiguration(kParameters, "loop_thread");
+    for (const auto& arm : arms_) {
+      // <arm_id>_loop_thread_* parameters override the configuration shared by all arms
+      auto configuration = parseThreadConfiguration(kParameters, arm.arm_id + "_loop_thread");
+      loop_thread_configurations.push_back(configuration.empty() ? kLoopThreadConfiguration
+                                                                 : configuration);
+    }
+    executor_thread_configuration = parseThreadConfiguration(kParameters, "executor_thread");
+  } catch (const std::invalid_argument& e) {
+    RCLCPP_FATAL(getLogger(), e.what());
     return CallbackReturn::ERROR;
   }
-  try {
-    RCLCPP_INFO(getLogger(), "Connecting to robot at \"%s\" ...", robot_ip.c_str());
-    robot_ = std::make_shared<Robot>(robot_ip, getLogger());
-  } catch (const franka::Exception& e) {
-    RCLCPP_FATAL(getLogger(), "Could not connect to robot");
-    RCLCPP_FATAL(getLogger(), e.what());
+  if (isEnabled(kParameters, "lock_memory")) {
+    lockMemory(getLogger());
+  }
+
+  // Connecting can take up to a minute. The arms connect in parallel in the background while the
+  // rest of the bringup continues and are only waited for when the hardware is configured.
+  if (isEnabled(kParameters, "loopback")) {
+    double packet_loss = 0.;
+    int64_t delay_us = 0;
+    try {
+      const auto kPacketLoss = kParameters.find("loopback_packet_loss");
+      if (kPacketLoss != kParameters.end()) {
+        packet_loss = parseNumber(kPacketLoss->first, kPacketLoss->second);
+      }
+      const auto kDelay = kParameters.find("loopback_delay_us");
+      if (kDelay != kParameters.end()) {
+        delay_us = parseInteger(kDelay->first, kDelay->second);
+      }
+    } catch (const std::invalid_argument& e) {
+      RCLCPP_FATAL(getLogger(), e.what());
+      return CallbackReturn::ERROR;
+    }
+    if (packet_loss < 0. or packet_loss > 1.) {
+      RCLCPP_FATAL(getLogger(), "Parameter 'loopback_packet_loss' must be within [0, 1], got %f",
+                   packet_loss);
+      return CallbackReturn::ERROR;
+    }
+    if (delay_us < 0) {
+      RCLCPP_FATAL(getLogger(), "Parameter 'loopback_delay_us' must not be negative, got %ld",
+                   delay_us);
+      return CallbackReturn::ERROR;
+    }
+    RCLCPP_INFO(getLogger(), "Using loopback robot, packet loss %f, delay %ld us", packet_loss,
+                delay_us);
+    for (auto i = 0U; i < arms_.size(); i++) {
+      const auto kLogger = getLogger(arms_[i]);
+      const auto kConfiguration = loop_thread_configurations[i];
+      arms_[i].connection =
+          std::async(std::launch::async, [packet_loss, delay_us, kLogger, kConfiguration]() {
+            return std::make_shared<Robot>(std::make_unique<LoopbackRobotConnection>(
+                                               packet_loss, std::chrono::microseconds(delay_us)),
+                                           kLogger, kConfiguration);
+          });
+    }
+  } else {
+    const auto kRobotIp = kParameters.find("robot_ip");
+    if (kRobotIp == kParameters.end()) {
+      RCLCPP_FATAL(getLogger(), "Parameter 'robot_ip' not set");
+      return CallbackReturn::ERROR;
+    }
+    const auto kRobotIps = splitList(kRobotIp->second);
+    if (kRobotIps.size() != arms_.size()) {
+      RCLCPP_FATAL(getLogger(), "Got %zu robot IPs for %zu arms.", kRobotIps.size(), arms_.size());
+      return CallbackReturn::ERROR;
+    }
+    for (auto i = 0U; i < arms_.size(); i++) {
+      const auto kLogger = getLogger(arms_[i]);
+      const auto kConfiguration = loop_thread_configurations[i];
+      const auto& robot_ip = kRobotIps[i];
+      RCLCPP_INFO(kLogger, "Connecting to robot at \"%s\" ...", robot_ip.c_str());
+      arms_[i].connection = std::async(std::launch::async, [robot_ip, kLogger, kConfiguration]() {
+        return std::make_shared<Robot>(robot_ip, kLogger, kConfiguration);
+      });
+    }
+  }
+  for (auto& arm : arms_) {
+    arm.hw_robot_state_pointer = pointerToStateValue(&arm.hw_franka_robot_state);
+  }
+
+  executor_ = std::make_shared<FrankaExecutor>(executor_thread_configuration, getLogger());
+  RCLCPP_INFO(
+      getLogger(), "Initialized %zu arm(s) in %.1f ms, connecting in the background", arms_.size(),
+      std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - init_start_time_)
+          .count());
+  return CallbackReturn::SUCCESS;
+}
+
+FrankaHardwareInterface::CallbackReturn FrankaHardwareInterface::on_configure(
+    const rclcpp_lifecycle::State& /*previous_state*/) {
+  return finishConnection();
+}
+
+FrankaHardwareInterface::CallbackReturn FrankaHardwareInterface::finishConnection() {
+  std::vector<std::string> state_recording_files;
+  const auto kStateRecordingFile = info_.hardware_parameters.find("state_recording_file");
+  if (kStateRecordingFile != info_.hardware_parameters.end()) {
+    state_recording_files = splitList(kStateRecordingFile->second);
+  }
+  if (not state_recording_files.empty() and state_recording_files.size() != arms_.size()) {
+    RCLCPP_FATAL(getLogger(), "Got %zu state recording files for %zu arms.",
+                 state_recording_files.size(), arms_.size());
     return CallbackReturn::ERROR;
   }
-  RCLCPP_INFO(getLogger(), "Successfully connected to robot");
 
-  node_ = std::make_shared<FrankaParamServiceServer>(rclcpp::NodeOptions(), robot_);
-  executor_ = std::make_shared<FrankaExecutor>();
-  executor_->add_node(node_);
+  double diagnostics_publish_rate = kDefaultDiagnosticsPublishRate;
+  const auto kDiagnosticsPublishRate = info_.hardware_parameters.find("diagnostics_publish_rate");
+  if (kDiagnosticsPublishRate != info_.hardware_parameters.end()) {
+    try {
+      diagnostics_publish_rate =
+          parseNumber(kDiagnosticsPublishRate->first, kDiagnosticsPublishRate->second);
+    } catch (const std::invalid_argument& e) {
+      RCLCPP_FATAL(getLogger(), e.what());
+      return CallbackReturn::ERROR;
+    }
+    if (diagnostics_publish_rate <= 0) {
+      RCLCPP_FATAL(getLogger(), "Parameter 'diagnostics_publish_rate' must be positive, got %f",
+                   diagnostics_publish_rate);
+      return CallbackReturn::ERROR;
+    }
+  }
+
+  const auto kMilliseconds = [](std::chrono::steady_clock::duration duration) {
+    return std::chrono::duration<double, std::milli>(duration).count();
+  };
+  for (auto i = 0U; i < arms_.size(); i++) {
+    auto& arm = arms_[i];
+    if (arm.robot) {
+      continue;
+    }
+    if (not arm.connection.valid()) {
+      RCLCPP_FATAL(getLogger(arm), "Not initialized");
+      return CallbackReturn::ERROR;
+    }
+    const auto kWaitStart = std::chrono::steady_clock::now();
+    try {
+      arm.robot = arm.connection.get();
+    } catch (const franka::Exception& e) {
+      RCLCPP_FATAL(getLogger(arm), "Could not connect to robot");
+      RCLCPP_FATAL(getLogger(arm), e.what());
+      return CallbackReturn::ERROR;
+    }
+    const auto kNow = std::chrono::steady_clock::now();
+    RCLCPP_INFO(getLogger(arm),
+                "Successfully connected to robot %.1f ms after initialization started, waited "
+                "%.1f ms for the connection",
+                kMilliseconds(kNow - init_start_time_), kMilliseconds(kNow - kWaitStart));
+    arm.hw_robot_model_pointer = pointerToStateValue(arm.robot->getModel());
+
+    if (not state_recording_files.empty()) {
+      try {
+        arm.robot->startRecording(state_recording_files[i]);
+      } catch (const std::runtime_error& e) {
+        RCLCPP_FATAL(getLogger(arm), e.what());
+        return CallbackReturn::ERROR;
+      }
+    }
+
+    // With several arms, the nodes of each arm live in a namespace named after it.
+    const std::string kNamespace = arms_.size() > 1 ? arm.arm_id : "";
+    arm.node =
+        std::make_shared<FrankaParamServiceServer>(rclcpp::NodeOptions(), arm.robot, kNamespace);
+    arm.diagnostics_publisher = std::make_shared<FrankaDiagnosticsPublisher>(
+        rclcpp::NodeOptions(), arm.robot, diagnostics_publish_rate, kNamespace);
+    executor_->add_node(arm.node);
+    executor_->add_node(arm.diagnostics_publisher);
+  }
   return CallbackReturn::SUCCESS;
 }
 
@@ -159,50 +513,136 @@ rclcpp::Logger FrankaHardwareInterface::getLogger() {
   return rclcpp::get_logger("FrankaHardwareInterface");
 }
 
+rclcpp::Logger FrankaHardwareInterface::getLogger(const Arm& arm) const {
+  return arms_.size() > 1 ? getLogger().get_child(arm.arm_id) : getLogger();
+}
+
+void FrankaHardwareInterface::holdCurrentState(Arm* arm) {
+  // Start from the current desired state until the controller writes its first command.
+  const auto& kState = arm->robot->read();
+  arm->hw_commands.fill(0);
+  arm->hw_position_commands = kState.q_d;
+  arm->hw_velocity_commands.fill(0);
+  arm->hw_cartesian_pose_commands = kState.O_T_EE_c;
+  arm->hw_cartesian_velocity_commands.fill(0);
+}
+
 hardware_interface::return_type FrankaHardwareInterface::perform_command_mode_switch(
     const std::vector<std::string>& /*start_interfaces*/,
     const std::vector<std::string>& /*stop_interfaces*/) {
-  if (not effort_interface_running_ and effort_interface_claimed_) {
-    robot_->stopRobot();
-    robot_->initializeTorqueControl();
-    effort_interface_running_ = true;
-  } else if (effort_interface_running_ and not effort_interface_claimed_) {
-    robot_->stopRobot();
-    robot_->initializeContinuousReading();
-    effort_interface_running_ = false;
+  // The arms switch in parallel, so that the new loops of all arms start in the same cycle.
+  std::vector<std::pair<Arm*, std::future<bool>>> switches;
+  for (auto& arm : arms_) {
+    if (arm.claimed_mode != arm.running_mode) {
+      Robot* robot = arm.robot.get();
+      const auto kMode = arm.claimed_mode;
+      switches.emplace_back(&arm, std::async(std::launch::async, [robot, kMode]() {
+        return robot->initializeControl(kMode);
+      }));
+    }
   }
-  return hardware_interface::return_type::OK;
+  bool switched = true;
+  for (auto& arm_switch : switches) {
+    Arm* arm = arm_switch.first;
+    if (not arm_switch.second.get()) {
+      switched = false;
+      continue;
+    }
+    arm->running_mode = arm->claimed_mode;
+    holdCurrentState(arm);
+  }
+  return switched ? hardware_interface::return_type::OK : hardware_interface::return_type::ERROR;
+}
+
+Robot::ControlMode FrankaHardwareInterface::getControlMode(
+    const Arm& arm,
+    const std::vector<std::string>& interfaces) const {
+  std::map<Robot::ControlMode, size_t> counts;
+  for (const auto& interface : interfaces) {
+    const auto kSeparator = interface.rfind('/');
+    if (kSeparator == std::string::npos) {
+      continue;
+    }
+    const auto kPrefix = interface.substr(0, kSeparator);
+    const auto kName = interface.substr(kSeparator + 1);
+    if (kPrefix == arm.arm_id) {
+      if (kName.rfind(kCartesianPoseInterface, 0) == 0) {
+        counts[Robot::ControlMode::kCartesianPose]++;
+      } else if (kName.rfind(kCartesianVelocityInterface, 0) == 0) {
+        counts[Robot::ControlMode::kCartesianVelocity]++;
+      }
+      continue;
+    }
+    if (std::none_of(arm.joints.begin(), arm.joints.end(), [this, &kPrefix](size_t joint) {
+          return info_.joints[joint].name == kPrefix;
+        })) {
+      continue;
+    }
+    if (kName == hardware_interface::HW_IF_EFFORT) {
+      counts[Robot::ControlMode::kTorque]++;
+    } else if (kName == hardware_interface::HW_IF_POSITION) {
+      counts[Robot::ControlMode::kJointPosition]++;
+    } else if (kName == hardware_interface::HW_IF_VELOCITY) {
+      counts[Robot::ControlMode::kJointVelocity]++;
+    }
+  }
+
+  if (counts.empty()) {
+    return Robot::ControlMode::kReading;
+  }
+  if (counts.size() > 1) {
+    RCLCPP_FATAL(getLogger(arm), "Got command interfaces of %zu different control modes.",
+                 counts.size());
+    throw std::invalid_argument("Command interfaces of different control modes cannot be mixed");
+  }
+  const auto kMode = counts.begin()->first;
+  const auto kNumberOfInterfaces = counts.begin()->second;
+  size_t expected_number_of_interfaces = kNumberOfJoints;
+  if (kMode == Robot::ControlMode::kCartesianPose) {
+    expected_number_of_interfaces = arm.hw_cartesian_pose_commands.size();
+  } else if (kMode == Robot::ControlMode::kCartesianVelocity) {
+    expected_number_of_interfaces = arm.hw_cartesian_velocity_commands.size();
+  }
+  if (kNumberOfInterfaces != expected_number_of_interfaces) {
+    RCLCPP_FATAL(getLogger(arm), "Expected %zu command interfaces, but got %zu instead.",
+                 expected_number_of_interfaces, kNumberOfInterfaces);
+    std::string error_string = "Invalid number of command interfaces. Expected ";
+    error_string += std::to_string(expected_number_of_interfaces);
+    throw std::invalid_argument(error_string);
+  }
+  return kMode;
 }
 
 hardware_interface::return_type FrankaHardwareInterface::prepare_command_mode_switch(
     const std::vector<std::string>& start_interfaces,
     const std::vector<std::string>& stop_interfaces) {
-  auto is_effort_interface = [](const std::string& interface) {
-    return interface.find(hardware_interface::HW_IF_EFFORT) != std::string::npos;
-  };
+  // Only applied if the switch is valid for all arms
+  std::vector<Robot::ControlMode> claimed_modes;
+  for (const auto& arm : arms_) {
+    const auto kStopMode = getControlMode(arm, stop_interfaces);
+    const auto kStartMode = getControlMode(arm, start_interfaces);
 
-  int64_t num_stop_effort_interfaces =
-      std::count_if(stop_interfaces.begin(), stop_interfaces.end(), is_effort_interface);
-  if (num_stop_effort_interfaces == kNumberOfJoints) {
-    effort_interface_claimed_ = false;
-  } else if (num_stop_effort_interfaces != 0) {
-    RCLCPP_FATAL(this->getLogger(), "Expected %zu effort interfaces to stop, but got %zu instead.",
-                 kNumberOfJoints, num_stop_effort_interfaces);
-    std::string error_string = "Invalid number of effort interfaces to stop. Expected ";
-    error_string += std::to_string(kNumberOfJoints);
-    throw std::invalid_argument(error_string);
+    auto claimed_mode = arm.claimed_mode;
+    if (kStopMode != Robot::ControlMode::kReading) {
+      if (kStopMode != claimed_mode) {
+        RCLCPP_ERROR(getLogger(arm), "Cannot stop command interfaces which are not claimed.");
+        return hardware_interface::return_type::ERROR;
+      }
+      claimed_mode = Robot::ControlMode::kReading;
+    }
+    if (kStartMode != Robot::ControlMode::kReading) {
+      if (claimed_mode != Robot::ControlMode::kReading) {
+        RCLCPP_ERROR(getLogger(arm),
+                     "Cannot start command interfaces while those of another control mode are "
+                     "claimed.");
+        return hardware_interface::return_type::ERROR;
+      }
+      claimed_mode = kStartMode;
+    }
+    claimed_modes.push_back(claimed_mode);
   }
-
-  int64_t num_start_effort_interfaces =
-      std::count_if(start_interfaces.begin(), start_interfaces.end(), is_effort_interface);
-  if (num_start_effort_interfaces == kNumberOfJoints) {
-    effort_interface_claimed_ = true;
-  } else if (num_start_effort_interfaces != 0) {
-    RCLCPP_FATAL(this->getLogger(), "Expected %zu effort interfaces to start, but got %zu instead.",
-                 kNumberOfJoints, num_start_effort_interfaces);
-    std::string error_string = "Invalid number of effort interfaces to start. Expected ";
-    error_string += std::to_string(kNumberOfJoints);
-    throw std::invalid_argument(error_string);
+  for (auto i = 0U; i < arms_.size(); i++) {
+    arms_[i].claimed_mode = claimed_modes[i];
   }
   return hardware_interface::return_type::OK;
 }
@@ -16,55 +16,74 @@
 
 namespace franka_hardware {
 
+constexpr std::size_t FrankaParamServiceServer::kCommandQueueCapacity;
+
 FrankaParamServiceServer::FrankaParamServiceServer(const rclcpp::NodeOptions& options,
-                                                   std::shared_ptr<Robot> robot)
-    : rclcpp::Node("service_server", options), robot_(std::move(robot)) {
-    /*  set_joint_stiffness_service_ = create_service<franka_msgs::srv::SetJointStiffness>(
+                                                   std::shared_ptr<Robot> robot,
+                                                   const std::string& node_namespace)
+    : rclcpp::Node("service_server", node_namespace, options), robot_(std::move(robot)) {
+  callback_group_ = create_callback_group(rclcpp::CallbackGroupType::Reentrant);
+
+  set_joint_stiffness_service_ = create_service<franka_msgs::srv::SetJointStiffness>(
       "~/set_joint_stiffness",
       std::bind(  // NOLINT [modernize-avoid-bind]
           &FrankaParamServiceServer::setJointStiffnessCallback, this, std::placeholders::_1,
-          std::placeholders::_2));
+          std::placeholders::_2),
+      rmw_qos_profile_services_default, callback_group_);
 
   set_cartesian_stiffness_service_ = create_service<franka_msgs::srv::SetCartesianStiffness>(
       "~/set_cartesian_stiffness",
       std::bind(  // NOLINT [modernize-avoid-bind]
           &FrankaParamServiceServer::setCartesianStiffnessCallback, this, std::placeholders::_1,
-          std::placeholders::_2));
+          std::placeholders::_2),
+      rmw_qos_profile_services_default, callback_group_);
 
   set_tcp_frame_service_ = create_service<franka_msgs::srv::SetTCPFrame>(
       "~/set_tcp_frame",
       std::bind(  // NOLINT [modernize-avoid-bind]
           &FrankaParamServiceServer::setTCPFrameCallback, this, std::placeholders::_1,
-          std::placeholders::_2));
+          std::placeholders::_2),
+      rmw_qos_profile_services_default, callback_group_);
 
   set_stiffness_frame_service_ = create_service<franka_msgs::srv::SetStiffnessFrame>(
       "~/set_stiffness_frame",
       std::bind(  // NOLINT [modernize-avoid-bind]
           &FrankaParamServiceServer::setStiffnessFrameCallback, this, std::placeholders::_1,
-          std::placeholders::_2));
+          std::placeholders::_2),
+      rmw_qos_profile_services_default, callback_group_);
 
   set_force_torque_collision_behavior_service_ =
       create_service<franka_msgs::srv::SetForceTorqueCollisionBehavior>(
           "~/set_force_torque_collision_behavior",
           std::bind(  // NOLINT [modernize-avoid-bind]
               &FrankaParamServiceServer::setForceTorqueCollisionBehaviorCallback, this,
-              std::placeholders::_1, std::placeholders::_2));
+              std::placeholders::_1, std::placeholders::_2),
+          rmw_qos_profile_services_default, callback_group_);
 
   set_full_collision_behavior_service_ = create_service<franka_msgs::srv::SetFullCollisionBehavior>(
       "~/set_full_collision_behavior",
       std::bind(  // NOLINT [modernize-avoid-bind]
           &FrankaParamServiceServer::setFullCollisionBehaviorCallback, this, std::placeholders::_1,
-          std::placeholders::_2));
-    */
+          std::placeholders::_2),
+      rmw_qos_profile_services_default, callback_group_);
+
   set_load_service_ = create_service<franka_msgs::srv::SetLoad>(
       "~/set_load",
       std::bind(  // NOLINT [modernize-avoid-bind]
           &FrankaParamServiceServer::setLoadCallback, this, std::placeholders::_1,
-          std::placeholders::_2));
+          std::placeholders::_2),
+      rmw_qos_profile_services_default, callback_group_);
+
+  set_robot_parameters_service_ = create_service<franka_msgs::srv::SetRobotParameters>(
+      "~/set_robot_parameters",
+      std::bind(  // NOLINT [modernize-avoid-bind]
+          &FrankaParamServiceServer::setRobotParametersCallback, this, std::placeholders::_1,
+          std::placeholders::_2),
+      rmw_qos_profile_services_default, callback_group_);
 
   RCLCPP_INFO(get_logger(), "Service started");
 }
-    /*
+
 void FrankaParamServiceServer::setJointStiffnessCallback(
     const franka_msgs::srv::SetJointStiffness::Request::SharedPtr& request,
     const franka_msgs::srv::SetJointStiffness::Response::SharedPtr& response) {
@@ -135,7 +154,7 @@ void FrankaParamServiceServer::setFullCollisionBehaviorCallback(
   setGenericRobotParam<franka_msgs::srv::SetFullCollisionBehavior::Request::SharedPtr,
                        franka_msgs::srv::SetFullCollisionBehavior::Response::SharedPtr>(
       set_full_collision_behavior_function, request, response);
-      }*/
+}
 
 void FrankaParamServiceServer::setLoadCallback(
     const franka_msgs::srv::SetLoad::Request::SharedPtr& request,
@@ -148,4 +167,16 @@ void FrankaParamServiceServer::setLoadCallback(
                                                                        response);
 }
 
+void FrankaParamServiceServer::setRobotParametersCallback(
+    const franka_msgs::srv::SetRobotParameters::Request::SharedPtr& request,
+    const franka_msgs::srv::SetRobotParameters::Response::SharedPtr& response) {
+  auto set_robot_parameters_function =
+      [&](const franka_msgs::srv::SetRobotParameters::Request::SharedPtr& request) {
+        robot_->setRobotParameters(request);
+      };
+  setGenericRobotParam<franka_msgs::srv::SetRobotParameters::Request::SharedPtr,
+                       franka_msgs::srv::SetRobotParameters::Response::SharedPtr>(
+      set_robot_parameters_function, request, response);
+}
+
 }  // namespace franka_hardware
@@ -0,0 +1,292 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "franka_hardware/loopback_robot_connection.hpp"
+
+#include <cmath>
+#include <thread>
+#include <utility>
+
+#include <franka/exception.h>
+
+namespace franka_hardware {
+
+namespace {
+constexpr std::chrono::milliseconds kCycleTime(1);
+constexpr double kCycleTimeSeconds = 0.001;
+// Damping of the simulated joints in torque control [Nms/rad]
+constexpr double kJointDamping = 5.;
+// Weight of a single cycle in the simulated control_command_success_rate
+constexpr double kSuccessRateWeight = 0.01;
+
+class LoopbackModel : public Model {
+ public:
+  LoopbackModel() = default;
+
+ protected:
+  std::array<double, 49> computeMassMatrix(const franka::RobotState& /*state*/) const override {
+    std::array<double, 49> mass_matrix{};
+    for (std::size_t i = 0; i < 7; i++) {
+      mass_matrix.at(i * 7 + i) = 1.;
+    }
+    return mass_matrix;
+  }
+
+  std::array<double, 7> computeCoriolisForceVector(
+      const franka::RobotState& /*state*/) const override {
+    return {};
+  }
+
+  std::array<double, 7> computeGravityForceVector(
+      const franka::RobotState& /*state*/) const override {
+    return {};
+  }
+
+  std::array<double, 42> computeZeroJacobian(franka::Frame /*frame*/,
+                                             const franka::RobotState& /*state*/) const override {
+    return {};
+  }
+
+  std::array<double, 42> computeBodyJacobian(franka::Frame /*frame*/,
+                                             const franka::RobotState& /*state*/) const override {
+    return {};
+  }
+
+  std::array<double, 16> computePose(franka::Frame /*frame*/,
+                                     const franka::RobotState& state) const override {
+    return state.O_T_EE;
+  }
+};
+}  // namespace
+
+LoopbackRobotConnection::LoopbackRobotConnection(double packet_loss,
+                                                 std::chrono::microseconds delay,
+                                                 uint32_t seed)
+    : packet_loss_(packet_loss), delay_(delay), random_generator_(seed) {
+  state_.q = {0, -M_PI_4, 0, -3 * M_PI_4, 0, M_PI_2, M_PI_4};
+  state_.q_d = state_.q;
+  state_.O_T_EE = {1, 0, 0, 0, 0, -1, 0, 0, 0, 0, -1, 0, 0.307, 0, 0.487, 1};
+  state_.O_T_EE_d = state_.O_T_EE;
+  state_.O_T_EE_c = state_.O_T_EE;
+  state_.control_command_success_rate = 1.;
+  state_.robot_mode = franka::RobotMode::kIdle;
+}
+
+void LoopbackRobotConnection::run(
+    const std::function<bool(const franka::RobotState&, franka::Duration)>& callback,
+    franka::RobotMode mode) {
+  if (loop_running_.exchange(true)) {
+    throw franka::InvalidOperationException(
+        "libfranka: Attempted to start multiple motion generators or controllers.");
+  }
+  state_.robot_mode = mode;
+  auto next_cycle = std::chrono::steady_clock::now();
+  uint64_t last_callback_time = state_.time.toMSec();
+  bool first_callback = true;
+  bool finished = false;
+  try {
+    while (not finished) {
+      next_cycle += kCycleTime;
+      std::this_thread::sleep_until(next_cycle);
+      state_.time = franka::Duration(state_.time.toMSec() + 1);
+      const bool kLost = packet_loss_(random_generator_);
+      if (mode == franka::RobotMode::kMove) {
+        state_.control_command_success_rate =
+            (1 - kSuccessRateWeight) * state_.control_command_success_rate +
+            kSuccessRateWeight * (kLost ? 0. : 1.);
+      }
+      if (kLost) {
+        integrateJointVelocities();
+        continue;
+      }
+      if (delay_.count() > 0) {
+        std::this_thread::sleep_for(delay_);
+      }
+      // Like libfranka, the first callback of a loop gets a period of zero.
+      const franka::Duration kPeriod(first_callback ? 0
+                                                    : state_.time.toMSec() - last_callback_time);
+      first_callback = false;
+      last_callback_time = state_.time.toMSec();
+      finished = callback(state_, kPeriod);
+    }
+  } catch (...) {
+    state_.robot_mode = franka::RobotMode::kIdle;
+    loop_running_ = false;
+    throw;
+  }
+  state_.dq.fill(0);
+  state_.robot_mode = franka::RobotMode::kIdle;
+  loop_running_ = false;
+}
+
+void LoopbackRobotConnection::integrateJointVelocities() {
+  for (std::size_t i = 0; i < state_.q.size(); i++) {
+    state_.q.at(i) += state_.dq.at(i) * kCycleTimeSeconds;
+  }
+}
+
+void LoopbackRobotConnection::read(std::function<bool(const franka::RobotState&)> read_callback) {
+  run([&read_callback](const franka::RobotState& state,
+                       franka::Duration /*period*/) { return not read_callback(state); },
+      franka::RobotMode::kIdle);
+}
+
+void LoopbackRobotConnection::control(
+    std::function<franka::Torques(const franka::RobotState&, franka::Duration)> control_callback,
+    bool /*limit_rate*/,
+    double /*cutoff_frequency*/) {
+  run(
+      [this, &control_callback](const franka::RobotState& state, franka::Duration period) {
+        const auto kTorques = control_callback(state, period);
+        state_.tau_J = kTorques.tau_J;
+        for (std::size_t i = 0; i < state_.dq.size(); i++) {
+          state_.dq.at(i) +=
+              (kTorques.tau_J.at(i) - kJointDamping * state_.dq.at(i)) * kCycleTimeSeconds;
+        }
+        integrateJointVelocities();
+        state_.q_d = state_.q;
+        return kTorques.motion_finished;
+      },
+      franka::RobotMode::kMove);
+}
+
+void LoopbackRobotConnection::control(
+    std::function<franka::JointPositions(const franka::RobotState&, franka::Duration)>
+        motion_callback,
+    franka::ControllerMode /*controller_mode*/,
+    bool /*limit_rate*/,
+    double /*cutoff_frequency*/) {
+  run(
+      [this, &motion_callback](const franka::RobotState& state, franka::Duration period) {
+        const auto kPositions = motion_callback(state, period);
+        for (std::size_t i = 0; i < state_.q.size(); i++) {
+          state_.dq.at(i) = (kPositions.q.at(i) - state_.q.at(i)) / kCycleTimeSeconds;
+        }
+        state_.q = kPositions.q;
+        state_.q_d = kPositions.q;
+        return kPositions.motion_finished;
+      },
+      franka::RobotMode::kMove);
+}
+
+void LoopbackRobotConnection::control(
+    std::function<franka::JointVelocities(const franka::RobotState&, franka::Duration)>
+        motion_callback,
+    franka::ControllerMode /*controller_mode*/,
+    bool /*limit_rate*/,
+    double /*cutoff_frequency*/) {
+  run(
+      [this, &motion_callback](const franka::RobotState& state, franka::Duration period) {
+        const auto kVelocities = motion_callback(state, period);
+        state_.dq = kVelocities.dq;
+        integrateJointVelocities();
+        state_.q_d = state_.q;
+        return kVelocities.motion_finished;
+      },
+      franka::RobotMode::kMove);
+}
+
+void LoopbackRobotConnection::control(
+    std::function<franka::CartesianPose(const franka::RobotState&, franka::Duration)>
+        motion_callback,
+    franka::ControllerMode /*controller_mode*/,
+    bool /*limit_rate*/,
+    double /*cutoff_frequency*/) {
+  run(
+      [this, &motion_callback](const franka::RobotState& state, franka::Duration period) {
+        const auto kPose = motion_callback(state, period);
+        state_.O_T_EE = kPose.O_T_EE;
+        state_.O_T_EE_d = kPose.O_T_EE;
+        state_.O_T_EE_c = kPose.O_T_EE;
+        return kPose.motion_finished;
+      },
+      franka::RobotMode::kMove);
+}
+
+void LoopbackRobotConnection::control(
+    std::function<franka::CartesianVelocities(const franka::RobotState&, franka::Duration)>
+        motion_callback,
+    franka::ControllerMode /*controller_mode*/,
+    bool /*limit_rate*/,
+    double /*cutoff_frequency*/) {
+  run(
+      [this, &motion_callback](const franka::RobotState& state, franka::Duration period) {
+        const auto kVelocities = motion_callback(state, period);
+        for (std::size_t i = 0; i < 3; i++) {
+          state_.O_T_EE.at(12 + i) += kVelocities.O_dP_EE.at(i) * kCycleTimeSeconds;
+        }
+        state_.O_T_EE_d = state_.O_T_EE;
+        state_.O_T_EE_c = state_.O_T_EE;
+        state_.O_dP_EE_c = kVelocities.O_dP_EE;
+        return kVelocities.motion_finished;
+      },
+      franka::RobotMode::kMove);
+}
+
+void LoopbackRobotConnection::assertNoLoopRunning() const {
+  if (loop_running_) {
+    throw franka::InvalidOperationException(
+        "libfranka: Cannot send a command while a control or motion generator loop is running!");
+  }
+}
+
+void LoopbackRobotConnection::setCollisionBehavior(
+    const std::array<double, 7>& /*lower_torque_thresholds*/,
+    const std::array<double, 7>& /*upper_torque_thresholds*/,
+    const std::array<double, 6>& /*lower_force_thresholds*/,
+    const std::array<double, 6>& /*upper_force_thresholds*/) {
+  assertNoLoopRunning();
+}
+
+void LoopbackRobotConnection::setCollisionBehavior(
+    const std::array<double, 7>& /*lower_torque_thresholds_acceleration*/,
+    const std::array<double, 7>& /*upper_torque_thresholds_acceleration*/,
+    const std::array<double, 7>& /*lower_torque_thresholds_nominal*/,
+    const std::array<double, 7>& /*upper_torque_thresholds_nominal*/,
+    const std::array<double, 6>& /*lower_force_thresholds_acceleration*/,
+    const std::array<double, 6>& /*upper_force_thresholds_acceleration*/,
+    const std::array<double, 6>& /*lower_force_thresholds_nominal*/,
+    const std::array<double, 6>& /*upper_force_thresholds_nominal*/) {
+  assertNoLoopRunning();
+}
+
+void LoopbackRobotConnection::setJointImpedance(
+    const std::array<double, 7>& /*K_theta*/) {  // NOLINT
+  assertNoLoopRunning();
+}
+
+void LoopbackRobotConnection::setCartesianImpedance(
+    const std::array<double, 6>& /*K_x*/) {  // NOLINT
+  assertNoLoopRunning();
+}
+
+void LoopbackRobotConnection::setEE(const std::array<double, 16>& /*NE_T_EE*/) {  // NOLINT
+  assertNoLoopRunning();
+}
+
+void LoopbackRobotConnection::setK(const std::array<double, 16>& /*EE_T_K*/) {  // NOLINT
+  assertNoLoopRunning();
+}
+
+void LoopbackRobotConnection::setLoad(double /*load_mass*/,
+                                      const std::array<double, 3>& /*F_x_Cload*/,  // NOLINT
+                                      const std::array<double, 9>& /*load_inertia*/) {
+  assertNoLoopRunning();
+}
+
+std::unique_ptr<Model> LoopbackRobotConnection::loadModel() {
+  return std::make_unique<LoopbackModel>();
+}
+
+}  // namespace franka_hardware
@@ -0,0 +1,112 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "franka_hardware/model.hpp"
+
+#include <utility>
+
+namespace franka_hardware {
+
+constexpr std::size_t Model::kNumberOfFrames;
+
+Model::Model(std::unique_ptr<franka::Model> model) : model_(std::move(model)) {}
+
+void Model::update(const franka::RobotState& state) {
+  state_ = &state;
+  cycle_++;
+}
+
+const franka::RobotState* Model::getRobotState() const {
+  return state_;
+}
+
+const std::array<double, 49>& Model::getMassMatrix() {
+  if (mass_matrix_.cycle != cycle_) {
+    mass_matrix_.value = computeMassMatrix(*state_);
+    mass_matrix_.cycle = cycle_;
+  }
+  return mass_matrix_.value;
+}
+
+const std::array<double, 7>& Model::getCoriolisForceVector() {
+  if (coriolis_.cycle != cycle_) {
+    coriolis_.value = computeCoriolisForceVector(*state_);
+    coriolis_.cycle = cycle_;
+  }
+  return coriolis_.value;
+}
+
+const std::array<double, 7>& Model::getGravityForceVector() {
+  if (gravity_.cycle != cycle_) {
+    gravity_.value = computeGravityForceVector(*state_);
+    gravity_.cycle = cycle_;
+  }
+  return gravity_.value;
+}
+
+const std::array<double, 42>& Model::getZeroJacobian(franka::Frame frame) {
+  auto& cached = zero_jacobians_.at(static_cast<std::size_t>(frame));
+  if (cached.cycle != cycle_) {
+    cached.value = computeZeroJacobian(frame, *state_);
+    cached.cycle = cycle_;
+  }
+  return cached.value;
+}
+
+const std::array<double, 42>& Model::getBodyJacobian(franka::Frame frame) {
+  auto& cached = body_jacobians_.at(static_cast<std::size_t>(frame));
+  if (cached.cycle != cycle_) {
+    cached.value = computeBodyJacobian(frame, *state_);
+    cached.cycle = cycle_;
+  }
+  return cached.value;
+}
+
+const std::array<double, 16>& Model::getPose(franka::Frame frame) {
+  auto& cached = poses_.at(static_cast<std::size_t>(frame));
+  if (cached.cycle != cycle_) {
+    cached.value = computePose(frame, *state_);
+    cached.cycle = cycle_;
+  }
+  return cached.value;
+}
+
+std::array<double, 49> Model::computeMassMatrix(const franka::RobotState& state) const {
+  return model_->mass(state);
+}
+
+std::array<double, 7> Model::computeCoriolisForceVector(const franka::RobotState& state) const {
+  return model_->coriolis(state);
+}
+
+std::array<double, 7> Model::computeGravityForceVector(const franka::RobotState& state) const {
+  return model_->gravity(state);
+}
+
+std::array<double, 42> Model::computeZeroJacobian(franka::Frame frame,
+                                                  const franka::RobotState& state) const {
+  return model_->zeroJacobian(frame, state);
+}
+
+std::array<double, 42> Model::computeBodyJacobian(franka::Frame frame,
+                                                  const franka::RobotState& state) const {
+  return model_->bodyJacobian(frame, state);
+}
+
+std::array<double, 16> Model::computePose(franka::Frame frame,
+                                          const franka::RobotState& state) const {
+  return model_->pose(frame, state);
+}
+
+}  // namespace franka_hardware
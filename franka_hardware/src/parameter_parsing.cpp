@@ -0,0 +1,50 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "franka_hardware/parameter_parsing.hpp"
+
+#include <cmath>
+#include <stdexcept>
+
+namespace franka_hardware {
+
+double parseNumber(const std::string& name, const std::string& value) {
+  std::size_t parsed_characters = 0;
+  double result = 0;
+  try {
+    result = std::stod(value, &parsed_characters);
+  } catch (const std::logic_error&) {
+    parsed_characters = 0;
+  }
+  if (parsed_characters == 0 or parsed_characters != value.size() or not std::isfinite(result)) {
+    throw std::invalid_argument("Parameter '" + name + "' is not a number: " + value);
+  }
+  return result;
+}
+
+int64_t parseInteger(const std::string& name, const std::string& value) {
+  std::size_t parsed_characters = 0;
+  int64_t result = 0;
+  try {
+    result = std::stoll(value, &parsed_characters);
+  } catch (const std::logic_error&) {
+    parsed_characters = 0;
+  }
+  if (parsed_characters == 0 or parsed_characters != value.size()) {
+    throw std::invalid_argument("Parameter '" + name + "' is not an integer: " + value);
+  }
+  return result;
+}
+
+}  // namespace franka_hardware
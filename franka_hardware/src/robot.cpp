@@ -14,97 +14,454 @@
 
 #include <franka_hardware/robot.hpp>
 
-#include <cassert>
-#include <mutex>
+#include <chrono>
+#include <cinttypes>
+#include <utility>
 
-#include <franka/control_tools.h>
+#include <franka/exception.h>
 #include <rclcpp/logging.hpp>
 
 namespace franka_hardware {
 
-Robot::Robot(const std::string& robot_ip, const rclcpp::Logger& logger) {
-  tau_command_.fill(0.);
-  franka::RealtimeConfig rt_config = franka::RealtimeConfig::kEnforce;
-  if (not franka::hasRealtimeKernel()) {
-    rt_config = franka::RealtimeConfig::kIgnore;
-    RCLCPP_WARN(
-        logger,
-        "You are not using a real-time kernel. Using a real-time kernel is strongly recommended!");
-  }
-  robot_ = std::make_unique<franka::Robot>(robot_ip, rt_config);
+constexpr std::chrono::milliseconds Robot::kModeSwitchTimeout;
+
+Robot::Robot(const std::string& robot_ip,
+             const rclcpp::Logger& logger,
+             const ThreadConfiguration& loop_thread_configuration)
+    : Robot(
+          std::make_unique<LibfrankaRobotConnection>(robot_ip,
+                                                     logger,
+                                                     not loop_thread_configuration.set_scheduling),
+          logger,
+          loop_thread_configuration) {}
+
+Robot::Robot(std::unique_ptr<RobotConnection> connection,
+             const rclcpp::Logger& logger,
+             const ThreadConfiguration& loop_thread_configuration)
+    : robot_(std::move(connection)), logger_(logger) {
+  const auto kStart = std::chrono::steady_clock::now();
+  model_ = robot_->loadModel();
+  RCLCPP_INFO(
+      logger_, "Loaded robot model in %.1f ms",
+      std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - kStart).count());
+  loop_thread_ =
+      std::thread([this, loop_thread_configuration]() { runLoop(loop_thread_configuration); });
+}
+
+void Robot::write(const std::array<double, 7>& command) {
+  auto& next = command_.back();
+  next.joint = command;
+  next.stamp = ControlLoopStatistics::Clock::now();
+  command_.publish();
 }
 
-void Robot::write(const std::array<double, 7>& efforts) {
-  std::lock_guard<std::mutex> lock(write_mutex_);
-  tau_command_ = efforts;
+void Robot::writeCartesianPose(const std::array<double, 16>& pose) {
+  auto& next = command_.back();
+  next.cartesian_pose = pose;
+  next.stamp = ControlLoopStatistics::Clock::now();
+  command_.publish();
 }
 
-franka::RobotState Robot::read() {
-  std::lock_guard<std::mutex> lock(read_mutex_);
-  return {current_state_};
+void Robot::writeCartesianVelocity(const std::array<double, 6>& velocity) {
+  auto& next = command_.back();
+  next.cartesian_velocity = velocity;
+  next.stamp = ControlLoopStatistics::Clock::now();
+  command_.publish();
+}
+
+const franka::RobotState& Robot::read() {
+  return current_state_.read().state;
+}
+
+const franka::RobotState& Robot::read(ControlLoopStatistics::Clock::time_point* receive_time) {
+  const auto& kReceived = current_state_.read();
+  *receive_time = kReceived.stamp;
+  return kReceived.state;
 }
 
 void Robot::stopRobot() {
-  if (not stopped_) {
-    finish_ = true;
-    control_thread_->join();
-    finish_ = false;
-    stopped_ = true;
-  }
-}
-
-void Robot::initializeTorqueControl() {
-  assert(isStopped());
-  stopped_ = false;
-  const auto kTorqueControl = [this]() {
-    robot_->control(
-        [this](const franka::RobotState& state, const franka::Duration& /*period*/) {
-          {
-            std::lock_guard<std::mutex> lock(read_mutex_);
-            current_state_ = state;
-          }
-          std::lock_guard<std::mutex> lock(write_mutex_);
-          franka::Torques out(tau_command_);
-          out.motion_finished = finish_;
-          return out;
-        },
-        true, franka::kMaxCutoffFrequency);
+  std::lock_guard<std::mutex> lock(loop_mutex_);
+  switchMode(ControlMode::kIdle);
+}
+
+bool Robot::initializeControl(ControlMode mode) {
+  std::lock_guard<std::mutex> lock(loop_mutex_);
+  return switchMode(mode);
+}
+
+bool Robot::initializeTorqueControl() {
+  return initializeControl(ControlMode::kTorque);
+}
+
+bool Robot::initializeContinuousReading() {
+  std::lock_guard<std::mutex> lock(loop_mutex_);
+  return switchMode(ControlMode::kReading);
+}
+
+bool Robot::switchMode(ControlMode mode) {
+  std::unique_lock<std::mutex> lock(mode_mutex_);
+  if (active_mode_ == mode and requested_mode_ == mode) {
+    return true;
+  }
+  const auto kStart = ControlLoopStatistics::Clock::now();
+  switch_failed_ = false;
+  last_switch_gap_ = ControlLoopStatistics::Clock::duration::zero();
+  requested_mode_ = mode;
+  mode_requested_.notify_one();
+  const bool kSwitched = mode_switched_.wait_for(
+      lock, kModeSwitchTimeout, [this, mode]() { return active_mode_ == mode or switch_failed_; });
+  if (not kSwitched or active_mode_ != mode) {
+    RCLCPP_ERROR(logger_, "Could not switch to %s", toString(mode));
+    return false;
+  }
+  const auto kMilliseconds = [](ControlLoopStatistics::Clock::duration duration) {
+    return std::chrono::duration<double, std::milli>(duration).count();
   };
-  control_thread_ = std::make_unique<std::thread>(kTorqueControl);
+  if (last_switch_gap_ != ControlLoopStatistics::Clock::duration::zero()) {
+    RCLCPP_INFO(logger_, "Switched to %s after %.3f ms, state gap %.3f ms", toString(mode),
+                kMilliseconds(ControlLoopStatistics::Clock::now() - kStart),
+                kMilliseconds(last_switch_gap_));
+  } else {
+    RCLCPP_INFO(logger_, "Switched to %s after %.3f ms", toString(mode),
+                kMilliseconds(ControlLoopStatistics::Clock::now() - kStart));
+  }
+  return true;
 }
 
-void Robot::initializeContinuousReading() {
-  assert(isStopped());
-  stopped_ = false;
-  const auto kReading = [this]() {
-    robot_->read([this](const franka::RobotState& state) {
-      {
-        std::lock_guard<std::mutex> lock(read_mutex_);
-        current_state_ = state;
+void Robot::runLoop(const ThreadConfiguration& configuration) {
+  if (not configuration.empty()) {
+    applyToCurrentThread(configuration, logger_);
+  }
+  while (true) {
+    ControlMode mode;
+    {
+      std::unique_lock<std::mutex> lock(mode_mutex_);
+      mode_requested_.wait(lock,
+                           [this]() { return shutdown_ or requested_mode_ != ControlMode::kIdle; });
+      if (shutdown_) {
+        return;
       }
-      return not finish_;
-    });
-  };
-  control_thread_ = std::make_unique<std::thread>(kReading);
+      mode = requested_mode_;
+    }
+
+    try {
+      switch (mode) {
+        case ControlMode::kTorque:
+          runTorqueControl();
+          break;
+        case ControlMode::kJointPosition:
+          runMotionGenerator<franka::JointPositions>(
+              mode, franka::ControllerMode::kJointImpedance,
+              [](const franka::RobotState& state) { return franka::JointPositions(state.q_d); },
+              [](const Command& command) { return franka::JointPositions(command.joint); });
+          break;
+        case ControlMode::kJointVelocity:
+          runMotionGenerator<franka::JointVelocities>(
+              mode, franka::ControllerMode::kJointImpedance,
+              [](const franka::RobotState& /*state*/) {
+                return franka::JointVelocities({0, 0, 0, 0, 0, 0, 0});
+              },
+              [](const Command& command) { return franka::JointVelocities(command.joint); });
+          break;
+        case ControlMode::kCartesianPose:
+          runMotionGenerator<franka::CartesianPose>(
+              mode, franka::ControllerMode::kCartesianImpedance,
+              [](const franka::RobotState& state) { return franka::CartesianPose(state.O_T_EE_c); },
+              [](const Command& command) { return franka::CartesianPose(command.cartesian_pose); });
+          break;
+        case ControlMode::kCartesianVelocity:
+          runMotionGenerator<franka::CartesianVelocities>(
+              mode, franka::ControllerMode::kCartesianImpedance,
+              [](const franka::RobotState& /*state*/) {
+                return franka::CartesianVelocities({0, 0, 0, 0, 0, 0});
+              },
+              [](const Command& command) {
+                return franka::CartesianVelocities(command.cartesian_velocity);
+              });
+          break;
+        case ControlMode::kReading:
+        case ControlMode::kIdle:
+        default:
+          runContinuousReading();
+          break;
+      }
+    } catch (const franka::Exception& e) {
+      RCLCPP_ERROR(logger_, "%s stopped: %s", toString(mode), e.what());
+      std::lock_guard<std::mutex> lock(mode_mutex_);
+      switch_failed_ = true;
+      // Keep the state streaming after a failed control loop, e.g. after a reflex.
+      ControlMode expected = mode;
+      requested_mode_.compare_exchange_strong(
+          expected, mode == ControlMode::kReading ? ControlMode::kIdle : ControlMode::kReading);
+    }
+
+    std::lock_guard<std::mutex> lock(mode_mutex_);
+    active_mode_ = ControlMode::kIdle;
+    if (requested_mode_ == ControlMode::kIdle) {
+      // The time spent idle is not a gap caused by a switch.
+      last_callback_time_ = ControlLoopStatistics::Clock::time_point();
+    }
+    mode_switched_.notify_all();
+  }
+}
+
+void Robot::publishState(const franka::RobotState& state,
+                         ControlLoopStatistics::Clock::time_point now) {
+  auto& next = current_state_.back();
+  next.state = state;
+  next.stamp = now;
+  current_state_.publish();
+  if (recorder_) {
+    recorder_->record(state, now);
+  }
+}
+
+void Robot::enterMode(ControlMode mode, ControlLoopStatistics::Clock::time_point now) {
+  // Only taken once per switch. switchMode() releases the mutex while it is waiting.
+  std::lock_guard<std::mutex> lock(mode_mutex_);
+  if (last_callback_time_ != ControlLoopStatistics::Clock::time_point()) {
+    last_switch_gap_ = now - last_callback_time_;
+    statistics_.recordModeSwitch(last_switch_gap_);
+  }
+  active_mode_ = mode;
+  mode_switched_.notify_all();
+}
+
+const Robot::Command* Robot::readCommand(ControlLoopStatistics::Clock::time_point now,
+                                         ControlLoopStatistics::Clock::time_point entry_time) {
+  const auto& kCommand = command_.read();
+  // Commands written before the switch were meant for the previous loop.
+  if (kCommand.stamp < entry_time) {
+    return nullptr;
+  }
+  statistics_.recordCommandAge(now - kCommand.stamp);
+  return &kCommand;
+}
+
+void Robot::runTorqueControl() {
+  statistics_.restart();
+  ControlLoopStatistics::Clock::time_point entry_time;
+  robot_->control(
+      [this, &entry_time](const franka::RobotState& state, const franka::Duration& /*period*/) {
+        const auto kNow = ControlLoopStatistics::Clock::now();
+        publishState(state, kNow);
+        if (entry_time == ControlLoopStatistics::Clock::time_point()) {
+          enterMode(ControlMode::kTorque, kNow);
+          entry_time = kNow;
+        }
+        last_callback_time_ = kNow;
+        statistics_.recordCycle(state, kNow, true);
+        const Command* command = readCommand(kNow, entry_time);
+        franka::Torques out = command != nullptr ? franka::Torques(command->joint)
+                                                 : franka::Torques({0, 0, 0, 0, 0, 0, 0});
+        out.motion_finished = requested_mode_ != ControlMode::kTorque;
+        return out;
+      },
+      true, franka::kMaxCutoffFrequency);
+}
+
+template <typename MotionGeneratorType>
+void Robot::runMotionGenerator(ControlMode mode,
+                               franka::ControllerMode controller_mode,
+                               MotionGeneratorType (*hold)(const franka::RobotState&),
+                               MotionGeneratorType (*convert)(const Command&)) {
+  statistics_.restart();
+  ControlLoopStatistics::Clock::time_point entry_time;
+  std::function<MotionGeneratorType(const franka::RobotState&, franka::Duration)> callback =
+      [this, mode, hold, convert, &entry_time](const franka::RobotState& state,
+                                               franka::Duration /*period*/) {
+        const auto kNow = ControlLoopStatistics::Clock::now();
+        publishState(state, kNow);
+        if (entry_time == ControlLoopStatistics::Clock::time_point()) {
+          enterMode(mode, kNow);
+          entry_time = kNow;
+        }
+        last_callback_time_ = kNow;
+        statistics_.recordCycle(state, kNow, true);
+        const Command* command = readCommand(kNow, entry_time);
+        MotionGeneratorType out = command != nullptr ? convert(*command) : hold(state);
+        out.motion_finished = requested_mode_ != mode;
+        return out;
+      };
+  // libfranka limits the rate of change and low-pass filters the commanded motion.
+  robot_->control(callback, controller_mode, true, franka::kDefaultCutoffFrequency);
+}
+
+void Robot::runContinuousReading() {
+  statistics_.restart();
+  bool entered = false;
+  robot_->read([this, &entered](const franka::RobotState& state) {
+    const auto kNow = ControlLoopStatistics::Clock::now();
+    statistics_.recordCycle(state, kNow, false);
+    publishState(state, kNow);
+    if (not entered) {
+      enterMode(ControlMode::kReading, kNow);
+      entered = true;
+    }
+    last_callback_time_ = kNow;
+    return requested_mode_ == ControlMode::kReading;
+  });
+}
+
+const char* Robot::toString(ControlMode mode) {
+  switch (mode) {
+    case ControlMode::kReading:
+      return "reading loop";
+    case ControlMode::kTorque:
+      return "torque control loop";
+    case ControlMode::kJointPosition:
+      return "joint position control loop";
+    case ControlMode::kJointVelocity:
+      return "joint velocity control loop";
+    case ControlMode::kCartesianPose:
+      return "Cartesian pose control loop";
+    case ControlMode::kCartesianVelocity:
+      return "Cartesian velocity control loop";
+    case ControlMode::kIdle:
+    default:
+      return "idle";
+  }
 }
 
 Robot::~Robot() {
-  stopRobot();
+  {
+    std::lock_guard<std::mutex> lock(mode_mutex_);
+    shutdown_ = true;
+    requested_mode_ = ControlMode::kIdle;
+  }
+  mode_requested_.notify_one();
+  loop_thread_.join();
 }
 
 bool Robot::isStopped() const {
-  return stopped_;
+  return getControlMode() == ControlMode::kIdle;
+}
+
+Robot::ControlMode Robot::getControlMode() const {
+  std::lock_guard<std::mutex> lock(mode_mutex_);
+  return active_mode_;
+}
+
+const ControlLoopStatistics& Robot::getStatistics() const {
+  return statistics_;
+}
+
+Model* Robot::getModel() {
+  return model_.get();
+}
+
+void Robot::startRecording(const std::string& path) {
+  auto recorder = std::make_unique<StateRecorder>(path);
+  executeParameterCommand([this, &recorder]() { std::swap(recorder_, recorder); });
+  RCLCPP_INFO(logger_, "Recording robot states to %s", path.c_str());
+  if (recorder) {
+    logRecordingStopped(*recorder);
+  }
+}
+
+void Robot::stopRecording() {
+  std::unique_ptr<StateRecorder> recorder;
+  executeParameterCommand([this, &recorder]() { std::swap(recorder_, recorder); });
+  if (recorder) {
+    logRecordingStopped(*recorder);
+  }
+}
+
+void Robot::logRecordingStopped(const StateRecorder& recorder) {
+  RCLCPP_INFO(logger_, "Stopped recording to %s", recorder.path().c_str());
+  if (recorder.droppedSamples() > 0) {
+    RCLCPP_WARN(logger_, "%" PRIu64 " robot states could not be recorded in time",
+                recorder.droppedSamples());
+  }
+}
+
+void Robot::executeParameterCommand(const std::function<void()>& command) {
+  std::lock_guard<std::mutex> lock(loop_mutex_);
+  const ControlMode kPreviousMode = requested_mode_;
+  if (kPreviousMode != ControlMode::kIdle and kPreviousMode != ControlMode::kReading) {
+    throw franka::InvalidOperationException(
+        "Robot parameters cannot be changed while a control loop is running");
+  }
+  if (not switchMode(ControlMode::kIdle)) {
+    throw franka::InvalidOperationException("Reading loop could not be paused");
+  }
+  try {
+    command();
+  } catch (const franka::Exception&) {
+    switchMode(kPreviousMode);
+    throw;
+  }
+  switchMode(kPreviousMode);
+}
+
+void Robot::setJointStiffness(const franka_msgs::srv::SetJointStiffness::Request::SharedPtr& req) {
+  executeParameterCommand([&]() { robot_->setJointImpedance(req->joint_stiffness); });
+}
+
+void Robot::setCartesianStiffness(
+    const franka_msgs::srv::SetCartesianStiffness::Request::SharedPtr& req) {
+  executeParameterCommand([&]() { robot_->setCartesianImpedance(req->cartesian_stiffness); });
+}
+
+void Robot::setTCPFrame(const franka_msgs::srv::SetTCPFrame::Request::SharedPtr& req) {
+  executeParameterCommand([&]() { robot_->setEE(req->ne_t_ee); });
+}
+
+void Robot::setStiffnessFrame(const franka_msgs::srv::SetStiffnessFrame::Request::SharedPtr& req) {
+  executeParameterCommand([&]() { robot_->setK(req->ee_t_k); });
+}
+
+void Robot::setForceTorqueCollisionBehavior(
+    const franka_msgs::srv::SetForceTorqueCollisionBehavior::Request::SharedPtr& req) {
+  executeParameterCommand([&]() {
+    robot_->setCollisionBehavior(
+        req->lower_torque_thresholds_nominal, req->upper_torque_thresholds_nominal,
+        req->lower_force_thresholds_nominal, req->upper_force_thresholds_nominal);
+  });
+}
+
+void Robot::setFullCollisionBehavior(
+    const franka_msgs::srv::SetFullCollisionBehavior::Request::SharedPtr& req) {
+  executeParameterCommand([&]() {
+    robot_->setCollisionBehavior(
+        req->lower_torque_thresholds_acceleration, req->upper_torque_thresholds_acceleration,
+        req->lower_torque_thresholds_nominal, req->upper_torque_thresholds_nominal,
+        req->lower_force_thresholds_acceleration, req->upper_force_thresholds_acceleration,
+        req->lower_force_thresholds_nominal, req->upper_force_thresholds_nominal);
+  });
 }
 
 void Robot::setLoad(const franka_msgs::srv::SetLoad::Request::SharedPtr& req) {
-  std::lock_guard<std::mutex> lock(write_mutex_);
-  double mass(req->mass);
-  std::array<double, 3> center_of_mass{};  // NOLINT [readability-identifier-naming]
-  std::copy(req->center_of_mass.cbegin(), req->center_of_mass.cend(), center_of_mass.begin());
-  std::array<double, 9> load_inertia{};
-  std::copy(req->load_inertia.cbegin(), req->load_inertia.cend(), load_inertia.begin());
-
-  robot_->setLoad(mass, center_of_mass, load_inertia);
+  executeParameterCommand(
+      [&]() { robot_->setLoad(req->mass, req->center_of_mass, req->load_inertia); });
+}
+
+void Robot::setRobotParameters(
+    const franka_msgs::srv::SetRobotParameters::Request::SharedPtr& req) {
+  executeParameterCommand([&]() {
+    if (req->set_full_collision_behavior) {
+      robot_->setCollisionBehavior(
+          req->lower_torque_thresholds_acceleration, req->upper_torque_thresholds_acceleration,
+          req->lower_torque_thresholds_nominal, req->upper_torque_thresholds_nominal,
+          req->lower_force_thresholds_acceleration, req->upper_force_thresholds_acceleration,
+          req->lower_force_thresholds_nominal, req->upper_force_thresholds_nominal);
+    }
+    if (req->set_joint_stiffness) {
+      robot_->setJointImpedance(req->joint_stiffness);
+    }
+    if (req->set_cartesian_stiffness) {
+      robot_->setCartesianImpedance(req->cartesian_stiffness);
+    }
+    if (req->set_tcp_frame) {
+      robot_->setEE(req->ne_t_ee);
+    }
+    if (req->set_stiffness_frame) {
+      robot_->setK(req->ee_t_k);
+    }
+    if (req->set_load) {
+      robot_->setLoad(req->mass, req->center_of_mass, req->load_inertia);
+    }
+  });
 }
 
 }  // namespace franka_hardware
@@ -0,0 +1,143 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "franka_hardware/robot_connection.hpp"
+
+#include <chrono>
+#include <utility>
+
+#include <franka/control_tools.h>
+#include <franka/model.h>
+#include <rclcpp/logging.hpp>
+
+namespace franka_hardware {
+
+LibfrankaRobotConnection::LibfrankaRobotConnection(const std::string& robot_ip,
+                                                   const rclcpp::Logger& logger,
+                                                   bool set_realtime_priority) {
+  franka::RealtimeConfig rt_config = franka::RealtimeConfig::kEnforce;
+  if (not franka::hasRealtimeKernel()) {
+    rt_config = franka::RealtimeConfig::kIgnore;
+    RCLCPP_WARN(
+        logger,
+        "You are not using a real-time kernel. Using a real-time kernel is strongly recommended!");
+  } else if (not set_realtime_priority) {
+    rt_config = franka::RealtimeConfig::kIgnore;
+  }
+  const auto kStart = std::chrono::steady_clock::now();
+  robot_ = std::make_unique<franka::Robot>(robot_ip, rt_config);
+  RCLCPP_INFO(
+      logger, "Connected to %s in %.1f ms", robot_ip.c_str(),
+      std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - kStart).count());
+}
+
+void LibfrankaRobotConnection::read(std::function<bool(const franka::RobotState&)> read_callback) {
+  robot_->read(std::move(read_callback));
+}
+
+void LibfrankaRobotConnection::control(
+    std::function<franka::Torques(const franka::RobotState&, franka::Duration)> control_callback,
+    bool limit_rate,
+    double cutoff_frequency) {
+  robot_->control(std::move(control_callback), limit_rate, cutoff_frequency);
+}
+
+void LibfrankaRobotConnection::control(
+    std::function<franka::JointPositions(const franka::RobotState&, franka::Duration)>
+        motion_callback,
+    franka::ControllerMode controller_mode,
+    bool limit_rate,
+    double cutoff_frequency) {
+  robot_->control(std::move(motion_callback), controller_mode, limit_rate, cutoff_frequency);
+}
+
+void LibfrankaRobotConnection::control(
+    std::function<franka::JointVelocities(const franka::RobotState&, franka::Duration)>
+        motion_callback,
+    franka::ControllerMode controller_mode,
+    bool limit_rate,
+    double cutoff_frequency) {
+  robot_->control(std::move(motion_callback), controller_mode, limit_rate, cutoff_frequency);
+}
+
+void LibfrankaRobotConnection::control(
+    std::function<franka::CartesianPose(const franka::RobotState&, franka::Duration)>
+        motion_callback,
+    franka::ControllerMode controller_mode,
+    bool limit_rate,
+    double cutoff_frequency) {
+  robot_->control(std::move(motion_callback), controller_mode, limit_rate, cutoff_frequency);
+}
+
+void LibfrankaRobotConnection::control(
+    std::function<franka::CartesianVelocities(const franka::RobotState&, franka::Duration)>
+        motion_callback,
+    franka::ControllerMode controller_mode,
+    bool limit_rate,
+    double cutoff_frequency) {
+  robot_->control(std::move(motion_callback), controller_mode, limit_rate, cutoff_frequency);
+}
+
+void LibfrankaRobotConnection::setCollisionBehavior(
+    const std::array<double, 7>& lower_torque_thresholds,
+    const std::array<double, 7>& upper_torque_thresholds,
+    const std::array<double, 6>& lower_force_thresholds,
+    const std::array<double, 6>& upper_force_thresholds) {
+  robot_->setCollisionBehavior(lower_torque_thresholds, upper_torque_thresholds,
+                               lower_force_thresholds, upper_force_thresholds);
+}
+
+void LibfrankaRobotConnection::setCollisionBehavior(
+    const std::array<double, 7>& lower_torque_thresholds_acceleration,
+    const std::array<double, 7>& upper_torque_thresholds_acceleration,
+    const std::array<double, 7>& lower_torque_thresholds_nominal,
+    const std::array<double, 7>& upper_torque_thresholds_nominal,
+    const std::array<double, 6>& lower_force_thresholds_acceleration,
+    const std::array<double, 6>& upper_force_thresholds_acceleration,
+    const std::array<double, 6>& lower_force_thresholds_nominal,
+    const std::array<double, 6>& upper_force_thresholds_nominal) {
+  robot_->setCollisionBehavior(
+      lower_torque_thresholds_acceleration, upper_torque_thresholds_acceleration,
+      lower_torque_thresholds_nominal, upper_torque_thresholds_nominal,
+      lower_force_thresholds_acceleration, upper_force_thresholds_acceleration,
+      lower_force_thresholds_nominal, upper_force_thresholds_nominal);
+}
+
+void LibfrankaRobotConnection::setJointImpedance(const std::array<double, 7>& K_theta) {  // NOLINT
+  robot_->setJointImpedance(K_theta);
+}
+
+void LibfrankaRobotConnection::setCartesianImpedance(const std::array<double, 6>& K_x) {  // NOLINT
+  robot_->setCartesianImpedance(K_x);
+}
+
+void LibfrankaRobotConnection::setEE(const std::array<double, 16>& NE_T_EE) {  // NOLINT
+  robot_->setEE(NE_T_EE);
+}
+
+void LibfrankaRobotConnection::setK(const std::array<double, 16>& EE_T_K) {  // NOLINT
+  robot_->setK(EE_T_K);
+}
+
+void LibfrankaRobotConnection::setLoad(double load_mass,
+                                       const std::array<double, 3>& F_x_Cload,  // NOLINT
+                                       const std::array<double, 9>& load_inertia) {
+  robot_->setLoad(load_mass, F_x_Cload, load_inertia);
+}
+
+std::unique_ptr<Model> LibfrankaRobotConnection::loadModel() {
+  return std::make_unique<Model>(std::make_unique<franka::Model>(robot_->loadModel()));
+}
+
+}  // namespace franka_hardware
@@ -0,0 +1,129 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "franka_hardware/state_recorder.hpp"
+
+#include <cerrno>
+#include <cstring>
+#include <stdexcept>
+
+namespace franka_hardware {
+
+constexpr std::array<char, 8> StateRecorder::kMagic;
+constexpr uint32_t StateRecorder::kVersion;
+constexpr std::size_t StateRecorder::kHeaderSize;
+constexpr std::size_t StateRecorder::kDefaultCapacity;
+constexpr std::chrono::milliseconds StateRecorder::kWritePeriod;
+
+static_assert(sizeof(StateRecord) == 1272, "StateRecord must not contain padding");
+static_assert(StateRecorder::kHeaderSize == sizeof(StateRecorder::kMagic) +
+                                                sizeof(StateRecorder::kVersion) + sizeof(uint32_t),
+              "Header size does not match its fields");
+
+StateRecorder::StateRecorder(const std::string& path, std::size_t capacity)
+    : path_(path), file_(std::fopen(path.c_str(), "wb")), buffer_(capacity), batch_(capacity) {
+  if (file_ == nullptr) {
+    throw std::runtime_error("Could not create state recording " + path + ": " +
+                             std::strerror(errno));
+  }
+  const uint32_t kRecordSize = sizeof(StateRecord);
+  if (std::fwrite(kMagic.data(), 1, kMagic.size(), file_) != kMagic.size() or
+      std::fwrite(&kVersion, sizeof(kVersion), 1, file_) != 1 or
+      std::fwrite(&kRecordSize, sizeof(kRecordSize), 1, file_) != 1) {
+    std::fclose(file_);
+    throw std::runtime_error("Could not write header of state recording " + path);
+  }
+  writer_ = std::thread([this]() { run(); });
+}
+
+StateRecorder::~StateRecorder() {
+  {
+    std::lock_guard<std::mutex> lock(mutex_);
+    finish_ = true;
+  }
+  finish_requested_.notify_one();
+  writer_.join();
+  std::fclose(file_);
+}
+
+void StateRecorder::record(const franka::RobotState& state, Clock::time_point now) {
+  StateRecord record;
+  record.time = state.time.toMSec();
+  record.host_time =
+      std::chrono::duration_cast<std::chrono::nanoseconds>(now.time_since_epoch()).count();
+  record.robot_mode = static_cast<int64_t>(state.robot_mode);
+  record.control_command_success_rate = state.control_command_success_rate;
+  record.q = state.q;
+  record.q_d = state.q_d;
+  record.dq = state.dq;
+  record.dq_d = state.dq_d;
+  record.ddq_d = state.ddq_d;
+  record.theta = state.theta;
+  record.dtheta = state.dtheta;
+  record.tau_J = state.tau_J;
+  record.tau_J_d = state.tau_J_d;
+  record.dtau_J = state.dtau_J;
+  record.tau_ext_hat_filtered = state.tau_ext_hat_filtered;
+  record.O_T_EE = state.O_T_EE;
+  record.O_T_EE_d = state.O_T_EE_d;
+  record.O_T_EE_c = state.O_T_EE_c;
+  record.O_F_ext_hat_K = state.O_F_ext_hat_K;
+  record.K_F_ext_hat_K = state.K_F_ext_hat_K;
+  record.O_dP_EE_d = state.O_dP_EE_d;
+  record.O_dP_EE_c = state.O_dP_EE_c;
+  record.O_ddP_EE_c = state.O_ddP_EE_c;
+  if (not buffer_.push(record)) {
+    dropped_samples_.fetch_add(1, std::memory_order_relaxed);
+  }
+}
+
+uint64_t StateRecorder::writtenSamples() const {
+  return written_samples_.load(std::memory_order_relaxed);
+}
+
+uint64_t StateRecorder::droppedSamples() const {
+  return dropped_samples_.load(std::memory_order_relaxed);
+}
+
+const std::string& StateRecorder::path() const {
+  return path_;
+}
+
+void StateRecorder::run() {
+  std::unique_lock<std::mutex> lock(mutex_);
+  while (not finish_requested_.wait_for(lock, kWritePeriod, [this]() { return finish_; })) {
+    lock.unlock();
+    const bool kWritten = writeBufferedSamples();
+    lock.lock();
+    if (not kWritten) {
+      return;
+    }
+  }
+  lock.unlock();
+  writeBufferedSamples();
+}
+
+bool StateRecorder::writeBufferedSamples() {
+  const std::size_t kCount = buffer_.pop(batch_.data(), batch_.size());
+  if (kCount == 0) {
+    return true;
+  }
+  const std::size_t kWritten = std::fwrite(batch_.data(), sizeof(StateRecord), kCount, file_);
+  written_samples_.fetch_add(kWritten, std::memory_order_relaxed);
+  // Make the samples visible to readers of the file while recording.
+  std::fflush(file_);
+  return kWritten == kCount;
+}
+
+}  // namespace franka_hardware
@@ -0,0 +1,198 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "franka_hardware/thread_configuration.hpp"
+
+#include <pthread.h>
+#include <sched.h>
+#include <sys/mman.h>
+#include <sys/resource.h>
+
+#include <cerrno>
+#include <cstdint>
+#include <cstring>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+
+#include <rclcpp/logging.hpp>
+
+#include "franka_hardware/parameter_parsing.hpp"
+
+namespace franka_hardware {
+
+namespace {
+
+const std::string* findParameter(const std::unordered_map<std::string, std::string>& parameters,
+                                 const std::string& name) {
+  const auto kParameter = parameters.find(name);
+  if (kParameter == parameters.end() or kParameter->second.empty()) {
+    return nullptr;
+  }
+  return &kParameter->second;
+}
+
+const char* policyName(int policy) {
+  switch (policy) {
+    case SCHED_FIFO:
+      return "fifo";
+    case SCHED_RR:
+      return "rr";
+    case SCHED_OTHER:
+      return "other";
+    default:
+      return "unknown";
+  }
+}
+
+}  // namespace
+
+ThreadConfiguration parseThreadConfiguration(
+    const std::unordered_map<std::string, std::string>& parameters,
+    const std::string& prefix) {
+  ThreadConfiguration configuration;
+  configuration.name = prefix;
+
+  const auto kPolicyName = prefix + "_policy";
+  const auto kPriorityName = prefix + "_priority";
+  const auto kCpusName = prefix + "_cpus";
+  const std::string* policy = findParameter(parameters, kPolicyName);
+  const std::string* priority = findParameter(parameters, kPriorityName);
+  const std::string* cpus = findParameter(parameters, kCpusName);
+
+  if (policy != nullptr) {
+    configuration.set_scheduling = true;
+    if (*policy == "other") {
+      configuration.policy = SCHED_OTHER;
+    } else if (*policy == "fifo") {
+      configuration.policy = SCHED_FIFO;
+    } else if (*policy == "rr") {
+      configuration.policy = SCHED_RR;
+    } else {
+      throw std::invalid_argument("Parameter '" + kPolicyName +
+                                  "' must be 'other', 'fifo' or 'rr', got " + *policy);
+    }
+  }
+  int64_t priority_value = 0;
+  if (priority != nullptr) {
+    if (policy == nullptr) {
+      configuration.set_scheduling = true;
+      configuration.policy = SCHED_FIFO;
+    }
+    priority_value = parseInteger(kPriorityName, *priority);
+  }
+  if (configuration.set_scheduling) {
+    const int kMinimum = sched_get_priority_min(configuration.policy);
+    const int kMaximum = sched_get_priority_max(configuration.policy);
+    if (priority_value < kMinimum or priority_value > kMaximum) {
+      throw std::invalid_argument("Parameter '" + kPriorityName + "' must be between " +
+                                  std::to_string(kMinimum) + " and " + std::to_string(kMaximum) +
+                                  " for policy " + policyName(configuration.policy));
+    }
+    configuration.priority = static_cast<int>(priority_value);
+  }
+  if (cpus != nullptr) {
+    // Every comma separates two CPUs, so that "0,,1" and "2," are rejected
+    std::string::size_type start = 0;
+    while (start <= cpus->size()) {
+      auto end = cpus->find(',', start);
+      if (end == std::string::npos) {
+        end = cpus->size();
+      }
+      const auto kCpuName = cpus->substr(start, end - start);
+      const int64_t kCpu = parseInteger(kCpusName, kCpuName);
+      if (kCpu < 0 or kCpu >= CPU_SETSIZE) {
+        throw std::invalid_argument("Parameter '" + kCpusName + "' contains invalid CPU " +
+                                    kCpuName);
+      }
+      configuration.cpus.push_back(static_cast<int>(kCpu));
+      start = end + 1;
+    }
+  }
+  return configuration;
+}
+
+bool applyToCurrentThread(const ThreadConfiguration& configuration, const rclcpp::Logger& logger) {
+  bool success = true;
+  if (configuration.set_scheduling) {
+    sched_param parameters{};
+    parameters.sched_priority = configuration.priority;
+    const int kError = pthread_setschedparam(pthread_self(), configuration.policy, &parameters);
+    if (kError != 0) {
+      RCLCPP_WARN(logger, "Could not set %s thread to policy %s with priority %d: %s",
+                  configuration.name.c_str(), policyName(configuration.policy),
+                  configuration.priority, std::strerror(kError));
+      success = false;
+    }
+  }
+  if (not configuration.cpus.empty()) {
+    cpu_set_t cpu_set;
+    CPU_ZERO(&cpu_set);
+    for (int cpu : configuration.cpus) {
+      CPU_SET(cpu, &cpu_set);
+    }
+    const int kError = pthread_setaffinity_np(pthread_self(), sizeof(cpu_set), &cpu_set);
+    if (kError != 0) {
+      RCLCPP_WARN(logger, "Could not set CPU affinity of %s thread: %s", configuration.name.c_str(),
+                  std::strerror(kError));
+      success = false;
+    }
+  }
+  RCLCPP_INFO(logger, "%s thread runs with %s", configuration.name.c_str(),
+              describeCurrentThread().c_str());
+  return success;
+}
+
+std::string describeCurrentThread() {
+  std::ostringstream description;
+  int policy = 0;
+  sched_param parameters{};
+  if (pthread_getschedparam(pthread_self(), &policy, &parameters) == 0) {
+    description << "policy " << policyName(policy) << ", priority " << parameters.sched_priority;
+  } else {
+    description << "unknown scheduling";
+  }
+  cpu_set_t cpu_set;
+  CPU_ZERO(&cpu_set);
+  if (pthread_getaffinity_np(pthread_self(), sizeof(cpu_set), &cpu_set) == 0) {
+    description << ", CPUs ";
+    bool first = true;
+    for (int cpu = 0; cpu < CPU_SETSIZE; cpu++) {
+      if (CPU_ISSET(cpu, &cpu_set)) {
+        description << (first ? "" : ",") << cpu;
+        first = false;
+      }
+    }
+  }
+  return description.str();
+}
+
+bool lockMemory(const rclcpp::Logger& logger) {
+  if (mlockall(MCL_CURRENT | MCL_FUTURE) != 0) {
+    const int kError = errno;
+    rlimit limit{};
+    std::string limit_description = "unknown";
+    if (getrlimit(RLIMIT_MEMLOCK, &limit) == 0) {
+      limit_description =
+          limit.rlim_cur == RLIM_INFINITY ? "unlimited" : std::to_string(limit.rlim_cur) + " bytes";
+    }
+    RCLCPP_WARN(logger, "Could not lock memory: %s. RLIMIT_MEMLOCK is %s", std::strerror(kError),
+                limit_description.c_str());
+    return false;
+  }
+  RCLCPP_INFO(logger, "Locked memory of the process");
+  return true;
+}
+
+}  // namespace franka_hardware
@@ -0,0 +1,60 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <future>
+#include <stdexcept>
+#include <vector>
+
+#include <gtest/gtest.h>
+
+#include "franka_hardware/async_command_queue.hpp"
+
+using franka_hardware::AsyncCommandQueue;
+
+TEST(AsyncCommandQueueTest, executesCommandsInOrder) {
+  AsyncCommandQueue queue(4);
+  std::vector<int> executed;
+  auto first = queue.push([&executed]() { executed.push_back(1); });
+  auto second = queue.push([&executed]() { executed.push_back(2); });
+  first.get();
+  second.get();
+  EXPECT_EQ(executed, (std::vector<int>{1, 2}));
+}
+
+TEST(AsyncCommandQueueTest, forwardsExceptionsToTheCaller) {
+  AsyncCommandQueue queue(1);
+  auto result = queue.push([]() { throw std::runtime_error("rejected"); });
+  EXPECT_THROW(result.get(), std::runtime_error);
+}
+
+TEST(AsyncCommandQueueTest, rejectsCommandsWhenFull) {
+  AsyncCommandQueue queue(1);
+  std::promise<void> release;
+  auto blocked = release.get_future().share();
+  std::promise<void> started;
+  auto running = queue.push([&started, blocked]() {
+    started.set_value();
+    blocked.wait();
+  });
+  started.get_future().wait();
+
+  auto queued = queue.push([]() {});
+  auto rejected = queue.push([]() {});
+  EXPECT_TRUE(queued.valid());
+  EXPECT_FALSE(rejected.valid());
+
+  release.set_value();
+  running.get();
+  queued.get();
+}
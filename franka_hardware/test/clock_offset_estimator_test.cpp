@@ -0,0 +1,76 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <algorithm>
+#include <cmath>
+#include <random>
+
+#include <gtest/gtest.h>
+
+#include "franka_hardware/clock_offset_estimator.hpp"
+
+using franka_hardware::ClockOffsetEstimator;
+
+namespace {
+/**
+ * Feeds one minute of 1 kHz states whose receive delay varies between 0.1 ms and 2 ms.
+ * @return the largest error of the mapped measurement time after the first window [s].
+ */
+double maximumError(ClockOffsetEstimator* estimator, double offset, double drift) {
+  std::mt19937 generator(42);
+  std::exponential_distribution<double> jitter(1. / 0.3e-3);
+  double maximum_error = 0;
+  for (int i = 0; i < 60000; i++) {
+    const double kRobotTime = 1000. + i * 1e-3;
+    const double kMeasurementTime = offset + kRobotTime * (1. + drift);
+    const double kDelay = 0.1e-3 + std::min(jitter(generator), 1.9e-3);
+    estimator->update(kRobotTime, kMeasurementTime + kDelay);
+    if (i >= 1000) {
+      maximum_error =
+          std::max(maximum_error, std::abs(estimator->toHostTime(kRobotTime) - kMeasurementTime));
+    }
+  }
+  return maximum_error;
+}
+}  // namespace
+
+TEST(ClockOffsetEstimatorTest, isInvalidBeforeFirstUpdate) {
+  ClockOffsetEstimator estimator;
+  EXPECT_FALSE(estimator.isValid());
+  EXPECT_TRUE(std::isnan(estimator.toHostTime(1.)));
+  estimator.update(1., 101.);
+  EXPECT_TRUE(estimator.isValid());
+  EXPECT_DOUBLE_EQ(estimator.toHostTime(2.), 102.);
+}
+
+TEST(ClockOffsetEstimatorTest, ignoresReceiveDelayJitter) {
+  ClockOffsetEstimator estimator;
+  // The remaining error is dominated by the minimum receive delay of 0.1 ms.
+  EXPECT_LT(maximumError(&estimator, 5000., 0.), 0.15e-3);
+}
+
+TEST(ClockOffsetEstimatorTest, correctsDrift) {
+  ClockOffsetEstimator estimator;
+  EXPECT_LT(maximumError(&estimator, 5000., 50e-6), 0.15e-3);
+  EXPECT_NEAR(estimator.drift(), 50e-6, 5e-6);
+}
+
+TEST(ClockOffsetEstimatorTest, restartsWhenRobotTimeJumpsBack) {
+  ClockOffsetEstimator estimator;
+  for (int i = 0; i < 3000; i++) {
+    estimator.update(100. + i * 1e-3, 200. + i * 1e-3);
+  }
+  estimator.update(1., 500.);
+  EXPECT_DOUBLE_EQ(estimator.toHostTime(1.), 500.);
+}
@@ -0,0 +1,98 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <chrono>
+
+#include <gtest/gtest.h>
+
+#include "franka_hardware/control_loop_statistics.hpp"
+
+using franka_hardware::ControlLoopStatistics;
+using franka_hardware::LatencyHistogram;
+using std::chrono::microseconds;
+
+TEST(LatencyHistogramTest, emptyHistogramReturnsZero) {
+  LatencyHistogram histogram(microseconds(10));
+  EXPECT_EQ(histogram.count(), 0U);
+  EXPECT_EQ(histogram.percentile(0.99), microseconds(0));
+  EXPECT_EQ(histogram.max(), microseconds(0));
+}
+
+TEST(LatencyHistogramTest, percentilesReturnBucketUpperEdges) {
+  LatencyHistogram histogram(microseconds(10));
+  for (int i = 0; i < 99; i++) {
+    histogram.record(microseconds(15));
+  }
+  histogram.record(microseconds(95));
+  EXPECT_EQ(histogram.count(), 100U);
+  EXPECT_EQ(histogram.percentile(0.5), microseconds(20));
+  EXPECT_EQ(histogram.percentile(0.99), microseconds(20));
+  EXPECT_EQ(histogram.percentile(1.0), microseconds(95));
+  EXPECT_EQ(histogram.max(), microseconds(95));
+}
+
+TEST(LatencyHistogramTest, overflowingValuesReportMaximum) {
+  LatencyHistogram histogram(microseconds(1));
+  histogram.record(microseconds(5000));
+  EXPECT_EQ(histogram.percentile(0.5), microseconds(5000));
+}
+
+TEST(ControlLoopStatisticsTest, countsMissedCyclesFromRobotTime) {
+  ControlLoopStatistics statistics;
+  franka::RobotState state;
+  auto now = ControlLoopStatistics::Clock::now();
+  for (uint64_t robot_time_ms : {10U, 11U, 14U, 15U}) {
+    state.time = franka::Duration(robot_time_ms);
+    statistics.recordCycle(state, now, false);
+    now += std::chrono::milliseconds(1);
+  }
+  EXPECT_EQ(statistics.cycles(), 4U);
+  EXPECT_EQ(statistics.missedCycles(), 2U);
+  EXPECT_EQ(statistics.period().count(), 3U);
+  EXPECT_EQ(statistics.period().max(), std::chrono::milliseconds(1));
+}
+
+TEST(ControlLoopStatisticsTest, tracksSuccessRateOnlyInTorqueControl) {
+  ControlLoopStatistics statistics;
+  franka::RobotState state;
+  state.control_command_success_rate = 0.;
+  statistics.recordCycle(state, ControlLoopStatistics::Clock::now(), false);
+  EXPECT_DOUBLE_EQ(statistics.minimumSuccessRate(), 1.);
+
+  state.control_command_success_rate = 0.9;
+  statistics.recordCycle(state, ControlLoopStatistics::Clock::now(), true);
+  state.control_command_success_rate = 0.97;
+  statistics.recordCycle(state, ControlLoopStatistics::Clock::now(), true);
+  EXPECT_DOUBLE_EQ(statistics.lastSuccessRate(), 0.97);
+  EXPECT_DOUBLE_EQ(statistics.minimumSuccessRate(), 0.9);
+}
+
+TEST(ControlLoopStatisticsTest, keepsModeSwitchGapOutOfPeriod) {
+  ControlLoopStatistics statistics;
+  franka::RobotState state;
+  auto now = ControlLoopStatistics::Clock::now();
+  state.time = franka::Duration(10);
+  statistics.recordCycle(state, now, false);
+
+  now += std::chrono::milliseconds(40);
+  statistics.recordModeSwitch(std::chrono::milliseconds(40));
+  statistics.restart();
+  state.time = franka::Duration(50);
+  statistics.recordCycle(state, now, true);
+
+  EXPECT_EQ(statistics.period().count(), 0U);
+  EXPECT_EQ(statistics.missedCycles(), 0U);
+  EXPECT_EQ(statistics.modeSwitchGap().count(), 1U);
+  EXPECT_EQ(statistics.modeSwitchGap().max(), std::chrono::milliseconds(40));
+}
@@ -0,0 +1,96 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <array>
+#include <string>
+#include <vector>
+
+#include <gtest/gtest.h>
+#include <hardware_interface/handle.hpp>
+#include <hardware_interface/loaned_state_interface.hpp>
+
+#include "franka_hardware/franka_robot_model.hpp"
+#include "franka_hardware/model.hpp"
+
+using franka_hardware::FrankaRobotModel;
+
+namespace {
+class FixedModel : public franka_hardware::Model {
+ public:
+  FixedModel() = default;
+
+  std::array<double, 42> zero_jacobian{};
+  std::array<double, 7> coriolis{};
+
+ protected:
+  std::array<double, 7> computeCoriolisForceVector(
+      const franka::RobotState& /*state*/) const override {
+    return coriolis;
+  }
+
+  std::array<double, 42> computeZeroJacobian(franka::Frame /*frame*/,
+                                             const franka::RobotState& /*state*/) const override {
+    return zero_jacobian;
+  }
+};
+
+class FrankaRobotModelTest : public ::testing::Test {
+ protected:
+  void SetUp() override {
+    robot_state_.q.at(0) = 0.5;
+    model_.zero_jacobian.fill(2.);
+    model_.coriolis.fill(3.);
+    model_.update(robot_state_);
+    model_value_ = franka_hardware::pointerToStateValue(&model_);
+    robot_state_value_ = franka_hardware::pointerToStateValue(&robot_state_);
+  }
+
+  FixedModel model_;
+  franka::RobotState robot_state_;
+  double model_value_ = 0;
+  double robot_state_value_ = 0;
+  double other_value_ = 0;
+};
+}  // namespace
+
+TEST_F(FrankaRobotModelTest, findsTheInterfacesByTheirFullName) {
+  hardware_interface::StateInterface other("panda_joint1", "position", &other_value_);
+  hardware_interface::StateInterface model("panda", FrankaRobotModel::kRobotModelInterface,
+                                           &model_value_);
+  hardware_interface::StateInterface state("panda", FrankaRobotModel::kRobotStateInterface,
+                                           &robot_state_value_);
+  std::vector<hardware_interface::LoanedStateInterface> loaned_interfaces;
+  loaned_interfaces.emplace_back(other);
+  loaned_interfaces.emplace_back(model);
+  loaned_interfaces.emplace_back(state);
+
+  FrankaRobotModel robot_model("panda");
+  ASSERT_TRUE(robot_model.assignLoanedStateInterfaces(loaned_interfaces));
+  EXPECT_DOUBLE_EQ(robot_model.getZeroJacobian(franka::Frame::kEndEffector).at(41), 2.);
+  EXPECT_DOUBLE_EQ(robot_model.getCoriolisForceVector().at(6), 3.);
+  EXPECT_DOUBLE_EQ(robot_model.getRobotState().q.at(0), 0.5);
+}
+
+TEST_F(FrankaRobotModelTest, failsWithoutTheInterfacesOfItsArm) {
+  hardware_interface::StateInterface model("fr3", FrankaRobotModel::kRobotModelInterface,
+                                           &model_value_);
+  hardware_interface::StateInterface state("fr3", FrankaRobotModel::kRobotStateInterface,
+                                           &robot_state_value_);
+  std::vector<hardware_interface::LoanedStateInterface> loaned_interfaces;
+  loaned_interfaces.emplace_back(model);
+  loaned_interfaces.emplace_back(state);
+
+  FrankaRobotModel robot_model("panda");
+  EXPECT_FALSE(robot_model.assignLoanedStateInterfaces(loaned_interfaces));
+}
@@ -0,0 +1,115 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <chrono>
+#include <cstdio>
+#include <memory>
+#include <thread>
+
+#include <franka/exception.h>
+#include <gtest/gtest.h>
+#include <rclcpp/logging.hpp>
+
+#include "franka_hardware/loopback_robot_connection.hpp"
+#include "franka_hardware/robot.hpp"
+
+using franka_hardware::LoopbackRobotConnection;
+using franka_hardware::Robot;
+using franka_hardware::StateRecord;
+using franka_hardware::StateRecorder;
+
+namespace {
+std::unique_ptr<Robot> createRobot(double packet_loss = 0.) {
+  return std::make_unique<Robot>(
+      std::make_unique<LoopbackRobotConnection>(packet_loss, std::chrono::microseconds(0), 42),
+      rclcpp::get_logger("loopback_robot_test"));
+}
+}  // namespace
+
+TEST(LoopbackRobotTest, streamsStateWhileReading) {
+  auto robot = createRobot();
+  EXPECT_TRUE(robot->isStopped());
+  ASSERT_TRUE(robot->initializeContinuousReading());
+  const auto kStart = robot->read().time.toMSec();
+  std::this_thread::sleep_for(std::chrono::milliseconds(50));
+  EXPECT_GT(robot->read().time.toMSec(), kStart);
+  robot->stopRobot();
+  EXPECT_TRUE(robot->isStopped());
+}
+
+TEST(LoopbackRobotTest, switchesBetweenAllModes) {
+  auto robot = createRobot();
+  ASSERT_TRUE(robot->initializeContinuousReading());
+  for (auto mode : {Robot::ControlMode::kTorque, Robot::ControlMode::kJointPosition,
+                    Robot::ControlMode::kJointVelocity, Robot::ControlMode::kCartesianPose,
+                    Robot::ControlMode::kCartesianVelocity, Robot::ControlMode::kReading}) {
+    ASSERT_TRUE(robot->initializeControl(mode));
+    EXPECT_EQ(robot->getControlMode(), mode);
+  }
+  EXPECT_EQ(robot->getStatistics().modeSwitchGap().count(), 6U);
+}
+
+TEST(LoopbackRobotTest, followsJointVelocityCommands) {
+  auto robot = createRobot();
+  ASSERT_TRUE(robot->initializeContinuousReading());
+  const auto kStartPosition = robot->read().q.at(0);
+  ASSERT_TRUE(robot->initializeControl(Robot::ControlMode::kJointVelocity));
+  for (int i = 0; i < 50; i++) {
+    robot->write({0.1, 0, 0, 0, 0, 0, 0});
+    std::this_thread::sleep_for(std::chrono::milliseconds(1));
+  }
+  ASSERT_TRUE(robot->initializeContinuousReading());
+  EXPECT_GT(robot->read().q.at(0), kStartPosition);
+}
+
+TEST(LoopbackRobotTest, reportsLostPacketsAsMissedCycles) {
+  auto robot = createRobot(0.2);
+  ASSERT_TRUE(robot->initializeControl(Robot::ControlMode::kTorque));
+  std::this_thread::sleep_for(std::chrono::milliseconds(100));
+  robot->stopRobot();
+  EXPECT_GT(robot->getStatistics().missedCycles(), 0U);
+  EXPECT_LT(robot->getStatistics().minimumSuccessRate(), 1.);
+}
+
+TEST(LoopbackRobotTest, rejectsParametersDuringControl) {
+  auto robot = createRobot();
+  auto request = std::make_shared<franka_msgs::srv::SetJointStiffness::Request>();
+  ASSERT_TRUE(robot->initializeContinuousReading());
+  EXPECT_NO_THROW(robot->setJointStiffness(request));
+  EXPECT_FALSE(robot->isStopped());
+  ASSERT_TRUE(robot->initializeTorqueControl());
+  EXPECT_THROW(robot->setJointStiffness(request), franka::InvalidOperationException);
+}
+
+TEST(LoopbackRobotTest, recordsStatesWhileReading) {
+  const auto kPath = ::testing::TempDir() + "loopback_robot_test.bin";
+  auto robot = createRobot();
+  robot->startRecording(kPath);
+  ASSERT_TRUE(robot->initializeContinuousReading());
+  std::this_thread::sleep_for(std::chrono::milliseconds(50));
+  ASSERT_TRUE(robot->initializeTorqueControl());
+  EXPECT_THROW(robot->stopRecording(), franka::InvalidOperationException);
+  ASSERT_TRUE(robot->initializeContinuousReading());
+  robot->stopRecording();
+  EXPECT_TRUE(robot->getControlMode() == Robot::ControlMode::kReading);
+
+  std::FILE* file = std::fopen(kPath.c_str(), "rb");
+  ASSERT_NE(file, nullptr);
+  std::fseek(file, 0, SEEK_END);
+  const auto kFileSize = static_cast<std::size_t>(std::ftell(file));
+  const auto kRecords = (kFileSize - StateRecorder::kHeaderSize) / sizeof(StateRecord);
+  std::fclose(file);
+  std::remove(kPath.c_str());
+  EXPECT_GT(kRecords, 40U);
+}
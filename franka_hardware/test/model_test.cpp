@@ -0,0 +1,77 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <array>
+
+#include <gtest/gtest.h>
+
+#include "franka_hardware/model.hpp"
+
+namespace {
+class CountingModel : public franka_hardware::Model {
+ public:
+  mutable int mass_matrix_computations = 0;
+  mutable int zero_jacobian_computations = 0;
+
+ protected:
+  std::array<double, 49> computeMassMatrix(const franka::RobotState& state) const override {
+    mass_matrix_computations++;
+    std::array<double, 49> mass_matrix{};
+    mass_matrix.fill(state.q.at(0));
+    return mass_matrix;
+  }
+
+  std::array<double, 42> computeZeroJacobian(franka::Frame frame,
+                                             const franka::RobotState& /*state*/) const override {
+    zero_jacobian_computations++;
+    std::array<double, 42> jacobian{};
+    jacobian.fill(static_cast<double>(frame));
+    return jacobian;
+  }
+};
+}  // namespace
+
+TEST(ModelTest, computesEachQuantityOncePerCycle) {
+  CountingModel model;
+  franka::RobotState state;
+  state.q.at(0) = 1.;
+  model.update(state);
+  EXPECT_DOUBLE_EQ(model.getMassMatrix().at(0), 1.);
+  EXPECT_DOUBLE_EQ(model.getMassMatrix().at(48), 1.);
+  EXPECT_EQ(model.mass_matrix_computations, 1);
+
+  state.q.at(0) = 2.;
+  model.update(state);
+  EXPECT_DOUBLE_EQ(model.getMassMatrix().at(0), 2.);
+  EXPECT_EQ(model.mass_matrix_computations, 2);
+}
+
+TEST(ModelTest, cachesJacobiansPerFrame) {
+  CountingModel model;
+  franka::RobotState state;
+  model.update(state);
+  EXPECT_DOUBLE_EQ(model.getZeroJacobian(franka::Frame::kEndEffector).at(0),
+                   static_cast<double>(franka::Frame::kEndEffector));
+  EXPECT_DOUBLE_EQ(model.getZeroJacobian(franka::Frame::kFlange).at(0),
+                   static_cast<double>(franka::Frame::kFlange));
+  model.getZeroJacobian(franka::Frame::kEndEffector);
+  EXPECT_EQ(model.zero_jacobian_computations, 2);
+}
+
+TEST(ModelTest, computesNothingBeforeTheFirstCycle) {
+  CountingModel model;
+  EXPECT_EQ(model.getRobotState(), nullptr);
+  EXPECT_DOUBLE_EQ(model.getMassMatrix().at(0), 0.);
+  EXPECT_EQ(model.mass_matrix_computations, 0);
+}
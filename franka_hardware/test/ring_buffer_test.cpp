@@ -0,0 +1,87 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <array>
+#include <cstdint>
+#include <thread>
+
+#include <gtest/gtest.h>
+
+#include "franka_hardware/ring_buffer.hpp"
+
+using franka_hardware::RingBuffer;
+
+TEST(RingBufferTest, returnsValuesInOrder) {
+  RingBuffer<int> buffer(4);
+  std::array<int, 4> values{};
+  EXPECT_EQ(buffer.pop(values.data(), values.size()), 0U);
+  EXPECT_TRUE(buffer.push(1));
+  EXPECT_TRUE(buffer.push(2));
+  EXPECT_TRUE(buffer.push(3));
+  ASSERT_EQ(buffer.pop(values.data(), 2), 2U);
+  EXPECT_EQ(values.at(0), 1);
+  EXPECT_EQ(values.at(1), 2);
+  ASSERT_EQ(buffer.pop(values.data(), values.size()), 1U);
+  EXPECT_EQ(values.at(0), 3);
+}
+
+TEST(RingBufferTest, rejectsValuesWhenFull) {
+  RingBuffer<int> buffer(2);
+  EXPECT_EQ(buffer.capacity(), 2U);
+  EXPECT_TRUE(buffer.push(1));
+  EXPECT_TRUE(buffer.push(2));
+  EXPECT_FALSE(buffer.push(3));
+  std::array<int, 2> values{};
+  ASSERT_EQ(buffer.pop(values.data(), values.size()), 2U);
+  EXPECT_EQ(values.at(1), 2);
+  EXPECT_TRUE(buffer.push(4));
+}
+
+TEST(RingBufferTest, popsAcrossTheEndOfTheBuffer) {
+  RingBuffer<int> buffer(3);
+  std::array<int, 3> values{};
+  for (int i = 0; i < 3; i++) {
+    buffer.push(i);
+  }
+  buffer.pop(values.data(), 2);
+  buffer.push(3);
+  buffer.push(4);
+  ASSERT_EQ(buffer.pop(values.data(), values.size()), 3U);
+  EXPECT_EQ(values, (std::array<int, 3>{2, 3, 4}));
+}
+
+TEST(RingBufferTest, consumerReceivesEveryAcceptedValueOnce) {
+  constexpr std::uint64_t kIterations = 50000;
+  RingBuffer<std::uint64_t> buffer(64);
+  std::thread producer([&]() {
+    for (std::uint64_t i = 1; i <= kIterations;) {
+      if (buffer.push(i)) {
+        i++;
+      }
+    }
+  });
+
+  std::array<std::uint64_t, 16> values{};
+  std::uint64_t expected = 1;
+  bool in_order = true;
+  while (expected <= kIterations) {
+    const std::size_t kCount = buffer.pop(values.data(), values.size());
+    for (std::size_t i = 0; i < kCount; i++) {
+      in_order = in_order and values.at(i) == expected;
+      expected++;
+    }
+  }
+  producer.join();
+  EXPECT_TRUE(in_order);
+}
@@ -0,0 +1,89 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <array>
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+#include <fstream>
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+#include <gtest/gtest.h>
+
+#include "franka_hardware/state_recorder.hpp"
+
+using franka_hardware::StateRecord;
+using franka_hardware::StateRecorder;
+
+namespace {
+std::string temporaryPath() {
+  return ::testing::TempDir() + "state_recorder_test.bin";
+}
+}  // namespace
+
+TEST(StateRecorderTest, writesHeaderAndRecords) {
+  const auto kPath = temporaryPath();
+  constexpr int kSamples = 100;
+  {
+    StateRecorder recorder(kPath);
+    franka::RobotState state;
+    for (int i = 0; i < kSamples; i++) {
+      state.time = franka::Duration(i);
+      state.q.fill(i * 0.1);
+      state.O_T_EE.at(12) = i;
+      recorder.record(state, StateRecorder::Clock::time_point(std::chrono::milliseconds(i)));
+    }
+  }
+
+  std::ifstream file(kPath, std::ios::binary);
+  std::array<char, 8> magic{};
+  uint32_t version = 0;
+  uint32_t record_size = 0;
+  file.read(magic.data(), magic.size());
+  file.read(reinterpret_cast<char*>(&version), sizeof(version));
+  file.read(reinterpret_cast<char*>(&record_size), sizeof(record_size));
+  EXPECT_EQ(magic, StateRecorder::kMagic);
+  EXPECT_EQ(version, StateRecorder::kVersion);
+  EXPECT_EQ(record_size, sizeof(StateRecord));
+
+  std::vector<StateRecord> records(kSamples + 1);
+  file.read(reinterpret_cast<char*>(records.data()), records.size() * sizeof(StateRecord));
+  ASSERT_EQ(file.gcount(), static_cast<std::streamsize>(kSamples * sizeof(StateRecord)));
+  for (int i = 0; i < kSamples; i++) {
+    EXPECT_EQ(records.at(i).time, static_cast<uint64_t>(i));
+    EXPECT_EQ(records.at(i).host_time, i * 1000000);
+    EXPECT_DOUBLE_EQ(records.at(i).q.at(6), i * 0.1);
+    EXPECT_DOUBLE_EQ(records.at(i).O_T_EE.at(12), i);
+  }
+  std::remove(kPath.c_str());
+}
+
+TEST(StateRecorderTest, dropsSamplesWhenBufferIsFull) {
+  const auto kPath = temporaryPath();
+  {
+    StateRecorder recorder(kPath, 4);
+    franka::RobotState state;
+    for (int i = 0; i < 1000; i++) {
+      recorder.record(state, StateRecorder::Clock::now());
+    }
+    EXPECT_GT(recorder.droppedSamples(), 0U);
+  }
+  std::remove(kPath.c_str());
+}
+
+TEST(StateRecorderTest, throwsIfFileCannotBeCreated) {
+  EXPECT_THROW(StateRecorder("/nonexistent_directory/recording.bin"), std::runtime_error);
+}
@@ -0,0 +1,60 @@
+#  Copyright (c) 2023 Franka Emika GmbH
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from franka_hardware.state_recording import load_recording, RECORD_DTYPE, write_header
+import numpy
+import pytest
+
+
+def write_recording(path, records, trailing_bytes=b''):
+    with open(path, 'wb') as stream:
+        write_header(stream)
+        records.tofile(stream)
+        stream.write(trailing_bytes)
+
+
+def test_load_records(tmp_path):
+    path = str(tmp_path / 'recording.bin')
+    records = numpy.zeros(100, dtype=RECORD_DTYPE)
+    records['time'] = numpy.arange(100)
+    records['q'][:, 3] = numpy.linspace(0, 1, 100)
+    write_recording(path, records)
+    recording = load_recording(path)
+    assert len(recording) == 100
+    assert recording['time'][-1] == 99
+    numpy.testing.assert_array_equal(recording['q'][:, 3], records['q'][:, 3])
+
+
+def test_ignore_partial_record(tmp_path):
+    path = str(tmp_path / 'recording.bin')
+    write_recording(path, numpy.zeros(3, dtype=RECORD_DTYPE), b'\0' * 10)
+    assert len(load_recording(path)) == 3
+
+
+def test_load_empty_recording(tmp_path):
+    path = str(tmp_path / 'recording.bin')
+    write_recording(path, numpy.zeros(0, dtype=RECORD_DTYPE))
+    assert len(load_recording(path)) == 0
+
+
+def test_reject_other_files(tmp_path):
+    path = str(tmp_path / 'recording.bin')
+    with open(path, 'wb') as stream:
+        stream.write(b'not a recording at all')
+    with pytest.raises(ValueError):
+        load_recording(path)
+
+
+def test_record_size_matches_cpp():
+    assert RECORD_DTYPE.itemsize == 1272
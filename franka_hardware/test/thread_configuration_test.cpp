@@ -0,0 +1,95 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <sched.h>
+
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <unordered_map>
+
+#include <gtest/gtest.h>
+#include <rclcpp/logging.hpp>
+
+#include "franka_hardware/thread_configuration.hpp"
+
+using franka_hardware::parseThreadConfiguration;
+
+TEST(ThreadConfigurationTest, keepsInheritedSettingsByDefault) {
+  const auto kConfiguration =
+      parseThreadConfiguration({{"loop_thread_priority", ""}}, "loop_thread");
+  EXPECT_EQ(kConfiguration.name, "loop_thread");
+  EXPECT_TRUE(kConfiguration.empty());
+}
+
+TEST(ThreadConfigurationTest, parsesPolicyPriorityAndCpus) {
+  const auto kConfiguration = parseThreadConfiguration(
+      {{"loop_thread_policy", "rr"}, {"loop_thread_priority", "80"}, {"loop_thread_cpus", "2,3"}},
+      "loop_thread");
+  EXPECT_TRUE(kConfiguration.set_scheduling);
+  EXPECT_EQ(kConfiguration.policy, SCHED_RR);
+  EXPECT_EQ(kConfiguration.priority, 80);
+  EXPECT_EQ(kConfiguration.cpus, (std::vector<int>{2, 3}));
+}
+
+TEST(ThreadConfigurationTest, priorityWithoutPolicySelectsFifo) {
+  const auto kConfiguration =
+      parseThreadConfiguration({{"loop_thread_priority", "90"}}, "loop_thread");
+  EXPECT_EQ(kConfiguration.policy, SCHED_FIFO);
+  EXPECT_EQ(kConfiguration.priority, 90);
+}
+
+TEST(ThreadConfigurationTest, rejectsInvalidValues) {
+  EXPECT_THROW(parseThreadConfiguration({{"loop_thread_policy", "deadline"}}, "loop_thread"),
+               std::invalid_argument);
+  EXPECT_THROW(parseThreadConfiguration({{"loop_thread_priority", "high"}}, "loop_thread"),
+               std::invalid_argument);
+  EXPECT_THROW(parseThreadConfiguration({{"loop_thread_priority", "100"}}, "loop_thread"),
+               std::invalid_argument);
+  EXPECT_THROW(
+      parseThreadConfiguration({{"loop_thread_policy", "other"}, {"loop_thread_priority", "10"}},
+                               "loop_thread"),
+      std::invalid_argument);
+  EXPECT_THROW(parseThreadConfiguration({{"loop_thread_cpus", "1,-2"}}, "loop_thread"),
+               std::invalid_argument);
+}
+
+TEST(ThreadConfigurationTest, rejectsEmptyCpusInTheList) {
+  for (const auto* cpus : {"0,,1", "2,", ",3", ","}) {
+    EXPECT_THROW(parseThreadConfiguration({{"loop_thread_cpus", cpus}}, "loop_thread"),
+                 std::invalid_argument)
+        << cpus;
+  }
+}
+
+TEST(ThreadConfigurationTest, appliesAffinityToCurrentThread) {
+  cpu_set_t allowed;
+  CPU_ZERO(&allowed);
+  ASSERT_EQ(sched_getaffinity(0, sizeof(allowed), &allowed), 0);
+  int cpu = 0;
+  while (not CPU_ISSET(cpu, &allowed)) {
+    cpu++;
+  }
+
+  std::thread thread([cpu]() {
+    const auto kConfiguration =
+        parseThreadConfiguration({{"test_thread_cpus", std::to_string(cpu)}}, "test_thread");
+    EXPECT_TRUE(
+        franka_hardware::applyToCurrentThread(kConfiguration, rclcpp::get_logger("thread_test")));
+    EXPECT_EQ(sched_getcpu(), cpu);
+    const auto kDescription = franka_hardware::describeCurrentThread();
+    EXPECT_NE(kDescription.find("CPUs " + std::to_string(cpu)), std::string::npos) << kDescription;
+  });
+  thread.join();
+}
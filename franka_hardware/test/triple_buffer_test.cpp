@@ -0,0 +1,87 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <array>
+#include <atomic>
+#include <cstdint>
+#include <thread>
+
+#include <gtest/gtest.h>
+
+#include "franka_hardware/triple_buffer.hpp"
+
+using franka_hardware::TripleBuffer;
+
+TEST(TripleBufferTest, returnsInitialValueBeforeFirstPublish) {
+  TripleBuffer<int> buffer(42);
+  EXPECT_FALSE(buffer.update());
+  EXPECT_EQ(buffer.read(), 42);
+}
+
+TEST(TripleBufferTest, returnsLatestPublishedValue) {
+  TripleBuffer<int> buffer(0);
+  buffer.write(1);
+  buffer.write(2);
+  buffer.write(3);
+  EXPECT_TRUE(buffer.update());
+  EXPECT_EQ(buffer.front(), 3);
+  EXPECT_FALSE(buffer.update());
+  EXPECT_EQ(buffer.front(), 3);
+}
+
+TEST(TripleBufferTest, frontIsStableUntilNextUpdate) {
+  TripleBuffer<int> buffer(0);
+  buffer.write(1);
+  const int& kFront = buffer.read();
+  buffer.write(2);
+  buffer.write(3);
+  EXPECT_EQ(kFront, 1);
+  EXPECT_EQ(buffer.read(), 3);
+}
+
+TEST(TripleBufferTest, backCanBeFilledInPlace) {
+  TripleBuffer<std::array<double, 7>> buffer;
+  buffer.back().fill(1.5);
+  buffer.publish();
+  EXPECT_DOUBLE_EQ(buffer.read().at(6), 1.5);
+}
+
+TEST(TripleBufferTest, consumerNeverSeesTornOrOutOfOrderValues) {
+  constexpr std::uint64_t kIterations = 200000;
+  TripleBuffer<std::array<std::uint64_t, 16>> buffer;
+  std::atomic_bool done{false};
+
+  std::thread producer([&]() {
+    for (std::uint64_t i = 1; i <= kIterations; i++) {
+      buffer.back().fill(i);
+      buffer.publish();
+    }
+    done = true;
+  });
+
+  std::uint64_t last_seen = 0;
+  bool consistent = true;
+  while (not done or buffer.update()) {
+    const auto& kValue = buffer.read();
+    for (auto element : kValue) {
+      consistent = consistent and element == kValue.front();
+    }
+    consistent = consistent and kValue.front() >= last_seen;
+    last_seen = kValue.front();
+  }
+  producer.join();
+
+  EXPECT_TRUE(consistent);
+  EXPECT_EQ(buffer.read().front(), kIterations);
+}
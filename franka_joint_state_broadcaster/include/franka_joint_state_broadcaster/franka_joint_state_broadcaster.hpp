@@ -0,0 +1,69 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <memory>
+#include <string>
+#include <vector>
+
+#include <controller_interface/controller_interface.hpp>
+#include <franka_msgs/msg/state_latency.hpp>
+#include <rclcpp/rclcpp.hpp>
+#include <realtime_tools/realtime_publisher.hpp>
+#include <sensor_msgs/msg/joint_state.hpp>
+
+namespace franka_joint_state_broadcaster {
+
+/**
+ * Publishes the joint states of an arm on joint_states, stamped with the time at which the robot
+ * measured them instead of the time of publishing. The latency of each published state is
+ * published on ~/latency.
+ *
+ * Uses the {arm_id}/measurement_time and {arm_id}/state_age state interfaces of franka_hardware.
+ * The joints listed in the gripper_joints parameter, e.g. the finger joints exported by
+ * franka_gripper/GripperHardwareInterface, are published in the same message.
+ */
+class FrankaJointStateBroadcaster : public controller_interface::ControllerInterface {
+ public:
+  CallbackReturn on_init() override { return CallbackReturn::SUCCESS; };
+  controller_interface::return_type init(
+      const std::string& controller_name,
+      const std::string& namespace_ = "",
+      const rclcpp::NodeOptions& options = rclcpp::NodeOptions()) override;
+  controller_interface::InterfaceConfiguration command_interface_configuration() const override;
+  controller_interface::InterfaceConfiguration state_interface_configuration() const override;
+  CallbackReturn on_configure(const rclcpp_lifecycle::State& previous_state) override;
+  controller_interface::return_type update(const rclcpp::Time& time,
+                                           const rclcpp::Duration& period) override;
+
+ private:
+  static constexpr int kNumberOfJoints = 7;
+  // Order of the state interfaces of each joint
+  static constexpr int kPosition = 0;
+  static constexpr int kVelocity = 1;
+  static constexpr int kEffort = 2;
+  static constexpr int kInterfacesPerJoint = 3;
+
+  std::string arm_id_;
+  std::vector<std::string> gripper_joints_;
+  std::shared_ptr<rclcpp::Publisher<sensor_msgs::msg::JointState>> joint_state_publisher_;
+  std::shared_ptr<rclcpp::Publisher<franka_msgs::msg::StateLatency>> latency_publisher_;
+  std::unique_ptr<realtime_tools::RealtimePublisher<sensor_msgs::msg::JointState>>
+      realtime_joint_state_publisher_;
+  std::unique_ptr<realtime_tools::RealtimePublisher<franka_msgs::msg::StateLatency>>
+      realtime_latency_publisher_;
+};
+
+}  // namespace franka_joint_state_broadcaster
@@ -0,0 +1,147 @@
+// Copyright (c) 2023 Franka Emika GmbH
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <franka_joint_state_broadcaster/franka_joint_state_broadcaster.hpp>
+
+#include <cmath>
+#include <exception>
+#include <string>
+
+namespace franka_joint_state_broadcaster {
+
+controller_interface::return_type FrankaJointStateBroadcaster::init(
+    const std::string& controller_name,
+    const std::string& /*namespace_*/,
+    const rclcpp::NodeOptions& /*options*/) {
+  auto ret = ControllerInterface::init(controller_name);
+  if (ret != controller_interface::return_type::OK) {
+    return ret;
+  }
+  try {
+    auto_declare<std::string>("arm_id", "panda");
+    auto_declare<std::vector<std::string>>("gripper_joints", {});
+  } catch (const std::exception& e) {
+    fprintf(stderr, "Exception thrown during init stage with message: %s \n", e.what());
+    return controller_interface::return_type::ERROR;
+  }
+  return controller_interface::return_type::OK;
+}
+
+controller_interface::InterfaceConfiguration
+FrankaJointStateBroadcaster::command_interface_configuration() const {
+  return {controller_interface::interface_configuration_type::NONE, {}};
+}
+
+controller_interface::InterfaceConfiguration
+FrankaJointStateBroadcaster::state_interface_configuration() const {
+  controller_interface::InterfaceConfiguration config;
+  config.type = controller_interface::interface_configuration_type::INDIVIDUAL;
+  for (int i = 1; i <= kNumberOfJoints; ++i) {
+    config.names.push_back(arm_id_ + "_joint" + std::to_string(i) + "/position");
+    config.names.push_back(arm_id_ + "_joint" + std::to_string(i) + "/velocity");
+    config.names.push_back(arm_id_ + "_joint" + std::to_string(i) + "/effort");
+  }
+  config.names.push_back(arm_id_ + "/measurement_time");
+  config.names.push_back(arm_id_ + "/state_age");
+  for (const auto& joint : gripper_joints_) {
+    config.names.push_back(joint + "/position");
+    config.names.push_back(joint + "/velocity");
+    config.names.push_back(joint + "/effort");
+  }
+  return config;
+}
+
+rclcpp_lifecycle::node_interfaces::LifecycleNodeInterface::CallbackReturn
+FrankaJointStateBroadcaster::on_configure(const rclcpp_lifecycle::State& /*previous_state*/) {
+  arm_id_ = get_node()->get_parameter("arm_id").as_string();
+  gripper_joints_ = get_node()->get_parameter("gripper_joints").as_string_array();
+  try {
+    joint_state_publisher_ = get_node()->create_publisher<sensor_msgs::msg::JointState>(
+        "joint_states", rclcpp::SystemDefaultsQoS());
+    latency_publisher_ = get_node()->create_publisher<franka_msgs::msg::StateLatency>(
+        "~/latency", rclcpp::SystemDefaultsQoS());
+    realtime_joint_state_publisher_ =
+        std::make_unique<realtime_tools::RealtimePublisher<sensor_msgs::msg::JointState>>(
+            joint_state_publisher_);
+    realtime_latency_publisher_ =
+        std::make_unique<realtime_tools::RealtimePublisher<franka_msgs::msg::StateLatency>>(
+            latency_publisher_);
+  } catch (const std::exception& e) {
+    RCLCPP_FATAL(get_node()->get_logger(), "Could not create publishers: %s", e.what());
+    return CallbackReturn::ERROR;
+  }
+
+  // Allocate the messages once, update() only fills in the values.
+  auto& joint_state = realtime_joint_state_publisher_->msg_;
+  joint_state.name.clear();
+  for (int i = 1; i <= kNumberOfJoints; ++i) {
+    joint_state.name.push_back(arm_id_ + "_joint" + std::to_string(i));
+  }
+  joint_state.name.insert(joint_state.name.end(), gripper_joints_.begin(), gripper_joints_.end());
+  joint_state.position.assign(joint_state.name.size(), 0);
+  joint_state.velocity.assign(joint_state.name.size(), 0);
+  joint_state.effort.assign(joint_state.name.size(), 0);
+  return CallbackReturn::SUCCESS;
+}
+
+controller_interface::return_type FrankaJointStateBroadcaster::update(
+    const rclcpp::Time& time,
+    const rclcpp::Duration& /*period*/) {
+  const double kMeasurementTime =
+      state_interfaces_.at(kNumberOfJoints * kInterfacesPerJoint).get_value();
+  const double kStateAge =
+      state_interfaces_.at(kNumberOfJoints * kInterfacesPerJoint + 1).get_value();
+  if (not std::isfinite(kMeasurementTime) or kMeasurementTime <= 0) {
+    // The robot time has not been mapped onto the ROS clock yet.
+    return controller_interface::return_type::OK;
+  }
+  const rclcpp::Time kStamp(static_cast<int64_t>(std::llround(kMeasurementTime * 1e9)),
+                            time.get_clock_type());
+
+  if (realtime_joint_state_publisher_->trylock()) {
+    auto& joint_state = realtime_joint_state_publisher_->msg_;
+    joint_state.header.stamp = kStamp;
+    for (int i = 0; i < kNumberOfJoints; ++i) {
+      joint_state.position[i] = state_interfaces_[kInterfacesPerJoint * i + kPosition].get_value();
+      joint_state.velocity[i] = state_interfaces_[kInterfacesPerJoint * i + kVelocity].get_value();
+      joint_state.effort[i] = state_interfaces_[kInterfacesPerJoint * i + kEffort].get_value();
+    }
+    // The gripper joints follow the measurement_time and state_age interfaces of the arm
+    const size_t kGripperOffset = kNumberOfJoints * kInterfacesPerJoint + 2;
+    for (size_t i = 0; i < gripper_joints_.size(); ++i) {
+      const size_t kIndex = kGripperOffset + kInterfacesPerJoint * i;
+      joint_state.position[kNumberOfJoints + i] = state_interfaces_[kIndex + kPosition].get_value();
+      joint_state.velocity[kNumberOfJoints + i] = state_interfaces_[kIndex + kVelocity].get_value();
+      joint_state.effort[kNumberOfJoints + i] = state_interfaces_[kIndex + kEffort].get_value();
+    }
+    const double kPublishTime = get_node()->now().seconds();
+    realtime_joint_state_publisher_->unlockAndPublish();
+
+    if (realtime_latency_publisher_->trylock()) {
+      auto& latency = realtime_latency_publisher_->msg_;
+      latency.header.stamp = kStamp;
+      // The state was received state_age before the hardware was read at the time of this cycle.
+      latency.receive_latency = time.seconds() - kStateAge - kMeasurementTime;
+      latency.sensor_to_publish_latency = kPublishTime - kMeasurementTime;
+      realtime_latency_publisher_->unlockAndPublish();
+    }
+  }
+  return controller_interface::return_type::OK;
+}
+
+}  // namespace franka_joint_state_broadcaster
+#include "pluginlib/class_list_macros.hpp"
+// NOLINTNEXTLINE
+PLUGINLIB_EXPORT_CLASS(franka_joint_state_broadcaster::FrankaJointStateBroadcaster,
+                       controller_interface::ControllerInterface)